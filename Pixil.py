@@ -1,3 +1,4 @@
+import os
 import re
 import sys
 import gc
@@ -5,10 +6,12 @@ import signal  # At top with other imports
 import time
 import datetime
 from queue import Empty
-from shared import QueueManager
+from shared import QueueManager, latency_trace, alloc_stats
 from shared.mplot_protocol import pack_mplot, encode_buffer
 from pathlib import Path
-from database import PixilMetricsDB
+from database.metrics_writer import get_metrics_writer, close_metrics_writer
+from shared.consumer_stats import (summarize as summarize_consumer_stats, frame_stamp,
+                                   BUDGET_STAGES, BLAMED_STAGES, FRAME_BUDGET_LOG_ENV)
 from rgb_matrix_lib import execute_command
 from typing import Union, Dict, Optional, List
 from pixil_utils.variable_registry import VariableRegistry
@@ -45,20 +48,20 @@ from pixil_utils.test_hooks import (
     get_metrics,
     print_summary,
     note_fail_in_line,
+    is_bench_mode,
+    seed_script_randomness,
+    BenchSampler,
 )
 from collections import OrderedDict  # Make sure this is imported
 from pixil_utils.optimization_flags import (
     ENABLE_ULTRA_FAST_PATH, ENABLE_FAST_PATH, ENABLE_PARSE_VALUE_CACHE,
     ENABLE_PHASE1_FAST_PATH, show_status, set_profile)
+from pixil_utils.param_fast_paths import try_ultra_fast_path, try_fast_path
 # Import pre-compiled regex patterns
 from pixil_utils.regex_patterns import (
-    # Fast Path patterns
-    FAST_SIMPLE_ARRAY_PATTERN, FAST_VAR_PLUS_NUM_PATTERN, FAST_VAR_MUL_NUM_PATTERN,
-    FAST_VAR_SUB_NUM_PATTERN, FAST_VAR_DIV_NUM_PATTERN, FAST_VAR_MOD_NUM_PATTERN,
-    FAST_VAR_ADD_VAR_PATTERN, FAST_VAR_MUL_VAR_PATTERN,
     # Legacy patterns  
     ARRAY_CREATE_PATTERN, ARRAY_ASSIGN_PATTERN, SPRITE_DEF_PATTERN, COMMAND_PATTERN,
-    SPRITE_OP_PATTERN, PROCEDURE_DEF_PATTERN, GRID_PROGRAM_DEF_PATTERN, FIELD_PROGRAM_DEF_PATTERN, PROCEDURE_CALL_PATTERN, FRAME_PARAM_PATTERN,
+    SPRITE_OP_PATTERN, PROCEDURE_DEF_PATTERN, GRID_PROGRAM_DEF_PATTERN, FIELD_PROGRAM_DEF_PATTERN, PARTICLE_PROGRAM_DEF_PATTERN, PROCEDURE_CALL_PATTERN, FRAME_PARAM_PATTERN,
     FOR_LOOP_PATTERN, WHILE_LOOP_PATTERN, IF_PATTERN, RANDOM_PATTERN
 )
 
@@ -102,10 +105,18 @@ _metrics = {
     'active_time': 0,             # Time excluding queue pauses
     'pause_start': None,          # Timestamp when queue pause began (or None)
     'total_pause_time': 0,        # Total time spent waiting on full queue
+    'frames_submitted': 0,        # end_frame calls sent to the consumer
     'enabled': True               # Toggle for enabling/disabling metrics
 }
 
 current_command = None
+script_name = None  # Name of the running script (set by process_script)
+
+# --profile: CLI options (set in __main__) and the active script's sampler
+_PROFILE_OPTIONS = None
+_profiler = None
+_alloc_stats = None  # shared.alloc_stats.AllocStats when --alloc-stats / PIXIL_ALLOC_STATS
+_gc_tuning = None  # shared.alloc_stats.GcTuning when --gc-freeze / PIXIL_GC_FREEZE
 
 #Variable cache
 _VAR_FORMAT_CACHE = OrderedDict()
@@ -141,6 +152,7 @@ def initialize_metrics():
     _metrics['active_time'] = 0
     _metrics['pause_start'] = None
     _metrics['total_pause_time'] = 0
+    _metrics['frames_submitted'] = 0
     
     # Set start time for get_system("runtime")
     set_script_start_time(_metrics['start_time'])
@@ -319,6 +331,10 @@ def report_metrics(reason="complete", script_name=None, start_time=None):
     report_detailed_summary()
     print("--")
     report_jit_stats()
+    print("--")
+    report_consumer_stats()
+    if _alloc_stats is not None:
+        report_alloc_stats()
     print("--------------------------------------------")
 
     # Save to database if we have script info
@@ -329,6 +345,73 @@ def report_metrics(reason="complete", script_name=None, start_time=None):
             print(f"Warning: Could not save metrics to database: {e}")
             # Continue without failing - database is optional
 
+def telemetry_snapshot():
+    """Live counters for shared.telemetry (called from the publisher thread)."""
+    from pixil_utils.math_functions import get_cache_hit_rates
+
+    queue = QueueManager.get_instance()
+    consumer = queue.collect_consumer_stats()
+    stall = _metrics['total_pause_time']
+    if _metrics['pause_start'] is not None:
+        stall += time.time() - _metrics['pause_start']
+    try:
+        depth = queue.command_queue.qsize()
+    except (NotImplementedError, OSError):
+        depth = None
+    return {
+        'script': script_name,
+        'uptime': time.time() - _metrics['start_time'] if _metrics['start_time'] else 0.0,
+        'queue_depth': depth,
+        'queue_capacity': queue._queue_size,
+        'queue_stalled': _metrics['pause_start'] is not None,
+        'queue_stall_time': stall,
+        'commands': _metrics['commands_processed'],
+        'lines': _metrics['script_lines_processed'],
+        'frames': _metrics['frames_submitted'],
+        'consumer_frames': consumer['presents'],
+        'consumer_present_max_ms': consumer['present_max'] * 1000.0,
+        'consumer_text_stall_time': consumer['text_stall_time'],
+        'consumer_burnouts': consumer['burnouts_live'],
+        'consumer_frame_target_fps': consumer['frame_target_fps'],
+        'consumer_frame_overruns': consumer['frame_overruns'],
+        'cache_hit_rates': get_cache_hit_rates(),
+    }
+
+def report_consumer_stats():
+    """Display-side counters reported by the consumer process."""
+    row = summarize_consumer_stats(QueueManager.get_instance().collect_consumer_stats())
+    if not row['stats_messages']:
+        print("Consumer display stats: none received")
+        return
+    print("Consumer display stats:")
+    print(f"  Frames presented: {row['frames_presented']:,} ({row['end_frames']:,} end_frame)")
+    print(f"  Present time: avg {row['present_time_avg_ms']:.2f} ms, max {row['present_time_max_ms']:.2f} ms")
+    print(f"  Pixels per frame: avg {row['pixels_per_frame_avg']:.0f}, max {row['pixels_per_frame_max']:,}")
+    print(f"  Burnout objects live: {row['burnouts_live_end']:,} (peak {row['burnouts_live_peak']:,})")
+    print(f"  Fade pumps: {row['fade_pumps']:,}")
+    if row['text_effects']:
+        print(f"  Text effect stall: {row['text_effect_stall_time']:.3f}s over {row['text_effects']:,} effects")
+    if row['frames_paced']:
+        print(f"  Frame budget: {row['frame_overruns']:,}/{row['frames_paced']:,} frames over "
+              f"{1000.0 / row['frame_target_fps']:.1f} ms ({row['frame_overrun_pct']:.1f}%), "
+              f"worst {row['frame_time_max_ms']:.1f} ms")
+        stages = ", ".join(f"{stage} {row[f'frame_{stage}_avg_ms']:.1f}/{row[f'frame_{stage}_max_ms']:.1f}"
+                           for stage in BUDGET_STAGES)
+        print(f"  Frame stages avg/max ms: {stages}")
+        if row['frame_overruns']:
+            blamed = ", ".join(f"{stage} {row[f'overruns_{stage}']:,}" for stage in BLAMED_STAGES)
+            print(f"  Slowest stage: {row['frame_slowest_stage']} (overruns by stage: {blamed})")
+
+def report_alloc_stats():
+    """Allocation/GC summary for this script from both processes (--alloc-stats)."""
+    producer = alloc_stats.merge(alloc_stats.empty_totals(), _alloc_stats.take(final=True))
+    for line in alloc_stats.format_report("producer", producer):
+        print(line)
+    consumer = QueueManager.get_instance().collect_consumer_stats().get("alloc")
+    if consumer:
+        for line in alloc_stats.format_report("consumer", consumer):
+            print(line)
+
 # Update the save_performance_metrics function in Pixil.py
 
 def save_performance_metrics(script_name, start_time, reason):
@@ -483,11 +566,16 @@ def save_performance_metrics(script_name, start_time, reason):
         'condition_template_cache_size': ct_stats['condition_cache_size'],  # FIXED: Use actual cache size
     }
 
-    # Save to database
+    # Hand off to the writer thread; the next script starts without waiting on SQLite
     try:
-        db = PixilMetricsDB()
-        db.save_metrics(script_name, start_time, end_time, metrics_data, reason)
-        print(f"✓ Performance metrics saved to database")
+        consumer_totals = QueueManager.get_instance().collect_consumer_stats()
+        consumer_row = summarize_consumer_stats(consumer_totals) if consumer_totals['messages'] else None
+        profile_rows = _profiler.rows() if _profiler is not None and _PROFILE_OPTIONS.profile_db else None
+        writer = get_metrics_writer()
+        if writer.submit(script_name, start_time, end_time, metrics_data, reason, consumer_row, profile_rows):
+            print(f"✓ Performance metrics queued for database")
+        else:
+            print(f"Warning: metrics writer backlog full ({writer.dropped} run(s) dropped)")
     except Exception as e:
         print(f"Database save failed: {e}")
         raise
@@ -524,6 +612,7 @@ def process_script(filename, execute_func=None):
     # Track script execution timing
     global script_start_time, script_name
     global mplot_buffer, mplot_count  # Add this line
+    global _profiler
     script_start_time = datetime.datetime.now()
     script_name = Path(filename).name
 
@@ -549,6 +638,7 @@ def process_script(filename, execute_func=None):
     queue = QueueManager.get_instance()
     queue.set_pause_callbacks(on_pause=on_queue_pause, on_resume=on_queue_resume)
     queue.reset_throttle()
+    queue.reset_consumer_stats()
 
     # Initialize script environment
     global variables
@@ -572,6 +662,9 @@ def process_script(filename, execute_func=None):
             return _orig_print(*args, **kwargs)
 
         builtins.print = _test_aware_print
+        seed_script_randomness()
+    # Benchmark mode: per-frame interval + queue depth, printed once at script end
+    _bench = BenchSampler("producer") if is_bench_mode() else None
 
     script_lines = preprocess_lines(filename)  # Use existing preprocessing
     variables = VariableRegistry()
@@ -581,10 +674,14 @@ def process_script(filename, execute_func=None):
     compiled_procedures = {}
     grid_programs = {}
     field_programs = {}
+    particle_programs = {}
     sprite_context = SpriteContext()  # Add sprite context
     frame_commands = []  # Add frame command buffer
     pending_begin_frame: Optional[str] = None  # Deferred until end_frame flush
     in_frame_mode = False  # Add frame mode tracking
+    # Frame budget: interpreter time since the previous end_frame, minus queue stalls
+    frame_clock_start = 0.0
+    frame_clock_stall = 0.0
 
     # Define helper functions after variables are initialized
     def execute_command(cmd):
@@ -727,7 +824,7 @@ def process_script(filename, execute_func=None):
 
     def start_frame_buffer(preserve: bool = False):
         """Begin matrix frame and batch draw commands until end_frame."""
-        nonlocal in_frame_mode, pending_begin_frame
+        nonlocal in_frame_mode, pending_begin_frame, frame_clock_start, frame_clock_stall
         global mplot_buffer, mplot_count, draw_buffer, draw_count, sprite_buffer, sprite_count
         frame_commands.clear()
         mplot_buffer.clear()
@@ -738,15 +835,59 @@ def process_script(filename, execute_func=None):
         sprite_count = 0
         pending_begin_frame = f'begin_frame({str(preserve).lower()})'
         in_frame_mode = True
+        latency_trace.begin_frame()
+        if _gc_tuning is not None:
+            # First frame: the script's procedures and programs are loaded
+            _gc_tuning.enter()
+        if not frame_clock_start:
+            frame_clock_start = time.perf_counter()
+            frame_clock_stall = _metrics['total_pause_time']
 
     def finish_frame_buffer():
         """Flush batched commands then end the matrix frame."""
-        nonlocal in_frame_mode
+        nonlocal in_frame_mode, frame_clock_start, frame_clock_stall
         flush_draw_buffer_commands()
         flush_sprite_buffer_commands()
         in_frame_mode = False
         flush_frame_commands()
-        execute_command('end_frame')
+        interpret = 0.0
+        if frame_clock_start:
+            stalled = _metrics['total_pause_time'] - frame_clock_stall
+            interpret = max(0.0, time.perf_counter() - frame_clock_start - stalled)
+        queue.put_command('end_frame', force_instant=True, frame_stamp=frame_stamp(interpret))
+        frame_clock_start = time.perf_counter()
+        frame_clock_stall = _metrics['total_pause_time']
+        latency_trace.end_frame()
+        if _alloc_stats is not None:
+            _alloc_stats.frame()
+        _metrics['frames_submitted'] += 1
+        if _bench is not None:
+            _bench.tick_frame(_queue_depth())
+            if _bench.frame_limit_reached():
+                force_timer_expired()
+
+    def _queue_depth():
+        try:
+            return queue.command_queue.qsize()
+        except (NotImplementedError, OSError):
+            return None
+
+    def _emit_bench_summary(end_time: float) -> None:
+        paused = _metrics['total_pause_time']
+        if _metrics['pause_start'] is not None:
+            paused += end_time - _metrics['pause_start']
+        active = max(end_time - _metrics['start_time'] - paused, 1e-9)
+        # Same count as the run metrics: a draw/sprite batch is one command
+        commands = _metrics['commands_processed']
+        _bench.emit(
+            script=Path(filename).name,
+            lines=_metrics['script_lines_processed'],
+            commands=commands,
+            active_s=round(active, 4),
+            paused_s=round(paused, 4),
+            lines_per_s=round(_metrics['script_lines_processed'] / active, 1),
+            commands_per_s=round(commands / active, 1),
+        )
 
     def store_frame_command(cmd):
         """Store command if in frame mode, execute immediately if not"""
@@ -759,223 +900,6 @@ def process_script(filename, execute_func=None):
         else:
             execute_command(cmd)
 
-    def try_ultra_fast_path(value, command_name, param_position):
-        """
-        Handle the simplest parameter cases with minimal overhead.
-        Returns formatted parameter string or None if not handled.
-        """
-        # REMOVED: Detailed counter tracking for better performance
-        
-        if not isinstance(value, str):
-            return None
-            
-        value_stripped = value.strip()
-        
-        # Ultra-Fast Path #1: Direct integers (e.g., "100", "32", "5")
-        if value_stripped.isdigit():
-            if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                debug_print(f"Ultra-fast integer: {value_stripped}", DEBUG_VERBOSE)
-            return value_stripped
-        
-        # Ultra-Fast Path #2: Direct color names (e.g., "red", "blue", "green")
-        # Create a set of known color names from your color list
-        KNOWN_COLORS = {
-            'black', 'white', 'gray', 'light_gray', 'dark_gray', 'silver',
-            'red', 'crimson', 'maroon', 'rose', 'pink', 'salmon', 'coral',
-            'brown', 'standard_brown', 'dark_brown', 'wood_brown', 'tan',
-            'orange', 'gold', 'peach', 'bronze', 'yellow', 'lime', 'green',
-            'olive', 'spring_green', 'forest_green', 'mint', 'teal', 'turquoise',
-            'cyan', 'sky_blue', 'azure', 'blue', 'navy', 'royal_blue', 'ocean_blue',
-            'indigo', 'purple', 'violet', 'magenta', 'lavender'
-        }
-        
-        if value_stripped in KNOWN_COLORS:
-            if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                debug_print(f"Ultra-fast color: {value_stripped}", DEBUG_VERBOSE)
-            return value_stripped
-
-        # Ultra-Fast Path #2b: burnout_mode literals (fade/instant) for plot/mplot
-        if value_stripped in ('fade', 'instant'):
-            try:
-                param_name = PARAMETER_TYPES[command_name][param_position]['name']
-            except (KeyError, IndexError):
-                param_name = ''
-            if param_name == 'burnout_mode':
-                if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                    debug_print(f"Ultra-fast burnout_mode: {value_stripped}", DEBUG_VERBOSE)
-                return value_stripped
-        
-        # Ultra-Fast Path #3: Direct quoted strings (e.g., "Hello", "piboto-regular")
-        if ((value_stripped.startswith('"') and value_stripped.endswith('"')) or
-            (value_stripped.startswith("'") and value_stripped.endswith("'"))):
-            if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                debug_print(f"Ultra-fast quoted string: {value_stripped}", DEBUG_VERBOSE)
-            return value_stripped
-        
-        # Not handled by ultra-fast path
-        return None
-
-    def try_fast_path(value, command_name, param_position):
-        """
-        Handle moderately complex parameter cases efficiently.
-        Returns formatted parameter string or None if not handled.
-        """
-        # REMOVED: Detailed counter tracking for better performance
-        
-        if not isinstance(value, str):
-            return None
-            
-        value_stripped = value.strip()
-        
-        # Fast Path #1: Simple array access (e.g., "v_array[v_i]", "v_px[v_i]")
-        array_match = FAST_SIMPLE_ARRAY_PATTERN.match(value_stripped)
-        if array_match:
-            array_name, index_var = array_match.groups()
-            
-            # Minimal validation then let Python handle the rest
-            if array_name in variables and index_var in variables:
-                try:
-                    array = variables[array_name]
-                    index = int(variables[index_var])
-                    result = array[index]  # Let Python handle bounds checking and array type
-                    
-                    if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                        debug_print(f"Fast array access: {array_name}[{index_var}] = {array_name}[{index}] = {result}", DEBUG_VERBOSE)
-                    return format_parameter(result, command_name, param_position, variables)
-                    
-                except (KeyError, IndexError, TypeError, ValueError):
-                    pass  # Fall back to normal processing
-        
-        # Fast Path #2: Simple arithmetic (v_variable + number, v_variable * number, etc.)
-        # Variable + number pattern
-        plus_match = FAST_VAR_PLUS_NUM_PATTERN.match(value_stripped)
-        if plus_match:
-            var_name, number_str = plus_match.groups()
-            if is_valid_numeric_operation(var_name, number_str, variables):
-                var_value = variables[var_name]
-                
-                # Simplified arithmetic - let Python handle int/float automatically
-                if '.' in number_str:
-                    result = float(var_value) + float(number_str)
-                else:
-                    result = var_value + int(number_str)
-                
-                if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                    debug_print(f"Fast add: {var_name} + {number_str} = {result}", DEBUG_VERBOSE)
-                return format_parameter(result, command_name, param_position, variables)
-        
-        # Variable * number pattern 
-        sub_match = FAST_VAR_SUB_NUM_PATTERN.match(value_stripped)
-        if sub_match:
-            var_name, number_str = sub_match.groups()
-            if is_valid_numeric_operation(var_name, number_str, variables):
-                var_value = variables[var_name]
-                
-                # Simplified arithmetic - let Python handle int/float automatically
-                if '.' in number_str:
-                    result = float(var_value) - float(number_str)
-                else:
-                    result = var_value - int(number_str)
-                
-                if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                    debug_print(f"Fast sub: {var_name} - {number_str} = {result}", DEBUG_VERBOSE)
-                return format_parameter(result, command_name, param_position, variables)
-                
-        # Variable - number pattern
-        sub_match = FAST_VAR_SUB_NUM_PATTERN.match(value_stripped)
-        if sub_match:
-            var_name, number_str = sub_match.groups()
-            if is_valid_numeric_operation(var_name, number_str, variables):
-                var_value = variables[var_name]
-                
-                # Simplified arithmetic - let Python handle int/float automatically
-                if '.' in number_str:
-                    result = float(var_value) - float(number_str)
-                else:
-                    result = var_value - int(number_str)
-                
-                if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                    debug_print(f"Fast sub: {var_name} - {number_str} = {result}", DEBUG_VERBOSE)
-                return format_parameter(result, command_name, param_position, variables)
-
-        # Variable / number pattern
-        div_match = FAST_VAR_DIV_NUM_PATTERN.match(value_stripped)
-        if div_match:
-            var_name, number_str = div_match.groups()
-            if is_valid_numeric_operation(var_name, number_str, variables) and float(number_str) != 0:
-                var_value = variables[var_name]
-                
-                # Division always results in float to avoid integer division issues
-                result = float(var_value) / float(number_str)
-                
-                if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                    debug_print(f"Fast div: {var_name} / {number_str} = {result}", DEBUG_VERBOSE)
-                return format_parameter(result, command_name, param_position, variables)
-
-        # Variable % number pattern
-        mod_match = FAST_VAR_MOD_NUM_PATTERN.match(value_stripped)
-        if mod_match:
-            var_name, number_str = mod_match.groups()
-            if is_valid_numeric_operation(var_name, number_str, variables) and float(number_str) != 0:
-                var_value = variables[var_name]
-                
-                # Modulo operation
-                if '.' in number_str:
-                    result = float(var_value) % float(number_str)
-                else:
-                    result = var_value % int(number_str)
-                
-                if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                    debug_print(f"Fast mod: {var_name} % {number_str} = {result}", DEBUG_VERBOSE)
-                return format_parameter(result, command_name, param_position, variables)
-
-        # Variable + variable pattern
-        var_add_match = FAST_VAR_ADD_VAR_PATTERN.match(value_stripped)
-        if var_add_match:
-            var1, var2 = var_add_match.groups()
-            if (var1 in variables and var2 in variables and
-                isinstance(variables[var1], (int, float)) and
-                isinstance(variables[var2], (int, float))):
-                
-                result = variables[var1] + variables[var2]
-                
-                if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                    debug_print(f"Fast var add: {var1} + {var2} = {result}", DEBUG_VERBOSE)
-                return format_parameter(result, command_name, param_position, variables)
-
-        # Variable * variable pattern
-        var_mul_match = FAST_VAR_MUL_VAR_PATTERN.match(value_stripped)
-        if var_mul_match:
-            var1, var2 = var_mul_match.groups()
-            if (var1 in variables and var2 in variables and
-                isinstance(variables[var1], (int, float)) and
-                isinstance(variables[var2], (int, float))):
-                
-                result = variables[var1] * variables[var2]
-                
-                if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                    debug_print(f"Fast var mul: {var1} * {var2} = {result}", DEBUG_VERBOSE)
-                return format_parameter(result, command_name, param_position, variables)
-
-        # Not handled by fast path
-        return None
-
-    def is_valid_numeric_operation(var_name, number_str, variables):
-        """Pre-validate that we can do numeric arithmetic without exceptions."""
-        if var_name not in variables:
-            return False
-        
-        var_value = variables[var_name]
-        if not isinstance(var_value, (int, float)):
-            return False
-        
-        # Quick check if number_str is valid
-        try:
-            float(number_str)
-            return True
-        except ValueError:
-            return False
-
     def parse_value(value, command_name, param_position):
         """
         Parse and format a parameter value, handling variables and math expressions.
@@ -1016,7 +940,7 @@ def process_script(filename, execute_func=None):
         # OPTIMIZATION 2: Fast path for arrays and arithmetic (controlled by flag)
         if ENABLE_FAST_PATH:
             _FAST_PATH_PARSE_TOTAL += 1
-            fast_result = try_fast_path(value, command_name, param_position)
+            fast_result = try_fast_path(value, command_name, param_position, variables)
             if fast_result is not None:
                 _FAST_PATH_PARSE_HITS += 1
                 return fast_result
@@ -1658,6 +1582,10 @@ def process_script(filename, execute_func=None):
             execute_command('sync_queue')
             queue.wait_until_empty()
             queue.last_command_time = time.time() * 1000
+        elif cmd_name.startswith('neighbor_'):
+            from pixil_utils.spatial_hash import run_neighbor_command
+            run_neighbor_command(cmd_name[len('neighbor_'):], arg_exprs, variables,
+                                 lambda text: evaluate_math_expression(text.strip(), variables))
         elif cmd_name == 'mflush':
             from pixil_utils.optimization_flags import ENABLE_DRAW_BATCH
             if ENABLE_DRAW_BATCH:
@@ -1723,14 +1651,21 @@ def process_script(filename, execute_func=None):
             return
         debug_print(f"Calling procedure: {proc_name}", DEBUG_SUMMARY)
         compiled = compiled_procedures.get(proc_name)
-        if compiled is not None and ENABLE_COMPILED_PROCEDURES:
-            run_compiled_block(compiled, _get_compiled_ctx())
-        else:
-            from pixil_utils.loop_compiler import LoopBreak
-            try:
-                process_lines(iter(procedures[proc_name]))
-            except LoopBreak:
-                pass
+        profiler = _profiler
+        if profiler is not None:
+            profiler.enter(proc_name)
+        try:
+            if compiled is not None and ENABLE_COMPILED_PROCEDURES:
+                run_compiled_block(compiled, _get_compiled_ctx())
+            else:
+                from pixil_utils.loop_compiler import LoopBreak
+                try:
+                    process_lines(iter(procedures[proc_name]))
+                except LoopBreak:
+                    pass
+        finally:
+            if profiler is not None:
+                profiler.exit()
 
     # Generator-based line processing logic
     def process_lines(line_generator):
@@ -1874,6 +1809,16 @@ def process_script(filename, execute_func=None):
                 field_programs[prog_name] = compile_field_program(prog_name, body_lines)
                 debug_print(f"field_program defined: {prog_name}", DEBUG_SUMMARY)
 
+            elif (particle_prog_match := PARTICLE_PROGRAM_DEF_PATTERN.match(line)):
+                prog_name = particle_prog_match.group(1)
+                from pixil_utils.grid_field_compiler import (
+                    collect_brace_block_lines,
+                    compile_particle_program,
+                )
+                body_lines = collect_brace_block_lines(line_generator)
+                particle_programs[prog_name] = compile_particle_program(prog_name, body_lines)
+                debug_print(f"particle_program defined: {prog_name}", DEBUG_SUMMARY)
+
             elif (grid_reset_match := re.match(r'grid_reset\((\w+)\)', line)):
                 prog_name = grid_reset_match.group(1)
                 from pixil_utils.grid_engine import reset_grid_runtime
@@ -1892,10 +1837,19 @@ def process_script(filename, execute_func=None):
                 if prog_name not in field_programs:
                     raise ValueError(f"Unknown field_program: {prog_name}")
                 from pixil_utils.grid_engine import run_field_render
-                n_drawn = run_field_render(
-                    field_programs[prog_name], variables, _append_to_draw_batch, draw_buffer
-                )
-                draw_count += n_drawn
+                run_field_render(field_programs[prog_name], variables, _append_to_draw_batch)
+
+            elif (particle_step_match := re.match(r'particle_step\((\w+)\)', line)):
+                prog_name = particle_step_match.group(1)
+                if prog_name not in particle_programs:
+                    raise ValueError(f"Unknown particle_program: {prog_name}")
+                from pixil_utils.particle_engine import run_particle_step
+                run_particle_step(particle_programs[prog_name], variables, _append_to_draw_batch)
+
+            elif line.startswith('neighbor_') and (neighbor_match := COMMAND_PATTERN.fullmatch(line)):
+                # Same dispatch as neighbor_* statements in compiled loops
+                from pixil_utils.parameter_types import split_command_parameters
+                _run_compiled_command(neighbor_match.group(1), split_command_parameters(neighbor_match.group(2)))
 
             elif line == 'chladni_step' or line == 'chladni_step()':
                 from pixil_utils.chladni_engine import run_chladni_step
@@ -2315,6 +2269,11 @@ def process_script(filename, execute_func=None):
 
     # Call the generator for file reading
     _test_exit_code = 0
+    if _PROFILE_OPTIONS is not None:
+        from pixil_utils.script_profiler import ScriptProfiler
+
+        _profiler = ScriptProfiler(filename, interval=_PROFILE_OPTIONS.profile_interval)
+        _profiler.start()
     try:
         from pixil_utils.loop_compiler import LoopBreak
         try:
@@ -2334,8 +2293,14 @@ def process_script(filename, execute_func=None):
         _test_exit_code = 1
         raise
     finally:
+        if _profiler is not None:
+            _profiler.stop()
         if is_test_mode():
+            # Producer rates exclude the snapshot round-trip below
+            bench_end = time.time()
             _capture_test_buffer_if_needed()
+            if _bench is not None:
+                _emit_bench_summary(bench_end)
             print_summary(_test_exit_code)
         if is_test_mode() and _orig_print is not None:
             import builtins
@@ -2351,6 +2316,8 @@ def process_script(filename, execute_func=None):
         else:
             flush_draw_buffer_commands()
             flush_sprite_buffer_commands()
+        if _gc_tuning is not None:
+            _gc_tuning.leave()
         gc.collect()
         
     debug_print("Script processing completed", DEBUG_CONCISE)
@@ -2358,6 +2325,9 @@ def process_script(filename, execute_func=None):
     if not shutdown_requested():
         execution_reason = "complete" if normal_exit else "interrupted"
         report_metrics(execution_reason, script_name, script_start_time)
+    if _profiler is not None:
+        print(_profiler.format_table(_PROFILE_OPTIONS.profile_top))
+        _profiler = None
     
 _stopping_message_sent = False
 
@@ -2385,6 +2355,14 @@ def clear_all_caches_between_scripts():
     from pixil_utils.condition_templates import clear_condition_cache
     clear_condition_cache()
 
+    # Grid/field/particle program state, including coherent-zoom frames
+    from pixil_utils.grid_engine import reset_grid_runtime
+    reset_grid_runtime()
+
+    # Spatial hashes hold the last script's position arrays
+    from pixil_utils.spatial_hash import reset_hashes
+    reset_hashes()
+
 def reset_parse_value_stats():
     """Reset parse value optimization statistics for new script."""
     global _PARSE_VALUE_ATTEMPTS, _VAR_CACHE_HITS, _VAR_CACHE_MISSES
@@ -2407,6 +2385,7 @@ def reset_parse_value_stats():
 # Main Execution
 if __name__ == '__main__':
     queue_monitor = None
+    telemetry = None
     # Set up signal handler
     signal.signal(signal.SIGINT, signal_handler)
 
@@ -2416,6 +2395,15 @@ if __name__ == '__main__':
         
         if args.debug_level is not None:
             set_debug_level(args.debug_level)
+        if args.profile:
+            _PROFILE_OPTIONS = args
+        if args.frame_budget_log:
+            # Read by the consumer process, so set before it starts
+            os.environ[FRAME_BUDGET_LOG_ENV] = "1"
+        if args.alloc_stats:
+            os.environ[alloc_stats.ALLOC_ENV] = args.alloc_stats
+        if args.gc_freeze:
+            os.environ[alloc_stats.GC_FREEZE_ENV] = "1"
             
         # Initialize script manager
         script_manager = ScriptManager(args.script_path)
@@ -2424,10 +2412,28 @@ if __name__ == '__main__':
         queue_instance = QueueManager.get_instance()
         queue_instance.start_consumer()
 
+        # Producer side, after the fork so the consumer does not inherit gc
+        # callbacks or tracemalloc; it reads the same variables when it starts
+        _alloc_stats = alloc_stats.from_env()
+        if alloc_stats.gc_freeze_enabled():
+            _gc_tuning = alloc_stats.GcTuning()
+
+        # Live telemetry socket (--telemetry or PIXIL_TELEMETRY)
+        from shared import telemetry as telemetry_socket
+        telemetry_path = args.telemetry if args.telemetry is not None else telemetry_socket.socket_path_from_env()
+        if telemetry_path is not None:
+            telemetry = telemetry_socket.TelemetryPublisher(telemetry_snapshot, telemetry_path or None)
+            try:
+                telemetry.start()
+                print(f"Telemetry: {telemetry.path}")
+            except OSError as e:
+                print(f"Warning: telemetry disabled: {e}")
+                telemetry = None
+
         # Start queue monitor if requested
         if args.queue_monitor:
             from shared.queue_monitor import QueueMonitor
-            queue_monitor = QueueMonitor(queue_instance)
+            queue_monitor = QueueMonitor(queue_instance, telemetry)
             queue_monitor.start()
 
         # Clear display initially
@@ -2494,8 +2500,12 @@ if __name__ == '__main__':
         try:
             if queue_monitor:
                 queue_monitor.stop()
+            if telemetry:
+                telemetry.stop()
             if queue_instance:
                 queue_instance.shutdown_display(timeout=4.0)
+            latency_trace.finish_producer()
+            close_metrics_writer()
             stop_terminal()
         except Exception:
             sys.exit(1)
\ No newline at end of file
@@ -19,7 +19,9 @@ Metrics collected:
 Usage:
     sudo python3 burnout_benchmark.py
 
-Note: Must run as root for RGB matrix hardware access.
+Note: Must run as root for RGB matrix hardware access. Off the Pi, select an
+in-memory display backend instead (see rgb_matrix_lib/display_backend.py):
+    PIXIL_DISPLAY_BACKEND=framebuffer python3 burnout_benchmark.py
 """
 
 import time
@@ -8,12 +8,14 @@ hardware monitoring.
 Main Classes:
 - PixilMetricsDB: Store and retrieve Pixil script performance data
 - PixilQueries: Helper class for common Pixil metric queries
+- MetricsWriter: Background thread that batches run metrics into the database
 
 Future classes will include matrix hardware metrics when needed.
 """
 
 from .pixil_metrics import PixilMetricsDB
 from .queries.pixil_queries import PixilQueries
+from .metrics_writer import MetricsWriter
 
 # Future matrix database imports will go here when implemented
 # from .matrix_metrics import MatrixMetricsDB  
@@ -21,7 +23,8 @@ from .queries.pixil_queries import PixilQueries
 
 __all__ = [
     'PixilMetricsDB',
-    'PixilQueries'
+    'PixilQueries',
+    'MetricsWriter'
 ]
 
 # Package version for future database migrations
@@ -0,0 +1,154 @@
+"""
+Background writer for Pixil run metrics.
+
+Script transitions used to open the database, insert ~70 columns and wait for
+SQLite to fsync before the next script could start; on an SD card that stalls
+the playlist handoff. submit() now only enqueues the run. A daemon thread owns
+one connection (statements stay prepared in its cache), drains whatever has
+queued up and writes it in a single transaction with synchronous=NORMAL, which
+under WAL defers the fsync to checkpoints.
+
+The queue is bounded: when the writer falls that far behind, new runs are
+dropped and counted rather than blocking the interpreter.
+"""
+
+import atexit
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from .pixil_metrics import PixilMetricsDB
+
+DEFAULT_MAX_PENDING = 64
+DEFAULT_BATCH_SIZE = 16
+SHUTDOWN_TIMEOUT = 5.0
+
+_STOP = object()
+
+
+class MetricsWriter:
+    """Bounded queue + writer thread for script_metrics and its child tables."""
+
+    def __init__(self, db: Optional[PixilMetricsDB] = None,
+                 max_pending: int = DEFAULT_MAX_PENDING, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db = db or PixilMetricsDB()
+        self.batch_size = max(1, batch_size)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.last_error: Optional[Exception] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pixil-metrics-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, script_name: str, start_time, end_time, metrics_data: Dict[str, Any],
+               reason: str = "complete", consumer_row: Optional[Dict[str, Any]] = None,
+               profile_rows: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """Queue one run; False (and counted in dropped) when the writer is saturated."""
+        self.start()
+        job = (script_name, start_time, end_time, metrics_data, reason, consumer_row, profile_rows)
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued run is committed; False on timeout."""
+        done = threading.Event()
+
+        def _waiter():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=_waiter, daemon=True).start()
+        return done.wait(timeout)
+
+    def close(self, timeout: float = SHUTDOWN_TIMEOUT) -> bool:
+        """Flush and stop the thread (a later submit() restarts it)."""
+        with self._lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return True
+        flushed = self.flush(timeout)
+        try:
+            self._queue.put(_STOP, timeout=0.5)
+        except queue.Full:
+            return False
+        thread.join(timeout=1.0)
+        return flushed
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        conn = self.db.get_connection()
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    self._queue.task_done()
+                    return
+                batch = [first]
+                while len(batch) < self.batch_size:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is _STOP:
+                        self._write(conn, batch)
+                        self._queue.task_done()
+                        return
+                    batch.append(job)
+                self._write(conn, batch)
+        finally:
+            conn.close()
+
+    def _write(self, conn, batch) -> None:
+        try:
+            for script_name, start_time, end_time, metrics_data, reason, consumer_row, profile_rows in batch:
+                row_id = self.db.insert_metrics(conn, script_name, start_time, end_time, metrics_data, reason)
+                if consumer_row:
+                    self.db.insert_consumer_metrics(conn, row_id, consumer_row)
+                if profile_rows:
+                    self.db.insert_line_profile(conn, row_id, profile_rows)
+            conn.commit()
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            conn.rollback()
+            self.last_error = e
+            print(f"Warning: metrics writer dropped {len(batch)} run(s): {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+_writer: Optional[MetricsWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_metrics_writer() -> MetricsWriter:
+    """Process-wide writer for the default metrics database."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = MetricsWriter()
+            atexit.register(close_metrics_writer)
+        return _writer
+
+
+def close_metrics_writer(timeout: float = SHUTDOWN_TIMEOUT) -> bool:
+    """Flush pending runs before exit; safe to call when no writer exists."""
+    with _writer_lock:
+        writer = _writer
+    return writer.close(timeout) if writer is not None else True
@@ -1,84 +1,172 @@
 #!/usr/bin/env python3
 """
-Manual database migration script for Pixil metrics.
-Usage: python migrate.py [migration_number]
+Database migrations for Pixil metrics.
+
+Migrations are database/migrations/NNN_name.sql, applied in number order and
+recorded in the schema_migrations table. PixilMetricsDB calls ensure_schema()
+once per process, so a new database gets every migration and an existing one
+only the missing ones.
+
+Databases migrated by hand before schema_migrations existed are adopted: a
+statement that fails only because its column already exists is skipped, and
+the migration is then recorded.
+
+Usage: python migrate.py [migration_number] | --list | --all
 """
 import sys
 import argparse
-from pathlib import Path
-import sys
+import re
+import sqlite3
+import threading
 from pathlib import Path
 
 # Add parent directory to path so we can import from database package
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database.base import DatabaseConfig
-from database.pixil_metrics import PixilMetricsDB
+
+MIGRATION_NAME_PATTERN = re.compile(r'^(\d{3})_.+\.sql$')
+
+# Database paths already brought up to date in this process
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+
+def available_migrations():
+    """[(number, path)] for every migration file, in order."""
+    migrations = []
+    for path in DatabaseConfig.get_migrations_directory().glob("*.sql"):
+        match = MIGRATION_NAME_PATTERN.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), path))
+    return sorted(migrations)
+
+
+def _ensure_tracking_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def applied_versions(conn):
+    """Migration numbers recorded in schema_migrations."""
+    _ensure_tracking_table(conn)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+
+def _split_statements(sql):
+    """Split a migration script into complete SQL statements."""
+    statements, pending = [], ""
+    for line in sql.splitlines(keepends=True):
+        pending += line
+        if sqlite3.complete_statement(pending):
+            if pending.strip():
+                statements.append(pending.strip())
+            pending = ""
+    leftover = "\n".join(l for l in pending.splitlines() if not l.strip().startswith('--')).strip()
+    if leftover:
+        statements.append(leftover)
+    return statements
+
+
+def _apply_to_connection(conn, number, path):
+    """Run one migration statement by statement and record it."""
+    for statement in _split_statements(path.read_text()):
+        try:
+            conn.execute(statement)
+        except sqlite3.OperationalError as e:
+            # Column added by a hand-applied copy of this migration
+            if "duplicate column name" not in str(e):
+                raise
+    conn.execute(
+        "INSERT OR REPLACE INTO schema_migrations (version, name) VALUES (?, ?)",
+        (number, path.name),
+    )
+
+
+def apply_pending_migrations(db):
+    """Apply every unrecorded migration to db; returns the numbers applied."""
+    applied = []
+    with db.get_connection() as conn:
+        done = applied_versions(conn)
+        for number, path in available_migrations():
+            if number in done:
+                continue
+            _apply_to_connection(conn, number, path)
+            applied.append(number)
+        conn.commit()
+    return applied
+
+
+def ensure_schema(db):
+    """Bring db up to date once per process and switch it to WAL journaling."""
+    key = str(db.db_path)
+    if key in _schema_ready:
+        return
+    with _schema_lock:
+        if key in _schema_ready:
+            return
+        apply_pending_migrations(db)
+        with db.get_connection() as conn:
+            # Persistent per database file; readers no longer block the writer
+            conn.execute("PRAGMA journal_mode=WAL")
+        _schema_ready.add(key)
+
 
 def apply_migration(migration_number):
     """Apply a specific migration by number."""
-    migrations_dir = DatabaseConfig.get_migrations_directory()
-    migration_file = migrations_dir / f"{migration_number:03d}_*.sql"
-    
-    # Find the migration file
-    migration_files = list(migrations_dir.glob(f"{migration_number:03d}_*.sql"))
-    
+    from database.pixil_metrics import PixilMetricsDB
+
+    migration_files = [path for number, path in available_migrations() if number == migration_number]
     if not migration_files:
         print(f"Migration {migration_number:03d} not found")
         return False
-    
+
     migration_file = migration_files[0]
     print(f"Applying migration: {migration_file.name}")
-    
+
     try:
         db = PixilMetricsDB()
-        
-        # Check if migration was already applied
-        if migration_already_applied(db, migration_number):
-            print(f"Migration {migration_number:03d} already applied")
-            return True
-        
-        # Read and execute migration
-        with open(migration_file, 'r') as f:
-            migration_sql = f.read()
-        
-        db.execute_migration(migration_sql)
-        
-        # Record that migration was applied
-        record_migration(db, migration_number, migration_file.name)
-        
+        with db.get_connection() as conn:
+            if migration_already_applied(conn, migration_number):
+                print(f"Migration {migration_number:03d} already applied")
+                return True
+            _apply_to_connection(conn, migration_number, migration_file)
+            conn.commit()
+        record_migration(migration_number, migration_file.name)
         print(f"✓ Migration {migration_number:03d} applied successfully")
         return True
-        
+
     except Exception as e:
         print(f"✗ Migration failed: {str(e)}")
         return False
 
-def migration_already_applied(db, migration_number):
+
+def migration_already_applied(conn, migration_number):
     """Check if migration was already applied."""
-    try:
-        with db.get_connection() as conn:
-            # Try to query for JIT columns to see if migration 002 was applied
-            if migration_number == 2:
-                cursor = conn.execute("PRAGMA table_info(script_metrics)")
-                columns = [row[1] for row in cursor.fetchall()]
-                return 'jit_attempts' in columns
-            return False
-    except Exception:
-        return False
+    return migration_number in applied_versions(conn)
+
 
-def record_migration(db, migration_number, filename):
-    """Record that a migration was applied (optional tracking)."""
-    # For now, just print - you could create a migrations table if desired
+def record_migration(migration_number, filename):
+    """Report a migration recorded in schema_migrations."""
     print(f"Recorded migration {migration_number:03d}: {filename}")
 
+
 def list_pending_migrations():
-    """List migrations that haven't been applied."""
-    migrations_dir = DatabaseConfig.get_migrations_directory()
-    
+    """List migrations and whether each has been applied."""
+    from database.pixil_metrics import PixilMetricsDB
+
+    with PixilMetricsDB().get_connection() as conn:
+        done = applied_versions(conn)
     print("Available migrations:")
-    for migration_file in sorted(migrations_dir.glob("*.sql")):
-        print(f"  {migration_file.name}")
+    for number, path in available_migrations():
+        status = "applied" if number in done else "pending"
+        print(f"  {path.name:<45} {status}")
+
 
 def main():
     parser = argparse.ArgumentParser(description='Apply database migrations')
@@ -86,20 +174,31 @@ def main():
                        help='Migration number to apply (e.g., 2 for 002_add_jit_line_caching.sql)')
     parser.add_argument('--list', action='store_true',
                        help='List available migrations')
-    
+    parser.add_argument('--all', action='store_true',
+                       help='Apply every pending migration')
+
     args = parser.parse_args()
-    
+
     if args.list:
         list_pending_migrations()
         return
-    
+
+    if args.all:
+        from database.pixil_metrics import PixilMetricsDB
+
+        # Constructing the database runs ensure_schema()
+        PixilMetricsDB()
+        list_pending_migrations()
+        return
+
     if not args.migration:
         print("Usage: python migrate.py <migration_number>")
         print("       python migrate.py --list")
+        print("       python migrate.py --all")
         return
-    
+
     success = apply_migration(args.migration)
     sys.exit(0 if success else 1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,31 @@
+-- Migration for consumer (display process) metrics
+-- One row per script run, reported by the rgb_matrix_lib consumer over the stats queue
+CREATE TABLE IF NOT EXISTS consumer_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script_metrics_id INTEGER NOT NULL REFERENCES script_metrics(id) ON DELETE CASCADE,
+    frames_presented INTEGER DEFAULT 0,
+    end_frames INTEGER DEFAULT 0,
+    present_time_total REAL DEFAULT 0.0,
+    present_time_avg_ms REAL DEFAULT 0.0,
+    present_time_max_ms REAL DEFAULT 0.0,
+    present_le_1ms INTEGER DEFAULT 0,
+    present_le_2ms INTEGER DEFAULT 0,
+    present_le_4ms INTEGER DEFAULT 0,
+    present_le_8ms INTEGER DEFAULT 0,
+    present_le_16ms INTEGER DEFAULT 0,
+    present_le_33ms INTEGER DEFAULT 0,
+    present_le_66ms INTEGER DEFAULT 0,
+    present_gt_66ms INTEGER DEFAULT 0,
+    pixels_written_total INTEGER DEFAULT 0,
+    pixels_per_frame_avg REAL DEFAULT 0.0,
+    pixels_per_frame_max INTEGER DEFAULT 0,
+    burnouts_live_end INTEGER DEFAULT 0,
+    burnouts_live_peak INTEGER DEFAULT 0,
+    fade_pumps INTEGER DEFAULT 0,
+    text_effects INTEGER DEFAULT 0,
+    text_effect_stall_time REAL DEFAULT 0.0,
+    stats_messages INTEGER DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_consumer_script_metrics ON consumer_metrics(script_metrics_id);
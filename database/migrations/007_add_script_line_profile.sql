@@ -0,0 +1,16 @@
+-- Migration for per-line script profiles (Pixil.py --profile-db)
+-- One row per (procedure stack, source line) sampled during a script run
+CREATE TABLE IF NOT EXISTS script_line_profile (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script_metrics_id INTEGER NOT NULL REFERENCES script_metrics(id) ON DELETE CASCADE,
+    line_numbers TEXT NOT NULL,
+    procedure_stack TEXT NOT NULL,
+    source_text TEXT,
+    samples INTEGER DEFAULT 0,
+    wall_time REAL DEFAULT 0.0,
+    cpu_time REAL DEFAULT 0.0,
+    wall_percent REAL DEFAULT 0.0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_line_profile_script_metrics ON script_line_profile(script_metrics_id, wall_time);
@@ -0,0 +1,214 @@
+-- Migration for daily per-script rollups
+-- One row per (day, script, execution_reason) holding the run count and the SUM of
+-- each metric column; averages are column / runs. Maintained by the insert trigger
+-- below, so summary and trend queries read a few rows per day instead of scanning
+-- script_metrics. Rollups are kept when delete_old_records prunes raw runs.
+CREATE TABLE IF NOT EXISTS script_daily_rollup (
+    day TEXT NOT NULL,                    -- DATE(start_time), local time
+    script_name TEXT NOT NULL,
+    execution_reason TEXT NOT NULL,
+    runs INTEGER DEFAULT 0,
+    commands_executed INTEGER DEFAULT 0,
+    script_lines_processed INTEGER DEFAULT 0,
+    total_execution_time REAL DEFAULT 0.0,
+    active_execution_time REAL DEFAULT 0.0,
+    commands_per_second REAL DEFAULT 0.0,
+    lines_per_second REAL DEFAULT 0.0,
+    fast_path_attempts INTEGER DEFAULT 0,
+    fast_path_hit_rate REAL DEFAULT 0.0,
+    fast_path_time_saved REAL DEFAULT 0.0,
+    fast_math_attempts INTEGER DEFAULT 0,
+    fast_math_hit_rate REAL DEFAULT 0.0,
+    fast_math_time_saved REAL DEFAULT 0.0,
+    cache_attempts INTEGER DEFAULT 0,
+    cache_hit_rate REAL DEFAULT 0.0,
+    cache_time_saved REAL DEFAULT 0.0,
+    parse_value_hit_rate REAL DEFAULT 0.0,
+    parse_value_time_saved REAL DEFAULT 0.0,
+    jit_attempts INTEGER DEFAULT 0,
+    jit_line_cache_skips INTEGER DEFAULT 0,
+    jit_hit_rate REAL DEFAULT 0.0,
+    jit_skip_efficiency REAL DEFAULT 0.0,
+    jit_time_saved REAL DEFAULT 0.0,
+    jit_skip_time_saved REAL DEFAULT 0.0,
+    -- Runs with JIT activity, and their rate sums (JIT averages skip idle runs)
+    jit_runs INTEGER DEFAULT 0,
+    jit_runs_hit_rate REAL DEFAULT 0.0,
+    jit_runs_skip_efficiency REAL DEFAULT 0.0,
+    resource_constrained_runs INTEGER DEFAULT 0,
+    PRIMARY KEY (day, script_name, execution_reason)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rollup_script_day ON script_daily_rollup(script_name, day);
+
+-- Backfill from existing runs
+INSERT OR REPLACE INTO script_daily_rollup (
+    day, script_name, execution_reason,
+    runs,
+    commands_executed,
+    script_lines_processed,
+    total_execution_time,
+    active_execution_time,
+    commands_per_second,
+    lines_per_second,
+    fast_path_attempts,
+    fast_path_hit_rate,
+    fast_path_time_saved,
+    fast_math_attempts,
+    fast_math_hit_rate,
+    fast_math_time_saved,
+    cache_attempts,
+    cache_hit_rate,
+    cache_time_saved,
+    parse_value_hit_rate,
+    parse_value_time_saved,
+    jit_attempts,
+    jit_line_cache_skips,
+    jit_hit_rate,
+    jit_skip_efficiency,
+    jit_time_saved,
+    jit_skip_time_saved,
+    jit_runs,
+    jit_runs_hit_rate,
+    jit_runs_skip_efficiency,
+    resource_constrained_runs
+) SELECT
+    DATE(start_time), script_name, COALESCE(execution_reason, 'complete'),
+    COUNT(*),
+    SUM(commands_executed),
+    SUM(script_lines_processed),
+    SUM(total_execution_time),
+    SUM(active_execution_time),
+    SUM(commands_per_second),
+    SUM(lines_per_second),
+    SUM(fast_path_attempts),
+    SUM(fast_path_hit_rate),
+    SUM(fast_path_time_saved),
+    SUM(fast_math_attempts),
+    SUM(fast_math_hit_rate),
+    SUM(fast_math_time_saved),
+    SUM(cache_attempts),
+    SUM(cache_hit_rate),
+    SUM(cache_time_saved),
+    SUM(parse_value_hit_rate),
+    SUM(parse_value_time_saved),
+    SUM(jit_attempts),
+    SUM(jit_line_cache_skips),
+    SUM(jit_hit_rate),
+    SUM(jit_skip_efficiency),
+    SUM(jit_time_saved),
+    SUM(jit_skip_time_saved),
+    SUM(CASE WHEN jit_attempts > 0 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN jit_attempts > 0 THEN jit_hit_rate ELSE 0 END),
+    SUM(CASE WHEN jit_attempts > 0 THEN jit_skip_efficiency ELSE 0 END),
+    SUM(CASE WHEN active_execution_time >= total_execution_time * 0.99 THEN 1 ELSE 0 END)
+FROM script_metrics
+GROUP BY DATE(start_time), script_name, COALESCE(execution_reason, 'complete');
+
+CREATE TRIGGER IF NOT EXISTS trg_script_daily_rollup
+AFTER INSERT ON script_metrics
+BEGIN
+    INSERT INTO script_daily_rollup (
+        day, script_name, execution_reason,
+        runs,
+        commands_executed,
+        script_lines_processed,
+        total_execution_time,
+        active_execution_time,
+        commands_per_second,
+        lines_per_second,
+        fast_path_attempts,
+        fast_path_hit_rate,
+        fast_path_time_saved,
+        fast_math_attempts,
+        fast_math_hit_rate,
+        fast_math_time_saved,
+        cache_attempts,
+        cache_hit_rate,
+        cache_time_saved,
+        parse_value_hit_rate,
+        parse_value_time_saved,
+        jit_attempts,
+        jit_line_cache_skips,
+        jit_hit_rate,
+        jit_skip_efficiency,
+        jit_time_saved,
+        jit_skip_time_saved,
+        jit_runs,
+        jit_runs_hit_rate,
+        jit_runs_skip_efficiency,
+        resource_constrained_runs
+    ) VALUES (
+        DATE(NEW.start_time), NEW.script_name, COALESCE(NEW.execution_reason, 'complete'),
+        1,
+        NEW.commands_executed,
+        NEW.script_lines_processed,
+        NEW.total_execution_time,
+        NEW.active_execution_time,
+        NEW.commands_per_second,
+        NEW.lines_per_second,
+        NEW.fast_path_attempts,
+        NEW.fast_path_hit_rate,
+        NEW.fast_path_time_saved,
+        NEW.fast_math_attempts,
+        NEW.fast_math_hit_rate,
+        NEW.fast_math_time_saved,
+        NEW.cache_attempts,
+        NEW.cache_hit_rate,
+        NEW.cache_time_saved,
+        NEW.parse_value_hit_rate,
+        NEW.parse_value_time_saved,
+        NEW.jit_attempts,
+        NEW.jit_line_cache_skips,
+        NEW.jit_hit_rate,
+        NEW.jit_skip_efficiency,
+        NEW.jit_time_saved,
+        NEW.jit_skip_time_saved,
+        CASE WHEN NEW.jit_attempts > 0 THEN 1 ELSE 0 END,
+        CASE WHEN NEW.jit_attempts > 0 THEN NEW.jit_hit_rate ELSE 0 END,
+        CASE WHEN NEW.jit_attempts > 0 THEN NEW.jit_skip_efficiency ELSE 0 END,
+        CASE WHEN NEW.active_execution_time >= NEW.total_execution_time * 0.99 THEN 1 ELSE 0 END
+    )
+    ON CONFLICT(day, script_name, execution_reason) DO UPDATE SET
+        runs = runs + excluded.runs,
+        commands_executed = commands_executed + excluded.commands_executed,
+        script_lines_processed = script_lines_processed + excluded.script_lines_processed,
+        total_execution_time = total_execution_time + excluded.total_execution_time,
+        active_execution_time = active_execution_time + excluded.active_execution_time,
+        commands_per_second = commands_per_second + excluded.commands_per_second,
+        lines_per_second = lines_per_second + excluded.lines_per_second,
+        fast_path_attempts = fast_path_attempts + excluded.fast_path_attempts,
+        fast_path_hit_rate = fast_path_hit_rate + excluded.fast_path_hit_rate,
+        fast_path_time_saved = fast_path_time_saved + excluded.fast_path_time_saved,
+        fast_math_attempts = fast_math_attempts + excluded.fast_math_attempts,
+        fast_math_hit_rate = fast_math_hit_rate + excluded.fast_math_hit_rate,
+        fast_math_time_saved = fast_math_time_saved + excluded.fast_math_time_saved,
+        cache_attempts = cache_attempts + excluded.cache_attempts,
+        cache_hit_rate = cache_hit_rate + excluded.cache_hit_rate,
+        cache_time_saved = cache_time_saved + excluded.cache_time_saved,
+        parse_value_hit_rate = parse_value_hit_rate + excluded.parse_value_hit_rate,
+        parse_value_time_saved = parse_value_time_saved + excluded.parse_value_time_saved,
+        jit_attempts = jit_attempts + excluded.jit_attempts,
+        jit_line_cache_skips = jit_line_cache_skips + excluded.jit_line_cache_skips,
+        jit_hit_rate = jit_hit_rate + excluded.jit_hit_rate,
+        jit_skip_efficiency = jit_skip_efficiency + excluded.jit_skip_efficiency,
+        jit_time_saved = jit_time_saved + excluded.jit_time_saved,
+        jit_skip_time_saved = jit_skip_time_saved + excluded.jit_skip_time_saved,
+        jit_runs = jit_runs + excluded.jit_runs,
+        jit_runs_hit_rate = jit_runs_hit_rate + excluded.jit_runs_hit_rate,
+        jit_runs_skip_efficiency = jit_runs_skip_efficiency + excluded.jit_runs_skip_efficiency,
+        resource_constrained_runs = resource_constrained_runs + excluded.resource_constrained_runs;
+END;
+
+-- Covering index for per-script run listings: seek by script and time window and
+-- filter on reason / resource ratio without touching the table row. It subsumes
+-- the single-column and (script_name, start_time) indexes from 001.
+CREATE INDEX IF NOT EXISTS idx_script_runs_covering ON script_metrics(
+    script_name,
+    start_time,
+    execution_reason,
+    total_execution_time,
+    active_execution_time
+);
+DROP INDEX IF EXISTS idx_script_date;
+DROP INDEX IF EXISTS idx_script_name;
@@ -0,0 +1,19 @@
+-- Migration for per-frame budget accounting (shared.consumer_stats frame budget)
+-- Stage times per end_frame and overruns against the fps() target, per script run
+ALTER TABLE consumer_metrics ADD COLUMN frame_target_fps REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frames_paced INTEGER DEFAULT 0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_overruns INTEGER DEFAULT 0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_overrun_pct REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_time_max_ms REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_interpret_avg_ms REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_interpret_max_ms REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_queue_wait_avg_ms REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_queue_wait_max_ms REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_execute_avg_ms REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_execute_max_ms REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_present_avg_ms REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_present_max_ms REAL DEFAULT 0.0;
+ALTER TABLE consumer_metrics ADD COLUMN overruns_interpret INTEGER DEFAULT 0;
+ALTER TABLE consumer_metrics ADD COLUMN overruns_execute INTEGER DEFAULT 0;
+ALTER TABLE consumer_metrics ADD COLUMN overruns_present INTEGER DEFAULT 0;
+ALTER TABLE consumer_metrics ADD COLUMN frame_slowest_stage TEXT;
@@ -10,6 +10,9 @@ from typing import Dict, Any, List, Optional
 from .base import BaseDatabase, DatabaseConfig
 from database.base import BaseDatabase, DatabaseConfig
 
+# Runs removed per transaction by delete_old_records
+DELETE_CHUNK_SIZE = 500
+
 class PixilMetricsDB(BaseDatabase):
     """
     Database for storing and retrieving Pixil script performance metrics.
@@ -23,15 +26,12 @@ class PixilMetricsDB(BaseDatabase):
         self.init_database()
     
     def init_database(self):
-        """Create tables and indexes if they don't exist."""
-        # Load and execute the initial migration
+        """Apply pending migrations (once per process) and enable WAL."""
         migrations_dir = DatabaseConfig.get_migrations_directory()
-        migration_file = migrations_dir / "001_pixil_initial.sql"
         
-        if migration_file.exists():
-            with open(migration_file, 'r') as f:
-                migration_sql = f.read()
-            self.execute_migration(migration_sql)
+        if (migrations_dir / "001_pixil_initial.sql").exists():
+            from database.migrate import ensure_schema
+            ensure_schema(self)
         else:
             # Fallback inline schema if migration file missing
             self._create_inline_schema()
@@ -77,104 +77,273 @@ class PixilMetricsDB(BaseDatabase):
 
     def save_metrics(self, script_name: str, start_time: datetime.datetime, 
                     end_time: datetime.datetime, metrics_data: Dict[str, Any], 
-                    reason: str = "complete"):
-        """Save performance metrics to database."""
+                    reason: str = "complete") -> int:
+        """Save performance metrics to database; returns the script_metrics row id."""
         with self.get_connection() as conn:
-            conn.execute('''
-                INSERT INTO script_metrics (
-                    script_name, start_time, end_time, execution_reason,
-                    commands_executed, script_lines_processed,
-                    total_execution_time, active_execution_time,
-                    commands_per_second, lines_per_second,
-                    fast_path_attempts, fast_path_hits, fast_path_hit_rate, fast_path_time_saved,
-                    fast_math_attempts, fast_math_hits, fast_math_hit_rate, fast_math_time_saved,
-                    cache_attempts, cache_hits, cache_hit_rate, cache_size, cache_time_saved,
-                    parse_value_attempts, parse_value_ultra_fast_hits, parse_value_fast_hits, 
-                    parse_value_hit_rate, parse_value_time_saved,
-                    parse_value_total_time, parse_value_avg_time_per_call, 
-                    direct_integer_hits, direct_color_hits, direct_string_hits,
-                    simple_array_hits, simple_arithmetic_hits,
-                    var_cache_attempts, var_cache_hits, var_cache_hit_rate, var_cache_time_saved,
-                    ultra_fast_attempts, ultra_fast_hits, ultra_fast_hit_rate, ultra_fast_time_saved,
-                    fast_path_parse_attempts, fast_path_parse_hits, fast_path_parse_hit_rate, fast_path_parse_time_saved,
-                    jit_attempts, jit_hits, jit_failures, jit_hit_rate, jit_time_saved,
-                    jit_line_cache_skips, failed_lines_cached, jit_skip_efficiency, jit_skip_time_saved,
-                    jit_cache_size, jit_cache_utilization, jit_compilation_time,
-                    condition_template_attempts, condition_template_hits, condition_template_hit_rate,
-                    condition_template_time_saved, condition_template_cache_size
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                script_name, start_time, end_time, reason,                                    # 4 values
-                metrics_data.get('commands_executed', 0),                                      # 1
-                metrics_data.get('script_lines_processed', 0),                               # 1  
-                metrics_data.get('total_execution_time', 0.0),                               # 1
-                metrics_data.get('active_execution_time', 0.0),                              # 1
-                metrics_data.get('commands_per_second', 0.0),                                # 1
-                metrics_data.get('lines_per_second', 0.0),                                   # 1 = 10 total
-                metrics_data.get('fast_path_attempts', 0),                                    # 1
-                metrics_data.get('fast_path_hits', 0),                                       # 1
-                metrics_data.get('fast_path_hit_rate', 0.0),                                 # 1
-                metrics_data.get('fast_path_time_saved', 0.0),                               # 1
-                metrics_data.get('fast_math_attempts', 0),                                    # 1
-                metrics_data.get('fast_math_hits', 0),                                       # 1
-                metrics_data.get('fast_math_hit_rate', 0.0),                                 # 1
-                metrics_data.get('fast_math_time_saved', 0.0),                               # 1
-                metrics_data.get('cache_attempts', 0),                                       # 1
-                metrics_data.get('cache_hits', 0),                                           # 1
-                metrics_data.get('cache_hit_rate', 0.0),                                     # 1
-                metrics_data.get('cache_size', 0),                                           # 1
-                metrics_data.get('cache_time_saved', 0.0),                                   # 1 = 23 total
+            row_id = self.insert_metrics(conn, script_name, start_time, end_time, metrics_data, reason)
+            conn.commit()
+            return row_id
+
+    def insert_metrics(self, conn: sqlite3.Connection, script_name: str, start_time: datetime.datetime,
+                       end_time: datetime.datetime, metrics_data: Dict[str, Any],
+                       reason: str = "complete") -> int:
+        """INSERT one script_metrics row on conn without committing; returns its row id."""
+        cursor = conn.execute('''
+            INSERT INTO script_metrics (
+                script_name, start_time, end_time, execution_reason,
+                commands_executed, script_lines_processed,
+                total_execution_time, active_execution_time,
+                commands_per_second, lines_per_second,
+                fast_path_attempts, fast_path_hits, fast_path_hit_rate, fast_path_time_saved,
+                fast_math_attempts, fast_math_hits, fast_math_hit_rate, fast_math_time_saved,
+                cache_attempts, cache_hits, cache_hit_rate, cache_size, cache_time_saved,
+                parse_value_attempts, parse_value_ultra_fast_hits, parse_value_fast_hits, 
+                parse_value_hit_rate, parse_value_time_saved,
+                parse_value_total_time, parse_value_avg_time_per_call, 
+                direct_integer_hits, direct_color_hits, direct_string_hits,
+                simple_array_hits, simple_arithmetic_hits,
+                var_cache_attempts, var_cache_hits, var_cache_hit_rate, var_cache_time_saved,
+                ultra_fast_attempts, ultra_fast_hits, ultra_fast_hit_rate, ultra_fast_time_saved,
+                fast_path_parse_attempts, fast_path_parse_hits, fast_path_parse_hit_rate, fast_path_parse_time_saved,
+                jit_attempts, jit_hits, jit_failures, jit_hit_rate, jit_time_saved,
+                jit_line_cache_skips, failed_lines_cached, jit_skip_efficiency, jit_skip_time_saved,
+                jit_cache_size, jit_cache_utilization, jit_compilation_time,
+                condition_template_attempts, condition_template_hits, condition_template_hit_rate,
+                condition_template_time_saved, condition_template_cache_size
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            script_name, start_time, end_time, reason,                                    # 4 values
+            metrics_data.get('commands_executed', 0),                                      # 1
+            metrics_data.get('script_lines_processed', 0),                               # 1  
+            metrics_data.get('total_execution_time', 0.0),                               # 1
+            metrics_data.get('active_execution_time', 0.0),                              # 1
+            metrics_data.get('commands_per_second', 0.0),                                # 1
+            metrics_data.get('lines_per_second', 0.0),                                   # 1 = 10 total
+            metrics_data.get('fast_path_attempts', 0),                                    # 1
+            metrics_data.get('fast_path_hits', 0),                                       # 1
+            metrics_data.get('fast_path_hit_rate', 0.0),                                 # 1
+            metrics_data.get('fast_path_time_saved', 0.0),                               # 1
+            metrics_data.get('fast_math_attempts', 0),                                    # 1
+            metrics_data.get('fast_math_hits', 0),                                       # 1
+            metrics_data.get('fast_math_hit_rate', 0.0),                                 # 1
+            metrics_data.get('fast_math_time_saved', 0.0),                               # 1
+            metrics_data.get('cache_attempts', 0),                                       # 1
+            metrics_data.get('cache_hits', 0),                                           # 1
+            metrics_data.get('cache_hit_rate', 0.0),                                     # 1
+            metrics_data.get('cache_size', 0),                                           # 1
+            metrics_data.get('cache_time_saved', 0.0),                                   # 1 = 23 total
+
+            metrics_data.get('parse_value_attempts', 0),                                 # 1
+            metrics_data.get('parse_value_ultra_fast_hits', 0),                          # 1
+            metrics_data.get('parse_value_fast_hits', 0),                                # 1
+            metrics_data.get('parse_value_hit_rate', 0.0),                               # 1
+            metrics_data.get('parse_value_time_saved', 0.0),                             # 1
+            metrics_data.get('parse_value_total_time', 0.0),                             # 1 - NEW
+            metrics_data.get('parse_value_avg_time_per_call', 0.0),                      # 1 - NEW
+            metrics_data.get('direct_integer_hits', 0),                                  # 1
+
+            metrics_data.get('direct_color_hits', 0),                                    # 1
+            metrics_data.get('direct_string_hits', 0),                                   # 1
+            metrics_data.get('simple_array_hits', 0),                                    # 1
+            metrics_data.get('simple_arithmetic_hits', 0),                               # 1 = 33 total
+            # NEW: Variable cache metrics
+            metrics_data.get('var_cache_attempts', 0),                                   # 1
+            metrics_data.get('var_cache_hits', 0),                                       # 1
+            metrics_data.get('var_cache_hit_rate', 0.0),                                 # 1
+            metrics_data.get('var_cache_time_saved', 0.0),                               # 1
+            # NEW: Ultra Fast Path metrics
+            metrics_data.get('ultra_fast_attempts', 0),                                  # 1
+            metrics_data.get('ultra_fast_hits', 0),                                      # 1
+            metrics_data.get('ultra_fast_hit_rate', 0.0),                                # 1
+            metrics_data.get('ultra_fast_time_saved', 0.0),                              # 1
+            # NEW: Fast Path Parse metrics
+            metrics_data.get('fast_path_parse_attempts', 0),                             # 1
+            metrics_data.get('fast_path_parse_hits', 0),                                 # 1
+            metrics_data.get('fast_path_parse_hit_rate', 0.0),                           # 1
+            metrics_data.get('fast_path_parse_time_saved', 0.0),                         # 1 = 45 total
+            # JIT metrics (existing)
+            metrics_data.get('jit_attempts', 0),                                         # 1
+            metrics_data.get('jit_hits', 0),                                             # 1
+            metrics_data.get('jit_failures', 0),                                         # 1
+            metrics_data.get('jit_hit_rate', 0.0),                                       # 1
+            metrics_data.get('jit_time_saved', 0.0),                                     # 1
+            metrics_data.get('jit_line_cache_skips', 0),                                 # 1
+            metrics_data.get('failed_lines_cached', 0),                                  # 1
+            metrics_data.get('jit_skip_efficiency', 0.0),                                # 1
+            metrics_data.get('jit_skip_time_saved', 0.0),                                # 1
+            metrics_data.get('jit_cache_size', 0),                                       # 1
+            metrics_data.get('jit_cache_utilization', 0.0),                              # 1
+            metrics_data.get('jit_compilation_time', 0.0), 
+            # Conditional Templates
+            metrics_data.get('condition_template_attempts', 0),                          # 1
+            metrics_data.get('condition_template_hits', 0),                              # 1
+            metrics_data.get('condition_template_hit_rate', 0.0),                        # 1
+            metrics_data.get('condition_template_time_saved', 0.0),                      # 1
+            metrics_data.get('condition_template_cache_size', 0)                         # 1 = 62 total
+        ))
+        return cursor.lastrowid
+
+    def save_consumer_metrics(self, script_metrics_id: int, totals: Dict[str, Any]) -> int:
+        """
+        Save consumer-process display stats for a script run.
+
+        Args:
+            script_metrics_id: Row id returned by save_metrics
+            totals: Merged consumer stats (shared.consumer_stats.merge)
+
+        Returns:
+            Row id of the consumer_metrics record
+        """
+        from shared.consumer_stats import summarize
+
+        with self.get_connection() as conn:
+            row_id = self.insert_consumer_metrics(conn, script_metrics_id, summarize(totals))
+            conn.commit()
+            return row_id
 
-                metrics_data.get('parse_value_attempts', 0),                                 # 1
-                metrics_data.get('parse_value_ultra_fast_hits', 0),                          # 1
-                metrics_data.get('parse_value_fast_hits', 0),                                # 1
-                metrics_data.get('parse_value_hit_rate', 0.0),                               # 1
-                metrics_data.get('parse_value_time_saved', 0.0),                             # 1
-                metrics_data.get('parse_value_total_time', 0.0),                             # 1 - NEW
-                metrics_data.get('parse_value_avg_time_per_call', 0.0),                      # 1 - NEW
-                metrics_data.get('direct_integer_hits', 0),                                  # 1
+    def insert_consumer_metrics(self, conn: sqlite3.Connection, script_metrics_id: int,
+                                row: Dict[str, Any]) -> int:
+        """INSERT a summarized consumer_metrics row on conn without committing."""
+        columns = ['script_metrics_id'] + list(row)
+        placeholders = ', '.join('?' for _ in columns)
+        cursor = conn.execute(
+            f"INSERT INTO consumer_metrics ({', '.join(columns)}) VALUES ({placeholders})",
+            [script_metrics_id] + list(row.values()),
+        )
+        return cursor.lastrowid
 
-                metrics_data.get('direct_color_hits', 0),                                    # 1
-                metrics_data.get('direct_string_hits', 0),                                   # 1
-                metrics_data.get('simple_array_hits', 0),                                    # 1
-                metrics_data.get('simple_arithmetic_hits', 0),                               # 1 = 33 total
-                # NEW: Variable cache metrics
-                metrics_data.get('var_cache_attempts', 0),                                   # 1
-                metrics_data.get('var_cache_hits', 0),                                       # 1
-                metrics_data.get('var_cache_hit_rate', 0.0),                                 # 1
-                metrics_data.get('var_cache_time_saved', 0.0),                               # 1
-                # NEW: Ultra Fast Path metrics
-                metrics_data.get('ultra_fast_attempts', 0),                                  # 1
-                metrics_data.get('ultra_fast_hits', 0),                                      # 1
-                metrics_data.get('ultra_fast_hit_rate', 0.0),                                # 1
-                metrics_data.get('ultra_fast_time_saved', 0.0),                              # 1
-                # NEW: Fast Path Parse metrics
-                metrics_data.get('fast_path_parse_attempts', 0),                             # 1
-                metrics_data.get('fast_path_parse_hits', 0),                                 # 1
-                metrics_data.get('fast_path_parse_hit_rate', 0.0),                           # 1
-                metrics_data.get('fast_path_parse_time_saved', 0.0),                         # 1 = 45 total
-                # JIT metrics (existing)
-                metrics_data.get('jit_attempts', 0),                                         # 1
-                metrics_data.get('jit_hits', 0),                                             # 1
-                metrics_data.get('jit_failures', 0),                                         # 1
-                metrics_data.get('jit_hit_rate', 0.0),                                       # 1
-                metrics_data.get('jit_time_saved', 0.0),                                     # 1
-                metrics_data.get('jit_line_cache_skips', 0),                                 # 1
-                metrics_data.get('failed_lines_cached', 0),                                  # 1
-                metrics_data.get('jit_skip_efficiency', 0.0),                                # 1
-                metrics_data.get('jit_skip_time_saved', 0.0),                                # 1
-                metrics_data.get('jit_cache_size', 0),                                       # 1
-                metrics_data.get('jit_cache_utilization', 0.0),                              # 1
-                metrics_data.get('jit_compilation_time', 0.0), 
-                # Conditional Templates
-                metrics_data.get('condition_template_attempts', 0),                          # 1
-                metrics_data.get('condition_template_hits', 0),                              # 1
-                metrics_data.get('condition_template_hit_rate', 0.0),                        # 1
-                metrics_data.get('condition_template_time_saved', 0.0),                      # 1
-                metrics_data.get('condition_template_cache_size', 0)                         # 1 = 62 total
-            ))
+    def save_line_profile(self, script_metrics_id: int, rows: List[Dict[str, Any]]) -> int:
+        """
+        Save a --profile table for a script run.
+
+        Args:
+            script_metrics_id: Row id returned by save_metrics
+            rows: ScriptProfiler.rows() dicts
+
+        Returns:
+            Number of rows written
+        """
+        with self.get_connection() as conn:
+            self.insert_line_profile(conn, script_metrics_id, rows)
             conn.commit()
+        return len(rows)
+
+    def insert_line_profile(self, conn: sqlite3.Connection, script_metrics_id: int,
+                            rows: List[Dict[str, Any]]) -> None:
+        """INSERT script_line_profile rows on conn without committing."""
+        conn.executemany('''
+            INSERT INTO script_line_profile (
+                script_metrics_id, line_numbers, procedure_stack, source_text,
+                samples, wall_time, cpu_time, wall_percent
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (script_metrics_id, r['line_numbers'], r['procedure_stack'], r['source_text'],
+             r['samples'], r['wall_time'], r['cpu_time'], r['wall_percent'])
+            for r in rows
+        ])
+
+    def get_line_profile(self, script_name: str, limit: int = 25) -> List[sqlite3.Row]:
+        """
+        Get the hottest profile rows from the latest profiled run of a script.
+
+        Args:
+            script_name: Name of script to query
+            limit: Maximum number of rows to return
+
+        Returns:
+            List of script_line_profile rows plus start_time, largest wall_time first
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                SELECT p.*, s.start_time
+                FROM script_line_profile p
+                JOIN script_metrics s ON s.id = p.script_metrics_id
+                WHERE p.script_metrics_id = (
+                    SELECT MAX(p2.script_metrics_id)
+                    FROM script_line_profile p2
+                    JOIN script_metrics s2 ON s2.id = p2.script_metrics_id
+                    WHERE s2.script_name = ?
+                )
+                ORDER BY p.wall_time DESC
+                LIMIT ?
+            ''', (script_name, limit))
+            return cursor.fetchall()
+
+    def get_consumer_metrics(self, limit: int = 10, script_name: Optional[str] = None) -> List[sqlite3.Row]:
+        """
+        Get recent consumer metrics joined to their script runs.
+
+        Args:
+            limit: Maximum number of records to return
+            script_name: Only return runs of this script
+
+        Returns:
+            List of rows with consumer_metrics columns plus script_name,
+            start_time, execution_reason and active_execution_time
+        """
+        where = "WHERE s.script_name = ?" if script_name else ""
+        params = ((script_name,) if script_name else ()) + (limit,)
+        with self.get_connection() as conn:
+            cursor = conn.execute(f'''
+                SELECT c.*, s.script_name, s.start_time, s.execution_reason,
+                       s.active_execution_time
+                FROM consumer_metrics c
+                JOIN script_metrics s ON s.id = c.script_metrics_id
+                {where}
+                ORDER BY s.created_at DESC, c.id DESC
+                LIMIT ?
+            ''', params)
+            return cursor.fetchall()
         
+    def get_frame_budget(self, limit: int = 20, script_name: Optional[str] = None,
+                         days: Optional[int] = None) -> List[sqlite3.Row]:
+        """
+        Get frame budget totals per script over runs that had an fps() target.
+
+        Args:
+            limit: Maximum number of scripts to return
+            script_name: Only return this script
+            days: Only include runs started in the last N days
+
+        Returns:
+            One row per script (runs, target_fps, frames_paced, frame_overruns,
+            overrun_pct, <stage>_avg_ms, worst_frame_ms, overruns_<stage>),
+            highest overrun_pct first
+        """
+        where = ["c.frames_paced > 0"]
+        params: List[Any] = []
+        if script_name:
+            where.append("s.script_name = ?")
+            params.append(script_name)
+        if days:
+            where.append("s.start_time >= ?")
+            params.append(datetime.datetime.now() - datetime.timedelta(days=days))
+        params.append(limit)
+        with self.get_connection() as conn:
+            cursor = conn.execute(f'''
+                SELECT s.script_name,
+                       COUNT(*) AS runs,
+                       MAX(c.frame_target_fps) AS target_fps,
+                       SUM(c.frames_paced) AS frames_paced,
+                       SUM(c.frame_overruns) AS frame_overruns,
+                       100.0 * SUM(c.frame_overruns) / SUM(c.frames_paced) AS overrun_pct,
+                       SUM(c.frame_interpret_avg_ms * c.end_frames) / SUM(c.end_frames) AS interpret_avg_ms,
+                       SUM(c.frame_queue_wait_avg_ms * c.end_frames) / SUM(c.end_frames) AS queue_wait_avg_ms,
+                       SUM(c.frame_execute_avg_ms * c.end_frames) / SUM(c.end_frames) AS execute_avg_ms,
+                       SUM(c.frame_present_avg_ms * c.end_frames) / SUM(c.end_frames) AS present_avg_ms,
+                       MAX(c.frame_time_max_ms) AS worst_frame_ms,
+                       SUM(c.overruns_interpret) AS overruns_interpret,
+                       SUM(c.overruns_execute) AS overruns_execute,
+                       SUM(c.overruns_present) AS overruns_present
+                FROM consumer_metrics c
+                JOIN script_metrics s ON s.id = c.script_metrics_id
+                WHERE {' AND '.join(where)}
+                GROUP BY s.script_name
+                ORDER BY overrun_pct DESC, s.script_name
+                LIMIT ?
+            ''', params)
+            return cursor.fetchall()
+
     def get_recent_metrics(self, limit: int = 10) -> List[sqlite3.Row]:
         """
         Get the most recent metrics records.
@@ -188,27 +357,30 @@ class PixilMetricsDB(BaseDatabase):
         with self.get_connection() as conn:
             cursor = conn.execute('''
                 SELECT * FROM script_metrics 
-                ORDER BY created_at DESC 
+                ORDER BY start_time DESC 
                 LIMIT ?
             ''', (limit,))
             return cursor.fetchall()
     
-    def get_metrics_by_script(self, script_name: str) -> List[sqlite3.Row]:
+    def get_metrics_by_script(self, script_name: str, limit: Optional[int] = None) -> List[sqlite3.Row]:
         """
-        Get all metrics for a specific script.
+        Get metrics for a specific script, most recent first.
         
         Args:
             script_name: Name of script to query
+            limit: Maximum number of records to return (default: all)
             
         Returns:
             List of database rows for the specified script
         """
+        # Ordered by start_time so idx_script_runs_covering serves the seek and LIMIT
         with self.get_connection() as conn:
             cursor = conn.execute('''
                 SELECT * FROM script_metrics 
                 WHERE script_name = ? 
-                ORDER BY created_at DESC
-            ''', (script_name,))
+                ORDER BY start_time DESC
+                LIMIT ?
+            ''', (script_name, -1 if limit is None else limit))
             return cursor.fetchall()
     
     def get_script_count(self) -> int:
@@ -237,22 +409,39 @@ class PixilMetricsDB(BaseDatabase):
             ''')
             return [row[0] for row in cursor.fetchall()]
     
-    def delete_old_records(self, days_old: int) -> int:
+    def delete_old_records(self, days_old: int, chunk_size: int = DELETE_CHUNK_SIZE) -> int:
         """
         Delete records older than specified number of days.
         
+        Runs are removed oldest first in chunks of chunk_size, each in its own
+        transaction, so pruning a long history never holds the write lock for
+        long. Daily rollups are kept.
+        
         Args:
             days_old: Delete records older than this many days
+            chunk_size: Maximum runs deleted per transaction
             
         Returns:
             Number of records deleted
         """
         cutoff_date = datetime.datetime.now() - datetime.timedelta(days=days_old)
+        deleted = 0
         
         with self.get_connection() as conn:
-            cursor = conn.execute('''
-                DELETE FROM script_metrics 
-                WHERE created_at < ?
-            ''', (cutoff_date,))
-            conn.commit()
-            return cursor.rowcount
\ No newline at end of file
+            while True:
+                ids = [row[0] for row in conn.execute('''
+                    SELECT id FROM script_metrics
+                    WHERE start_time < ?
+                    ORDER BY start_time
+                    LIMIT ?
+                ''', (cutoff_date, max(1, chunk_size)))]
+                if not ids:
+                    break
+                placeholders = ",".join("?" * len(ids))
+                # SQLite leaves foreign keys unenforced by default; drop child rows explicitly
+                for child_table in ('consumer_metrics', 'script_line_profile'):
+                    conn.execute(f'DELETE FROM {child_table} WHERE script_metrics_id IN ({placeholders})', ids)
+                conn.execute(f'DELETE FROM script_metrics WHERE id IN ({placeholders})', ids)
+                conn.commit()
+                deleted += len(ids)
+        return deleted
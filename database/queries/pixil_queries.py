@@ -1,6 +1,10 @@
 """
 Performance query helpers for Pixil metrics.
 Provides advanced analytics and reporting queries for script performance data.
+
+Summary and trend queries read script_daily_rollup (migration 008), which the
+insert trigger keeps current, so their cost depends on the number of days and
+scripts rather than the number of recorded runs.
 """
 
 from typing import List, Dict, Any, Optional
@@ -8,6 +12,17 @@ import sqlite3
 from datetime import datetime, timedelta
 from ..base import BaseDatabase
 
+
+def _avg(column: str) -> str:
+    """Per-run average of a rollup SUM column."""
+    return f"SUM({column}) * 1.0 / NULLIF(SUM(runs), 0)"
+
+
+def _cutoff_day(days: int) -> str:
+    """First rollup day (local DATE(start_time)) inside a days-long window."""
+    return (datetime.now() - timedelta(days=days)).date().isoformat()
+
+
 class PixilQueries(BaseDatabase):
     """
     Advanced query helper for Pixil performance metrics.
@@ -19,6 +34,8 @@ class PixilQueries(BaseDatabase):
     def __init__(self):
         """Initialize with Pixil metrics database."""
         super().__init__("pixil_metrics.db")
+        from database.migrate import ensure_schema
+        ensure_schema(self)
     
     def get_performance_summary(self, days: int = 7) -> Dict[str, Any]:
         """
@@ -30,25 +47,23 @@ class PixilQueries(BaseDatabase):
         Returns:
             Dictionary with summary statistics
         """
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
         with self.get_connection() as conn:
-            cursor = conn.execute('''
+            cursor = conn.execute(f'''
                 SELECT 
-                    COUNT(*) as total_runs,
+                    COALESCE(SUM(runs), 0) as total_runs,
                     COUNT(DISTINCT script_name) as unique_scripts,
-                    AVG(commands_per_second) as avg_commands_per_sec,
-                    AVG(lines_per_second) as avg_lines_per_sec,
-                    AVG(total_execution_time) as avg_execution_time,
-                    AVG(fast_path_hit_rate) as avg_fast_path_hit_rate,
-                    AVG(fast_math_hit_rate) as avg_fast_math_hit_rate,
-                    AVG(cache_hit_rate) as avg_cache_hit_rate,
+                    {_avg('commands_per_second')} as avg_commands_per_sec,
+                    {_avg('lines_per_second')} as avg_lines_per_sec,
+                    {_avg('total_execution_time')} as avg_execution_time,
+                    {_avg('fast_path_hit_rate')} as avg_fast_path_hit_rate,
+                    {_avg('fast_math_hit_rate')} as avg_fast_math_hit_rate,
+                    {_avg('cache_hit_rate')} as avg_cache_hit_rate,
                     SUM(fast_path_time_saved + fast_math_time_saved + cache_time_saved) as total_time_saved,
-                    COUNT(CASE WHEN execution_reason = 'interrupted' THEN 1 END) as interrupted_count,
-                    COUNT(CASE WHEN execution_reason = 'complete' THEN 1 END) as completed_count
-                FROM script_metrics
-                WHERE created_at >= ?
-            ''', (cutoff_date,))
+                    COALESCE(SUM(CASE WHEN execution_reason = 'interrupted' THEN runs END), 0) as interrupted_count,
+                    COALESCE(SUM(CASE WHEN execution_reason = 'complete' THEN runs END), 0) as completed_count
+                FROM script_daily_rollup
+                WHERE day >= ?
+            ''', (_cutoff_day(days),))
             
             row = cursor.fetchone()
             return dict(row) if row else {}
@@ -61,24 +76,166 @@ class PixilQueries(BaseDatabase):
             Dictionary with optimization performance data
         """
         with self.get_connection() as conn:
-            cursor = conn.execute('''
+            cursor = conn.execute(f'''
                 SELECT 
-                    AVG(fast_path_hit_rate) as avg_fast_path_rate,
-                    AVG(fast_math_hit_rate) as avg_fast_math_rate,
-                    AVG(cache_hit_rate) as avg_cache_rate,
+                    {_avg('fast_path_hit_rate')} as avg_fast_path_rate,
+                    {_avg('fast_math_hit_rate')} as avg_fast_math_rate,
+                    {_avg('cache_hit_rate')} as avg_cache_rate,
                     SUM(fast_path_time_saved) as total_fast_path_saved,
                     SUM(fast_math_time_saved) as total_fast_math_saved,
                     SUM(cache_time_saved) as total_cache_saved,
-                    AVG(fast_path_attempts) as avg_fast_path_attempts,
-                    AVG(fast_math_attempts) as avg_fast_math_attempts,
-                    AVG(cache_attempts) as avg_cache_attempts
-                FROM script_metrics
+                    {_avg('fast_path_attempts')} as avg_fast_path_attempts,
+                    {_avg('fast_math_attempts')} as avg_fast_math_attempts,
+                    {_avg('cache_attempts')} as avg_cache_attempts
+                FROM script_daily_rollup
                 WHERE execution_reason = 'complete'
             ''')
             
             row = cursor.fetchone()
             return dict(row) if row else {}
 
+    def get_jit_effectiveness(self, days: int = 7) -> Dict[str, Any]:
+        """
+        Get JIT averages over executed runs that used the JIT in the last N days.
+        
+        Args:
+            days: Number of days to include
+            
+        Returns:
+            Dictionary with avg_jit_hit_rate, avg_skip_efficiency, total_jit_time_saved
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                SELECT 
+                    SUM(jit_runs_hit_rate) / NULLIF(SUM(jit_runs), 0) as avg_jit_hit_rate,
+                    SUM(jit_runs_skip_efficiency) / NULLIF(SUM(jit_runs), 0) as avg_skip_efficiency,
+                    SUM(jit_time_saved + jit_skip_time_saved) as total_jit_time_saved
+                FROM script_daily_rollup
+                WHERE execution_reason IN ('complete', 'interrupted')
+                AND day >= ?
+            ''', (_cutoff_day(days),))
+            
+            row = cursor.fetchone()
+            return dict(row) if row else {}
+
+    def get_script_summary(self, script_name: str) -> Dict[str, Any]:
+        """
+        Get lifetime totals and averages for one script.
+        
+        Args:
+            script_name: Name of script to summarize
+            
+        Returns:
+            Dictionary with total_runs, executed_runs and averages over executed runs
+        """
+        executed = "execution_reason IN ('complete', 'interrupted')"
+        with self.get_connection() as conn:
+            cursor = conn.execute(f'''
+                SELECT 
+                    COALESCE(SUM(runs), 0) as total_runs,
+                    COALESCE(SUM(CASE WHEN {executed} THEN runs END), 0) as executed_runs,
+                    SUM(CASE WHEN {executed} THEN total_execution_time END) /
+                        NULLIF(SUM(CASE WHEN {executed} THEN runs END), 0) as avg_duration,
+                    SUM(CASE WHEN {executed} THEN commands_per_second END) /
+                        NULLIF(SUM(CASE WHEN {executed} THEN runs END), 0) as avg_commands_per_sec,
+                    SUM(CASE WHEN {executed} THEN fast_path_hit_rate END) /
+                        NULLIF(SUM(CASE WHEN {executed} THEN runs END), 0) as avg_fast_path_rate,
+                    SUM(CASE WHEN {executed} THEN jit_hit_rate END) /
+                        NULLIF(SUM(CASE WHEN {executed} THEN runs END), 0) as avg_jit_hit_rate,
+                    SUM(CASE WHEN {executed} THEN jit_skip_efficiency END) /
+                        NULLIF(SUM(CASE WHEN {executed} THEN runs END), 0) as avg_skip_efficiency
+                FROM script_daily_rollup
+                WHERE script_name = ?
+            ''', (script_name,))
+            
+            row = cursor.fetchone()
+            return dict(row) if row else {}
+
+    def get_run_counts(self, days: int, script_name: Optional[str] = None) -> Dict[str, int]:
+        """
+        Count executed and resource-constrained runs over the last N days.
+        
+        Args:
+            days: Number of days to include (whole days)
+            script_name: Restrict to one script
+            
+        Returns:
+            Dictionary with total_runs and resource_constrained_runs
+        """
+        query = '''
+            SELECT 
+                COALESCE(SUM(runs), 0) as total_runs,
+                COALESCE(SUM(resource_constrained_runs), 0) as resource_constrained_runs
+            FROM script_daily_rollup
+            WHERE execution_reason IN ('complete', 'interrupted')
+            AND day >= ?
+        '''
+        params: List[Any] = [_cutoff_day(days)]
+        if script_name:
+            query += " AND script_name = ?"
+            params.append(script_name)
+        with self.get_connection() as conn:
+            return dict(conn.execute(query, params).fetchone())
+
+    def get_active_scripts(self, days: int) -> List[str]:
+        """
+        Scripts with executed runs in the last N days.
+        
+        Args:
+            days: Number of days to include (whole days)
+            
+        Returns:
+            Sorted list of script names
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                SELECT DISTINCT script_name
+                FROM script_daily_rollup
+                WHERE execution_reason IN ('complete', 'interrupted')
+                AND day >= ?
+                ORDER BY script_name
+            ''', (_cutoff_day(days),))
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_daily_rollups(self, days: int = 30, script_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get per-day averages over executed runs, newest day first.
+        
+        Args:
+            days: Number of days to include
+            script_name: Restrict to one script (default: all scripts)
+            
+        Returns:
+            List of daily statistics
+        """
+        query = f'''
+            SELECT 
+                day as date,
+                SUM(runs) as runs,
+                COUNT(DISTINCT script_name) as scripts,
+                {_avg('total_execution_time')} as avg_execution_time,
+                {_avg('active_execution_time')} as avg_active_time,
+                {_avg('commands_per_second')} as avg_commands_per_sec,
+                {_avg('lines_per_second')} as avg_lines_per_sec,
+                {_avg('fast_path_hit_rate')} as avg_fast_path_rate,
+                {_avg('fast_math_hit_rate')} as avg_fast_math_rate,
+                {_avg('cache_hit_rate')} as avg_cache_rate,
+                {_avg('parse_value_hit_rate')} as avg_parse_value_rate,
+                SUM(jit_runs_hit_rate) / NULLIF(SUM(jit_runs), 0) as avg_jit_hit_rate,
+                SUM(jit_runs_skip_efficiency) / NULLIF(SUM(jit_runs), 0) as avg_skip_efficiency,
+                SUM(resource_constrained_runs) as resource_constrained_runs
+            FROM script_daily_rollup
+            WHERE execution_reason IN ('complete', 'interrupted')
+            AND day >= ?
+        '''
+        params: List[Any] = [_cutoff_day(days)]
+        if script_name:
+            query += " AND script_name = ?"
+            params.append(script_name)
+        query += " GROUP BY day ORDER BY day DESC"
+        with self.get_connection() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+
     def get_jit_performance_summary(self, days: int = 7) -> Dict[str, Any]:
         """
         Get JIT line caching performance summary.
@@ -156,26 +313,24 @@ class PixilQueries(BaseDatabase):
         Returns:
             List of daily optimization statistics
         """
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
         with self.get_connection() as conn:
-            cursor = conn.execute('''
+            cursor = conn.execute(f'''
                 SELECT 
-                    DATE(created_at) as date,
-                    COUNT(*) as runs,
-                    AVG(jit_hit_rate) as avg_jit_hit_rate,
-                    AVG(jit_skip_efficiency) as avg_skip_efficiency,
-                    AVG(fast_path_hit_rate) as avg_fast_path_rate,
-                    AVG(fast_math_hit_rate) as avg_fast_math_rate,
-                    AVG(parse_value_hit_rate) as avg_parse_value_rate,
+                    day as date,
+                    SUM(runs) as runs,
+                    {_avg('jit_hit_rate')} as avg_jit_hit_rate,
+                    {_avg('jit_skip_efficiency')} as avg_skip_efficiency,
+                    {_avg('fast_path_hit_rate')} as avg_fast_path_rate,
+                    {_avg('fast_math_hit_rate')} as avg_fast_math_rate,
+                    {_avg('parse_value_hit_rate')} as avg_parse_value_rate,
                     SUM(jit_time_saved + jit_skip_time_saved + 
                         fast_path_time_saved + fast_math_time_saved + 
                         parse_value_time_saved) as total_time_saved
-                FROM script_metrics
-                WHERE created_at >= ? AND execution_reason = 'complete'
-                GROUP BY DATE(created_at)
+                FROM script_daily_rollup
+                WHERE day >= ? AND execution_reason = 'complete'
+                GROUP BY day
                 ORDER BY date DESC
-            ''', (cutoff_date,))
+            ''', (_cutoff_day(days),))
             
             return [dict(row) for row in cursor.fetchall()]
 
@@ -190,18 +345,18 @@ class PixilQueries(BaseDatabase):
             List of scripts ranked by optimization effectiveness
         """
         with self.get_connection() as conn:
-            cursor = conn.execute('''
+            cursor = conn.execute(f'''
                 SELECT 
                     script_name,
-                    COUNT(*) as execution_count,
-                    AVG(jit_hit_rate + jit_skip_efficiency + 
+                    SUM(runs) as execution_count,
+                    SUM(jit_hit_rate + jit_skip_efficiency + 
                         fast_path_hit_rate + fast_math_hit_rate + 
-                        parse_value_hit_rate) / 5 as avg_optimization_score,
-                    AVG(jit_time_saved + jit_skip_time_saved + 
+                        parse_value_hit_rate) / SUM(runs) / 5 as avg_optimization_score,
+                    SUM(jit_time_saved + jit_skip_time_saved + 
                         fast_path_time_saved + fast_math_time_saved + 
-                        parse_value_time_saved) as avg_time_saved,
-                    AVG(total_execution_time) as avg_execution_time
-                FROM script_metrics
+                        parse_value_time_saved) / SUM(runs) as avg_time_saved,
+                    {_avg('total_execution_time')} as avg_execution_time
+                FROM script_daily_rollup
                 WHERE execution_reason = 'complete'
                 GROUP BY script_name
                 HAVING execution_count >= 3
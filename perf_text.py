@@ -9,6 +9,9 @@ and compare results.
 Run on the Raspberry Pi:
     sudo python3 test_perf_benchmark.py
 
+Run off the Pi (in-memory canvas, 2 ms simulated vsync):
+    PIXIL_DISPLAY_BACKEND=framebuffer PIXIL_SIM_VSYNC_MS=2 python3 perf_text.py
+
 Benchmarks:
     1. Immediate mode — no background (draw commands, no framing)
     2. Immediate mode — with background
@@ -0,0 +1,197 @@
+"""Lookup-table kernels for grid_program cellular automaton rules.
+
+A grid_program with a `rule` line skips step blocks: the field holds integer
+cell states and each generation is
+
+    index = state * (K + 1) + count      (K = 8 Moore / 4 von Neumann neighbours)
+    state = table[index]
+
+with count the number of live neighbours (state 1) for Life-like and
+Generations rules, or of neighbours in the next state round for cyclic rules.
+The whole rule is the table, built once; a step is a handful of uint8 slice
+adds over one padded copy of the states plus one np.take. Moore Life-like and
+Generations counts come from a separable 3x3 box sum (four adds instead of
+eight) that includes the cell itself; the table is indexed by that sum, so
+the centre is taken off when the table is built rather than every step.
+
+Rule strings (case-insensitive, parts separated by / or spaces):
+    B3/S23            Life-like: born with 3, survives with 2 or 3
+    B2/S/C3           Generations: C states; live cells that fail S decay
+                      through states 2 .. C-1 back to 0 (Brian's Brain)
+    cyclic C16 T1     Cyclic: state s becomes s+1 (mod C) with at least T
+                      neighbours already in state s+1
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import FrozenSet
+
+import numpy as np
+
+from .grid_step_plan import fill_padded
+
+_OFFSETS_4 = ((0, 1), (0, -1), (1, 0), (-1, 0))
+_OFFSETS_8 = _OFFSETS_4 + ((1, 1), (1, -1), (-1, 1), (-1, -1))
+NEIGHBORHOODS = {"moore": _OFFSETS_8, "von_neumann": _OFFSETS_4}
+_MAX_STATES = 256  # states are stored as uint8 while the kernel runs
+
+
+@dataclass(frozen=True)
+class CARule:
+    kind: str  # "life" | "generations" | "cyclic"
+    states: int
+    birth: FrozenSet[int] = frozenset()
+    survive: FrozenSet[int] = frozenset()
+    threshold: int = 1
+    neighborhood: str = "moore"
+
+    @property
+    def neighbors(self) -> int:
+        return len(NEIGHBORHOODS[self.neighborhood])
+
+
+def _digits(digits: str, letter: str, limit: int) -> FrozenSet[int]:
+    counts = frozenset(int(ch) for ch in digits)
+    if any(c > limit for c in counts):
+        raise ValueError(f"rule {letter}{digits}: neighbour counts go up to {limit}")
+    return counts
+
+
+def parse_ca_rule(text: str, neighborhood: str = "moore") -> CARule:
+    if neighborhood not in NEIGHBORHOODS:
+        raise ValueError(f"unknown neighborhood: {neighborhood} (moore or von_neumann)")
+    limit = len(NEIGHBORHOODS[neighborhood])
+    tokens = [tok for tok in re.split(r"[/\s]+", text.strip().upper()) if tok]
+    if not tokens:
+        raise ValueError("rule requires a rule string, e.g. B3/S23")
+    cyclic = tokens[0] == "CYCLIC"
+    if cyclic:
+        tokens = tokens[1:]
+    parts = {}
+    for tok in tokens:
+        letter, digits = tok[0], tok[1:]
+        bad_digits = (digits and not digits.isdigit()) or (letter in "CT" and not digits)
+        if letter not in "BSCT" or letter in parts or bad_digits:
+            raise ValueError(f"bad rule part {tok!r} in {text!r}")
+        parts[letter] = digits
+
+    if cyclic:
+        if "B" in parts or "S" in parts or "C" not in parts:
+            raise ValueError(f"cyclic rule needs C<states> [T<threshold>], got {text!r}")
+        kind = "cyclic"
+        states = int(parts["C"])
+        threshold = int(parts.get("T", 1))
+        if not 1 <= threshold <= limit:
+            raise ValueError(f"cyclic threshold must be 1..{limit}, got {threshold}")
+        birth = survive = frozenset()
+    else:
+        if "T" in parts or "B" not in parts or "S" not in parts:
+            raise ValueError(f"rule needs B<counts>/S<counts>[/C<states>], got {text!r}")
+        states = int(parts.get("C", 2))
+        kind = "life" if states == 2 else "generations"
+        birth = _digits(parts["B"], "B", limit)
+        survive = _digits(parts["S"], "S", limit)
+        threshold = 1
+    if not 2 <= states <= _MAX_STATES:
+        raise ValueError(f"rule states must be 2..{_MAX_STATES}, got {states}")
+    return CARule(kind, states, birth, survive, threshold, neighborhood)
+
+
+def _box_counted(rule: CARule) -> bool:
+    return rule.kind != "cyclic" and rule.neighborhood == "moore"
+
+
+def rule_table(rule: CARule) -> np.ndarray:
+    """Next state for every state * span + count (span = K + 1, or K + 2 with a box sum)."""
+    box = _box_counted(rule)
+    span = rule.neighbors + (2 if box else 1)
+    table = np.zeros(rule.states * span, dtype=np.uint8)
+    for state in range(rule.states):
+        for index in range(span):
+            # A box sum counts a live cell as its own neighbour
+            count = index - 1 if box and state == 1 else index
+            if rule.kind == "cyclic":
+                nxt = (state + 1) % rule.states if count >= rule.threshold else state
+            elif state == 0:
+                nxt = 1 if count in rule.birth else 0
+            elif state == 1:
+                nxt = 1 if count in rule.survive else 2 % rule.states
+            else:
+                nxt = (state + 1) % rule.states
+            table[state * span + index] = nxt
+    return table
+
+
+class CAKernel:
+    """One rule on one grid size: the table plus every scratch buffer a step needs."""
+
+    def __init__(self, rule: CARule, size: int, boundary: str):
+        self.rule = rule
+        self.size = size
+        self.boundary = boundary
+        self.table = rule_table(rule)
+        self.offsets = NEIGHBORHOODS[rule.neighborhood]
+        self.box = _box_counted(rule)
+        self.span = np.uint16(self.table.size // rule.states)
+        self.states = [np.zeros((size, size), dtype=np.uint8) for _ in range(2)]
+        self.pad = np.zeros((size + 2, size + 2), dtype=np.uint8)
+        self.count = np.empty((size, size), dtype=np.uint8)
+        self.rows = np.empty((size + 2, size), dtype=np.uint8)
+        self.hits = np.empty((size, size), dtype=bool)
+        self.index = np.empty((size, size), dtype=np.uint16)
+        self.load = np.empty((size, size), dtype=np.float64)
+        if rule.kind == "cyclic":
+            self.successor = ((np.arange(rule.states) + 1) % rule.states).astype(np.uint8)
+            self.target = np.empty((size, size), dtype=np.uint8)
+
+    def _count(self, states: np.ndarray) -> np.ndarray:
+        size = self.size
+        pad = self.pad
+        if self.rule.kind == "cyclic":
+            # Neighbours already in this cell's next state
+            np.take(self.successor, states, out=self.target)
+            fill_padded(pad, states, self.boundary)
+            self.count.fill(0)
+            for dy, dx in self.offsets:
+                np.equal(pad[1 + dy:1 + dy + size, 1 + dx:1 + dx + size], self.target, out=self.hits)
+                self.count += self.hits
+            return self.count
+        if self.rule.kind == "life":
+            fill_padded(pad, states, self.boundary)
+        else:
+            np.equal(states, 1, out=pad[1:-1, 1:-1])
+            fill_padded(pad, pad[1:-1, 1:-1], self.boundary)
+        if self.box:
+            rows = self.rows
+            np.add(pad[:, :-2], pad[:, 1:-1], out=rows)
+            rows += pad[:, 2:]
+            np.add(rows[:-2], rows[1:-1], out=self.count)
+            self.count += rows[2:]
+            return self.count
+        (dy, dx), rest = self.offsets[0], self.offsets[1:]
+        np.copyto(self.count, pad[1 + dy:1 + dy + size, 1 + dx:1 + dx + size])
+        for dy, dx in rest:
+            self.count += pad[1 + dy:1 + dy + size, 1 + dx:1 + dx + size]
+        return self.count
+
+    def step(self, states: np.ndarray, out: np.ndarray) -> np.ndarray:
+        np.multiply(states, self.span, out=self.index)
+        self.index += self._count(states)
+        return np.take(self.table, self.index, out=out)
+
+    def run(self, field: np.ndarray, out: np.ndarray, steps: int) -> None:
+        """Advance a flat float field `steps` generations into out.
+
+        Field values are state numbers: truncated and clipped to 0 .. states - 1.
+        """
+        current, spare = self.states
+        # fmax / fmin also turn NaN into a valid state
+        grid = np.fmax(field.reshape(self.size, self.size), 0.0, out=self.load)
+        np.fmin(grid, self.rule.states - 1, out=grid)
+        np.copyto(current, grid, casting="unsafe")
+        for _ in range(steps):
+            self.step(current, spare)
+            current, spare = spare, current
+        np.copyto(out.reshape(self.size, self.size), current)
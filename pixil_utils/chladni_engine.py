@@ -8,6 +8,7 @@ import numpy as np
 
 from .array_manager import PixilArray
 from .grid_expr import resolve_scalar
+from .test_hooks import random_seed
 
 
 def _get_array(variables: Any, name: str) -> PixilArray:
@@ -17,93 +18,66 @@ def _get_array(variables: Any, name: str) -> PixilArray:
     return arr
 
 
-def _chladni_value(x: float, y: float, n_scale: float, m_scale: float) -> float:
+def _chladni_values(x: np.ndarray, y: np.ndarray, n_scale: float, m_scale: float) -> np.ndarray:
     cx = x - 32.0
     cy = y - 32.0
     term1 = np.cos(n_scale * cx) * np.cos(m_scale * cy)
     term2 = np.cos(m_scale * cx) * np.cos(n_scale * cy)
-    return float(np.abs(term1 + term2))
+    return np.abs(term1 + term2)
 
 
-def _clamp_particle(x: float, y: float) -> tuple[float, float]:
-    if x < 2:
-        x = 2.0
-    if x > 61:
-        x = 61.0
-    if y < 2:
-        y = 2.0
-    if y > 61:
-        y = 61.0
-    return x, y
+def _chladni_value(x: float, y: float, n_scale: float, m_scale: float) -> float:
+    return float(_chladni_values(np.float64(x), np.float64(y), n_scale, m_scale))
 
 
-def _move_particle(
-    x: float,
-    y: float,
+def _move_particles(
+    x: np.ndarray,
+    y: np.ndarray,
     n_scale: float,
     m_scale: float,
     rng: np.random.Generator,
-) -> tuple[float, float, float]:
-    current_val = _chladni_value(x, y, n_scale, m_scale)
-    best_x = x
-    best_y = y
-    best_val = current_val
-
-    axis = int(rng.integers(0, 2))
-    if axis == 0:
-        if x > 2:
-            tx = x - 1
-            test_val = _chladni_value(tx, y, n_scale, m_scale)
-            if test_val < best_val:
-                best_val = test_val
-                best_x = tx
-        if x < 61:
-            tx = x + 1
-            test_val = _chladni_value(tx, y, n_scale, m_scale)
-            if test_val < best_val:
-                best_val = test_val
-                best_x = tx
-    else:
-        if y > 2:
-            ty = y - 1
-            test_val = _chladni_value(x, ty, n_scale, m_scale)
-            if test_val < best_val:
-                best_val = test_val
-                best_y = ty
-        if y < 61:
-            ty = y + 1
-            test_val = _chladni_value(x, ty, n_scale, m_scale)
-            if test_val < best_val:
-                best_val = test_val
-                best_y = ty
-
-    roll = int(rng.integers(0, 100))
-
-    if current_val > 0.8:
-        nx = x + (best_x - x) * 2
-        ny = y + (best_y - y) * 2
-        nx, ny = _clamp_particle(nx, ny)
-    elif current_val > 0.4:
-        if roll < 90:
-            nx, ny = best_x, best_y
-        else:
-            nx, ny = x, y
-    elif current_val > 0.15:
-        if roll < 70:
-            nx, ny = best_x, best_y
-        else:
-            nx, ny = x, y
-    else:
-        if roll < 20:
-            nx = x + float(rng.integers(-1, 2))
-            ny = y + float(rng.integers(-1, 2))
-            if nx <= 2 or nx >= 61:
-                nx = x
-            if ny <= 2 or ny >= 61:
-                ny = y
-        else:
-            nx, ny = x, y
-
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """One settle move for every particle: probe a neighbor on a random axis, then
+    step toward the lower plate value (or jitter) with probabilities set by how far
+    the particle is from a nodal line."""
+    n = x.size
+    current_val = _chladni_values(x, y, n_scale, m_scale)
+    on_x = rng.integers(0, 2, n) == 0
+    roll = rng.integers(0, 100, n)
+    jitter_x = rng.integers(-1, 2, n)
+    jitter_y = rng.integers(-1, 2, n)
+
+    step_x = on_x.astype(np.float64)
+    step_y = 1.0 - step_x
+    pos = np.where(on_x, x, y)
+    best_x = x.copy()
+    best_y = y.copy()
+    best_val = current_val.copy()
+    # Probe -1 then +1 along the axis; the +1 side must beat the -1 result
+    for sign, allowed in ((-1.0, pos > 2), (1.0, pos < 61)):
+        tx = x + sign * step_x
+        ty = y + sign * step_y
+        test_val = _chladni_values(tx, ty, n_scale, m_scale)
+        better = allowed & (test_val < best_val)
+        best_val = np.where(better, test_val, best_val)
+        best_x = np.where(better, tx, best_x)
+        best_y = np.where(better, ty, best_y)
+
+    jx = x + jitter_x
+    jy = y + jitter_y
+    jx = np.where((jx <= 2) | (jx >= 61), x, jx)
+    jy = np.where((jy <= 2) | (jy >= 61), y, jy)
+    bands = [current_val > 0.8, current_val > 0.4, current_val > 0.15]
+    nx = np.select(
+        bands,
+        [np.clip(x + (best_x - x) * 2, 2.0, 61.0), np.where(roll < 90, best_x, x), np.where(roll < 70, best_x, x)],
+        np.where(roll < 20, jx, x),
+    )
+    ny = np.select(
+        bands,
+        [np.clip(y + (best_y - y) * 2, 2.0, 61.0), np.where(roll < 90, best_y, y), np.where(roll < 70, best_y, y)],
+        np.where(roll < 20, jy, y),
+    )
     return nx, ny, current_val
 
 
@@ -127,17 +101,15 @@ def run_chladni_step(
     py_arr = _get_array(variables, py_name)
     n_scale = resolve_scalar(n_scale_name, variables)
     m_scale = resolve_scalar(m_scale_name, variables)
-    n = px_arr.size
-    rng = np.random.default_rng()
-
-    for i in range(n):
-        x = float(px_arr[i])
-        y = float(py_arr[i])
-        nx, ny, settle_val = _move_particle(x, y, n_scale, m_scale, rng)
-        px_arr[i] = nx
-        py_arr[i] = ny
+    # Seeded runs (PIXIL_RANDOM_SEED) draw the generator seed from the global stream
+    rng = np.random.default_rng(np.random.randint(1 << 31) if random_seed() is not None else None)
+
+    xs = np.asarray(px_arr.data, dtype=np.float64)
+    ys = np.asarray(py_arr.data, dtype=np.float64)
+    nx, ny, settle_vals = _move_particles(xs, ys, n_scale, m_scale, rng)
+    px_arr.data[:] = nx.tolist()
+    py_arr.data[:] = ny.tolist()
+    for ix, iy, settle_val in zip(nx.astype(int).tolist(), ny.astype(int).tolist(), settle_vals.tolist()):
         color, intensity = _color_for_value(settle_val)
-        ix = int(nx)
-        iy = int(ny)
         if 0 <= ix <= 63 and 0 <= iy <= 63:
             append_draw("mplot", [ix, iy, color, intensity])
@@ -66,6 +66,14 @@ def parse_args():
             - script_path: Path or pattern for script(s)
             - duration: Run duration in seconds (None for unlimited)
             - debug_level: Debug level value (None for default)
+            - queue_monitor: Show the queue depth monitor
+            - telemetry: Telemetry socket path, '' for the default, None when off
+            - profile / profile_db: Per-line sampling profiler (optionally saved to DB)
+            - profile_interval: Sample interval in seconds
+            - profile_top: Rows in the printed profile table
+            - frame_budget_log: Consumer logs frame budget overruns each second
+            - alloc_stats: Allocation/GC instrumentation mode ('stats', 'trace' or None)
+            - gc_freeze: gc.freeze() after script load, raised thresholds while animating
     """
     parser = argparse.ArgumentParser(
         description='Pixil LED Matrix Script Runner',
@@ -92,9 +100,23 @@ Examples:
   # Run with the queue monitor
   sudo python Pixil.py main/snake -q  
 
+  # Headless: publish live telemetry, watch it from another shell
+  sudo python Pixil.py main/* --telemetry
+  python tools/pixil_top.py
+
   # Combined options
   sudo python Pixil.py holiday/* -t 1:30 -d DEBUG_SUMMARY
 
+  # Profile time per script line / procedure (and save it with the run metrics)
+  sudo python Pixil.py main/spiral -t 0:30 --profile --profile-db
+
+  # Log which stage (interpret/execute/present) makes fps() frames run late
+  sudo python Pixil.py main/spiral -t 0:30 --frame-budget-log
+
+  # GC pauses and allocation growth per frame (trace: also tracemalloc sites)
+  sudo python Pixil.py main/spiral -t 0:30 --alloc-stats
+  sudo python Pixil.py main/spiral -t 0:30 --alloc-stats trace --gc-freeze
+
 Note: 
   - Scripts can be referenced with or without the .pix extension
   - Subdirectories are supported for both single scripts and wildcards
@@ -126,6 +148,69 @@ Note:
         help='Show real-time queue depth monitor'
     )
 
+    parser.add_argument(
+        '--telemetry',
+        nargs='?',
+        const='',
+        default=None,
+        metavar='SOCKET',
+        help='Publish live queue/fps/cache telemetry on a Unix socket for tools/pixil_top.py '
+             '(default $XDG_RUNTIME_DIR or /tmp/pixil-telemetry.sock; also PIXIL_TELEMETRY)'
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Sample wall/CPU time per .pix line and procedure; print a table after each script'
+    )
+
+    parser.add_argument(
+        '--profile-interval',
+        type=float,
+        default=2.0,
+        metavar='MS',
+        help='Profiler sample interval in milliseconds (default 2.0)'
+    )
+
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=25,
+        metavar='N',
+        help='Rows shown in the profile table (default 25)'
+    )
+
+    parser.add_argument(
+        '--profile-db',
+        action='store_true',
+        help='Also save the profile with the run in the metrics database (implies --profile)'
+    )
+
+    parser.add_argument(
+        '--frame-budget-log',
+        action='store_true',
+        help='Log a line each second that has frames over the fps() budget, naming the '
+             'slowest stage (also PIXIL_FRAME_BUDGET_LOG=1)'
+    )
+
+    parser.add_argument(
+        '--alloc-stats',
+        nargs='?',
+        const='stats',
+        default=None,
+        choices=['stats', 'trace'],
+        metavar='MODE',
+        help='Time GC pauses and count net allocations per frame in both processes; '
+             "'trace' adds tracemalloc peaks and growth sites (slow; also PIXIL_ALLOC_STATS)"
+    )
+
+    parser.add_argument(
+        '--gc-freeze',
+        action='store_true',
+        help='Collect and gc.freeze() once the script is loaded, and raise GC thresholds '
+             'while it animates (also PIXIL_GC_FREEZE=1, thresholds PIXIL_GC_THRESHOLD)'
+    )
+
     args = parser.parse_args()
     
     # Convert args to more intuitive names
@@ -133,7 +218,15 @@ Note:
         script_path=args.script_path,
         duration=args.time,  # Already converted to seconds by validate_time_format
         debug_level=args.debug,
-        queue_monitor=args.queue_monitor
+        queue_monitor=args.queue_monitor,
+        telemetry=args.telemetry,
+        profile=args.profile or args.profile_db,
+        profile_interval=max(0.2, args.profile_interval) / 1000.0,  # seconds
+        profile_top=args.profile_top,
+        profile_db=args.profile_db,
+        frame_budget_log=args.frame_budget_log,
+        alloc_stats=args.alloc_stats,
+        gc_freeze=args.gc_freeze
     )
 
 # Export symbols
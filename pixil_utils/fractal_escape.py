@@ -1,12 +1,146 @@
-"""Vectorized escape-time iteration for Mandelbrot / Julia fractals."""
+"""
+Vectorized escape-time iteration for Mandelbrot / Julia fractals.
+
+Each kernel iterates only the pixels that are still inside the bailout: escaped
+pixels are dropped from the working arrays (compacted) once they make up a
+quarter of them, so late iterations cost what is left of the set rather than
+the whole grid.
+
+Large grids are split into row bands (contiguous spans of the row-major
+raster, up to BANDS_PER_WORKER per worker so bands that sit on the set do not
+leave the others idle) and run on a persistent thread pool; NumPy releases the
+GIL inside the ufunc loops. A band holds at least MIN_BAND_PIXELS so those
+loops, not the per-iteration Python, dominate — smaller grids run untiled.
+PIXIL_FRACTAL_WORKERS sets the pool size (default: CPU count, capped at
+MAX_WORKERS; 1 disables tiling). Results are identical to the untiled path:
+every pixel goes through the same arithmetic in the same order.
+"""
 
 from __future__ import annotations
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
 import numpy as np
 
 _REF_LIMIT = 1e6
 _Z_LINEAR_CAP = 4.0
 
+WORKERS_ENV = "PIXIL_FRACTAL_WORKERS"
+MAX_WORKERS = 4
+MIN_BAND_PIXELS = 4096
+BANDS_PER_WORKER = 2
+# Compact the working arrays once this fraction of them has escaped
+_COMPACT_FRACTION = 0.25
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def fractal_workers() -> int:
+    """Band worker count from PIXIL_FRACTAL_WORKERS, else the CPU count (max MAX_WORKERS)."""
+    value = os.environ.get(WORKERS_ENV, "").strip()
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            pass
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+
+
+def _get_pool(workers: int) -> ThreadPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=True)
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pixil-fractal")
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the band workers (started again on the next large grid)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_workers = 0
+
+
+def _run_banded(kernel: Callable[..., np.ndarray], arrays: Sequence[np.ndarray]) -> np.ndarray:
+    """kernel(*flat_band_arrays) over row bands of same-shape arrays; result has their shape."""
+    shape = arrays[0].shape
+    flat = [np.ascontiguousarray(arr, dtype=np.float64).ravel() for arr in arrays]
+    total = flat[0].size
+    workers = fractal_workers()
+    bands = min(workers * BANDS_PER_WORKER, total // MIN_BAND_PIXELS)
+    if workers < 2 or bands < 2:
+        return kernel(*flat).reshape(shape)
+
+    esc = np.empty(total, dtype=np.float64)
+    bounds = np.linspace(0, total, bands + 1).astype(int)
+
+    def band(start: int, stop: int) -> None:
+        esc[start:stop] = kernel(*(arr[start:stop] for arr in flat))
+
+    pool = _get_pool(workers)
+    futures = [pool.submit(band, start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+    for future in futures:
+        future.result()
+    return esc.reshape(shape)
+
+
+def _compact(idx: np.ndarray, live: np.ndarray, arrays: List[np.ndarray]) -> Tuple[np.ndarray, List[np.ndarray]]:
+    return idx[live], [arr[live] for arr in arrays]
+
+
+def _escape_kernel(
+    cr: np.ndarray,
+    ci: np.ndarray,
+    zr: np.ndarray,
+    zi: np.ndarray,
+    max_iter: int,
+    bailout: float,
+    burning_ship: bool,
+) -> np.ndarray:
+    """Escape counts for flat arrays, iterating only pixels that have not escaped."""
+    esc = np.full(cr.size, float(max_iter))
+    idx = np.arange(cr.size)
+    live = np.ones(cr.size, dtype=bool)
+    dead = 0
+    with np.errstate(over="ignore", invalid="ignore"):
+        for n in range(max_iter):
+            if burning_ship:
+                ax = np.abs(zr)
+                ay = np.abs(zi)
+                zr_new = ax * ax - ay * ay + cr
+                zi_new = 2.0 * ax * ay + ci
+            else:
+                zr_new = zr * zr - zi * zi + cr
+                zi_new = 2.0 * zr * zi + ci
+            mag2 = zr_new * zr_new + zi_new * zi_new
+            escaped = (mag2 > bailout) | ~np.isfinite(mag2)
+            escaped &= live
+            count = int(np.count_nonzero(escaped))
+            zr, zi = zr_new, zi_new
+            if not count:
+                continue
+            esc[idx[escaped]] = n + 1
+            live &= ~escaped
+            dead += count
+            if dead == idx.size:
+                break
+            if dead >= idx.size * _COMPACT_FRACTION:
+                idx, (cr, ci, zr, zi) = _compact(idx, live, [cr, ci, zr, zi])
+                live = np.ones(idx.size, dtype=bool)
+                dead = 0
+    return esc
+
 
 def escape_iter(
     c_re: np.ndarray,
@@ -25,40 +159,23 @@ def escape_iter(
     max_iter = int(max_iter)
     bailout = float(bailout)
 
-    cr = np.asarray(c_re, dtype=np.float64)
-    ci = np.asarray(c_im, dtype=np.float64)
-
     if z0_re is None:
-        zr = np.zeros_like(cr, dtype=np.float64)
-        zi = np.zeros_like(ci, dtype=np.float64)
+        cr, ci = np.broadcast_arrays(np.asarray(c_re, dtype=np.float64), np.asarray(c_im, dtype=np.float64))
+        zr = np.zeros(cr.shape, dtype=np.float64)
+        zi = zr
     else:
-        zr = np.asarray(z0_re, dtype=np.float64)
-        zi = np.asarray(z0_im, dtype=np.float64)
-        if cr.shape == () or cr.size == 1:
-            cr = np.full_like(zr, float(cr.ravel()[0]))
-        if ci.shape == () or ci.size == 1:
-            ci = np.full_like(zi, float(ci.ravel()[0]))
+        # A constant c (0-d or size 1) broadcasts over the z0 grid
+        zr, zi, cr, ci = np.broadcast_arrays(
+            np.asarray(z0_re, dtype=np.float64),
+            np.asarray(z0_im, dtype=np.float64),
+            np.asarray(c_re, dtype=np.float64),
+            np.asarray(c_im, dtype=np.float64),
+        )
 
-    esc = np.zeros(zr.shape, dtype=np.float64)
-    mask = np.ones(zr.shape, dtype=bool)
+    def kernel(cr, ci, zr, zi):
+        return _escape_kernel(cr, ci, zr, zi, max_iter, bailout, False)
 
-    with np.errstate(over="ignore", invalid="ignore"):
-        for n in range(max_iter):
-            zr2 = zr * zr - zi * zi
-            zi2 = 2.0 * zr * zi
-            zr_new = zr2 + cr
-            zi_new = zi2 + ci
-            zr = np.where(mask, zr_new, zr)
-            zi = np.where(mask, zi_new, zi)
-            mag2 = zr * zr + zi * zi
-            escaped = mask & ((mag2 > bailout) | ~np.isfinite(mag2))
-            esc[escaped] = n + 1
-            mask &= ~escaped
-            if not np.any(mask):
-                break
-
-    esc[mask] = max_iter
-    return esc
+    return _run_banded(kernel, [cr, ci, zr, zi])
 
 
 def burning_ship_iter(
@@ -73,32 +190,87 @@ def burning_ship_iter(
     max_iter = int(max_iter)
     bailout = float(bailout)
 
-    cr = np.asarray(c_re, dtype=np.float64)
-    ci = np.asarray(c_im, dtype=np.float64)
-    zr = np.zeros_like(cr, dtype=np.float64)
-    zi = np.zeros_like(ci, dtype=np.float64)
+    cr, ci = np.broadcast_arrays(np.asarray(c_re, dtype=np.float64), np.asarray(c_im, dtype=np.float64))
+
+    def kernel(cr, ci):
+        zeros = np.zeros(cr.size, dtype=np.float64)
+        return _escape_kernel(cr, ci, zeros, zeros, max_iter, bailout, True)
+
+    return _run_banded(kernel, [cr, ci])
 
-    esc = np.zeros(zr.shape, dtype=np.float64)
-    mask = np.ones(zr.shape, dtype=bool)
 
+def _reference_orbit(ar: float, ai: float, max_iter: int, bailout: float) -> Tuple[List[float], List[float]]:
+    """Z_0 = 0 .. Z_k of the anchor orbit, stopping before it escapes or leaves the linear range."""
+    orbit_r, orbit_i = [0.0], [0.0]
+    Zr, Zi = 0.0, 0.0
+    for _ in range(max_iter):
+        Zr2 = Zr * Zr - Zi * Zi + ar
+        Zi2 = 2.0 * Zr * Zi + ai
+        Zmag2 = Zr2 * Zr2 + Zi2 * Zi2
+        if (
+            not np.isfinite(Zmag2)
+            or Zmag2 > bailout
+            or abs(Zr2) > _REF_LIMIT
+            or abs(Zi2) > _REF_LIMIT
+            or abs(Zr2) > _Z_LINEAR_CAP
+            or abs(Zi2) > _Z_LINEAR_CAP
+        ):
+            break
+        orbit_r.append(Zr2)
+        orbit_i.append(Zi2)
+        Zr, Zi = Zr2, Zi2
+    return orbit_r, orbit_i
+
+
+def _perturb_kernel(
+    ar: float,
+    ai: float,
+    dr: np.ndarray,
+    di: np.ndarray,
+    orbit: Tuple[List[float], List[float]],
+    max_iter: int,
+    bailout: float,
+) -> np.ndarray:
+    orbit_r, orbit_i = orbit
+    esc = np.zeros(dr.size, dtype=np.float64)
+    idx = np.arange(dr.size)
+    live = np.ones(dr.size, dtype=bool)
+    dead = 0
+    dzr = np.zeros_like(dr)
+    dzi = np.zeros_like(di)
+    cr_all, ci_all = dr, di
     with np.errstate(over="ignore", invalid="ignore"):
-        for n in range(max_iter):
-            ax = np.abs(zr)
-            ay = np.abs(zi)
-            zr2 = ax * ax - ay * ay
-            zi2 = 2.0 * ax * ay
-            zr_new = zr2 + cr
-            zi_new = zi2 + ci
-            zr = np.where(mask, zr_new, zr)
-            zi = np.where(mask, zi_new, zi)
+        for n in range(len(orbit_r) - 1):
+            Zr, Zi = orbit_r[n], orbit_i[n]
+            t1r = 2.0 * (Zr * dzr - Zi * dzi)
+            t1i = 2.0 * (Zr * dzi + Zi * dzr)
+            t2r = dzr * dzr - dzi * dzi
+            t2i = 2.0 * dzr * dzi
+            dzr = t1r + t2r + dr
+            dzi = t1i + t2i + di
+            zr = orbit_r[n + 1] + dzr
+            zi = orbit_i[n + 1] + dzi
             mag2 = zr * zr + zi * zi
-            escaped = mask & ((mag2 > bailout) | ~np.isfinite(mag2))
-            esc[escaped] = n + 1
-            mask &= ~escaped
-            if not np.any(mask):
-                break
-
-    esc[mask] = max_iter
+            escaped = (mag2 > bailout) | ~np.isfinite(mag2)
+            escaped &= live
+            count = int(np.count_nonzero(escaped))
+            if not count:
+                continue
+            esc[idx[escaped]] = n + 1
+            live &= ~escaped
+            dead += count
+            if dead == idx.size:
+                return esc
+            if dead >= idx.size * _COMPACT_FRACTION:
+                idx, (dr, di, dzr, dzi) = _compact(idx, live, [dr, di, dzr, dzi])
+                live = np.ones(idx.size, dtype=bool)
+                dead = 0
+
+    # Reference orbit ran out (or max_iter reached): finish the rest directly
+    rest = idx[live]
+    if rest.size:
+        zeros = np.zeros(rest.size, dtype=np.float64)
+        esc[rest] = _escape_kernel(ar + cr_all[rest], ai + ci_all[rest], zeros, zeros, max_iter, bailout, False)
     return esc
 
 
@@ -120,64 +292,13 @@ def escape_perturb(
     bailout = float(bailout)
     ar = float(anchor_re)
     ai = float(anchor_im)
-    dr = np.asarray(dc_re, dtype=np.float64)
-    di = np.asarray(dc_im, dtype=np.float64)
-
-    Zr, Zi = 0.0, 0.0
-    dzr = np.zeros_like(dr)
-    dzi = np.zeros_like(di)
-    esc = np.zeros(dr.shape, dtype=np.float64)
-    mask = np.ones(dr.shape, dtype=bool)
-    ref_ok = True
-
-    with np.errstate(over="ignore", invalid="ignore"):
-        for n in range(max_iter):
-            if not ref_ok:
-                break
-
-            Zr2 = Zr * Zr - Zi * Zi + ar
-            Zi2 = 2.0 * Zr * Zi + ai
-            Zmag2 = Zr2 * Zr2 + Zi2 * Zi2
-            if (
-                not np.isfinite(Zmag2)
-                or Zmag2 > bailout
-                or abs(Zr2) > _REF_LIMIT
-                or abs(Zi2) > _REF_LIMIT
-                or abs(Zr2) > _Z_LINEAR_CAP
-                or abs(Zi2) > _Z_LINEAR_CAP
-            ):
-                ref_ok = False
-                break
-
-            dzr_m = np.where(mask, dzr, 0.0)
-            dzi_m = np.where(mask, dzi, 0.0)
+    dr, di = np.broadcast_arrays(np.asarray(dc_re, dtype=np.float64), np.asarray(dc_im, dtype=np.float64))
+    orbit = _reference_orbit(ar, ai, max_iter, bailout)
 
-            t1r = 2.0 * (Zr * dzr_m - Zi * dzi_m)
-            t1i = 2.0 * (Zr * dzi_m + Zi * dzr_m)
-            t2r = dzr_m * dzr_m - dzi_m * dzi_m
-            t2i = 2.0 * dzr_m * dzi_m
-            dzr_new = t1r + t2r + dr
-            dzi_new = t1i + t2i + di
+    def kernel(dr, di):
+        return _perturb_kernel(ar, ai, dr, di, orbit, max_iter, bailout)
 
-            zr = Zr2 + dzr_new
-            zi = Zi2 + dzi_new
-            mag2 = zr * zr + zi * zi
-            escaped = mask & ((mag2 > bailout) | ~np.isfinite(mag2))
-            esc[escaped] = n + 1
-            mask &= ~escaped
-
-            Zr, Zi = Zr2, Zi2
-            dzr = np.where(mask, dzr_new, 0.0)
-            dzi = np.where(mask, dzi_new, 0.0)
-
-            if not np.any(mask):
-                break
-
-    if np.any(mask):
-        full = escape_iter(ar + dr, ai + di, max_iter)
-        esc[mask] = full[mask]
-
-    return esc
+    return _run_banded(kernel, [dr, di])
 
 
 def escape_zoom(
@@ -195,3 +316,187 @@ def escape_zoom(
     if np.max(np.abs(dr)) > dc_threshold or np.max(np.abs(di)) > dc_threshold:
         return escape_iter(anchor_re + dr, anchor_im + di, max_iter, bailout=bailout)
     return escape_perturb(anchor_re, anchor_im, dr, di, max_iter, bailout=bailout)
+
+
+# ---------------------------------------------------------------------------
+# Frame-coherent zoom (escape_zoom / escape_perturb with a quality argument)
+# ---------------------------------------------------------------------------
+
+DEFAULT_QUALITY = 0.5
+REFRESH_FRAMES = 30  # full recompute at least this often
+MAX_REUSE_OFFSET = 1.0  # new-grid pixels between a pixel and its reused sample at quality 0
+_MAX_STEP_RATIO = 2.0  # zooming faster than this per frame recomputes everything
+_MAX_COHERENT_CACHES = 8
+
+_COHERENT: Dict[Any, "ZoomReuse"] = {}
+
+
+def _grid_geometry(dr: np.ndarray, di: np.ndarray) -> Optional[Tuple[float, float, float, float]]:
+    """(re0, im0, step_x, step_y) when dc is a regular 2-D grid (re along columns, im along rows)."""
+    if dr.ndim != 2 or dr.shape[0] < 2 or dr.shape[1] < 2:
+        return None
+    re0, im0 = float(dr[0, 0]), float(di[0, 0])
+    sx, sy = float(dr[0, 1] - dr[0, 0]), float(di[1, 0] - di[0, 0])
+    if sx == 0.0 or sy == 0.0:
+        return None
+    h, w = dr.shape
+    tol = 1e-6 * min(abs(sx), abs(sy))
+    expect_re = re0 + sx * np.arange(w)
+    expect_im = im0 + sy * np.arange(h)
+    if np.max(np.abs(dr - expect_re[None, :])) > tol or np.max(np.abs(di - expect_im[:, None])) > tol:
+        return None
+    return re0, im0, sx, sy
+
+
+def _boundary_map(esc: np.ndarray) -> np.ndarray:
+    """Pixels whose escape count differs from a 4-neighbour."""
+    edge = np.zeros(esc.shape, dtype=bool)
+    diff_x = esc[:, 1:] != esc[:, :-1]
+    diff_y = esc[1:, :] != esc[:-1, :]
+    edge[:, 1:] |= diff_x
+    edge[:, :-1] |= diff_x
+    edge[1:, :] |= diff_y
+    edge[:-1, :] |= diff_y
+    return edge
+
+
+class ZoomReuse:
+    """
+    Escape counts of the previous frame, reprojected onto the next one.
+
+    A pixel takes the count of the nearest previous sample when that sample is
+    inside the old frame, is not on a count boundary, and the point the count
+    was actually computed at (tracked through chains of reuse) is within
+    (1 - quality) * MAX_REUSE_OFFSET new pixels of it. The rest is computed. Frames
+    with a different shape or max_iter, a zoom step beyond _MAX_STEP_RATIO, or
+    REFRESH_FRAMES since the last full frame are computed in full.
+    """
+
+    def __init__(self, quality: float = DEFAULT_QUALITY, refresh: int = REFRESH_FRAMES):
+        self.quality = min(1.0, max(0.0, float(quality)))
+        self.refresh = max(1, int(refresh))
+        self.tolerance = (1.0 - self.quality) * MAX_REUSE_OFFSET
+        self.frames_since_refresh = 0
+        self.reused = 0
+        self.computed = 0
+        self._prev: Optional[Tuple] = None
+
+    def _reproject(
+        self, ar: float, ai: float, geometry: Tuple[float, float, float, float], shape: Tuple[int, int]
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """(reuse mask, reused counts, sample offsets re/im) or None for a full frame."""
+        p_ar, p_ai, p_geometry, p_esc, p_dre, p_dim, p_edge, _ = self._prev
+        re0, im0, sx, sy = geometry
+        p_re0, p_im0, p_sx, p_sy = p_geometry
+        for ratio in (p_sx / sx, p_sy / sy):
+            if not 1.0 / _MAX_STEP_RATIO <= abs(ratio) <= _MAX_STEP_RATIO:
+                return None
+        h, w = shape
+        new_re = re0 + sx * np.arange(w)
+        new_im = im0 + sy * np.arange(h)
+        # Nearest previous grid point for each new column / row
+        iu = np.rint(((ar - p_ar) + new_re - p_re0) / p_sx)
+        iv = np.rint(((ai - p_ai) + new_im - p_im0) / p_sy)
+        inside = ((iv >= 0) & (iv < h))[:, None] & ((iu >= 0) & (iu < w))[None, :]
+        cols = np.clip(iu, 0, w - 1).astype(np.intp)
+        rows = np.clip(iv, 0, h - 1).astype(np.intp)
+        src = np.ix_(rows, cols)
+        # Where the reused count was actually computed, relative to each new pixel
+        dre = ((p_ar - ar) + p_re0 + p_sx * cols - new_re)[None, :] + p_dre[src]
+        dim = ((p_ai - ai) + p_im0 + p_sy * rows - new_im)[:, None] + p_dim[src]
+        offset = np.hypot(dre / sx, dim / sy)
+        reuse = inside & ~p_edge[src] & (offset <= self.tolerance)
+        return reuse, p_esc[src], dre, dim
+
+    def escape(
+        self,
+        anchor_re: float,
+        anchor_im: float,
+        dr: np.ndarray,
+        di: np.ndarray,
+        max_iter: int,
+        compute: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    ) -> np.ndarray:
+        """Counts for c = anchor + (dr, di); compute(dr_subset, di_subset) runs the kernel."""
+        geometry = _grid_geometry(dr, di)
+        plan = None
+        prev = self._prev
+        if (
+            geometry is not None
+            and prev is not None
+            and prev[3].shape == dr.shape
+            and prev[7] == max_iter
+            and self.frames_since_refresh + 1 < self.refresh
+            and self.tolerance > 0.0
+        ):
+            plan = self._reproject(anchor_re, anchor_im, geometry, dr.shape)
+
+        if plan is None:
+            esc = np.asarray(compute(dr, di), dtype=np.float64).reshape(dr.shape)
+            dre = np.zeros(dr.shape)
+            dim = np.zeros(dr.shape)
+            self.frames_since_refresh = 0
+            self.computed += esc.size
+        else:
+            reuse, esc, dre, dim = plan
+            fresh = ~reuse
+            if fresh.any():
+                esc[fresh] = compute(dr[fresh], di[fresh])
+            dre[fresh] = 0.0
+            dim[fresh] = 0.0
+            self.frames_since_refresh += 1
+            count = int(np.count_nonzero(reuse))
+            self.reused += count
+            self.computed += esc.size - count
+
+        if geometry is None:
+            self._prev = None
+        else:
+            self._prev = (float(anchor_re), float(anchor_im), geometry, esc, dre, dim, _boundary_map(esc), max_iter)
+        return esc.copy()
+
+
+def escape_zoom_coherent(
+    key: Any,
+    anchor_re: float,
+    anchor_im: float,
+    dc_re: np.ndarray,
+    dc_im: np.ndarray,
+    max_iter: int,
+    quality: float = DEFAULT_QUALITY,
+    perturb: bool = False,
+    dc_threshold: float = 0.002,
+    bailout: float = 4.0,
+) -> np.ndarray:
+    """
+    escape_zoom (or escape_perturb when perturb=True) reusing the previous
+    frame of the same call site `key` (see ZoomReuse).
+
+    The direct/perturbation choice is made on the whole grid, so recomputed
+    pixels get exactly the value a full frame would give them.
+    """
+    cache = _COHERENT.get(key)
+    if cache is None or cache.quality != min(1.0, max(0.0, float(quality))):
+        if cache is None and len(_COHERENT) >= _MAX_COHERENT_CACHES:
+            _COHERENT.pop(next(iter(_COHERENT)))
+        cache = _COHERENT[key] = ZoomReuse(quality)
+    max_iter = int(max_iter)
+    ar, ai = float(anchor_re), float(anchor_im)
+    dr, di = np.broadcast_arrays(np.asarray(dc_re, dtype=np.float64), np.asarray(dc_im, dtype=np.float64))
+    direct = not perturb and (np.max(np.abs(dr)) > dc_threshold or np.max(np.abs(di)) > dc_threshold)
+
+    def compute(sub_re: np.ndarray, sub_im: np.ndarray) -> np.ndarray:
+        if direct:
+            return escape_iter(ar + sub_re, ai + sub_im, max_iter, bailout=bailout)
+        return escape_perturb(ar, ai, sub_re, sub_im, max_iter, bailout=bailout)
+
+    return cache.escape(ar, ai, dr, di, max_iter, compute)
+
+
+def reset_coherent(program: Optional[str] = None) -> None:
+    """Drop cached frames (all, or every call site of one program)."""
+    if program is None:
+        _COHERENT.clear()
+        return
+    for key in [k for k in _COHERENT if isinstance(k, tuple) and k[0] == program]:
+        del _COHERENT[key]
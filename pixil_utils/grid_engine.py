@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 
 from .array_manager import PixilArray
+from .ca_kernel import CAKernel
 from .grid_expr import (
     ExprNode,
     FieldEvalContext,
@@ -17,6 +19,13 @@ from .grid_expr import (
     resolve_size,
 )
 from .grid_field_compiler import FieldProgram, GridDrawSpec, GridProgram, StepBlock
+from .grid_step_plan import (
+    StepPlan,
+    below_avg_into,
+    compile_step_plan,
+    laplacian_4_into,
+    neighbor_count_into,
+)
 
 
 @dataclass
@@ -25,9 +34,25 @@ class _GridRuntime:
     boundary: str
     active_idx: Dict[str, int] = field(default_factory=dict)
     buffers: Dict[str, List[np.ndarray]] = field(default_factory=dict)
+    # Script arrays whose .data is the field's active buffer (rebound on every swap)
+    bound: Dict[str, PixilArray] = field(default_factory=dict)
+    # Step plans by block position (None: the block runs through eval_expr)
+    plans: Dict[int, Tuple[StepBlock, Optional[StepPlan]]] = field(default_factory=dict)
+    # Lookup-table kernel for `rule` programs, rebuilt if the rule, size or boundary changes
+    kernel: Optional[CAKernel] = None
 
 
 _RUNTIME: Dict[str, _GridRuntime] = {}
+# Field buffers of reset runtimes by length, reused by the next program of that size
+_BUFFER_POOL: Dict[int, List[np.ndarray]] = {}
+
+# Site distance tables per field_program name: (key, tables), rebuilt when the sites move
+_SITE_TABLES: Dict[str, Tuple[tuple, Any]] = {}
+# Pixels per (sites, size, size) chunk: 2**15 float64 = 256 KB, 8 sites at 64x64. Small
+# enough that a chunk's temporaries stay in cache while a formula runs over it
+_SITE_CHUNK_PIXELS = 1 << 15
+# Calls that work elementwise on stacked per-site arrays, so sum_sites can evaluate all sites at once
+_SITE_VECTOR_CALLS = frozenset({"clamp", "where", "min", "max", "abs", "floor", "sin", "cos", "sqrt", "pow"})
 
 
 def _build_scalars(variables: Any) -> Dict[str, float]:
@@ -50,40 +75,61 @@ def _get_array(variables: Any, name: str) -> PixilArray:
     return arr
 
 
-def _array_to_numpy(arr: PixilArray) -> np.ndarray:
-    return np.asarray(arr.data, dtype=np.float64)
+def grid_fill(variables: Any, array_name: str, value: float) -> None:
+    arr = _get_array(variables, array_name)
+    arr.data[:] = [float(value)] * arr.size
 
 
-def _write_back(arr: PixilArray, data: np.ndarray) -> None:
-    flat = np.asarray(data, dtype=np.float64).ravel()
-    for i, val in enumerate(flat):
-        arr.data[i] = float(val)
+def _take_buffer(length: int) -> np.ndarray:
+    pool = _BUFFER_POOL.get(length)
+    return pool.pop() if pool else np.empty(length, dtype=np.float64)
 
 
-def grid_fill(variables: Any, array_name: str, value: float) -> None:
-    arr = _get_array(variables, array_name)
-    fill = float(value)
-    for i in range(arr.size):
-        arr.data[i] = fill
+def _release_runtime(rt: _GridRuntime) -> None:
+    """Hand the buffers back to the pool; bound arrays keep a plain copy of their field."""
+    for fname, arr in rt.bound.items():
+        if arr.data is rt.buffers[fname][rt.active_idx[fname]]:
+            arr.data = arr.data.tolist()
+    for pair in rt.buffers.values():
+        for buf in pair:
+            _BUFFER_POOL.setdefault(buf.size, []).append(buf)
+    rt.buffers.clear()
+    rt.bound.clear()
+
+
+def _bind_field(rt: _GridRuntime, fname: str, arr: PixilArray) -> None:
+    """Make arr.data the field's active buffer, adopting what the script last stored there.
+
+    A no-op while the array is still bound; a new array (script restart, create_array
+    again) or one another program rebound is copied in once and bound in its place.
+    """
+    active = rt.buffers[fname][rt.active_idx[fname]]
+    if arr.data is active:
+        return
+    if arr.size != active.size:
+        raise ValueError(f"Field {fname} size {arr.size} != {active.size}")
+    active[:] = arr.data
+    previous = rt.bound.get(fname)
+    if previous is not None and previous is not arr and previous.data is active:
+        previous.data = active.tolist()
+    arr.data = active
+    rt.bound[fname] = arr
 
 
 def _ensure_runtime(program: GridProgram, variables: Any) -> _GridRuntime:
     size = resolve_size(program.size, variables)
-    key = program.name
-    if key not in _RUNTIME:
-        rt = _GridRuntime(size=size, boundary=program.boundary)
+    rt = _RUNTIME.get(program.name)
+    if rt is not None and (rt.size != size or set(rt.buffers) != set(program.fields)):
+        _release_runtime(rt)
+        rt = None
+    if rt is None:
+        rt = _RUNTIME[program.name] = _GridRuntime(size=size, boundary=program.boundary)
         for fname in program.fields:
-            src = _array_to_numpy(_get_array(variables, fname))
-            if src.size != size * size:
-                raise ValueError(
-                    f"Field {fname} size {src.size} != {size * size}"
-                )
-            rt.buffers[fname] = [src.copy(), src.copy()]
+            rt.buffers[fname] = [_take_buffer(size * size), _take_buffer(size * size)]
             rt.active_idx[fname] = 0
-        _RUNTIME[key] = rt
-    rt = _RUNTIME[key]
-    rt.size = size
     rt.boundary = program.boundary
+    for fname in program.fields:
+        _bind_field(rt, fname, _get_array(variables, fname))
     return rt
 
 
@@ -92,65 +138,107 @@ def _reshape(field: np.ndarray, size: int) -> np.ndarray:
 
 
 def _laplacian_4(field: np.ndarray, size: int, boundary: str) -> np.ndarray:
+    out = np.empty((size, size), dtype=np.float64)
+    pad = np.empty((size + 2, size + 2), dtype=np.float64)
     grid = _reshape(field, size)
-    if boundary == "wrap":
-        up = np.roll(grid, 1, axis=0)
-        down = np.roll(grid, -1, axis=0)
-        left = np.roll(grid, 1, axis=1)
-        right = np.roll(grid, -1, axis=1)
-    else:
-        up = np.vstack([grid[0:1, :], grid[:-1, :]])
-        down = np.vstack([grid[1:, :], grid[-1:, :]])
-        left = np.hstack([grid[:, 0:1], grid[:, :-1]])
-        right = np.hstack([grid[:, 1:], grid[:, -1:]])
-    lap = left + right + up + down - 4.0 * grid
-    return lap.ravel()
+    return laplacian_4_into(grid, boundary, out, pad, np.empty_like(out)).ravel()
 
 
 def _neighbor_count(field: np.ndarray, size: int, boundary: str, orthogonal: bool) -> np.ndarray:
-    alive = (_reshape(field, size) > 0.5).astype(np.float64)
-    if boundary == "wrap":
-        total = np.zeros_like(alive)
-        shifts = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        if not orthogonal:
-            shifts += [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        for dy, dx in shifts:
-            total += np.roll(np.roll(alive, dy, axis=0), dx, axis=1)
-        return total.ravel()
-    padded = np.pad(alive, 1, mode="edge")
-    total = np.zeros_like(alive)
-    offsets = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-    if not orthogonal:
-        offsets += [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-    h, w = alive.shape
-    for dy, dx in offsets:
-        y0, y1 = 1 + dy, 1 + dy + h
-        x0, x1 = 1 + dx, 1 + dx + w
-        total += padded[y0:y1, x0:x1]
-    return total.ravel()
+    out = np.empty((size, size), dtype=np.float64)
+    pad = np.empty((size + 2, size + 2), dtype=np.float64)
+    return neighbor_count_into(_reshape(field, size), boundary, orthogonal, out, pad).ravel()
 
 
+@lru_cache(maxsize=8)
 def _grid_coords(size: int) -> Dict[str, np.ndarray]:
     ys, xs = np.mgrid[0:size, 0:size].astype(np.float64)
-    return {"grid_x": xs.ravel(), "grid_y": ys.ravel()}
+    coords = {"grid_x": xs.ravel(), "grid_y": ys.ravel()}
+    for arr in coords.values():
+        arr.flags.writeable = False  # shared by every program of this size
+    return coords
+
+
+@lru_cache(maxsize=8)
+def _grid_mesh(size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(ys, xs) pixel coordinates as read-only (size, size) arrays."""
+    coords = _grid_coords(size)
+    return coords["grid_y"].reshape(size, size), coords["grid_x"].reshape(size, size)
+
+
+def _site_chunks(count: int, size: int) -> List[slice]:
+    step = max(1, _SITE_CHUNK_PIXELS // (size * size))
+    return [slice(start, start + step) for start in range(0, count, step)]
+
+
+def _site_distances(name: str, size: int, px: np.ndarray, py: np.ndarray) -> List[Tuple[np.ndarray, ...]]:
+    """(dx, dy, dist2) site stacks, one per site chunk; dist2 is (sites, size, size).
+
+    Kept for the next frame of the same program and reused while the sites stay put.
+    """
+    key = ("distances", size, px.tobytes(), py.tobytes())
+    cached = _SITE_TABLES.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    ys, xs = _grid_mesh(size)
+    tables = []
+    for chunk in _site_chunks(px.size, size):
+        # dx only varies along a row and dy down a column: (sites, 1, size) and
+        # (sites, size, 1) broadcast to the full grid wherever they are used
+        dx = xs[None, :1, :] - px[chunk, None, None]
+        dy = ys[None, :, :1] - py[chunk, None, None]
+        tables.append((dx, dy, dx * dx + dy * dy))
+    _SITE_TABLES[name] = (key, tables)
+    return tables
+
+
+def _nearest_sites(name: str, size: int, px: np.ndarray, py: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """(label, nearest dist2, second-nearest dist2) per pixel; inf when there is no second site.
+
+    Sites are scanned in chunks with a running two-smallest merge, so memory stays at
+    one chunk however many sites there are; ties go to the lower site index, as argmin.
+    Within a chunk everything is a min-reduction over the site axis, which NumPy runs
+    as contiguous whole-plane passes (argmin / partition along axis 0 are far slower).
+    """
+    key = ("nearest", size, px.tobytes(), py.tobytes())
+    cached = _SITE_TABLES.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    ys, xs = _grid_mesh(size)
+    label = np.zeros((size, size), dtype=np.intp)
+    best = np.full((size, size), np.inf)
+    second = np.full((size, size), np.inf)
+    for chunk in _site_chunks(px.size, size):
+        dist2 = (xs[None, :1, :] - px[chunk, None, None]) ** 2 + (ys[None, :, :1] - py[chunk, None, None]) ** 2
+        index = np.arange(chunk.start, chunk.start + dist2.shape[0])[:, None, None]
+        chunk_best = np.minimum.reduce(dist2, axis=0)
+        # Lowest site index reaching the minimum, then the minimum over the rest
+        chunk_label = np.minimum.reduce(np.where(dist2 == chunk_best, index, px.size), axis=0)
+        chunk_second = np.minimum.reduce(np.where(index == chunk_label, np.inf, dist2), axis=0)
+        second = np.minimum(np.maximum(best, chunk_best), np.minimum(second, chunk_second))
+        closer = chunk_best < best
+        label = np.where(closer, chunk_label, label)
+        best = np.minimum(best, chunk_best)
+    tables = (label, best, second)
+    _SITE_TABLES[name] = (key, tables)
+    return tables
+
+
+def _add_planes(acc: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """acc += values[0]; acc += values[1]; ... the same order as a per-site loop."""
+    for plane in values:
+        acc += plane
+    return acc
+
+
+def _site_vectorizable(node: ExprNode) -> bool:
+    if node.kind == "call" and str(node.value) not in _SITE_VECTOR_CALLS:
+        return False
+    return all(_site_vectorizable(child) for child in node.children)
 
 
 def _below_avg(field: np.ndarray, size: int) -> np.ndarray:
-    g = _reshape(field, size)
-    out = g.copy()
-    for y in range(size - 1):
-        below_y = y + 1
-        for x in range(size):
-            total = g[below_y, x]
-            count = 1
-            if x > 0:
-                total += g[below_y, x - 1]
-                count += 1
-            if x < size - 1:
-                total += g[below_y, x + 1]
-                count += 1
-            out[y, x] = total / count
-    return out.ravel()
+    return below_avg_into(_reshape(field, size), np.empty((size, size), dtype=np.float64)).ravel()
 
 
 def _random_field(lo: float, hi: float, size: int) -> np.ndarray:
@@ -169,6 +257,18 @@ def _write_field(rt: _GridRuntime, name: str, data: np.ndarray) -> None:
 def _swap_fields(rt: _GridRuntime, names: List[str]) -> None:
     for name in names:
         rt.active_idx[name] = 1 - rt.active_idx[name]
+        rt.bound[name].data = rt.buffers[name][rt.active_idx[name]]
+
+
+def _step_plan(index: int, block: StepBlock, rt: _GridRuntime, program: GridProgram) -> Optional[StepPlan]:
+    cached = rt.plans.get(index)
+    stale = cached is None or cached[0] is not block
+    if not stale and cached[1] is not None:
+        stale = (cached[1].size, cached[1].boundary) != (rt.size, rt.boundary)
+    if stale:
+        plan = compile_step_plan(block, program.fields, rt.size, rt.boundary, _grid_coords(rt.size))
+        cached = rt.plans[index] = (block, plan)
+    return cached[1]
 
 
 def _execute_step_block(
@@ -176,8 +276,13 @@ def _execute_step_block(
     rt: _GridRuntime,
     program: GridProgram,
     variables: Any,
+    index: int = 0,
 ) -> None:
     read_fields = _read_fields(rt, program.fields)
+    plan = _step_plan(index, block, rt, program)
+    if plan is not None:
+        plan.run(read_fields, variables, rt.buffers[block.field][1 - rt.active_idx[block.field]])
+        return
     temps: Dict[str, np.ndarray] = {}
     scalars = _build_scalars(variables)
 
@@ -235,6 +340,40 @@ def _clamp_palette_color(base: float, scale: float, field_val: np.ndarray) -> np
     return colors
 
 
+def _color_ids(colors: Any) -> Any:
+    """Wire color ids (shared.mplot_protocol) for a color name, spectral number or array of numbers."""
+    from shared.mplot_protocol import get_color_id, normalize_mplot_color
+
+    if isinstance(colors, np.ndarray):
+        return np.clip(np.rint(np.nan_to_num(colors)), 0, 99).astype(np.int16)
+    return get_color_id(normalize_mplot_color(colors))
+
+
+def _append_raster(
+    append_draw: Callable[[str, List[Any]], None],
+    color_ids: np.ndarray,
+    intensities: np.ndarray,
+    mask: Optional[np.ndarray] = None,
+    cell: int = 1,
+) -> None:
+    """Emit a (size, size) field as one draw_batch raster record at the origin.
+
+    Cells outside mask are skipped; cell > 1 scales each cell to a cell x cell block.
+    """
+    from shared.draw_batch_protocol import RASTER_SKIP
+
+    ids = np.asarray(color_ids, dtype=np.int16)
+    ints = np.clip(intensities, 0, 100).astype(np.uint8)
+    if mask is not None:
+        if not mask.any():
+            return
+        ids = np.where(mask, ids, np.int16(RASTER_SKIP))
+    if cell > 1:
+        ids = np.repeat(np.repeat(ids, cell, axis=0), cell, axis=1)
+        ints = np.repeat(np.repeat(ints, cell, axis=0), cell, axis=1)
+    append_draw("raster", [0, 0, ids, ints])
+
+
 def _render_grid(
     program: GridProgram,
     rt: _GridRuntime,
@@ -255,76 +394,40 @@ def _render_grid(
         i_scale = resolve_scalar(draw.intensity_scale, variables)
         colors = _clamp_palette_color(base, scale, field_vals)
         intensities = np.clip(i_base + np.floor(field_vals * i_scale), 0, 100)
-        grid = _reshape(field_vals, size)
-        color_grid = _reshape(colors, size)
-        int_grid = _reshape(intensities, size)
-        for y in range(size):
-            for x in range(size):
-                px = x * cell
-                py = y * cell
-                color = int(color_grid[y, x])
-                intensity = int(int_grid[y, x])
-                if cell == 1:
-                    append_draw("mplot", [px, py, color, intensity])
-                else:
-                    append_draw(
-                        "draw_rectangle",
-                        [px, py, cell, cell, color, intensity, True],
-                    )
+        _append_raster(
+            append_draw, _color_ids(np.floor(_reshape(colors, size))), _reshape(intensities, size), cell=cell
+        )
         return
 
     if draw.mode == "fill":
         field_name = draw.fill_field or program.fields[0]
-        field_vals = active[field_name]
-        grid = _reshape(field_vals, size)
-        color = draw.fill_color
+        grid = _reshape(active[field_name], size)
+        color_id = _color_ids(draw.fill_color)
         intensity = int(resolve_scalar(draw.fill_intensity, variables))
-        for y in range(size):
-            for x in range(size):
-                if grid[y, x] <= 0.5:
-                    continue
-                px = x * cell
-                py = y * cell
-                if cell == 1:
-                    append_draw("mplot", [px, py, color, intensity])
-                else:
-                    append_draw(
-                        "draw_rectangle",
-                        [px, py, cell, cell, color, intensity, True],
-                    )
-        return
-
+        _append_raster(
+            append_draw,
+            np.full((size, size), color_id, dtype=np.int16),
+            np.full((size, size), intensity),
+            mask=grid > 0.5,
+            cell=cell,
+        )
         return
 
     if draw.mode == "fire":
         field_name = draw.fire_field or program.fields[0]
         heat = _reshape(active[field_name], size)
-        for y in range(size):
-            for x in range(size):
-                h = heat[y, x]
-                if h <= 0:
-                    continue
-                if h < 20:
-                    color: Any = 0
-                    intensity = int(h * 3)
-                elif h < 40:
-                    color = "red"
-                    intensity = int((h - 20) * 3 + 20)
-                elif h < 70:
-                    color = "orange"
-                    intensity = int((h - 40) * 2 + 40)
-                else:
-                    color = "yellow"
-                    intensity = int(min(h, 100))
-                px = x * cell
-                py = y * cell
-                if cell == 1:
-                    append_draw("mplot", [px, py, color, intensity])
-                else:
-                    append_draw(
-                        "draw_rectangle",
-                        [px, py, cell, cell, color, intensity, True],
-                    )
+        bands = [heat < 20, heat < 40, heat < 70]
+        color_ids = np.select(
+            bands,
+            [_color_ids(0), _color_ids("red"), _color_ids("orange")],
+            _color_ids("yellow"),
+        )
+        intensities = np.select(
+            bands,
+            [np.floor(heat * 3), np.floor((heat - 20) * 3 + 20), np.floor((heat - 40) * 2 + 40)],
+            np.floor(np.minimum(heat, 100)),
+        )
+        _append_raster(append_draw, color_ids, intensities, mask=heat > 0, cell=cell)
         return
 
     if draw.mode == "expr":
@@ -365,30 +468,28 @@ def _render_grid(
             colors = np.full(size * size, float(colors))
         if not isinstance(opacities, np.ndarray):
             opacities = np.full(size * size, float(opacities))
-        mask_grid = _reshape(mask.astype(np.float64), size) > 0
-        color_grid = _reshape(colors, size)
-        opacity_grid = _reshape(opacities, size)
-        for y in range(size):
-            for x in range(size):
-                if not mask_grid[y, x]:
-                    continue
-                px = x * cell
-                py = y * cell
-                color_val = color_grid[y, x]
-                color: Any = int(color_val) if float(color_val).is_integer() else int(round(color_val))
-                intensity = int(np.clip(opacity_grid[y, x], 0, 100))
-                if cell == 1:
-                    append_draw("mplot", [px, py, color, intensity])
-                else:
-                    append_draw(
-                        "draw_rectangle",
-                        [px, py, cell, cell, color, intensity, True],
-                    )
+        _append_raster(
+            append_draw,
+            _color_ids(_reshape(colors, size)),
+            np.floor(np.nan_to_num(_reshape(opacities, size))),
+            mask=_reshape(mask.astype(np.float64), size) > 0,
+            cell=cell,
+        )
         return
 
     raise ValueError(f"Unknown draw mode: {draw.mode}")
 
 
+def _run_rule(program: GridProgram, rt: _GridRuntime, steps: int) -> None:
+    kernel = rt.kernel
+    if kernel is None or (kernel.rule, kernel.size, kernel.boundary) != (program.rule, rt.size, rt.boundary):
+        kernel = rt.kernel = CAKernel(program.rule, rt.size, rt.boundary)
+    fname = program.fields[0]
+    active = rt.active_idx[fname]
+    kernel.run(rt.buffers[fname][active], rt.buffers[fname][1 - active], steps)
+    _swap_fields(rt, [fname])
+
+
 def run_grid_step(
     program: GridProgram,
     variables: Any,
@@ -396,14 +497,15 @@ def run_grid_step(
 ) -> None:
     rt = _ensure_runtime(program, variables)
     step_count = max(1, resolve_size(program.steps, variables))
-    for _ in range(step_count):
-        for block in program.step_blocks:
-            _execute_step_block(block, rt, program, variables)
-        _swap_fields(rt, program.fields)
-
-    for fname in program.fields:
-        active = rt.buffers[fname][rt.active_idx[fname]]
-        _write_back(_get_array(variables, fname), active)
+    if program.rule is not None:
+        _run_rule(program, rt, step_count)
+    else:
+        # Fields with no step block keep a single live buffer the script may write to
+        stepped = list(dict.fromkeys(block.field for block in program.step_blocks))
+        for _ in range(step_count):
+            for index, block in enumerate(program.step_blocks):
+                _execute_step_block(block, rt, program, variables, index)
+            _swap_fields(rt, stepped)
 
     _render_grid(program, rt, variables, append_draw)
 
@@ -452,28 +554,31 @@ def _eval_value_formula(
         program.phases,
         program.active,
     )
-    ys, xs = np.mgrid[0:size, 0:size].astype(np.float64)
+    ys, xs = _grid_mesh(size)
     grid_vars = {"grid_x": xs, "grid_y": ys}
     scalars = _build_scalars(variables)
     temps: Dict[str, np.ndarray] = {}
 
+    # Only active sites take part; their distance stacks are cached per program
+    live = np.arange(n) if active is None else np.flatnonzero(active > 0)
+    if live.size == n:
+        live_x, live_y = px, py
+    else:
+        live_x, live_y = px[live], py[live]
+    site_weights = weights[live] if weights is not None else np.ones(live.size)
+    site_phases = phases[live] if phases is not None else np.zeros(live.size)
+    site_active = active[live] if active is not None else np.ones(live.size)
+
     if program.mode == "metaballs":
         result = np.zeros((size, size), dtype=np.float64)
-        for i in range(n):
-            if active is not None and active[i] <= 0:
-                continue
-            dx = xs - px[i]
-            dy = ys - py[i]
-            dist2 = np.maximum(dx * dx + dy * dy, 1.0)
-            w = weights[i] if weights is not None else 1.0
-            result += (w * w) / dist2
+        for chunk, (_, _, dist2) in zip(_site_chunks(live.size, size), _site_distances(program.name, size, live_x, live_y)):
+            w = site_weights[chunk, None, None]
+            _add_planes(result, (w * w) / np.maximum(dist2, 1.0))
         return result
 
-    def sum_sites_fn(expr: ExprNode) -> np.ndarray:
+    def sum_sites_per_site(expr: ExprNode) -> np.ndarray:
         acc = np.zeros((size, size), dtype=np.float64)
-        for i in range(n):
-            if active is not None and active[i] <= 0:
-                continue
+        for i in live:
             dx = xs - px[i]
             dy = ys - py[i]
             dist2 = dx * dx + dy * dy
@@ -499,6 +604,33 @@ def _eval_value_formula(
             acc += val
         return acc
 
+    def sum_sites_fn(expr: ExprNode) -> np.ndarray:
+        if not _site_vectorizable(expr):
+            # escape_*, nested sum_sites: calls that expect one site's grid at a time
+            return sum_sites_per_site(expr)
+        acc = np.zeros((size, size), dtype=np.float64)
+        tables = _site_distances(program.name, size, live_x, live_y)
+        for chunk, (dx, dy, dist2) in zip(_site_chunks(live.size, size), tables):
+            # Every site in the chunk at once: site vars stack along axis 0, per-site
+            # constants are (sites, 1, 1) and broadcast against the grid
+            site_ctx = FieldEvalContext(
+                scalars=scalars,
+                temps=temps,
+                site_vars={
+                    "dx": dx,
+                    "dy": dy,
+                    "dist2": dist2,
+                    "weight": site_weights[chunk, None, None],
+                    "phase": site_phases[chunk, None, None],
+                    "active": site_active[chunk, None, None],
+                },
+                grid_vars=grid_vars,
+                sum_sites_fn=sum_sites_fn,
+            )
+            val = np.broadcast_to(eval_expr(expr, site_ctx), dist2.shape)
+            _add_planes(acc, val)
+        return acc
+
     for target, expr in program.value_assignments:
         ctx = FieldEvalContext(
             scalars=scalars,
@@ -527,12 +659,9 @@ def _render_voronoi(
     px, py, _, _, _, n = _site_arrays(
         variables, program.sites_x, program.sites_y, program.weights
     )
-    ys, xs = np.mgrid[0:size, 0:size].astype(np.float64)
-    dist2 = (xs[None, :, :] - px[:, None, None]) ** 2 + (ys[None, :, :] - py[:, None, None]) ** 2
-    closest = np.argmin(dist2, axis=0)
-    sorted_d = np.sort(dist2, axis=0)
-    min_dist = sorted_d[0]
-    second_dist = sorted_d[1]
+    if n == 0:
+        return
+    closest, min_dist, second_dist = _nearest_sites(program.name, size, px, py)
     edge_ratio = resolve_scalar(program.edge_ratio, variables)
     edge_mask = second_dist < min_dist * edge_ratio
 
@@ -542,19 +671,17 @@ def _render_voronoi(
 
     fill_opacity = int(resolve_scalar(program.fill_opacity, variables))
     edge_opacity = int(resolve_scalar(program.edge_opacity, variables))
-    edge_color = program.edge_color
 
-    for y in range(size):
-        for x in range(size):
-            if program.edges and edge_mask[y, x]:
-                append_draw("mplot", [x, y, edge_color, edge_opacity])
-            else:
-                ci = int(closest[y, x])
-                if site_colors is not None:
-                    color = int(site_colors[ci])
-                else:
-                    color = (ci * 17) % 99 + 1
-                append_draw("mplot", [x, y, color, fill_opacity])
+    if site_colors is not None:
+        palette = _color_ids(np.trunc(_array_values(site_colors)))
+    else:
+        palette = (np.arange(n) * 17) % 99 + 1
+    color_ids = palette[closest].astype(np.int16)
+    intensities = np.full((size, size), fill_opacity)
+    if program.edges:
+        color_ids[edge_mask] = _color_ids(program.edge_color)
+        intensities[edge_mask] = edge_opacity
+    _append_raster(append_draw, color_ids, intensities)
 
 
 def _resolve_color_name(name: str, variables: Any) -> str:
@@ -572,61 +699,38 @@ def _render_field_signed(
     program: FieldProgram,
     value_grid: np.ndarray,
     variables: Any,
-    size: int,
     append_draw: Callable[[str, List[Any]], None],
-    draw_buffer: Optional[bytearray] = None,
-) -> int:
-    from shared.mplot_protocol import get_color_id
-
-    peak = _resolve_color_name(program.peak_color, variables)
-    trough = _resolve_color_name(program.trough_color, variables)
-    peak_id = get_color_id(peak)
-    trough_id = get_color_id(trough)
+) -> None:
+    peak_id = _color_ids(_resolve_color_name(program.peak_color, variables))
+    trough_id = _color_ids(_resolve_color_name(program.trough_color, variables))
     scale = resolve_scalar(program.intensity_scale, variables)
     h = value_grid
     intensities = np.clip(np.abs(h) * scale, 0, 99).astype(np.uint8)
-    mask = intensities > 0
-    if not np.any(mask):
-        return 0
-    ys, xs = np.nonzero(mask)
-    hs = h[mask]
-    ints = intensities[mask]
-    color_ids = np.where(hs > 0, peak_id, trough_id)
-
-    if draw_buffer is not None:
-        from pixil_utils.draw_batch_dispatch import append_mplot_bulk
-
-        return append_mplot_bulk(draw_buffer, xs, ys, color_ids, ints)
-
-    for i in range(len(xs)):
-        color = peak if hs[i] > 0 else trough
-        append_draw("mplot", [int(xs[i]), int(ys[i]), color, int(ints[i])])
-    return len(xs)
+    color_ids = np.where(h > 0, peak_id, trough_id)
+    _append_raster(append_draw, color_ids, intensities, mask=intensities > 0)
 
 
 def run_field_render(
     program: FieldProgram,
     variables: Any,
     append_draw: Callable[[str, List[Any]], None],
-    draw_buffer: Optional[bytearray] = None,
-) -> int:
+) -> None:
     size = resolve_size(program.size, variables)
 
     if program.mode == "voronoi":
         _render_voronoi(program, variables, size, append_draw)
-        return 0
+        return
 
     value_grid = _eval_value_formula(program, variables, size)
 
     if program.signed:
-        return _render_field_signed(
-            program, value_grid, variables, size, append_draw, draw_buffer
-        )
+        _render_field_signed(program, value_grid, variables, append_draw)
+        return
 
     flat = value_grid.ravel()
     result_name = program.value_result or "v_sum"
     scalars = _build_scalars(variables)
-    ys, xs = np.mgrid[0:size, 0:size].astype(np.float64)
+    ys, xs = _grid_mesh(size)
     grid_vars = {"grid_x": xs, "grid_y": ys}
     iter_grid = _reshape(flat, size)
     temps: Dict[str, np.ndarray] = {result_name: iter_grid, "v_sum": iter_grid}
@@ -654,24 +758,26 @@ def run_field_render(
     if not isinstance(opacities, np.ndarray):
         opacities = np.full(size * size, float(opacities))
 
-    grid = _reshape(value_grid.ravel(), size)
-    mask_grid = _reshape(mask.astype(np.float64), size) > 0
-    color_grid = _reshape(colors, size)
-    opacity_grid = _reshape(opacities, size)
-
-    for y in range(size):
-        for x in range(size):
-            if not mask_grid[y, x]:
-                continue
-            color_val = color_grid[y, x]
-            color: Any = int(round(color_val))
-            intensity = int(np.clip(opacity_grid[y, x], 0, 100))
-            append_draw("mplot", [x, y, color, intensity])
-    return 0
+    _append_raster(
+        append_draw,
+        _color_ids(_reshape(colors, size)),
+        np.floor(np.nan_to_num(_reshape(opacities, size))),
+        mask=_reshape(np.asarray(mask).astype(np.float64), size) > 0,
+    )
 
 
 def reset_grid_runtime(name: Optional[str] = None) -> None:
+    """Drop runtime state for one program, or for every program (between scripts)."""
+    from .fractal_escape import reset_coherent
+
     if name is None:
+        for rt in _RUNTIME.values():
+            _release_runtime(rt)
         _RUNTIME.clear()
-    elif name in _RUNTIME:
-        del _RUNTIME[name]
+        _SITE_TABLES.clear()
+    else:
+        rt = _RUNTIME.pop(name, None)
+        if rt is not None:
+            _release_runtime(rt)
+        _SITE_TABLES.pop(name, None)
+    reset_coherent(name)
@@ -1,11 +1,12 @@
-"""Expression AST and NumPy evaluation for grid_program / field_program."""
+"""Expression AST and NumPy evaluation for grid_program / field_program / particle_program."""
 
 from __future__ import annotations
 
+import operator
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
 import numpy as np
 
@@ -33,6 +34,10 @@ class ExprNode:
     kind: str
     value: Any = None
     children: Optional[List["ExprNode"]] = None
+    # Closure from compile_expr(); eval_expr runs it instead of walking the tree
+    compiled: Optional[Callable[[Any], Any]] = field(default=None, compare=False, repr=False)
+    # (program name, call site) for calls that keep per-site state between frames
+    cache_key: Any = field(default=None, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         if self.children is None:
@@ -240,7 +245,22 @@ class FieldEvalContext:
     sum_sites_fn: Callable[[ExprNode], np.ndarray]
 
 
-def _resolve_ident(name: str, ctx: Union[GridEvalContext, FieldEvalContext]) -> Any:
+@dataclass
+class ParticleEvalContext:
+    scalars: Dict[str, float]
+    arrays: Dict[str, np.ndarray]
+    temps: Dict[str, np.ndarray]
+    particle_vars: Dict[str, np.ndarray]
+    count: int
+    # (op, per-particle values or None, radius) -> per-particle result; op is count/sum/avg
+    neighbors_fn: Callable[[str, Optional[np.ndarray], float], np.ndarray]
+    random_fn: Callable[[float, float], np.ndarray]
+
+
+EvalContext = Union[GridEvalContext, FieldEvalContext, ParticleEvalContext]
+
+
+def _resolve_ident(name: str, ctx: EvalContext) -> Any:
     if name in ctx.temps:
         return ctx.temps[name]
     if name in ctx.scalars:
@@ -253,10 +273,21 @@ def _resolve_ident(name: str, ctx: Union[GridEvalContext, FieldEvalContext]) ->
         return ctx.grid_vars[name]
     if isinstance(ctx, GridEvalContext) and name in ctx.fields:
         return ctx.fields[name]
+    if isinstance(ctx, ParticleEvalContext) and name in ctx.particle_vars:
+        return ctx.particle_vars[name]
+    if isinstance(ctx, ParticleEvalContext) and name in ctx.arrays:
+        return ctx.arrays[name]
     raise KeyError(f"Unknown identifier in expression: {name}")
 
 
-def eval_expr(node: ExprNode, ctx: Union[GridEvalContext, FieldEvalContext]) -> Any:
+def eval_expr(node: ExprNode, ctx: EvalContext) -> Any:
+    compiled = node.compiled
+    if compiled is not None:
+        return compiled(ctx)
+    return _eval_node(node, ctx)
+
+
+def _eval_node(node: ExprNode, ctx: EvalContext) -> Any:
     kind = node.kind
     if kind == "num":
         return float(node.value)
@@ -316,7 +347,7 @@ def eval_expr(node: ExprNode, ctx: Union[GridEvalContext, FieldEvalContext]) ->
         if op == "*":
             return la * rb
         if op == "/":
-            return np.divide(la, rb, out=np.zeros_like(la, dtype=np.float64), where=rb != 0)
+            return np.divide(la, rb, out=np.zeros(np.broadcast_shapes(la.shape, rb.shape)), where=rb != 0)
         raise ValueError(f"Unknown binop {op}")
     if kind == "call":
         name = str(node.value)
@@ -351,90 +382,338 @@ def eval_expr(node: ExprNode, ctx: Union[GridEvalContext, FieldEvalContext]) ->
                 lo = float(eval_expr(node.children[0], ctx))
                 hi = float(eval_expr(node.children[1], ctx))
                 return ctx.random_field_fn(lo, hi)
-        args = [eval_expr(child, ctx) for child in node.children]
-        if name == "clamp" and len(args) == 3:
-            val, lo, hi = args
-            return np.clip(_to_array(val), float(lo), float(hi))
-        if name == "where" and len(args) == 3:
-            cond, a, b = args
-            ca, aa = _broadcast(cond, a)
-            _, bb = _broadcast(cond, b)
-            return np.where(ca != 0, aa, bb)
-        if name == "min":
-            if len(args) == 2:
-                a, b = _broadcast(args[0], args[1])
-                return np.minimum(a, b)
-        if name == "max":
-            if len(args) == 2:
-                a, b = _broadcast(args[0], args[1])
-                return np.maximum(a, b)
-        if name == "abs" and len(args) == 1:
-            val = args[0]
-            if isinstance(val, np.ndarray):
-                return np.abs(val)
-            return abs(float(val))
-        if name == "floor" and len(args) == 1:
-            val = args[0]
-            if isinstance(val, np.ndarray):
-                return np.floor(val)
-            return float(np.floor(float(val)))
-        if name == "sin" and len(args) == 1:
-            val = _to_array(args[0])
-            return np.sin(val)
-        if name == "cos" and len(args) == 1:
-            val = _to_array(args[0])
-            return np.cos(val)
-        if name == "sqrt" and len(args) == 1:
-            val = _to_array(args[0])
-            return np.sqrt(np.maximum(val, 0.0))
-        if name == "pow" and len(args) == 2:
-            a, b = _broadcast(args[0], args[1])
-            return np.power(a, b)
-        if name == "escape_iter":
-            from .fractal_escape import escape_iter as _escape_iter
-
-            if len(args) == 3:
-                c_re, c_im, max_iter = args
-                return _escape_iter(_to_array(c_re), _to_array(c_im), int(max_iter))
-            if len(args) == 5:
-                c_re, c_im, max_iter, z0_re, z0_im = args
-                return _escape_iter(
-                    _to_array(c_re),
-                    _to_array(c_im),
-                    int(max_iter),
-                    z0_re=_to_array(z0_re),
-                    z0_im=_to_array(z0_im),
-                )
-            raise ValueError("escape_iter() expects 3 args (Mandelbrot) or 5 args (Julia)")
-        if name == "burning_ship_iter" and len(args) == 3:
-            from .fractal_escape import burning_ship_iter as _burning_ship_iter
+        if isinstance(ctx, ParticleEvalContext):
+            if name == "near_count" and len(node.children) == 1:
+                return ctx.neighbors_fn("count", None, float(eval_expr(node.children[0], ctx)))
+            if name in ("near_sum", "near_avg") and len(node.children) == 2:
+                values = eval_expr(node.children[0], ctx)
+                if not isinstance(values, np.ndarray):
+                    values = np.full(ctx.count, float(values))
+                radius = float(eval_expr(node.children[1], ctx))
+                return ctx.neighbors_fn(name[5:], values, radius)
+            if name == "random" and len(node.children) == 2:
+                lo = float(eval_expr(node.children[0], ctx))
+                hi = float(eval_expr(node.children[1], ctx))
+                return ctx.random_fn(lo, hi)
+        return _call_builtin(name, [eval_expr(child, ctx) for child in node.children], node)
+    raise ValueError(f"Unknown node kind {kind}")
+
 
+def _call_builtin(name: str, args: List[Any], node: ExprNode) -> Any:
+    """Builtins that only need their argument values (node keys escape_* frame reuse)."""
+    if name == "clamp" and len(args) == 3:
+        val, lo, hi = args
+        return np.clip(_to_array(val), float(lo), float(hi))
+    if name == "where" and len(args) == 3:
+        cond, a, b = args
+        ca, aa = _broadcast(cond, a)
+        _, bb = _broadcast(cond, b)
+        return np.where(ca != 0, aa, bb)
+    if name == "min":
+        if len(args) == 2:
+            a, b = _broadcast(args[0], args[1])
+            return np.minimum(a, b)
+    if name == "max":
+        if len(args) == 2:
+            a, b = _broadcast(args[0], args[1])
+            return np.maximum(a, b)
+    if name == "abs" and len(args) == 1:
+        val = args[0]
+        if isinstance(val, np.ndarray):
+            return np.abs(val)
+        return abs(float(val))
+    if name == "floor" and len(args) == 1:
+        val = args[0]
+        if isinstance(val, np.ndarray):
+            return np.floor(val)
+        return float(np.floor(float(val)))
+    if name == "sin" and len(args) == 1:
+        val = _to_array(args[0])
+        return np.sin(val)
+    if name == "cos" and len(args) == 1:
+        val = _to_array(args[0])
+        return np.cos(val)
+    if name == "sqrt" and len(args) == 1:
+        val = _to_array(args[0])
+        return np.sqrt(np.maximum(val, 0.0))
+    if name == "pow" and len(args) == 2:
+        a, b = _broadcast(args[0], args[1])
+        return np.power(a, b)
+    if name == "escape_iter":
+        from .fractal_escape import escape_iter as _escape_iter
+
+        if len(args) == 3:
             c_re, c_im, max_iter = args
-            return _burning_ship_iter(_to_array(c_re), _to_array(c_im), int(max_iter))
-        if name == "escape_perturb" and len(args) == 5:
-            from .fractal_escape import escape_perturb as _escape_perturb
-
-            anchor_re, anchor_im, dc_re, dc_im, max_iter = args
-            return _escape_perturb(
-                float(_to_array(anchor_re).ravel()[0]),
-                float(_to_array(anchor_im).ravel()[0]),
-                _to_array(dc_re),
-                _to_array(dc_im),
+            return _escape_iter(_to_array(c_re), _to_array(c_im), int(max_iter))
+        if len(args) == 5:
+            c_re, c_im, max_iter, z0_re, z0_im = args
+            return _escape_iter(
+                _to_array(c_re),
+                _to_array(c_im),
                 int(max_iter),
+                z0_re=_to_array(z0_re),
+                z0_im=_to_array(z0_im),
             )
-        if name == "escape_zoom" and len(args) == 5:
-            from .fractal_escape import escape_zoom as _escape_zoom
-
-            anchor_re, anchor_im, dc_re, dc_im, max_iter = args
-            return _escape_zoom(
-                float(_to_array(anchor_re).ravel()[0]),
-                float(_to_array(anchor_im).ravel()[0]),
-                _to_array(dc_re),
-                _to_array(dc_im),
-                int(max_iter),
-            )
-        raise ValueError(f"Unknown or invalid call: {name}")
-    raise ValueError(f"Unknown node kind {kind}")
+        raise ValueError("escape_iter() expects 3 args (Mandelbrot) or 5 args (Julia)")
+    if name == "burning_ship_iter" and len(args) == 3:
+        from .fractal_escape import burning_ship_iter as _burning_ship_iter
+
+        c_re, c_im, max_iter = args
+        return _burning_ship_iter(_to_array(c_re), _to_array(c_im), int(max_iter))
+    if name in ("escape_perturb", "escape_zoom") and len(args) in (5, 6):
+        from .fractal_escape import escape_perturb as _escape_perturb
+        from .fractal_escape import escape_zoom as _escape_zoom
+        from .fractal_escape import escape_zoom_coherent as _escape_zoom_coherent
+
+        anchor_re, anchor_im, dc_re, dc_im, max_iter = args[:5]
+        zoom_args = (
+            float(_to_array(anchor_re).ravel()[0]),
+            float(_to_array(anchor_im).ravel()[0]),
+            _to_array(dc_re),
+            _to_array(dc_im),
+            int(max_iter),
+        )
+        if len(args) == 6:
+            # Optional quality: reuse this call site's previous frame
+            quality = float(_to_array(args[5]).ravel()[0])
+            key = node.cache_key if node.cache_key is not None else id(node)
+            return _escape_zoom_coherent(key, *zoom_args, quality=quality, perturb=name == "escape_perturb")
+        if name == "escape_perturb":
+            return _escape_perturb(*zoom_args)
+        return _escape_zoom(*zoom_args)
+    raise ValueError(f"Unknown or invalid call: {name}")
+
+
+# Closure compilation ---------------------------------------------------------
+#
+# compile_expr() lowers a tree once, when the program is compiled, into nested
+# closures: node dispatch, identifier lookup order and constant subtrees are
+# settled up front, so each evaluation only calls NumPy. Results match
+# eval_expr exactly (same ufuncs on the same values); the only difference is
+# that a scalar operand stays a float64 scalar instead of being broadcast into
+# a full-size array first.
+
+# Lookup order after temps, per context kind (mirrors _resolve_ident)
+_IDENT_SLOTS = {
+    "grid": ("scalars", "grid_vars", "fields"),
+    "field": ("scalars", "grid_vars", "site_vars"),
+    "particle": ("scalars", "particle_vars", "arrays"),
+}
+# Calls that can be folded when every argument is a constant
+_PURE_CALLS = frozenset({"clamp", "where", "min", "max", "abs", "floor", "sin", "cos", "sqrt", "pow"})
+_CMP_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+_ARITH_OPS = {"+": operator.add, "-": operator.sub, "*": operator.mul}
+_NOT_CONST = object()
+
+Compiled = Callable[[Any], Any]
+
+
+def _pair(a: Any, b: Any) -> tuple:
+    """_broadcast without the full-size copy of a scalar side."""
+    if not isinstance(a, np.ndarray) or a.ndim == 0:
+        a = np.float64(a)
+    if not isinstance(b, np.ndarray) or b.ndim == 0:
+        b = np.float64(b)
+    return a, b
+
+
+def _safe_divide(a: Any, b: Any) -> Any:
+    la, rb = _pair(a, b)
+    shape = np.broadcast_shapes(np.shape(la), np.shape(rb))
+    return np.divide(la, rb, out=np.zeros(shape, dtype=np.float64), where=rb != 0)
+
+
+def compile_expr(
+    node: ExprNode,
+    kind: str,
+    arrays: Iterable[str] = (),
+    local_names: Iterable[str] = (),
+) -> Compiled:
+    """Lower node to a closure taking an eval context of kind "grid", "field" or "particle".
+
+    arrays are the program's field / per-particle array names and local_names
+    the temps already assigned when the expression runs; both only steer the
+    identifier lookups, which fall back to _resolve_ident on a miss.
+    """
+    if kind not in _IDENT_SLOTS:
+        raise ValueError(f"Unknown expression context kind: {kind}")
+    fn, _ = _lower(node, kind, frozenset(arrays), frozenset(local_names))
+    return fn
+
+
+def _constant(value: Any) -> Compiled:
+    return lambda _ctx: value
+
+
+def _lower_ident(name: str, kind: str, arrays: frozenset, local_names: frozenset) -> Compiled:
+    if name in local_names:
+        return lambda ctx: ctx.temps[name]
+    # Numeric scalars are v_ variables that are not arrays
+    slots = tuple(
+        slot for slot in _IDENT_SLOTS[kind]
+        if slot != "scalars" or (name.startswith("v_") and name not in arrays)
+    )
+
+    def lookup(ctx: Any) -> Any:
+        for slot in slots:
+            values = getattr(ctx, slot)
+            if name in values:
+                return values[name]
+        return _resolve_ident(name, ctx)
+
+    return lookup
+
+
+def _lower_call(
+    node: ExprNode, kind: str, arrays: frozenset, local_names: frozenset, args: List[Compiled]
+) -> Optional[Compiled]:
+    """Context builtins (lap, sum_sites, near_count, ...); None for the value-only builtins."""
+    name = str(node.value)
+    children = node.children
+    if kind == "field" and name == "sum_sites" and len(children) == 1:
+        site_expr = children[0]
+        site_expr.compiled = compile_expr(site_expr, kind, arrays, local_names)
+        return lambda ctx: ctx.sum_sites_fn(site_expr)
+    if kind == "grid":
+        if name in ("lap", "at", "neighbors", "neighbors4", "below_avg") and len(children) == 1:
+            if children[0].kind != "ident":
+                return None  # eval_expr raises the usage error
+            field_name = str(children[0].value)
+            if name == "lap":
+                return lambda ctx: ctx.laplacian_fn(field_name)
+            if name == "below_avg":
+                return lambda ctx: ctx.below_avg_fn(field_name)
+            if name == "at":
+
+                def at(ctx: Any) -> Any:
+                    if field_name not in ctx.fields:
+                        raise KeyError(f"Unknown field {field_name}")
+                    return ctx.fields[field_name]
+
+                return at
+            orth = name == "neighbors4"
+            return lambda ctx: ctx.neighbors_fn(field_name, orth)
+        if name == "random_field" and len(args) == 2:
+            lo, hi = args
+            return lambda ctx: ctx.random_field_fn(float(lo(ctx)), float(hi(ctx)))
+    if kind == "particle":
+        if name == "near_count" and len(args) == 1:
+            radius = args[0]
+            return lambda ctx: ctx.neighbors_fn("count", None, float(radius(ctx)))
+        if name in ("near_sum", "near_avg") and len(args) == 2:
+            values_fn, radius = args
+            op = name[5:]
+
+            def near(ctx: Any) -> Any:
+                values = values_fn(ctx)
+                if not isinstance(values, np.ndarray):
+                    values = np.full(ctx.count, float(values))
+                return ctx.neighbors_fn(op, values, float(radius(ctx)))
+
+            return near
+        if name == "random" and len(args) == 2:
+            lo, hi = args
+            return lambda ctx: ctx.random_fn(float(lo(ctx)), float(hi(ctx)))
+    return None
+
+
+def _lower(node: ExprNode, kind: str, arrays: frozenset, local_names: frozenset) -> tuple:
+    """(closure, constant value or _NOT_CONST)."""
+    node_kind = node.kind
+    if node_kind == "num":
+        value = float(node.value)
+        return _constant(value), value
+    if node_kind == "ident":
+        return _lower_ident(str(node.value), kind, arrays, local_names), _NOT_CONST
+
+    lowered = [_lower(child, kind, arrays, local_names) for child in node.children]
+    args = [fn for fn, _ in lowered]
+    foldable = all(const is not _NOT_CONST for _, const in lowered)
+
+    if node_kind == "neg":
+        (operand,) = args
+
+        def run(ctx: Any) -> Any:
+            val = operand(ctx)
+            return -val if isinstance(val, np.ndarray) else -float(val)
+
+    elif node_kind == "not":
+        (operand,) = args
+
+        def run(ctx: Any) -> Any:
+            val = operand(ctx)
+            return np.logical_not(val) if isinstance(val, np.ndarray) else not bool(val)
+
+    elif node_kind in ("and", "or"):
+        left, right = args
+        logical = np.logical_and if node_kind == "and" else np.logical_or
+        is_and = node_kind == "and"
+
+        def run(ctx: Any) -> Any:
+            a = left(ctx)
+            b = right(ctx)
+            if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+                la, rb = _pair(a, b)
+                return logical(la != 0, rb != 0)
+            return (bool(a) and bool(b)) if is_and else (bool(a) or bool(b))
+
+    elif node_kind == "cmp" or (node_kind == "binop" and node.value in _ARITH_OPS):
+        left, right = args
+        op = _CMP_OPS[node.value] if node_kind == "cmp" else _ARITH_OPS[node.value]
+
+        def run(ctx: Any) -> Any:
+            return op(*_pair(left(ctx), right(ctx)))
+
+    elif node_kind == "binop" and node.value == "/":
+        left, right = args
+
+        def run(ctx: Any) -> Any:
+            return _safe_divide(left(ctx), right(ctx))
+
+    elif node_kind == "call" and node.value == "where" and len(args) == 3:
+        cond, if_true, if_false = args
+
+        def run(ctx: Any) -> Any:
+            c, a = _pair(cond(ctx), if_true(ctx))
+            return np.where(c != 0, a, _pair(c, if_false(ctx))[1])
+
+    elif node_kind == "call" and node.value in ("min", "max") and len(args) == 2:
+        left, right = args
+        pick = np.minimum if node.value == "min" else np.maximum
+
+        def run(ctx: Any) -> Any:
+            return pick(*_pair(left(ctx), right(ctx)))
+
+    elif node_kind == "call":
+        run = _lower_call(node, kind, arrays, local_names, args)
+        if run is None:
+            name = str(node.value)
+            if name not in _PURE_CALLS:
+                foldable = False
+
+            def run(ctx: Any) -> Any:
+                return _call_builtin(name, [arg(ctx) for arg in args], node)
+
+        else:
+            foldable = False
+    else:
+        # Let eval_expr raise its own error when this node is reached
+        return (lambda ctx: _eval_node(node, ctx)), _NOT_CONST
+
+    if foldable:
+        try:
+            value = run(None)
+        except (ArithmeticError, TypeError, ValueError):
+            return run, _NOT_CONST
+        return _constant(value), value
+    return run, _NOT_CONST
 
 
 def resolve_scalar(value: str, variables: Any) -> float:
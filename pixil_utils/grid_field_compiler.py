@@ -1,17 +1,23 @@
-"""Parse grid_program and field_program blocks into compiled specs."""
+"""Parse grid_program, field_program and particle_program blocks into compiled specs."""
 
 from __future__ import annotations
 
 import re
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
 
-from .grid_expr import ExprNode, parse_expr
+from .grid_expr import ExprNode, compile_expr, parse_expr
+
+if TYPE_CHECKING:
+    from .ca_kernel import CARule
 
 _ASSIGN_RE = re.compile(r"^(v_\w+)\s*=\s*(.+)$")
 _STEP_RE = re.compile(r"^step\s+(v_\w+)\s*\{$")
 _DRAW_RE = re.compile(r"^draw\s*\{$")
 _VALUE_RE = re.compile(r"^value\s*\{$")
+_UPDATE_RE = re.compile(r"^update\s*\{$")
+
+PARTICLE_BOUNDS = ("none", "clamp", "wrap", "bounce", "kill")
 
 
 @dataclass
@@ -47,6 +53,8 @@ class GridProgram:
     boundary: str = "clamp"
     step_blocks: List[StepBlock] = field(default_factory=list)
     draw: GridDrawSpec = field(default_factory=GridDrawSpec)
+    # Set when the program is a `rule` automaton instead of step blocks
+    rule: Optional[CARule] = None
 
 
 @dataclass
@@ -76,6 +84,32 @@ class FieldProgram:
     fill_opacity: str = "60"
 
 
+@dataclass
+class ParticleProgram:
+    name: str
+    position: Tuple[str, str] = ("", "")
+    velocity: Optional[Tuple[str, str]] = None
+    arrays: List[str] = field(default_factory=list)
+    count: Optional[str] = None
+    alive: Optional[str] = None
+    life: Optional[str] = None
+    decay: str = "1"
+    live_count: Optional[str] = None
+    steps: str = "1"
+    gravity: Tuple[str, str] = ("0", "0")
+    drag: str = "1"
+    bounds: str = "none"
+    area: Tuple[str, str, str, str] = ("0", "0", "63", "63")
+    update: List[Tuple[str, ExprNode]] = field(default_factory=list)
+    draw: GridDrawSpec = field(default_factory=GridDrawSpec)
+
+    def state_arrays(self) -> List[str]:
+        """Every per-particle array the program reads and may write, without duplicates."""
+        names = list(self.position) + list(self.velocity or ()) + self.arrays
+        names += [name for name in (self.alive, self.life) if name]
+        return list(dict.fromkeys(names))
+
+
 def collect_brace_block_lines(line_iter) -> List[str]:
     """Consume lines from a generator until the outermost `{` block closes."""
     body: List[str] = []
@@ -162,8 +196,52 @@ def _parse_draw_body(body: List[str]) -> GridDrawSpec:
     return spec
 
 
+def _compile_assignments(
+    assignments: List[Tuple[str, ExprNode]],
+    kind: str,
+    arrays: Iterable[str] = (),
+    array_targets: bool = False,
+) -> None:
+    """Lower each assignment's expression; earlier targets are temps for later lines.
+
+    With array_targets, assigning to one of arrays writes that array instead of a temp.
+    """
+    arrays = frozenset(arrays)
+    local_names: List[str] = []
+    for target, expr in assignments:
+        expr.compiled = compile_expr(expr, kind, arrays, local_names)
+        if not (array_targets and target in arrays):
+            local_names.append(target)
+
+
+def _compile_exprs(
+    exprs: Iterable[Optional[ExprNode]], kind: str, arrays: Iterable[str] = (), local_names: Iterable[str] = ()
+) -> None:
+    for expr in exprs:
+        if expr is not None:
+            expr.compiled = compile_expr(expr, kind, arrays, local_names)
+
+
+def _key_call_sites(name: str, exprs: Iterable[Optional[ExprNode]]) -> None:
+    """Give every call a cache_key of (program name, position in the program).
+
+    Keys stay the same when a program is recompiled and never collide across
+    programs, unlike id(node).
+    """
+    site = 0
+    stack = [expr for expr in reversed(list(exprs)) if expr is not None]
+    while stack:
+        node = stack.pop()
+        if node.kind == "call":
+            node.cache_key = (name, site)
+            site += 1
+        stack.extend(reversed(node.children))
+
+
 def compile_grid_program(name: str, body_lines: List[str]) -> GridProgram:
     program = GridProgram(name=name)
+    rule_text: Optional[str] = None
+    neighborhood: Optional[str] = None
     i = 0
     while i < len(body_lines):
         line = body_lines[i].strip()
@@ -181,6 +259,10 @@ def compile_grid_program(name: str, body_lines: List[str]) -> GridProgram:
             program.steps = line.split(None, 1)[1].strip()
         elif line.startswith("boundary "):
             program.boundary = line.split(None, 1)[1].strip()
+        elif line.startswith("rule "):
+            rule_text = line.split(None, 1)[1].strip()
+        elif line.startswith("neighborhood "):
+            neighborhood = line.split(None, 1)[1].strip()
         elif _STEP_RE.match(line):
             field_name = _STEP_RE.match(line).group(1)
             block_body, i = _collect_brace_block(body_lines, i)
@@ -198,8 +280,22 @@ def compile_grid_program(name: str, body_lines: List[str]) -> GridProgram:
 
     if not program.fields:
         raise ValueError(f"grid_program {name}: fields required")
-    if not program.step_blocks:
+    if rule_text is not None:
+        from .ca_kernel import parse_ca_rule
+
+        if len(program.fields) != 1 or program.step_blocks:
+            raise ValueError(f"grid_program {name}: rule takes one field and no step blocks")
+        program.rule = parse_ca_rule(rule_text, neighborhood or "moore")
+    elif neighborhood is not None:
+        raise ValueError(f"grid_program {name}: neighborhood needs a rule")
+    elif not program.step_blocks:
         raise ValueError(f"grid_program {name}: at least one step block required")
+    draw = program.draw
+    step_exprs = [expr for block in program.step_blocks for _, expr in block.assignments]
+    _key_call_sites(name, step_exprs + [draw.plot_if, draw.color_expr, draw.opacity_expr])
+    for block in program.step_blocks:
+        _compile_assignments(block.assignments, "grid", program.fields)
+    _compile_exprs((draw.plot_if, draw.color_expr, draw.opacity_expr), "grid", program.fields)
     return program
 
 
@@ -265,4 +361,84 @@ def compile_field_program(name: str, body_lines: List[str]) -> FieldProgram:
 
     if not program.sites_x or not program.sites_y:
         raise ValueError(f"field_program {name}: sites required")
+    _key_call_sites(
+        name,
+        [expr for _, expr in program.value_assignments]
+        + [program.plot_if, program.color_expr, program.opacity_expr],
+    )
+    _compile_assignments(program.value_assignments, "field")
+    # run_field_render exposes the value grid under these names
+    render_names = {program.value_result or "v_sum", "v_sum", "v_iter"}
+    _compile_exprs((program.plot_if, program.color_expr, program.opacity_expr), "field", (), render_names)
+    return program
+
+
+def _split_list(line: str, count: int, usage: str) -> List[str]:
+    raw = line.split(None, 1)[1].strip()
+    parts = [p.strip() for p in raw.split(",") if p.strip()]
+    if len(parts) != count:
+        raise ValueError(usage)
+    return parts
+
+
+def compile_particle_program(name: str, body_lines: List[str]) -> ParticleProgram:
+    program = ParticleProgram(name=name)
+    i = 0
+    while i < len(body_lines):
+        line = body_lines[i].strip()
+        if not line:
+            i += 1
+            continue
+        if line.startswith("position "):
+            program.position = tuple(_split_list(line, 2, "position requires two arrays: position x_arr, y_arr"))
+        elif line.startswith("velocity "):
+            program.velocity = tuple(_split_list(line, 2, "velocity requires two arrays: velocity vx_arr, vy_arr"))
+        elif line.startswith("arrays "):
+            raw = line.split(None, 1)[1].strip()
+            program.arrays = [a.strip() for a in raw.split(",") if a.strip()]
+        elif line.startswith("count "):
+            program.count = line.split(None, 1)[1].strip()
+        elif line.startswith("alive "):
+            program.alive = line.split(None, 1)[1].strip()
+        elif line.startswith("life "):
+            program.life = line.split(None, 1)[1].strip()
+        elif line.startswith("decay "):
+            program.decay = line.split(None, 1)[1].strip()
+        elif line.startswith("live_count "):
+            program.live_count = line.split(None, 1)[1].strip()
+        elif line.startswith("steps "):
+            program.steps = line.split(None, 1)[1].strip()
+        elif line.startswith("gravity "):
+            program.gravity = tuple(_split_list(line, 2, "gravity requires two values: gravity gx, gy"))
+        elif line.startswith("drag "):
+            program.drag = line.split(None, 1)[1].strip()
+        elif line.startswith("bounds "):
+            program.bounds = line.split(None, 1)[1].strip()
+            if program.bounds not in PARTICLE_BOUNDS:
+                raise ValueError(f"particle_program {name}: unknown bounds {program.bounds}")
+        elif line.startswith("area "):
+            program.area = tuple(_split_list(line, 4, "area requires four values: area x0, y0, x1, y1"))
+        elif _UPDATE_RE.match(line):
+            block_body, i = _collect_brace_block(body_lines, i)
+            program.update = _parse_assignments(block_body)
+            continue
+        elif _DRAW_RE.match(line):
+            block_body, i = _collect_brace_block(body_lines, i)
+            program.draw = _parse_draw_body(block_body)
+            if program.draw.mode == "fire" or program.draw.palette_field or program.draw.fill_field:
+                raise ValueError(
+                    f"particle_program {name}: draw supports plot_if, color, opacity, fill_color, fill_intensity"
+                )
+            continue
+        else:
+            raise ValueError(f"Unknown particle_program directive: {line}")
+        i += 1
+
+    if not program.position[0]:
+        raise ValueError(f"particle_program {name}: position required")
+    arrays = program.state_arrays()
+    draw = program.draw
+    _key_call_sites(name, [expr for _, expr in program.update] + [draw.plot_if, draw.color_expr, draw.opacity_expr])
+    _compile_assignments(program.update, "particle", arrays, array_targets=True)
+    _compile_exprs((draw.plot_if, draw.color_expr, draw.opacity_expr), "particle", arrays)
     return program
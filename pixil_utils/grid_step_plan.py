@@ -0,0 +1,476 @@
+"""Compiled step plans for grid_program step blocks.
+
+compile_step_plan() lowers one StepBlock for one grid size into a flat list of
+NumPy ufunc calls writing into buffers allocated at compile time, so running a
+step allocates nothing except random_field() output. Subtrees that only touch
+numbers are folded at compile time; subtrees that also read scalar variables
+run through eval_expr once per step. Blocks the plan cannot lower (calls such
+as escape_iter on field data) compile to None and keep going through eval_expr.
+
+Every lowered node runs the same ufunc on the same operands as eval_expr, so
+plan and interpreter results are identical, not merely close.
+
+The stencils used by lap(), neighbors() and below_avg() live here as well: they
+read shifted slices of one padded copy of the field instead of building
+rolled/stacked temporaries, and write into a caller-provided output.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .array_manager import PixilArray
+from .grid_expr import ExprNode, GridEvalContext, eval_expr
+from .grid_field_compiler import StepBlock
+
+_NEIGHBOR_OFFSETS_4 = ((0, 1), (0, -1), (1, 0), (-1, 0))
+_NEIGHBOR_OFFSETS_8 = _NEIGHBOR_OFFSETS_4 + ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+_CMP_UFUNCS = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    ">": np.greater,
+    "<=": np.less_equal,
+    ">=": np.greater_equal,
+}
+_BINOP_UFUNCS = {"+": np.add, "-": np.subtract, "*": np.multiply}
+_UNARY_CALLS = {"abs": np.abs, "floor": np.floor, "sin": np.sin, "cos": np.cos}
+# Calls whose result is a full field even when every argument is a scalar
+_FIELD_CALLS = frozenset({"lap", "at", "neighbors", "neighbors4", "below_avg", "random_field"})
+
+
+def fill_padded(pad: np.ndarray, grid: np.ndarray, boundary: str) -> np.ndarray:
+    """Copy grid into pad[1:-1, 1:-1] with a one-cell border (wrapped or edge-clamped)."""
+    pad[1:-1, 1:-1] = grid
+    if boundary == "wrap":
+        pad[0, 1:-1] = grid[-1]
+        pad[-1, 1:-1] = grid[0]
+        pad[:, 0] = pad[:, -2]
+        pad[:, -1] = pad[:, 1]
+    else:
+        pad[0, 1:-1] = grid[0]
+        pad[-1, 1:-1] = grid[-1]
+        pad[:, 0] = pad[:, 1]
+        pad[:, -1] = pad[:, -2]
+    return pad
+
+
+def laplacian_4_into(
+    grid: np.ndarray, boundary: str, out: np.ndarray, pad: np.ndarray, scratch: np.ndarray
+) -> np.ndarray:
+    """left + right + up + down - 4 * grid, evaluated in that order into out (size x size)."""
+    fill_padded(pad, grid, boundary)
+    np.add(pad[1:-1, :-2], pad[1:-1, 2:], out=out)
+    out += pad[:-2, 1:-1]
+    out += pad[2:, 1:-1]
+    np.multiply(grid, 4.0, out=scratch)
+    out -= scratch
+    return out
+
+
+def neighbor_count_into(
+    grid: np.ndarray, boundary: str, orthogonal: bool, out: np.ndarray, pad: np.ndarray
+) -> np.ndarray:
+    """Live (> 0.5) neighbours of each cell, 4- or 8-connected, into out."""
+    np.greater(grid, 0.5, out=pad[1:-1, 1:-1])
+    fill_padded(pad, pad[1:-1, 1:-1], boundary)
+    h, w = grid.shape
+    offsets = _NEIGHBOR_OFFSETS_4 if orthogonal else _NEIGHBOR_OFFSETS_8
+    (dy, dx), rest = offsets[0], offsets[1:]
+    np.copyto(out, pad[1 + dy:1 + dy + h, 1 + dx:1 + dx + w])
+    for dy, dx in rest:
+        out += pad[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+    return out
+
+
+def below_avg_into(grid: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Each row becomes the mean of the (up to) three cells below it; the last row is kept."""
+    size = grid.shape[0]
+    out[-1] = grid[-1]
+    if size > 1:
+        rows = out[:-1]
+        np.copyto(rows, grid[1:])
+        rows[:, 1:] += grid[1:, :-1]
+        rows[:, :-1] += grid[1:, 1:]
+        rows[:, 1:-1] /= 3
+        rows[:, 0] /= 2
+        rows[:, -1] /= 2
+    return out
+
+
+def _is_scalar_node(node: ExprNode, array_names: Set[str]) -> bool:
+    """True when node evaluates to a scalar: no field, coordinate or temp reads."""
+    if node.kind == "num":
+        return True
+    if node.kind == "ident":
+        return str(node.value) not in array_names
+    if node.kind == "call" and str(node.value) in _FIELD_CALLS:
+        return False
+    return all(_is_scalar_node(child, array_names) for child in node.children)
+
+
+def _has_ident(node: ExprNode) -> bool:
+    return node.kind == "ident" or any(_has_ident(child) for child in node.children)
+
+
+def _collect_idents(node: ExprNode, out: Set[str]) -> None:
+    if node.kind == "ident":
+        out.add(str(node.value))
+    for child in node.children:
+        _collect_idents(child, out)
+
+
+class _Unsupported(Exception):
+    """Raised while compiling a node the plan does not lower."""
+
+
+class StepPlan:
+    """One StepBlock lowered for one grid size; run() computes the block's next field."""
+
+    def __init__(self, size: int, boundary: str):
+        self.size = size
+        self.boundary = boundary
+        self.regs: List[Any] = []
+        self.ops: List[Callable[[], None]] = []
+        self.field_slots: Dict[str, int] = {}
+        self.scalar_names: Set[str] = set()
+        self.scalars: Dict[str, float] = {}
+        self.result_slot = -1
+        # The result is computed straight into the caller's output buffer
+        self.result_in_place = False
+
+    def run(self, fields: Dict[str, np.ndarray], variables: Any, out: np.ndarray) -> None:
+        regs = self.regs
+        for name, slot in self.field_slots.items():
+            regs[slot] = fields[name]
+        scalars = self.scalars
+        for name in self.scalar_names:
+            # Same selection as grid_engine._build_scalars; names left out raise in eval_expr
+            try:
+                val = variables.get(name)
+            except KeyError:
+                scalars.pop(name, None)
+                continue
+            if isinstance(val, bool):
+                scalars[name] = 1.0 if val else 0.0
+            elif isinstance(val, (int, float)) and not isinstance(val, PixilArray):
+                scalars[name] = float(val)
+            else:
+                scalars.pop(name, None)
+        if self.result_in_place:
+            regs[self.result_slot] = out
+        for op in self.ops:
+            op()
+        if not self.result_in_place:
+            np.copyto(out, regs[self.result_slot])
+
+
+class _PlanCompiler:
+    def __init__(
+        self,
+        plan: StepPlan,
+        field_names: Sequence[str],
+        coords: Dict[str, np.ndarray],
+    ):
+        self.plan = plan
+        self.n = plan.size * plan.size
+        self.field_names = set(field_names)
+        self.coords = coords
+        self.temps: Dict[str, Tuple[int, str]] = {}
+        # Slots holding a buffer this plan owns and writes with a ufunc
+        self.owned: Set[int] = set()
+        self.scalar_ctx = GridEvalContext(
+            scalars=plan.scalars,
+            fields={},
+            temps={},
+            grid_vars={},
+            size=plan.size,
+            boundary=plan.boundary,
+            laplacian_fn=self._no_field_fn,
+            neighbors_fn=self._no_field_fn,
+            below_avg_fn=self._no_field_fn,
+            random_field_fn=self._no_field_fn,
+        )
+        self._pad: Optional[np.ndarray] = None
+        self._scratch: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _no_field_fn(*_args: Any) -> Any:
+        raise _Unsupported()
+
+    def _slot(self, value: Any) -> int:
+        self.plan.regs.append(value)
+        return len(self.plan.regs) - 1
+
+    def _buffer(self, kind: str) -> int:
+        slot = self._slot(np.empty(self.n, dtype=bool if kind == "b" else np.float64))
+        self.owned.add(slot)
+        return slot
+
+    def _pad_buffers(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._pad is None:
+            size = self.plan.size
+            self._pad = np.empty((size + 2, size + 2), dtype=np.float64)
+            self._scratch = np.empty((size, size), dtype=np.float64)
+        return self._pad, self._scratch
+
+    def _array_names(self) -> Set[str]:
+        return set(self.temps) | set(self.coords) | self.field_names
+
+    def _field_slot(self, node: ExprNode) -> int:
+        if node.kind != "ident" or str(node.value) not in self.field_names:
+            raise _Unsupported()
+        name = str(node.value)
+        if name not in self.plan.field_slots:
+            self.plan.field_slots[name] = self._slot(None)
+        return self.plan.field_slots[name]
+
+    def compile_node(self, node: ExprNode) -> Tuple[int, str]:
+        """(slot, kind) with kind 'f' (float field), 'b' (bool field) or 's' (scalar)."""
+        if _is_scalar_node(node, self._array_names()):
+            return self._scalar(node), "s"
+        kind = node.kind
+        if kind == "ident":
+            name = str(node.value)
+            if name in self.temps:
+                return self.temps[name]
+            if name in self.coords:
+                return self._slot(self.coords[name]), "f"
+            return self._field_slot(node), "f"
+        if kind == "neg":
+            src, src_kind = self.compile_node(node.children[0])
+            return self._ufunc(np.negative, src_kind, src), src_kind
+        if kind == "not":
+            src, _ = self.compile_node(node.children[0])
+            return self._ufunc(np.logical_not, "b", src), "b"
+        if kind in ("and", "or"):
+            (a, _), (b, _) = self.compile_node(node.children[0]), self.compile_node(node.children[1])
+            ufunc = np.logical_and if kind == "and" else np.logical_or
+            return self._ufunc(ufunc, "b", a, b), "b"
+        if kind == "cmp":
+            (a, _), (b, _) = self.compile_node(node.children[0]), self.compile_node(node.children[1])
+            return self._ufunc(_CMP_UFUNCS[node.value], "b", a, b), "b"
+        if kind == "binop":
+            (a, a_kind), (b, b_kind) = self.compile_node(node.children[0]), self.compile_node(node.children[1])
+            if node.value == "/":
+                return self._divide(a, b, b_kind), "f"
+            out_kind = "b" if a_kind == b_kind == "b" else "f"
+            return self._ufunc(_BINOP_UFUNCS[node.value], out_kind, a, b), out_kind
+        if kind == "call":
+            return self._call(node)
+        raise _Unsupported()
+
+    def _scalar(self, node: ExprNode) -> int:
+        if not _has_ident(node):
+            return self._slot(float(eval_expr(node, self.scalar_ctx)))
+        _collect_idents(node, self.plan.scalar_names)
+        slot = self._slot(0.0)
+        regs, ctx = self.plan.regs, self.scalar_ctx
+
+        def op() -> None:
+            regs[slot] = float(eval_expr(node, ctx))
+
+        self.plan.ops.append(op)
+        return slot
+
+    def _ufunc(self, ufunc: Callable, kind: str, *args: int) -> int:
+        slot = self._buffer(kind)
+        regs = self.plan.regs
+        if len(args) == 1:
+            (a,) = args
+
+            def op() -> None:
+                ufunc(regs[a], out=regs[slot])
+        else:
+            a, b = args
+
+            def op() -> None:
+                ufunc(regs[a], regs[b], out=regs[slot])
+
+        self.plan.ops.append(op)
+        return slot
+
+    def _divide(self, a: int, b: int, b_kind: str) -> int:
+        # eval_expr: np.divide(la, rb, out=zeros, where=rb != 0)
+        slot = self._buffer("f")
+        regs = self.plan.regs
+        if b_kind == "s":
+
+            def op() -> None:
+                if regs[b] != 0:
+                    np.divide(regs[a], regs[b], out=regs[slot])
+                else:
+                    regs[slot].fill(0.0)
+        else:
+            mask = self._buffer("b")
+
+            def op() -> None:
+                np.not_equal(regs[b], 0, out=regs[mask])
+                regs[slot].fill(0.0)
+                np.divide(regs[a], regs[b], out=regs[slot], where=regs[mask])
+
+        self.plan.ops.append(op)
+        return slot
+
+    def _call(self, node: ExprNode) -> Tuple[int, str]:
+        name = str(node.value)
+        args = node.children
+        regs = self.plan.regs
+        size, boundary = self.plan.size, self.plan.boundary
+        if name == "at" and len(args) == 1:
+            return self._field_slot(args[0]), "f"
+        if name in ("lap", "neighbors", "neighbors4", "below_avg") and len(args) == 1:
+            src = self._field_slot(args[0])
+            slot = self._buffer("f")
+            pad, scratch = self._pad_buffers()
+            if name == "lap":
+
+                def op() -> None:
+                    laplacian_4_into(
+                        regs[src].reshape(size, size), boundary, regs[slot].reshape(size, size), pad, scratch
+                    )
+            elif name == "below_avg":
+
+                def op() -> None:
+                    below_avg_into(regs[src].reshape(size, size), regs[slot].reshape(size, size))
+            else:
+                orthogonal = name == "neighbors4"
+
+                def op() -> None:
+                    neighbor_count_into(
+                        regs[src].reshape(size, size), boundary, orthogonal, regs[slot].reshape(size, size), pad
+                    )
+
+            self.plan.ops.append(op)
+            return slot, "f"
+        if name == "random_field" and len(args) == 2:
+            lo, hi = (self.compile_node(arg) for arg in args)
+            if lo[1] != "s" or hi[1] != "s":
+                raise _Unsupported()
+            slot = self._slot(None)
+            n = self.n
+
+            def op() -> None:
+                regs[slot] = np.random.uniform(regs[lo[0]], regs[hi[0]], n)
+
+            self.plan.ops.append(op)
+            return slot, "f"
+
+        compiled = [self.compile_node(arg) for arg in args]
+        kinds = [kind for _, kind in compiled]
+        slots = [slot for slot, _ in compiled]
+        if name == "clamp" and len(args) == 3 and kinds[1] == kinds[2] == "s":
+            val, lo, hi = slots
+            slot = self._buffer("f")
+
+            def op() -> None:
+                np.clip(regs[val], regs[lo], regs[hi], out=regs[slot])
+
+            self.plan.ops.append(op)
+            return slot, "f"
+        if name == "where" and len(args) == 3:
+            return self._where(compiled)
+        if name in ("min", "max") and len(args) == 2:
+            out_kind = "b" if kinds[0] == kinds[1] == "b" else "f"
+            ufunc = np.minimum if name == "min" else np.maximum
+            return self._ufunc(ufunc, out_kind, *slots), out_kind
+        if name in _UNARY_CALLS and len(args) == 1:
+            out_kind = kinds[0] if name in ("abs", "floor") else "f"
+            return self._ufunc(_UNARY_CALLS[name], out_kind, slots[0]), out_kind
+        if name == "sqrt" and len(args) == 1:
+            slot = self._buffer("f")
+            (val,) = slots
+
+            def op() -> None:
+                np.maximum(regs[val], 0.0, out=regs[slot])
+                np.sqrt(regs[slot], out=regs[slot])
+
+            self.plan.ops.append(op)
+            return slot, "f"
+        if name == "pow" and len(args) == 2:
+            # eval_expr broadcasts a scalar side to a full array first, and
+            # np.power on a scalar operand is not always bit-identical to that
+            full = [self._full(slot) if kind == "s" else slot for slot, kind in compiled]
+            return self._ufunc(np.power, "f", *full), "f"
+        raise _Unsupported()
+
+    def _full(self, src: int) -> int:
+        """A float field holding scalar slot src every step."""
+        slot = self._buffer("f")
+        regs = self.plan.regs
+
+        def op() -> None:
+            regs[slot].fill(regs[src])
+
+        self.plan.ops.append(op)
+        return slot
+
+    def _where(self, compiled: List[Tuple[int, str]]) -> Tuple[int, str]:
+        (cond, cond_kind), (a, a_kind), (b, b_kind) = compiled
+        out_kind = "b" if a_kind == b_kind == "b" else "f"
+        slot = self._buffer(out_kind)
+        regs = self.plan.regs
+        if cond_kind == "s":
+
+            def op() -> None:
+                np.copyto(regs[slot], regs[a] if regs[cond] != 0 else regs[b])
+        elif cond_kind == "b":
+
+            def op() -> None:
+                np.copyto(regs[slot], regs[b])
+                np.copyto(regs[slot], regs[a], where=regs[cond])
+        else:
+            mask = self._buffer("b")
+
+            def op() -> None:
+                np.not_equal(regs[cond], 0, out=regs[mask])
+                np.copyto(regs[slot], regs[b])
+                np.copyto(regs[slot], regs[a], where=regs[mask])
+
+        self.plan.ops.append(op)
+        return slot, out_kind
+
+    def assign(self, target: str, node: ExprNode) -> Tuple[int, str]:
+        slot, kind = self.compile_node(node)
+        if kind == "s":
+            # eval_expr callers store scalar results as full fields
+            value = slot
+            slot = self._buffer("f")
+            regs = self.plan.regs
+
+            def op() -> None:
+                regs[slot].fill(regs[value])
+
+            self.plan.ops.append(op)
+            kind = "f"
+        self.temps[target] = (slot, kind)
+        return slot, kind
+
+
+def compile_step_plan(
+    block: StepBlock,
+    field_names: Sequence[str],
+    size: int,
+    boundary: str,
+    coords: Dict[str, np.ndarray],
+) -> Optional[StepPlan]:
+    """Lower block for a size x size grid, or None when eval_expr has to run it."""
+    plan = StepPlan(size, boundary)
+    compiler = _PlanCompiler(plan, field_names, coords)
+    output_name = f"{block.field}_next"
+    result: Optional[Tuple[int, str]] = None
+    try:
+        for target, expr in block.assignments:
+            compiled = compiler.assign(target, expr)
+            if target == output_name:
+                result = compiled
+    except _Unsupported:
+        return None
+    if result is None:
+        return None
+    plan.result_slot = result[0]
+    plan.result_in_place = result[1] == "f" and result[0] in compiler.owned
+    return plan
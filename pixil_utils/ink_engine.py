@@ -61,60 +61,47 @@ def run_ink_step(
     color_mid = _resolve_color("v_color_mid", variables)
     color_dark = _resolve_color("v_color_dark", variables)
 
-    n = px.size
-    any_alive = 0.0
-
-    for i in range(n):
-        if alive[i] <= 0:
-            continue
-
-        x = float(px[i])
-        y = float(py[i])
-        ivx = float(vx[i])
-        ivy = float(vy[i])
-
-        ivx = ivx * 0.98 + float(curve_x[i]) + drift_x
-        ivy = ivy * 0.98 + float(curve_y[i]) + drift_y
-
-        if swirl_active >= 1:
-            dx = x - drop_x
-            dy = y - drop_y
-            ivx += dy * swirl_strength * swirl_dir * -1.0
-            ivy += dx * swirl_strength * swirl_dir
-
-        x += ivx
-        y += ivy
-        inten = float(intensity[i]) - fade_rate
-
-        vx[i] = ivx
-        vy[i] = ivy
-        px[i] = x
-        py[i] = y
-
-        if inten <= 0:
-            alive[i] = 0
-            intensity[i] = 0
-            continue
-
-        alive[i] = 1
-        intensity[i] = inten
-        any_alive = 1.0
-
-        draw_intensity = int(inten)
-        if draw_intensity > 60:
-            color = color_bright
-            plot_intensity = draw_intensity
-        elif draw_intensity > 30:
-            color = color_mid
-            plot_intensity = draw_intensity + 20
-        else:
-            color = color_dark
-            plot_intensity = draw_intensity + 30
-
-        plot_intensity = int(np.clip(plot_intensity, 0, 100))
-        ix = int(x)
-        iy = int(y)
-        if 0 <= ix <= 63 and 0 <= iy <= 63:
-            append_draw("mplot", [ix, iy, color, plot_intensity])
-
-    _set_scalar(variables, "v_any_alive", any_alive)
+    alive_vals = np.asarray(alive.data, dtype=np.float64)
+    live = alive_vals > 0
+    x = np.asarray(px.data, dtype=np.float64)
+    y = np.asarray(py.data, dtype=np.float64)
+    ivx = np.asarray(vx.data, dtype=np.float64) * 0.98 + np.asarray(curve_x.data, dtype=np.float64) + drift_x
+    ivy = np.asarray(vy.data, dtype=np.float64) * 0.98 + np.asarray(curve_y.data, dtype=np.float64) + drift_y
+
+    if swirl_active >= 1:
+        ivx += (y - drop_y) * swirl_strength * swirl_dir * -1.0
+        ivy += (x - drop_x) * swirl_strength * swirl_dir
+
+    x = x + ivx
+    y = y + ivy
+    inten = np.asarray(intensity.data, dtype=np.float64) - fade_rate
+    lit = live & (inten > 0)
+
+    # Dead particles keep their state; particles that burn out this step are cleared
+    live_idx = np.flatnonzero(live).tolist()
+    still_lit = lit.tolist()
+    for arr, values in ((vx, ivx), (vy, ivy), (px, x), (py, y), (intensity, inten)):
+        data = arr.data
+        vals = values.tolist()
+        for i in live_idx:
+            data[i] = vals[i]
+    for i in live_idx:
+        if not still_lit[i]:
+            intensity.data[i] = 0.0
+        alive.data[i] = 1.0 if still_lit[i] else 0.0
+
+    draw_intensity = np.trunc(inten).astype(int)
+    plot_intensity = np.clip(
+        np.select([draw_intensity > 60, draw_intensity > 30], [draw_intensity, draw_intensity + 20], draw_intensity + 30),
+        0,
+        100,
+    )
+    band = np.select([draw_intensity > 60, draw_intensity > 30], [0, 1], 2)
+    colors = (color_bright, color_mid, color_dark)
+    ix = np.trunc(x).astype(int)
+    iy = np.trunc(y).astype(int)
+    visible = lit & (ix >= 0) & (ix <= 63) & (iy >= 0) & (iy <= 63)
+    for i in np.flatnonzero(visible).tolist():
+        append_draw("mplot", [int(ix[i]), int(iy[i]), colors[band[i]], int(plot_intensity[i])])
+
+    _set_scalar(variables, "v_any_alive", 1.0 if lit.any() else 0.0)
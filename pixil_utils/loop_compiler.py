@@ -9,7 +9,7 @@ Loops: nested for (literal bounds folded at compile time), v_ assignments, array
        draw_rectangle/draw_polygon/draw_arc (fast path), other draw_* via CommandStmt.
 Procedures: loops plus array assign, if/elseif/else, call/bare proc name,
             begin_frame, end_frame, mflush, plot, draw_line, draw_circle, draw_polygon,
-            draw_arc, etc.
+            draw_arc, neighbor_* spatial hash queries, etc.
 Unsupported constructs cause compile failure and interpreter fallback.
 """
 
@@ -57,6 +57,10 @@ _FRAME_MISC_COMMANDS = frozenset({"fps"})
 # Must not be treated as bare procedure names (e.g. begin_frame has no parens in scripts)
 _FRAME_BUILTIN_NAMES = _FRAME_NO_ARG | _FRAME_COMMANDS | _FRAME_MISC_COMMANDS
 _SPRITE_COMMANDS = frozenset({"show_sprite", "move_sprite", "hide_sprite"})
+# Spatial hash queries; args are array names and expressions passed through to run_command
+_NEIGHBOR_COMMANDS = frozenset({
+    "neighbor_grid", "neighbor_count", "neighbor_sum", "neighbor_avg", "neighbor_offset", "neighbor_away",
+})
 _BARE_CALL_RESERVED = frozenset(
     {"else", "break", "endif", "endfor", "endwhile", "endsprite", "then", "true", "false"}
 )
@@ -1065,6 +1069,23 @@ def _parse_sprite_command(line: str, allow_commands: bool) -> Optional[CommandSt
     return CommandStmt(cmd, args)
 
 
+def _parse_neighbor_command(line: str, allow_commands: bool) -> Optional[CommandStmt]:
+    if not allow_commands:
+        return None
+    stripped = line.strip()
+    match = COMMAND_PATTERN.match(stripped)
+    if not match:
+        return None
+    cmd = match.group(1)
+    if cmd not in _NEIGHBOR_COMMANDS:
+        return None
+    from .parameter_types import split_command_parameters
+
+    inner = match.group(2)
+    args = [a.strip() for a in split_command_parameters(inner)] if inner.strip() else []
+    return CommandStmt(cmd, args)
+
+
 def _parse_command(line: str, allow_commands: bool) -> Optional[CommandStmt]:
     if not allow_commands:
         return None
@@ -1081,6 +1102,9 @@ def _parse_command(line: str, allow_commands: bool) -> Optional[CommandStmt]:
     sprite = _parse_sprite_command(stripped, allow_commands)
     if sprite is not None:
         return sprite
+    neighbor = _parse_neighbor_command(stripped, allow_commands)
+    if neighbor is not None:
+        return neighbor
     match = COMMAND_PATTERN.match(stripped)
     if not match:
         return None
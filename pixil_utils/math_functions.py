@@ -277,6 +277,18 @@ def reset_expression_cache_stats():
     _CACHE_MISSES = 0
     _EXPRESSION_RESULT_CACHE.clear()
 
+def get_cache_hit_rates():
+    """Current-script hit rates (percent, None before any attempt) for live telemetry."""
+    def rate(hits, attempts):
+        return round(hits / attempts * 100, 1) if attempts else None
+
+    return {
+        'fast_math': rate(_FAST_MATH_HITS, _FAST_MATH_TOTAL),
+        'expression_cache': rate(_CACHE_HITS, _CACHE_HITS + _CACHE_MISSES),
+        'jit': rate(_JIT_HITS, _JIT_ATTEMPTS),
+        'condition_template': rate(_CONDITION_TEMPLATE_HITS, _CONDITION_TEMPLATE_HITS + _CONDITION_TEMPLATE_MISSES),
+    }
+
 def reset_condition_template_stats():
     """Reset condition template statistics for new script."""
     global _CONDITION_TEMPLATE_HITS, _CONDITION_TEMPLATE_MISSES, _CONDITION_TEMPLATE_TIME_SAVED
@@ -931,13 +943,14 @@ def evaluate_math_expression(expr: str, variables: Union[Dict[str, Any], Variabl
                     debug_print(f"Fast array arithmetic hit: {expr} = {fast_result}", DEBUG_VERBOSE)
                 return fast_result
         
-        # Try simple arithmetic
-        fast_result = try_fast_arithmetic(expr, variables)
-        if fast_result is not None:
-            _FAST_MATH_HITS += 1
-            if DEBUG_LEVEL >= DEBUG_VERBOSE:
-                debug_print(f"Fast arithmetic hit: {expr} = {fast_result}", DEBUG_VERBOSE)
-            return fast_result
+        # Try simple arithmetic (no pattern has parentheses; function calls skip 16 regexes)
+        if '(' not in expr:
+            fast_result = try_fast_arithmetic(expr, variables)
+            if fast_result is not None:
+                _FAST_MATH_HITS += 1
+                if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                    debug_print(f"Fast arithmetic hit: {expr} = {fast_result}", DEBUG_VERBOSE)
+                return fast_result
         
         # Try random(min, max, decimals) with literals or simple variables (NEW)
         if 'random' in expr:
@@ -1452,6 +1465,10 @@ def evaluate_condition(condition, variables):
     if DEBUG_LEVEL >= DEBUG_VERBOSE:
         debug_print(f"Evaluating condition: '{condition}'", DEBUG_VERBOSE)
 
+    # Bare flag (if v_done then): the lookup below beats building a template
+    if condition.startswith('v_') and condition in variables:
+        return bool(variables.get(condition))
+
     # ===== CONDITION TEMPLATES OPTIMIZATION =====
     if ENABLE_CONDITION_TEMPLATES:
         global _CONDITION_TEMPLATE_HITS, _CONDITION_TEMPLATE_MISSES, _CONDITION_TEMPLATE_TIME_SAVED
@@ -292,24 +292,25 @@ def show_status():
         print(f"Sprite Batch:        {'ON' if ENABLE_SPRITE_BATCH else 'OFF'}")
         print("=================================\n")
 
+# Profile name -> setter (set_profile, tests/scripts/run_fastpath_bench.py)
+PROFILES = {
+    'all_off': set_profile_all_off,
+    'all_on': set_profile_all_on,
+    'math_heavy': set_profile_math_heavy,
+    'simple_graphics': set_profile_simple_graphics,
+    'only_working': set_profile_only_working,
+    'grid_sim': set_profile_grid_sim,
+    'boids': set_profile_boids,
+}
+
 def set_profile(profile_name):
     """Set optimization profile by name."""
-    profile_functions = {
-        'all_off': set_profile_all_off,
-        'all_on': set_profile_all_on,
-        'math_heavy': set_profile_math_heavy,
-        'simple_graphics': set_profile_simple_graphics,
-        'only_working': set_profile_only_working,
-        'grid_sim': set_profile_grid_sim,
-        'boids': set_profile_boids,
-    }
-    
-    if profile_name in profile_functions:
-        profile_functions[profile_name]()
+    if profile_name in PROFILES:
+        PROFILES[profile_name]()
         if SHOW_OPTIMIZATION_STATUS:
             show_status()
     else:
-        available = ', '.join(profile_functions.keys())
+        available = ', '.join(PROFILES.keys())
         print(f"Unknown profile '{profile_name}'. Available: {available}")
 
 # Convenience function for quick testing
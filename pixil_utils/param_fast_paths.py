@@ -0,0 +1,243 @@
+"""
+Parameter fast paths used by Pixil.parse_value before the general path.
+
+try_ultra_fast_path (ENABLE_ULTRA_FAST_PATH) returns literal integers, color
+names, burnout modes and quoted strings unchanged; try_fast_path
+(ENABLE_FAST_PATH) resolves v_array[v_i] and single-operator arithmetic on a
+variable without going through evaluate_math_expression. Both return the
+formatted parameter string, or None to fall through to the next stage.
+
+tests/scripts/run_fastpath_bench.py times each one against the general path.
+"""
+
+from typing import Any, Dict, Optional, Union
+
+from .debug import DEBUG_VERBOSE, DEBUG_LEVEL, debug_print
+from .expression_parser import format_parameter
+from .parameter_types import PARAMETER_TYPES
+from .regex_patterns import (
+    FAST_SIMPLE_ARRAY_PATTERN, FAST_VAR_PLUS_NUM_PATTERN, FAST_VAR_MUL_NUM_PATTERN,
+    FAST_VAR_SUB_NUM_PATTERN, FAST_VAR_DIV_NUM_PATTERN, FAST_VAR_MOD_NUM_PATTERN,
+    FAST_VAR_ADD_VAR_PATTERN, FAST_VAR_MUL_VAR_PATTERN,
+)
+from .variable_registry import VariableRegistry
+
+# Color names passed through as-is (see rgb_matrix_lib color list)
+KNOWN_COLORS = frozenset({
+    'black', 'white', 'gray', 'light_gray', 'dark_gray', 'silver',
+    'red', 'crimson', 'maroon', 'rose', 'pink', 'salmon', 'coral',
+    'brown', 'standard_brown', 'dark_brown', 'wood_brown', 'tan',
+    'orange', 'gold', 'peach', 'bronze', 'yellow', 'lime', 'green',
+    'olive', 'spring_green', 'forest_green', 'mint', 'teal', 'turquoise',
+    'cyan', 'sky_blue', 'azure', 'blue', 'navy', 'royal_blue', 'ocean_blue',
+    'indigo', 'purple', 'violet', 'magenta', 'lavender'
+})
+
+
+def try_ultra_fast_path(value: Any, command_name: str, param_position: int) -> Optional[str]:
+    """
+    Handle the simplest parameter cases with minimal overhead.
+    Returns formatted parameter string or None if not handled.
+    """
+    if not isinstance(value, str):
+        return None
+
+    value_stripped = value.strip()
+
+    # Ultra-Fast Path #1: Direct integers (e.g., "100", "32", "5")
+    if value_stripped.isdigit():
+        if DEBUG_LEVEL >= DEBUG_VERBOSE:
+            debug_print(f"Ultra-fast integer: {value_stripped}", DEBUG_VERBOSE)
+        return value_stripped
+
+    # Ultra-Fast Path #2: Direct color names (e.g., "red", "blue", "green")
+    if value_stripped in KNOWN_COLORS:
+        if DEBUG_LEVEL >= DEBUG_VERBOSE:
+            debug_print(f"Ultra-fast color: {value_stripped}", DEBUG_VERBOSE)
+        return value_stripped
+
+    # Ultra-Fast Path #2b: burnout_mode literals (fade/instant) for plot/mplot
+    if value_stripped in ('fade', 'instant'):
+        try:
+            param_name = PARAMETER_TYPES[command_name][param_position]['name']
+        except (KeyError, IndexError):
+            param_name = ''
+        if param_name == 'burnout_mode':
+            if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                debug_print(f"Ultra-fast burnout_mode: {value_stripped}", DEBUG_VERBOSE)
+            return value_stripped
+
+    # Ultra-Fast Path #3: Direct quoted strings (e.g., "Hello", "piboto-regular")
+    if ((value_stripped.startswith('"') and value_stripped.endswith('"')) or
+        (value_stripped.startswith("'") and value_stripped.endswith("'"))):
+        if DEBUG_LEVEL >= DEBUG_VERBOSE:
+            debug_print(f"Ultra-fast quoted string: {value_stripped}", DEBUG_VERBOSE)
+        return value_stripped
+
+    # Not handled by ultra-fast path
+    return None
+
+
+def is_valid_numeric_operation(var_name: str, number_str: str, variables) -> bool:
+    """Pre-validate that we can do numeric arithmetic without exceptions."""
+    if var_name not in variables:
+        return False
+
+    var_value = variables[var_name]
+    if not isinstance(var_value, (int, float)):
+        return False
+
+    # Quick check if number_str is valid
+    try:
+        float(number_str)
+        return True
+    except ValueError:
+        return False
+
+
+def try_fast_path(
+    value: Any,
+    command_name: str,
+    param_position: int,
+    variables: Union[Dict[str, Any], VariableRegistry],
+) -> Optional[str]:
+    """
+    Handle moderately complex parameter cases efficiently.
+    Returns formatted parameter string or None if not handled.
+    """
+    if not isinstance(value, str):
+        return None
+
+    value_stripped = value.strip()
+
+    # Fast Path #1: Simple array access (e.g., "v_array[v_i]", "v_px[v_i]")
+    array_match = FAST_SIMPLE_ARRAY_PATTERN.match(value_stripped)
+    if array_match:
+        array_name, index_var = array_match.groups()
+
+        # Minimal validation then let Python handle the rest
+        if array_name in variables and index_var in variables:
+            try:
+                array = variables[array_name]
+                index = int(variables[index_var])
+                result = array[index]  # Let Python handle bounds checking and array type
+
+                if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                    debug_print(f"Fast array access: {array_name}[{index_var}] = {array_name}[{index}] = {result}", DEBUG_VERBOSE)
+                return format_parameter(result, command_name, param_position, variables)
+
+            except (KeyError, IndexError, TypeError, ValueError):
+                pass  # Fall back to normal processing
+
+    # Fast Path #2: Simple arithmetic (v_variable + number, v_variable * number, etc.)
+    # Variable + number pattern
+    plus_match = FAST_VAR_PLUS_NUM_PATTERN.match(value_stripped)
+    if plus_match:
+        var_name, number_str = plus_match.groups()
+        if is_valid_numeric_operation(var_name, number_str, variables):
+            var_value = variables[var_name]
+
+            # Simplified arithmetic - let Python handle int/float automatically
+            if '.' in number_str:
+                result = float(var_value) + float(number_str)
+            else:
+                result = var_value + int(number_str)
+
+            if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                debug_print(f"Fast add: {var_name} + {number_str} = {result}", DEBUG_VERBOSE)
+            return format_parameter(result, command_name, param_position, variables)
+
+    # Variable * number pattern
+    mul_match = FAST_VAR_MUL_NUM_PATTERN.match(value_stripped)
+    if mul_match:
+        var_name, number_str = mul_match.groups()
+        if is_valid_numeric_operation(var_name, number_str, variables):
+            var_value = variables[var_name]
+
+            if '.' in number_str:
+                result = float(var_value) * float(number_str)
+            else:
+                result = var_value * int(number_str)
+
+            if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                debug_print(f"Fast mul: {var_name} * {number_str} = {result}", DEBUG_VERBOSE)
+            return format_parameter(result, command_name, param_position, variables)
+
+    # Variable - number pattern
+    sub_match = FAST_VAR_SUB_NUM_PATTERN.match(value_stripped)
+    if sub_match:
+        var_name, number_str = sub_match.groups()
+        if is_valid_numeric_operation(var_name, number_str, variables):
+            var_value = variables[var_name]
+
+            # Simplified arithmetic - let Python handle int/float automatically
+            if '.' in number_str:
+                result = float(var_value) - float(number_str)
+            else:
+                result = var_value - int(number_str)
+
+            if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                debug_print(f"Fast sub: {var_name} - {number_str} = {result}", DEBUG_VERBOSE)
+            return format_parameter(result, command_name, param_position, variables)
+
+    # Variable / number pattern
+    div_match = FAST_VAR_DIV_NUM_PATTERN.match(value_stripped)
+    if div_match:
+        var_name, number_str = div_match.groups()
+        if is_valid_numeric_operation(var_name, number_str, variables) and float(number_str) != 0:
+            var_value = variables[var_name]
+
+            # Division always results in float to avoid integer division issues
+            result = float(var_value) / float(number_str)
+
+            if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                debug_print(f"Fast div: {var_name} / {number_str} = {result}", DEBUG_VERBOSE)
+            return format_parameter(result, command_name, param_position, variables)
+
+    # Variable % number pattern
+    mod_match = FAST_VAR_MOD_NUM_PATTERN.match(value_stripped)
+    if mod_match:
+        var_name, number_str = mod_match.groups()
+        if is_valid_numeric_operation(var_name, number_str, variables) and float(number_str) != 0:
+            var_value = variables[var_name]
+
+            # Modulo operation
+            if '.' in number_str:
+                result = float(var_value) % float(number_str)
+            else:
+                result = var_value % int(number_str)
+
+            if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                debug_print(f"Fast mod: {var_name} % {number_str} = {result}", DEBUG_VERBOSE)
+            return format_parameter(result, command_name, param_position, variables)
+
+    # Variable + variable pattern
+    var_add_match = FAST_VAR_ADD_VAR_PATTERN.match(value_stripped)
+    if var_add_match:
+        var1, var2 = var_add_match.groups()
+        if (var1 in variables and var2 in variables and
+            isinstance(variables[var1], (int, float)) and
+            isinstance(variables[var2], (int, float))):
+
+            result = variables[var1] + variables[var2]
+
+            if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                debug_print(f"Fast var add: {var1} + {var2} = {result}", DEBUG_VERBOSE)
+            return format_parameter(result, command_name, param_position, variables)
+
+    # Variable * variable pattern
+    var_mul_match = FAST_VAR_MUL_VAR_PATTERN.match(value_stripped)
+    if var_mul_match:
+        var1, var2 = var_mul_match.groups()
+        if (var1 in variables and var2 in variables and
+            isinstance(variables[var1], (int, float)) and
+            isinstance(variables[var2], (int, float))):
+
+            result = variables[var1] * variables[var2]
+
+            if DEBUG_LEVEL >= DEBUG_VERBOSE:
+                debug_print(f"Fast var mul: {var1} * {var2} = {result}", DEBUG_VERBOSE)
+            return format_parameter(result, command_name, param_position, variables)
+
+    # Not handled by fast path
+    return None
@@ -190,6 +190,49 @@ PARAMETER_TYPES: Dict[str, CommandParams] = {
     'field_render': [
         {'name': 'program', 'type': 'str', 'position': 0},
     ],
+    'particle_step': [
+        {'name': 'program', 'type': 'str', 'position': 0},
+    ],
+    'neighbor_grid': [
+        {'name': 'x_array', 'type': 'str', 'position': 0},
+        {'name': 'y_array', 'type': 'str', 'position': 1},
+        {'name': 'cell', 'type': 'float', 'position': 2},
+        {'name': 'wrap', 'type': 'float', 'position': 3, 'optional': True},
+    ],
+    'neighbor_count': [
+        {'name': 'x_array', 'type': 'str', 'position': 0},
+        {'name': 'y_array', 'type': 'str', 'position': 1},
+        {'name': 'radius', 'type': 'float', 'position': 2},
+        {'name': 'out', 'type': 'str', 'position': 3},
+    ],
+    'neighbor_sum': [
+        {'name': 'x_array', 'type': 'str', 'position': 0},
+        {'name': 'y_array', 'type': 'str', 'position': 1},
+        {'name': 'radius', 'type': 'float', 'position': 2},
+        {'name': 'values', 'type': 'str', 'position': 3},
+        {'name': 'out', 'type': 'str', 'position': 4},
+    ],
+    'neighbor_avg': [
+        {'name': 'x_array', 'type': 'str', 'position': 0},
+        {'name': 'y_array', 'type': 'str', 'position': 1},
+        {'name': 'radius', 'type': 'float', 'position': 2},
+        {'name': 'values', 'type': 'str', 'position': 3},
+        {'name': 'out', 'type': 'str', 'position': 4},
+    ],
+    'neighbor_offset': [
+        {'name': 'x_array', 'type': 'str', 'position': 0},
+        {'name': 'y_array', 'type': 'str', 'position': 1},
+        {'name': 'radius', 'type': 'float', 'position': 2},
+        {'name': 'out_x', 'type': 'str', 'position': 3},
+        {'name': 'out_y', 'type': 'str', 'position': 4},
+    ],
+    'neighbor_away': [
+        {'name': 'x_array', 'type': 'str', 'position': 0},
+        {'name': 'y_array', 'type': 'str', 'position': 1},
+        {'name': 'radius', 'type': 'float', 'position': 2},
+        {'name': 'out_x', 'type': 'str', 'position': 3},
+        {'name': 'out_y', 'type': 'str', 'position': 4},
+    ],
     'grid_fill': [
         {'name': 'array', 'type': 'str', 'position': 0},
         {'name': 'value', 'type': 'float', 'position': 1},
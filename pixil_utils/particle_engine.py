@@ -0,0 +1,284 @@
+"""NumPy execution for particle_program."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .array_manager import PixilArray
+from .grid_expr import ParticleEvalContext, eval_expr, resolve_scalar, resolve_size
+from .grid_field_compiler import ParticleProgram
+from .spatial_hash import SpatialHash
+
+
+def _get_array(variables: Any, name: str) -> PixilArray:
+    arr = variables.get(name) if hasattr(variables, "get") else variables[name]
+    if not isinstance(arr, PixilArray):
+        raise ValueError(f"{name} is not an array")
+    return arr
+
+
+def _build_scalars(variables: Any) -> Dict[str, float]:
+    scalars: Dict[str, float] = {}
+    for name in variables.name_to_index:
+        val = variables.get(name)
+        if isinstance(val, PixilArray):
+            continue
+        if isinstance(val, bool):
+            scalars[name] = 1.0 if val else 0.0
+        elif isinstance(val, (int, float)):
+            scalars[name] = float(val)
+    return scalars
+
+
+def _set_scalar(variables: Any, name: str, value: float) -> None:
+    if hasattr(variables, "set"):
+        variables.set(name, value)
+    else:
+        variables[name] = value
+
+
+def _resolve_color_name(name: str, variables: Any) -> str:
+    text = name.strip()
+    if text.startswith("v_"):
+        val = variables.get(text) if hasattr(variables, "get") else variables[text]
+        if isinstance(val, str):
+            if val.startswith('"') and val.endswith('"'):
+                return val[1:-1]
+            return val
+    return text
+
+
+def plot_points(
+    append_draw: Callable[[str, List[Any]], None],
+    xs: np.ndarray,
+    ys: np.ndarray,
+    color_ids: Any,
+    intensities: Any,
+) -> None:
+    """Emit points as one draw_batch raster record over their bounding box.
+
+    Points off the panel are dropped; where several share a pixel the last one
+    wins, as with a run of mplot calls in index order.
+    """
+    from shared.draw_batch_protocol import DEFAULT_PANEL_HEIGHT, DEFAULT_PANEL_WIDTH, RASTER_SKIP
+
+    ix = np.trunc(xs)
+    iy = np.trunc(ys)
+    on_panel = (ix >= 0) & (ix < DEFAULT_PANEL_WIDTH) & (iy >= 0) & (iy < DEFAULT_PANEL_HEIGHT)
+    if not on_panel.any():
+        return
+    ix = ix[on_panel].astype(np.intp)
+    iy = iy[on_panel].astype(np.intp)
+    ids = np.broadcast_to(np.asarray(color_ids, dtype=np.int16), on_panel.shape)[on_panel]
+    ints = np.broadcast_to(np.clip(intensities, 0, 100).astype(np.uint8), on_panel.shape)[on_panel]
+    x0, y0 = int(ix.min()), int(iy.min())
+    height, width = int(iy.max()) - y0 + 1, int(ix.max()) - x0 + 1
+    # Fancy assignment does not say which repeat wins, so keep each pixel's last point
+    flat = (iy - y0) * width + (ix - x0)
+    pixels, first_in_reverse = np.unique(flat[::-1], return_index=True)
+    last = flat.size - 1 - first_in_reverse
+    plane_ids = np.full(height * width, RASTER_SKIP, dtype=np.int16)
+    plane_ints = np.zeros(height * width, dtype=np.uint8)
+    plane_ids[pixels] = ids[last]
+    plane_ints[pixels] = ints[last]
+    plane_ids = plane_ids.reshape(height, width)
+    plane_ints = plane_ints.reshape(height, width)
+    append_draw("raster", [x0, y0, plane_ids, plane_ints])
+
+
+def _live_mask(program: ParticleProgram, arrays: Dict[str, np.ndarray], count: int) -> np.ndarray:
+    live = np.ones(count, dtype=bool)
+    if program.alive:
+        live &= arrays[program.alive] > 0
+    if program.life:
+        live &= arrays[program.life] > 0
+    return live
+
+
+class _Neighbors:
+    """Neighbor queries over the live particles: one spatial hash per radius, kept until positions move."""
+
+    def __init__(self, program: ParticleProgram, arrays: Dict[str, np.ndarray], live: np.ndarray):
+        self.program = program
+        self.arrays = arrays
+        self.live = live
+        self.live_idx = np.flatnonzero(live)
+        self._hashes: Dict[float, SpatialHash] = {}
+
+    def invalidate(self) -> None:
+        self._hashes.clear()
+
+    def __call__(self, op: str, values: Optional[np.ndarray], radius: float) -> np.ndarray:
+        spatial = self._hashes.get(radius)
+        if spatial is None:
+            x_name, y_name = self.program.position
+            xs = self.arrays[x_name][self.live_idx]
+            ys = self.arrays[y_name][self.live_idx]
+            spatial = self._hashes[radius] = SpatialHash(xs, ys, max(radius, 1.0))
+        out = np.zeros(self.live.size, dtype=np.float64)
+        if op == "count":
+            out[self.live_idx] = spatial.count(radius)
+        elif op == "sum":
+            out[self.live_idx] = spatial.sum(radius, values[self.live_idx])
+        else:
+            out[self.live_idx] = spatial.avg(radius, values[self.live_idx])
+        return out
+
+
+def _run_update(
+    program: ParticleProgram,
+    arrays: Dict[str, np.ndarray],
+    live: np.ndarray,
+    scalars: Dict[str, float],
+) -> None:
+    count = live.size
+    neighbors = _Neighbors(program, arrays, live)
+    ctx = ParticleEvalContext(
+        scalars=scalars,
+        arrays=arrays,
+        temps={},
+        particle_vars={"index": np.arange(count, dtype=np.float64)},
+        count=count,
+        neighbors_fn=neighbors,
+        random_fn=lambda lo, hi: np.random.uniform(lo, hi, count),
+    )
+    for target, expr in program.update:
+        value = eval_expr(expr, ctx)
+        if target in arrays:
+            # Dead particles keep their state
+            np.copyto(arrays[target], value, where=live)
+            if target in program.position:
+                neighbors.invalidate()
+        elif isinstance(value, np.ndarray):
+            ctx.temps[target] = value
+        else:
+            ctx.temps[target] = np.full(count, float(value), dtype=np.float64)
+
+
+def _apply_bounds(
+    program: ParticleProgram,
+    arrays: Dict[str, np.ndarray],
+    live: np.ndarray,
+    variables: Any,
+) -> None:
+    mode = program.bounds
+    if mode == "none":
+        return
+    x0, y0, x1, y1 = (resolve_scalar(v, variables) for v in program.area)
+    velocity = program.velocity or (None, None)
+    for pos_name, vel_name, lo, hi in (
+        (program.position[0], velocity[0], x0, x1),
+        (program.position[1], velocity[1], y0, y1),
+    ):
+        pos = arrays[pos_name]
+        if mode == "clamp":
+            np.copyto(pos, np.clip(pos, lo, hi), where=live)
+        elif mode == "wrap":
+            np.copyto(pos, lo + np.mod(pos - lo, hi - lo + 1), where=live)
+        elif mode == "bounce":
+            below = live & (pos < lo)
+            above = live & (pos > hi)
+            pos[below] = 2 * lo - pos[below]
+            pos[above] = 2 * hi - pos[above]
+            np.copyto(pos, np.clip(pos, lo, hi), where=live)
+            if vel_name:
+                vel = arrays[vel_name]
+                vel[below] = np.abs(vel[below])
+                vel[above] = -np.abs(vel[above])
+        else:  # kill
+            live &= (pos >= lo) & (pos <= hi)
+
+
+def _step(program: ParticleProgram, arrays: Dict[str, np.ndarray], variables: Any, scalars: Dict[str, float]) -> None:
+    count = arrays[program.position[0]].size
+    live = _live_mask(program, arrays, count)
+    if program.update:
+        _run_update(program, arrays, live, scalars)
+
+    if program.velocity:
+        vx = arrays[program.velocity[0]]
+        vy = arrays[program.velocity[1]]
+        gx, gy = (resolve_scalar(v, variables) for v in program.gravity)
+        drag = resolve_scalar(program.drag, variables)
+        np.copyto(vx, (vx + gx) * drag, where=live)
+        np.copyto(vy, (vy + gy) * drag, where=live)
+        px = arrays[program.position[0]]
+        py = arrays[program.position[1]]
+        np.copyto(px, px + vx, where=live)
+        np.copyto(py, py + vy, where=live)
+
+    was_live = live.copy()
+    _apply_bounds(program, arrays, live, variables)
+    if program.life:
+        life = arrays[program.life]
+        np.copyto(life, np.maximum(life - resolve_scalar(program.decay, variables), 0.0), where=live)
+        live &= life > 0
+    if program.alive:
+        arrays[program.alive][was_live & ~live] = 0.0
+    elif program.life:
+        # Killed by bounds with no alive array: end the lifetime instead
+        arrays[program.life][was_live & ~live] = 0.0
+
+
+def _render(
+    program: ParticleProgram,
+    arrays: Dict[str, np.ndarray],
+    variables: Any,
+    scalars: Dict[str, float],
+    append_draw: Callable[[str, List[Any]], None],
+) -> None:
+    from shared.mplot_protocol import get_color_id, normalize_mplot_color
+
+    count = arrays[program.position[0]].size
+    live = _live_mask(program, arrays, count)
+    draw = program.draw
+    ctx = ParticleEvalContext(
+        scalars=scalars,
+        arrays=arrays,
+        temps={},
+        particle_vars={"index": np.arange(count, dtype=np.float64)},
+        count=count,
+        neighbors_fn=_Neighbors(program, arrays, live),
+        random_fn=lambda lo, hi: np.random.uniform(lo, hi, count),
+    )
+    if draw.plot_if is not None:
+        live &= np.broadcast_to(np.asarray(eval_expr(draw.plot_if, ctx)) != 0, live.shape)
+    if not live.any():
+        return
+    if draw.color_expr is not None:
+        colors = np.broadcast_to(np.asarray(eval_expr(draw.color_expr, ctx), dtype=np.float64), live.shape)
+        color_ids = np.clip(np.rint(np.nan_to_num(colors)), 0, 99).astype(np.int16)[live]
+    else:
+        color_ids = get_color_id(normalize_mplot_color(_resolve_color_name(draw.fill_color, variables)))
+    if draw.opacity_expr is not None:
+        opacity = np.broadcast_to(np.asarray(eval_expr(draw.opacity_expr, ctx), dtype=np.float64), live.shape)
+        intensities = np.floor(np.nan_to_num(opacity))[live]
+    else:
+        intensities = resolve_scalar(draw.fill_intensity, variables)
+    x_name, y_name = program.position
+    plot_points(append_draw, arrays[x_name][live], arrays[y_name][live], color_ids, intensities)
+
+
+def run_particle_step(
+    program: ParticleProgram,
+    variables: Any,
+    append_draw: Callable[[str, List[Any]], None],
+) -> None:
+    sources = {name: _get_array(variables, name) for name in program.state_arrays()}
+    count = min(src.size for src in sources.values())
+    if program.count:
+        count = max(0, min(count, resolve_size(program.count, variables)))
+    arrays = {name: np.asarray(src.data[:count], dtype=np.float64) for name, src in sources.items()}
+    scalars = _build_scalars(variables)
+
+    for _ in range(max(1, resolve_size(program.steps, variables))):
+        _step(program, arrays, variables, scalars)
+
+    for name, src in sources.items():
+        src.data[:count] = arrays[name].tolist()
+    if program.live_count:
+        _set_scalar(variables, program.live_count, float(_live_mask(program, arrays, count).sum()))
+
+    _render(program, arrays, variables, scalars, append_draw)
@@ -106,6 +106,7 @@ SPRITE_OP_PATTERN = re.compile(r'(show|hide|move|dispose)_sprite\((\w+)(?:,\s*(.
 PROCEDURE_DEF_PATTERN = re.compile(r'def (\w+) {')
 GRID_PROGRAM_DEF_PATTERN = re.compile(r'grid_program (\w+) \{')
 FIELD_PROGRAM_DEF_PATTERN = re.compile(r'field_program (\w+) \{')
+PARTICLE_PROGRAM_DEF_PATTERN = re.compile(r'particle_program (\w+) \{')
 PROCEDURE_CALL_PATTERN = re.compile(r'call (\w+)')
 FRAME_PARAM_PATTERN = re.compile(r'begin_frame\((.*)\)')
 FOR_LOOP_PATTERN = re.compile(r'for (v_\w+) in \((.+?), (.+?), (.+?)\)')
@@ -0,0 +1,196 @@
+"""
+Sampling profiler that attributes time to .pix source lines and procedures.
+
+cProfile reports interpreter functions (process_lines, evaluate_math_expression);
+script authors need the line of their animation that is slow. The interpreter
+already publishes the line it is executing through
+math_functions.set_current_script_line, and Pixil.py brackets procedure calls
+with enter()/exit(). A daemon thread samples both every `interval` seconds and
+charges the elapsed wall time, and the main thread's CPU time where the
+platform exposes it, to the (procedure stack, line) observed.
+
+Compiled procedures and loops run without per-line updates, so their time is
+charged to the calling line (the `call` or loop header) under the procedure's
+stack entry.
+
+Enabled with `Pixil.py <script> --profile`; see pixil_utils/cli.py.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from . import math_functions
+from .regex_patterns import PROCEDURE_DEF_PATTERN
+
+DEFAULT_INTERVAL = 0.002  # seconds between samples
+DEFAULT_TOP = 25
+MAIN = "<main>"
+
+
+def _normalize(line: str) -> str:
+    """Same comment stripping as Pixil.preprocess_lines."""
+    return line.split('#', 1)[0].strip()
+
+
+def map_source_lines(path) -> Dict[Tuple[str, Optional[str]], Tuple[int, ...]]:
+    """(line text, enclosing procedure or None) -> 1-based source line numbers."""
+    mapping: Dict[Tuple[str, Optional[str]], List[int]] = defaultdict(list)
+    procedure: Optional[str] = None
+    with open(path, 'r') as f:
+        for number, raw in enumerate(f, 1):
+            text = _normalize(raw)
+            if not text:
+                continue
+            if procedure is not None and text == '}':
+                procedure = None
+                continue
+            mapping[(text, procedure)].append(number)
+            if procedure is None and (match := PROCEDURE_DEF_PATTERN.match(text)):
+                procedure = match.group(1)
+    return {key: tuple(numbers) for key, numbers in mapping.items()}
+
+
+def _main_thread_cpu_clock() -> Optional[int]:
+    try:
+        return time.pthread_getcpuclockid(threading.main_thread().ident)
+    except (AttributeError, OSError):
+        return None
+
+
+class ScriptProfiler:
+    """Per-script sampler; start() before the script runs, stop() after."""
+
+    def __init__(self, source_path, interval: float = DEFAULT_INTERVAL):
+        self.source_path = str(source_path)
+        self.interval = max(0.0002, interval)
+        self.lines = map_source_lines(source_path)
+        # Tuple so the sampler thread always reads a consistent stack
+        self._stack: Tuple[str, ...] = ()
+        self._samples: Dict[Tuple[Tuple[str, ...], Optional[str]], List[float]] = {}
+        self._cpu_clock = _main_thread_cpu_clock()
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.wall_total = 0.0
+        self.cpu_total = 0.0
+        self.sample_count = 0
+
+    # -- interpreter hooks -------------------------------------------------
+
+    def enter(self, procedure: str) -> None:
+        self._stack = self._stack + (procedure,)
+
+    def exit(self) -> None:
+        self._stack = self._stack[:-1]
+
+    # -- sampler -----------------------------------------------------------
+
+    def _cpu_now(self) -> float:
+        return time.clock_gettime(self._cpu_clock) if self._cpu_clock is not None else 0.0
+
+    def _run(self) -> None:
+        last_wall = time.perf_counter()
+        last_cpu = self._cpu_now()
+        samples = self._samples
+        while self._running.is_set():
+            time.sleep(self.interval)
+            now_wall = time.perf_counter()
+            now_cpu = self._cpu_now()
+            key = (self._stack, math_functions._current_script_line)
+            entry = samples.get(key)
+            if entry is None:
+                entry = samples[key] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += now_wall - last_wall
+            entry[2] += now_cpu - last_cpu
+            last_wall, last_cpu = now_wall, now_cpu
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="pixil-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._running.clear()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self.sample_count = sum(int(e[0]) for e in self._samples.values())
+        self.wall_total = sum(e[1] for e in self._samples.values())
+        self.cpu_total = sum(e[2] for e in self._samples.values())
+
+    @property
+    def has_cpu_time(self) -> bool:
+        return self._cpu_clock is not None
+
+    # -- results -----------------------------------------------------------
+
+    def _line_numbers(self, stack: Tuple[str, ...], text: Optional[str]) -> str:
+        if not text:
+            return "-"
+        owner = stack[-1] if stack else None
+        numbers = self.lines.get((text, owner))
+        if numbers is None:
+            # Line defined elsewhere (e.g. a loop body run from a procedure call)
+            numbers = tuple(sorted(n for (t, _p), ns in self.lines.items() if t == text for n in ns))
+        return ",".join(str(n) for n in numbers) if numbers else "?"
+
+    def rows(self) -> List[Dict]:
+        """Samples as rows sorted by wall time (largest first)."""
+        total = self.wall_total or sum(e[1] for e in self._samples.values()) or 1.0
+        out = []
+        for (stack, text), (count, wall, cpu) in self._samples.items():
+            out.append({
+                "line_numbers": self._line_numbers(stack, text),
+                "procedure_stack": ";".join((MAIN,) + stack),
+                "source_text": text or "",
+                "samples": int(count),
+                "wall_time": wall,
+                "cpu_time": cpu,
+                "wall_percent": wall / total * 100.0,
+            })
+        out.sort(key=lambda r: r["wall_time"], reverse=True)
+        return out
+
+    def procedure_totals(self) -> List[Tuple[str, float, float]]:
+        """(procedure, inclusive wall, self wall) sorted by inclusive time."""
+        inclusive: Dict[str, float] = defaultdict(float)
+        own: Dict[str, float] = defaultdict(float)
+        for (stack, _text), (_count, wall, _cpu) in self._samples.items():
+            frames = (MAIN,) + stack
+            for name in set(frames):
+                inclusive[name] += wall
+            own[frames[-1]] += wall
+        return sorted(((n, inclusive[n], own[n]) for n in inclusive), key=lambda t: t[1], reverse=True)
+
+    def format_table(self, top: int = DEFAULT_TOP) -> str:
+        """Flame table: hottest (stack, line) pairs, then per-procedure totals."""
+        rows = self.rows()
+        cpu_note = "" if self.has_cpu_time else " (CPU time unavailable on this platform)"
+        lines = [
+            f"--- Script Profile: {self.source_path} ---",
+            f"Samples: {self.sample_count:,} every {self.interval * 1000:.1f} ms, "
+            f"wall {self.wall_total:.3f}s, CPU {self.cpu_total:.3f}s{cpu_note}",
+            f"{'Wall s':>8} {'Wall%':>6} {'CPU s':>8} {'Samples':>8}  {'Line':<10} {'Stack':<28} Source",
+        ]
+        for row in rows[:top]:
+            lines.append(
+                f"{row['wall_time']:>8.3f} {row['wall_percent']:>5.1f}% {row['cpu_time']:>8.3f} "
+                f"{row['samples']:>8}  {row['line_numbers'][:10]:<10} {row['procedure_stack'][-28:]:<28} "
+                f"{row['source_text'][:60]}"
+            )
+        if len(rows) > top:
+            lines.append(f"... {len(rows) - top} more line(s)")
+        procedures = self.procedure_totals()
+        if len(procedures) > 1:
+            lines.append("Procedures (inclusive / self wall seconds):")
+            for name, inclusive, own in procedures:
+                lines.append(f"  {name:<28} {inclusive:>8.3f} {own:>8.3f}")
+        lines.append("-" * 44)
+        return "\n".join(lines)
@@ -29,7 +29,7 @@ def reset_shutdown() -> None:
 
 
 def exit_pixil(queue_instance=None, queue_monitor=None) -> None:
-    """Stop the show: clear matrix, stop consumer, exit immediately (no metrics)."""
+    """Stop the show: clear matrix, stop consumer, write the trace and metrics, exit immediately."""
     if queue_monitor is not None:
         try:
             queue_monitor.stop()
@@ -53,6 +53,21 @@ def exit_pixil(queue_instance=None, queue_monitor=None) -> None:
             except Exception:
                 pass
 
+    # The consumer wrote its trace part while shutting down; merge it with ours
+    # here, as os._exit skips the finally block in Pixil.py
+    try:
+        from shared import latency_trace
+        latency_trace.finish_producer()
+    except Exception:
+        pass
+
+    # os._exit also skips atexit, so flush queued metrics runs now
+    try:
+        from database.metrics_writer import close_metrics_writer
+        close_metrics_writer()
+    except Exception:
+        pass
+
     os._exit(0)
 
 
@@ -0,0 +1,236 @@
+"""Uniform-grid spatial hash for particle neighbor queries.
+
+Points are binned into square cells by sorting their cell keys once
+(sort-and-bucket); a radius query then looks only at the cells within reach
+of each point's own cell, so a frame of queries costs about
+O(n log n + pairs) instead of O(n^2). Everything is array code: each cell
+offset is one vectorized pass that expands the matching bucket ranges into
+candidate (i, j) pairs and keeps those closer than the radius.
+
+Scripts reach it through the neighbor_* commands (run_neighbor_command) and
+particle_program through near_count / near_sum / near_avg.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .array_manager import PixilArray
+
+# (i, j, dx, dy, d2) with dx = x[j] - x[i] (shortest way round when wrapping)
+Pairs = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+# Argument counts accepted by each neighbor_<op> command
+NEIGHBOR_ARGS = {"grid": (3, 4), "count": (4,), "sum": (5,), "avg": (5,), "offset": (5,), "away": (5,)}
+
+
+class SpatialHash:
+    """Cell-binned point set; pairs(radius) lists every neighbor pair within radius."""
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, cell: float, wrap: float = 0.0):
+        if cell <= 0:
+            raise ValueError(f"spatial hash cell size must be positive, got {cell}")
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.ys = np.asarray(ys, dtype=np.float64)
+        self.wrap = float(wrap)
+        self._pairs: Dict[float, Pairs] = {}
+
+        if self.wrap > 0:
+            # Equal cells round the torus, none smaller than asked for
+            self.cols = self.rows = max(1, int(self.wrap // cell))
+            self.cell = self.wrap / self.cols
+        else:
+            self.cell = float(cell)
+        cx = np.floor(self.xs / self.cell).astype(np.int64)
+        cy = np.floor(self.ys / self.cell).astype(np.int64)
+        if self.wrap > 0:
+            cx %= self.cols
+            cy %= self.rows
+        elif self.xs.size:
+            cx -= cx.min()
+            cy -= cy.min()
+            self.cols = int(cx.max()) + 1
+            self.rows = int(cy.max()) + 1
+        else:
+            self.cols = self.rows = 1
+        self.cell_x = cx
+        self.cell_y = cy
+        keys = cy * self.cols + cx
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    @property
+    def size(self) -> int:
+        return self.xs.size
+
+    def _offsets(self, reach: int) -> List[Tuple[int, int]]:
+        span = range(-reach, reach + 1)
+        if self.wrap <= 0:
+            return [(ox, oy) for oy in span for ox in span]
+        # On a small torus several offsets land on the same cell; visit each once
+        cols = sorted({ox % self.cols for ox in span})
+        rows = sorted({oy % self.rows for oy in span})
+        return [(ox, oy) for oy in rows for ox in cols]
+
+    def pairs(self, radius: float) -> Pairs:
+        """Ordered pairs (both directions) of distinct points closer than radius (strictly)."""
+        cached = self._pairs.get(radius)
+        if cached is not None:
+            return cached
+        n = self.size
+        index = np.arange(n)
+        r2 = radius * radius
+        parts: List[Pairs] = []
+        for ox, oy in self._offsets(max(0, math.ceil(radius / self.cell))):
+            nx = self.cell_x + ox
+            ny = self.cell_y + oy
+            if self.wrap > 0:
+                nx %= self.cols
+                ny %= self.rows
+                valid = index
+            else:
+                valid = index[(nx >= 0) & (nx < self.cols) & (ny >= 0) & (ny < self.rows)]
+                nx = nx[valid]
+                ny = ny[valid]
+            keys = ny * self.cols + nx
+            starts = np.searchsorted(self.sorted_keys, keys, side="left")
+            counts = np.searchsorted(self.sorted_keys, keys, side="right") - starts
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # Expand every [start, start + count) bucket range into one flat index run
+            run_starts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            first = np.repeat(valid, counts)
+            second = self.order[run_starts + np.arange(total)]
+            dx = self.xs[second] - self.xs[first]
+            dy = self.ys[second] - self.ys[first]
+            if self.wrap > 0:
+                dx -= self.wrap * np.round(dx / self.wrap)
+                dy -= self.wrap * np.round(dy / self.wrap)
+            d2 = dx * dx + dy * dy
+            keep = (d2 < r2) & (first != second)
+            parts.append((first[keep], second[keep], dx[keep], dy[keep], d2[keep]))
+        if parts:
+            result = tuple(np.concatenate(column) for column in zip(*parts))
+        else:
+            empty = np.zeros(0, dtype=np.float64)
+            result = (np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), empty, empty, empty)
+        self._pairs[radius] = result
+        return result
+
+    def count(self, radius: float) -> np.ndarray:
+        first = self.pairs(radius)[0]
+        return np.bincount(first, minlength=self.size).astype(np.float64)
+
+    def sum(self, radius: float, values: np.ndarray) -> np.ndarray:
+        first, second = self.pairs(radius)[:2]
+        return np.bincount(first, weights=np.asarray(values, dtype=np.float64)[second], minlength=self.size)
+
+    def avg(self, radius: float, values: np.ndarray) -> np.ndarray:
+        return _safe_divide(self.sum(radius, values), self.count(radius))
+
+    def offset(self, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Average vector from each point to its neighbors (toward their centre)."""
+        first, _, dx, dy, _ = self.pairs(radius)
+        counts = self.count(radius)
+        sx = np.bincount(first, weights=dx, minlength=self.size)
+        sy = np.bincount(first, weights=dy, minlength=self.size)
+        return _safe_divide(sx, counts), _safe_divide(sy, counts)
+
+    def away(self, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Sum of unit vectors pointing away from each neighbor (coincident ones skipped)."""
+        first, _, dx, dy, d2 = self.pairs(radius)
+        dist = np.sqrt(d2)
+        inv = np.divide(1.0, dist, out=np.zeros_like(dist), where=dist > 0)
+        sx = np.bincount(first, weights=-dx * inv, minlength=self.size)
+        sy = np.bincount(first, weights=-dy * inv, minlength=self.size)
+        return sx, sy
+
+
+def _safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.zeros_like(num, dtype=np.float64), where=den != 0)
+
+
+# Hashes built by neighbor_grid, keyed by position array names
+_HASHES: Dict[Tuple[str, str], Tuple[PixilArray, PixilArray, SpatialHash]] = {}
+
+
+def _get_array(variables: Any, name: str) -> PixilArray:
+    arr = variables.get(name) if hasattr(variables, "get") else variables[name]
+    if not isinstance(arr, PixilArray):
+        raise ValueError(f"{name} is not an array")
+    return arr
+
+
+def _new_hash(x_arr: PixilArray, y_arr: PixilArray, cell: float, wrap: float = 0.0) -> SpatialHash:
+    count = min(x_arr.size, y_arr.size)
+    xs = np.asarray(x_arr.data[:count], dtype=np.float64)
+    ys = np.asarray(y_arr.data[:count], dtype=np.float64)
+    return SpatialHash(xs, ys, cell, wrap)
+
+
+def build_hash(variables: Any, x_name: str, y_name: str, cell: float, wrap: float = 0.0) -> SpatialHash:
+    """neighbor_grid: snapshot the positions into a hash that later queries reuse."""
+    x_arr = _get_array(variables, x_name)
+    y_arr = _get_array(variables, y_name)
+    spatial = _new_hash(x_arr, y_arr, cell, wrap)
+    _HASHES[(x_name, y_name)] = (x_arr, y_arr, spatial)
+    return spatial
+
+
+def _hash_for(variables: Any, x_name: str, y_name: str, radius: float) -> SpatialHash:
+    x_arr = _get_array(variables, x_name)
+    y_arr = _get_array(variables, y_name)
+    entry = _HASHES.get((x_name, y_name))
+    if entry is not None and entry[0] is x_arr and entry[1] is y_arr:
+        return entry[2]
+    # No neighbor_grid for these arrays (or a new script reused the names): one-off hash
+    return _new_hash(x_arr, y_arr, max(radius, 1.0))
+
+
+def _store(variables: Any, name: str, values: np.ndarray) -> None:
+    arr = _get_array(variables, name)
+    count = min(arr.size, values.size)
+    arr.data[:count] = values[:count].tolist()
+
+
+def run_neighbor_command(op: str, args: List[str], variables: Any, evaluate) -> None:
+    """Execute neighbor_<op>(...) with raw argument strings; evaluate() resolves numeric args.
+
+    neighbor_grid(x, y, cell[, wrap])
+    neighbor_count(x, y, radius, out)
+    neighbor_sum(x, y, radius, values, out)    neighbor_avg(x, y, radius, values, out)
+    neighbor_offset(x, y, radius, out_x, out_y) neighbor_away(x, y, radius, out_x, out_y)
+    """
+    if op not in NEIGHBOR_ARGS:
+        raise ValueError(f"Unknown neighbor command: neighbor_{op}")
+    if len(args) not in NEIGHBOR_ARGS[op]:
+        counts = " or ".join(str(c) for c in NEIGHBOR_ARGS[op])
+        raise ValueError(f"neighbor_{op} expects {counts} arguments, got {len(args)}")
+    x_name, y_name = args[0].strip(), args[1].strip()
+    if op == "grid":
+        wrap = float(evaluate(args[3])) if len(args) == 4 else 0.0
+        build_hash(variables, x_name, y_name, float(evaluate(args[2])), wrap)
+        return
+    radius = float(evaluate(args[2]))
+    spatial = _hash_for(variables, x_name, y_name, radius)
+    if op == "count":
+        _store(variables, args[3].strip(), spatial.count(radius))
+    elif op in ("sum", "avg"):
+        values = _get_array(variables, args[3].strip())
+        if values.size < spatial.size:
+            raise ValueError(f"neighbor_{op}: {args[3].strip()} is shorter than the position arrays")
+        data = np.asarray(values.data[:spatial.size], dtype=np.float64)
+        result = spatial.sum(radius, data) if op == "sum" else spatial.avg(radius, data)
+        _store(variables, args[4].strip(), result)
+    else:
+        out_x, out_y = spatial.offset(radius) if op == "offset" else spatial.away(radius)
+        _store(variables, args[3].strip(), out_x)
+        _store(variables, args[4].strip(), out_y)
+
+
+def reset_hashes() -> None:
+    _HASHES.clear()
@@ -7,10 +7,16 @@ record_* functions are no-ops — no measurable impact on lightshow runs.
 
 from __future__ import annotations
 
+import json
 import os
+import time
 from dataclasses import dataclass, field
 
 _ENV_FLAG = "PIXIL_TEST_MODE"
+# Benchmark mode (tests/scripts/run_bench.py): test mode plus stats lines.
+_BENCH_FLAG = "PIXIL_BENCH"
+_BENCH_FRAMES = "PIXIL_BENCH_FRAMES"
+_SEED_ENV = "PIXIL_RANDOM_SEED"
 
 # Cap rests in test mode (seconds) so Tier 2 finishes quickly.
 REST_CAP_SECONDS = float(os.environ.get("PIXIL_TEST_REST_CAP", "0.01"))
@@ -111,3 +117,168 @@ def note_fail_in_line(text: str) -> None:
     """Call from print paths when output may contain self-check failures."""
     if is_test_mode() and "FAIL" in text.upper():
         record_fail_line()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark mode (PIXIL_BENCH=1, always together with PIXIL_TEST_MODE=1)
+# ---------------------------------------------------------------------------
+
+def is_bench_mode() -> bool:
+    val = os.environ.get(_BENCH_FLAG, "").strip().lower()
+    return val in ("1", "true", "yes", "on") and is_test_mode()
+
+
+def random_seed():
+    """Seed from PIXIL_RANDOM_SEED, or None (unseeded) when unset/invalid."""
+    raw = os.environ.get(_SEED_ENV, "").strip()
+    if not raw:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return None
+
+
+def seed_script_randomness() -> None:
+    """Seed random() and NumPy so benchmark runs are reproducible."""
+    seed = random_seed()
+    if seed is None:
+        return
+    import random
+
+    random.seed(seed)
+    try:
+        import numpy as np
+
+        np.random.seed(seed & 0xFFFFFFFF)
+    except ImportError:
+        pass
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of values (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return float(ordered[rank])
+
+
+def distribution(values) -> dict:
+    """Summary used for frame times and queue depth in bench JSON."""
+    if not values:
+        return {"n": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "n": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p90": round(percentile(values, 90), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(float(max(values)), 4),
+    }
+
+
+def allocation_snapshot() -> dict:
+    """Cheap allocation counters: live blocks, gc collections, peak RSS (KiB)."""
+    import gc
+    import sys
+
+    snap = {
+        "blocks": sys.getallocatedblocks(),
+        "gc_collections": sum(s.get("collections", 0) for s in gc.get_stats()),
+        "max_rss_kb": 0,
+    }
+    try:
+        import resource
+
+        snap["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, OSError):
+        pass
+    return snap
+
+
+def allocation_delta(start: dict) -> dict:
+    end = allocation_snapshot()
+    return {
+        "blocks_delta": end["blocks"] - start["blocks"],
+        "gc_collections": end["gc_collections"] - start["gc_collections"],
+        "max_rss_kb": end["max_rss_kb"],
+    }
+
+
+class BenchSampler:
+    """Per-process bench counters; printed as one PIXIL_BENCH_<ROLE> JSON line."""
+
+    def __init__(self, role: str):
+        self.role = role
+        self.reset()
+
+    def reset(self) -> None:
+        self.frames = 0
+        self.frame_ms = []
+        self.present_ms = []
+        self.queue_depth = []
+        self.busy_s = 0.0
+        self.commands = 0
+        self._frame_busy = 0.0
+        self._last_tick = time.perf_counter()
+        self._alloc_start = allocation_snapshot()
+
+    def add_command(self, seconds: float) -> None:
+        self.commands += 1
+        self.busy_s += seconds
+        self._frame_busy += seconds
+
+    def end_frame(self, present_seconds: float = 0.0, depth=None) -> None:
+        """Close a frame: its busy time is every command since the previous one."""
+        self.frames += 1
+        self.frame_ms.append(self._frame_busy * 1000.0)
+        self.present_ms.append(present_seconds * 1000.0)
+        self._frame_busy = 0.0
+        if depth is not None:
+            self.queue_depth.append(depth)
+
+    def tick_frame(self, depth=None) -> None:
+        """Producer side: a frame's time is the wall interval since the previous tick."""
+        now = time.perf_counter()
+        self._frame_busy = now - self._last_tick
+        self._last_tick = now
+        self.end_frame(0.0, depth)
+
+    def sample_depth(self, depth) -> None:
+        if depth is not None:
+            self.queue_depth.append(depth)
+
+    def frame_limit_reached(self) -> bool:
+        limit = bench_frame_limit()
+        return limit is not None and self.frames >= limit
+
+    def summary(self, **extra) -> dict:
+        data = {
+            "frames": self.frames,
+            "commands": self.commands,
+            "busy_s": round(self.busy_s, 4),
+            "frame_ms": distribution(self.frame_ms),
+            "present_ms": distribution(self.present_ms),
+            "queue_depth": distribution(self.queue_depth),
+            "alloc": allocation_delta(self._alloc_start),
+        }
+        data.update(extra)
+        return data
+
+    def emit(self, **extra) -> dict:
+        data = self.summary(**extra)
+        print(f"PIXIL_BENCH_{self.role.upper()} {json.dumps(data, sort_keys=True)}", flush=True)
+        return data
+
+
+def bench_frame_limit():
+    """PIXIL_BENCH_FRAMES as int, or None for a time-limited run."""
+    raw = os.environ.get(_BENCH_FRAMES, "").strip()
+    if not raw:
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        return None
+    return value if value > 0 else None
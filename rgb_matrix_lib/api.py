@@ -1,11 +1,11 @@
 # File: rgb_matrix_lib/api.py
 
-from rgbmatrix import RGBMatrix, RGBMatrixOptions
 from PIL import Image, ImageDraw, ImageFont
 import time
 import math
 from .drawing_objects import DrawingObject, ShapeType, ThreadedBurnoutManager, BurnoutMode
-from .utils import get_color_rgb, polygon_vertices, arc_points, TRANSPARENT_COLOR, GRID_SIZE, get_grid_cells, is_transparent
+from .utils import get_color_rgb, polygon_vertices, arc_points, TRANSPARENT_COLOR, GRID_SIZE, get_grid_cells, is_transparent, SCALE_LUT
+from .utils import COLOR_LUT, COLOR_ID_OFFSET
 from typing import Optional, List, Tuple, Union, Any
 from .debug import debug, Level, Component, configure_debug
 from .sprite import MatrixSprite, SpriteManager, SpriteInstance
@@ -14,12 +14,21 @@ import numpy as np
 from .text_effects import TextEffect, EffectModifier
 from .text_renderer import TextRenderer
 from .commands import CommandExecutor  # Added CommandExecutor import
+from .display_backend import create_matrix
+from shared import latency_trace
+from shared.consumer_stats import ConsumerStats
+from shared.draw_batch_protocol import RASTER_SKIP
 
 #configure_debug(level=Level.DEBUG)
 
 # Performance tuning flag
 USE_PIL_FOR_FRAME_MODE = True  # Set to True to use PIL Image approach
 
+# Presentation scheduler: fade tick when fps() pacing is off, and the longest the
+# consumer blocks on an empty queue before re-checking shutdown/drain flags.
+FADE_PUMP_INTERVAL = 0.033
+IDLE_WAIT_INTERVAL = 0.05
+
 # Global instance for internal use
 _api_instance: Optional['RGB_Api'] = None
 
@@ -53,11 +62,14 @@ def cleanup() -> None:
             print("API module-level cleanup: instance set to None")
 
 class RGB_Api:
-    def __init__(self):
+    # Display-side counters reported to the producer (None on bare test instances)
+    consumer_stats: Optional[ConsumerStats] = None
+
+    def __init__(self, backend: Optional[str] = None):
+        """backend: 'hardware', 'framebuffer' or 'null' (default: PIXIL_DISPLAY_BACKEND)."""
         debug(f"Initializing RGB_Api from {__file__}", Level.INFO, Component.SYSTEM)
         
-        self.options = self._configure_matrix_options()
-        self.matrix = RGBMatrix(options=self.options)
+        self.matrix, self.options = create_matrix(backend)
         self.canvas = self.matrix.CreateFrameCanvas()
         self.drawing_buffer = np.full((self.matrix.height, self.matrix.width, 3), TRANSPARENT_COLOR, dtype=np.uint8)
         self.current_command_pixels = []
@@ -75,6 +87,7 @@ class RGB_Api:
         self.burnout_manager.start()
         self._drain_checker = None
         self._shutdown_checker = None
+        self.consumer_stats = ConsumerStats()
 
         debug("RGB_Api initialization complete", Level.INFO, Component.SYSTEM)
 
@@ -104,6 +117,7 @@ class RGB_Api:
     def set_fps(self, fps: float) -> None:
         """Set maximum display refresh rate. fps<=0 disables pacing (full speed)."""
         rate = float(fps)
+        self._last_present_time = 0.0  # The next present starts a new pacing cadence
         if rate <= 0:
             self._target_fps = 0.0
             self._frame_interval = 0.0
@@ -173,23 +187,6 @@ class RGB_Api:
         if not self.frame_mode:
             self.refresh_display()
 
-    def _configure_matrix_options(self):
-        """Configure and return matrix options."""
-        debug("Configuring matrix options", Level.DEBUG, Component.MATRIX)
-        options = RGBMatrixOptions()
-        options = RGBMatrixOptions()
-        options.rows = 64
-        options.cols = 64
-        options.hardware_mapping = 'adafruit-hat'
-        options.gpio_slowdown = 3
-        options.scan_mode = 1
-        options.pwm_bits = 11
-        options.brightness = 100
-        options.limit_refresh_rate_hz = 0  # No throttling
-
-        debug(f"Matrix configured: {options.rows}x{options.cols}", Level.DEBUG, Component.MATRIX)
-        return options
-
     def _get_color(self, color: Union[str, int, Tuple[int, int, int]], intensity: int = 100) -> Tuple[int, int, int]:
         """Get RGB tuple for a color input with optional intensity."""
         # Clamp intensity to 0-99 (max per rgb_matrix_lib)
@@ -223,6 +220,13 @@ class RGB_Api:
 
     def end_frame(self):
         if self.frame_mode:
+            trace_start = latency_trace.now_us() if latency_trace.ENABLED else 0
+            stats = self.consumer_stats
+            if stats is not None:
+                present_start = time.perf_counter()
+                # Preserve frames write incrementally; standard frames start from a clear buffer
+                pixels_written = len(self.current_command_pixels) if self.preserve_frame_changes else \
+                    int(np.count_nonzero(np.any(self.drawing_buffer != TRANSPARENT_COLOR, axis=2)))
             if self.background_manager.has_background():
                 # --- BACKGROUND PATH ---
                 # Composite background layers + drawing_buffer once
@@ -282,6 +286,14 @@ class RGB_Api:
             self.current_command_pixels.clear()
             self.frame_mode = False
             self.preserve_frame_changes = False
+            if stats is not None:
+                present_seconds = time.perf_counter() - present_start
+                stats.record_present(present_seconds, pixels_written, end_frame=True)
+                # Time since the previous paced present; over the interval means nothing left to sleep
+                elapsed = time.perf_counter() - self._last_present_time if self._last_present_time > 0 else 0.0
+                stats.record_frame(present_seconds, self._frame_interval, elapsed)
+            if trace_start:
+                latency_trace.span("present", "present", trace_start, latency_trace.now_us())
             self._pace_after_present()
 
 #    def end_frame(self):
@@ -339,9 +351,13 @@ class RGB_Api:
     def _maybe_swap_buffer(self):
         """Handle buffer swapping based on mode."""
         if not self.frame_mode:
+            present_start = time.perf_counter()
             self.canvas = self.matrix.SwapOnVSync(self.canvas)
             for x, y, r, g, b in self.current_command_pixels:
                 self.canvas.SetPixel(x, y, r, g, b)
+            if self.consumer_stats is not None:
+                self.consumer_stats.record_present(time.perf_counter() - present_start,
+                                                   len(self.current_command_pixels))
             self.current_command_pixels.clear()
             self._pace_after_present()
 
@@ -397,8 +413,8 @@ class RGB_Api:
             if not (0 <= x < self.matrix.width and 0 <= y < self.matrix.height):
                 continue
                 
-            # Get RGB color
-            rgb_color = self._get_color(color, intensity if intensity is not None else 100)
+            # Get RGB color (palette table lookup; skips _get_color's per-call trace formatting)
+            rgb_color = get_color_rgb(color, 100 if intensity is None else intensity)
             
             self._draw_to_buffers(x, y, rgb_color[0], rgb_color[1], rgb_color[2])
             
@@ -427,6 +443,42 @@ class RGB_Api:
             debug(f"Batch plotted {pixels_plotted} pixels atomically (no burnouts)", 
                 Level.DEBUG, Component.COMMAND)
         
+    def draw_raster(self, x: int, y: int, pixels: np.ndarray, intensities: Optional[np.ndarray] = None):
+        """Blit a dense pixel plane (draw_batch RASTER record) in one array copy.
+
+        Args:
+            x, y: Top-left corner of the plane
+            pixels: (h, w) wire color ids, RASTER_SKIP where nothing is drawn,
+                    or an (h, w, 3) uint8 RGB plane when intensities is None
+            intensities: (h, w) brightness 0-100 for color id planes
+        """
+        height = min(pixels.shape[0], self.matrix.height - y)
+        width = min(pixels.shape[1], self.matrix.width - x)
+        if height <= 0 or width <= 0:
+            return
+        pixels = pixels[:height, :width]
+        region = self.drawing_buffer[y:y + height, x:x + width]
+        if intensities is None:
+            region[:] = pixels
+            drawn = None
+            rgb = pixels
+        else:
+            ids = pixels.astype(np.intp) + COLOR_ID_OFFSET
+            np.clip(ids, 0, len(COLOR_LUT) - 1, out=ids)
+            rgb = COLOR_LUT[ids, np.minimum(intensities[:height, :width], 100)]
+            drawn = pixels != RASTER_SKIP
+            region[drawn] = rgb[drawn]
+        if not self.frame_mode or self.preserve_frame_changes:
+            # Outside standard frame mode pixels also go straight to the canvas
+            ys, xs = np.nonzero(drawn) if drawn is not None else np.indices((height, width)).reshape(2, -1)
+            set_pixel = self.canvas.SetPixel
+            tracked = self.current_command_pixels
+            for py, px, (r, g, b) in zip((ys + y).tolist(), (xs + x).tolist(), rgb[ys, xs].tolist()):
+                set_pixel(px, py, r, g, b)
+                tracked.append((px, py, r, g, b))
+        self._maybe_swap_buffer()
+        debug(f"Raster blit {width}x{height} at ({x}, {y})", Level.TRACE, Component.DRAWING)
+
     def draw_line(self, x0: int, y0: int, x1: int, y1: int, color: Union[str, int], 
                   intensity: int = 100, burnout: Optional[int] = None, burnout_mode: str = "instant"):
         """Draw a line between two points.
@@ -902,7 +954,13 @@ class RGB_Api:
         text_effect = effect if isinstance(effect, TextEffect) else TextEffect[effect.upper()]
         effect_modifier = modifier if isinstance(modifier, EffectModifier) else \
                         (EffectModifier[modifier.upper()] if modifier else None)
-        self.text_renderer.render_text(x, y, text, font_name, font_size, rgb_color, text_effect, effect_modifier)
+        if text_effect is TextEffect.NORMAL or self.consumer_stats is None:
+            self.text_renderer.render_text(x, y, text, font_name, font_size, rgb_color, text_effect, effect_modifier)
+        else:
+            # Animated effects sleep inside the consumer; nothing else runs meanwhile
+            stall_start = time.perf_counter()
+            self.text_renderer.render_text(x, y, text, font_name, font_size, rgb_color, text_effect, effect_modifier)
+            self.consumer_stats.record_text_stall(time.perf_counter() - stall_start)
         self._maybe_swap_buffer()
 
     def clear_text(self, x: int, y: int) -> None:
@@ -952,50 +1010,79 @@ class RGB_Api:
             self.canvas.Fill(0, 0, 0)
             self.canvas = self.matrix.SwapOnVSync(self.canvas)
 
-    def pump_fade_display(self, min_interval: float = 0.033, force: bool = False) -> None:
-        """Push burnout fade updates to the physical LEDs (non-frame mode only).
+    def next_present_time(self) -> Optional[float]:
+        """When the consumer should present on its own (time.time() clock), or None if idle.
 
         The burnout thread updates drawing_buffer (and the back canvas) continuously,
-        but SwapOnVSync only runs on plot/rest/refresh. Without periodic pumps, fade mode
-        looks like instant burnout until something calls refresh_display().
+        but SwapOnVSync only runs on plot/rest/refresh. Active fades and already-applied
+        expiries present on the next tick (the fps() interval, or FADE_PUMP_INTERVAL
+        when unpaced); otherwise the plan is the earliest pending burnout expiry.
+        Frame mode presents at end_frame, so nothing is scheduled.
         """
         if self.frame_mode:
-            return
-        if not self.burnout_manager.has_active_fades():
-            return
+            return None
+        burnouts = self.burnout_manager
+        interval = self._frame_interval if self._frame_interval > 0 else FADE_PUMP_INTERVAL
+        next_tick = self._last_fade_pump_time + interval
+        if burnouts.has_active_fades() or burnouts.has_pending_changes():
+            return next_tick
+        expiry = burnouts.next_expiry()
+        if expiry is None:
+            return None
+        # The burnout thread clears expired objects within one wake interval
+        return max(expiry + burnouts.BURNOUT_WAKE_INTERVAL, next_tick)
+
+    def presentation_wait(self, max_wait: float = IDLE_WAIT_INTERVAL) -> float:
+        """Seconds the consumer may block waiting for commands before a present is due."""
+        due = self.next_present_time()
+        if due is None:
+            return max_wait
+        return min(max_wait, max(0.0, due - time.time()))
+
+    def pump_presentation(self, force: bool = False) -> bool:
+        """Present burnout/fade updates if the scheduler says one is due (non-frame mode only).
+
+        Cheap when nothing is due, so the consumer calls it between commands as well as
+        when idle; fades stay smooth even when the queue never empties. Returns True if
+        the display was refreshed.
+        """
+        if self.frame_mode:
+            return False
         now = time.time()
-        if not force and (now - self._last_fade_pump_time) < min_interval:
-            return
+        if not force:
+            due = self.next_present_time()
+            if due is None or now < due:
+                return False
         self._last_fade_pump_time = now
         if (
             self.burnout_manager.check_and_reset_changes()
             or self.burnout_manager.has_active_fades()
         ):
-            debug("Pumping fade updates to display", Level.TRACE, Component.SYSTEM)
+            debug("Pumping burnout updates to display", Level.TRACE, Component.SYSTEM)
             self.refresh_display()
+            if self.consumer_stats is not None:
+                self.consumer_stats.record_fade_pump(self.burnout_manager.live_count())
+            return True
+        return False
 
     def rest(self, duration: float):
-        """Rest for a duration while still checking burnouts."""
+        """Rest for a duration while still presenting burnouts and fades on schedule."""
         from pixil_utils.test_hooks import effective_rest_duration, record_rest
 
         duration = effective_rest_duration(duration)
         record_rest()
         debug(f"Resting for {duration} seconds", Level.DEBUG, Component.COMMAND)
         end_time = time.time() + duration
-        last_refresh_time = time.time()
-        refresh_interval = 0.05  # Refresh display every 50ms
         
-        while time.time() < end_time:
+        while True:
             if self.drain_abort_requested():
                 break
-            current_time = time.time()
-
-            if current_time - last_refresh_time >= refresh_interval:
-                self.pump_fade_display(min_interval=0, force=True)
-                last_refresh_time = current_time
-                
-            # Sleep for a small amount of time
-            time.sleep(min(0.01, end_time - current_time))
+            self.pump_presentation()
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                break
+            # Sleep until the next planned present, capped so drain stays responsive
+            time.sleep(max(0.001, min(0.01, remaining, self.presentation_wait())))
 
     # Sprite Management Methods
     def show_sprite(self, name: str, x: float, y: float, instance_id: int = 0, 
@@ -1015,40 +1102,13 @@ class RGB_Api:
               (f" cel {cel_idx}" if cel_idx is not None else ""), 
             Level.INFO, Component.SPRITE)
         
-        # Get or create the instance
-        instance = self.sprite_manager.get_instance(name, instance_id)
-        is_new_instance = False
-        
-        if not instance:
-            # Create new instance from template - use cel_idx or default to 0
-            initial_cel = cel_idx if cel_idx is not None else 0
-            instance = self.sprite_manager.create_instance(name, instance_id, x, y, z_index, initial_cel)
-            if not instance:
-                debug(f"Cannot show sprite '{name}' instance {instance_id}: template doesn't exist", 
-                    Level.ERROR, Component.SPRITE)
-                return
-            is_new_instance = True
-        
-        # If already visible, mark old position dirty
-        if instance.visible:
-            old_cells = get_grid_cells(int(instance.x), int(instance.y), instance.width, instance.height)
-            self._mark_cells_dirty(old_cells)
-        
-        # Update instance state
-        instance.x = int(x)
-        instance.y = int(y)
-        instance.visible = True
-        
-        # Only change cel if explicitly specified, or if this is a new instance
-        if cel_idx is not None:
-            instance.set_cel(cel_idx)
-        # If not specified and existing instance, preserve current cel (do nothing)
-        
-        new_cells = set(get_grid_cells(int(x), int(y), instance.width, instance.height))
-        instance.occupied_cells = new_cells
+        dirty_cells = self._apply_show_sprite(name, x, y, instance_id, z_index, cel_idx)
+        if dirty_cells is None:
+            return
+        self._mark_cells_dirty(dirty_cells)
         
         if not self.frame_mode:
-            self._present_sprite_update(instance)
+            self._present_sprite_update(self.sprite_manager.get_instance(name, instance_id))
 
     def hide_sprite(self, name: str, instance_id: int = 0):
         """
@@ -1057,12 +1117,9 @@ class RGB_Api:
         """
         debug(f"Hiding sprite '{name}' instance {instance_id}", Level.INFO, Component.SPRITE)
         
-        instance = self.sprite_manager.get_instance(name, instance_id)
-        if instance and instance.visible:
-            cells = get_grid_cells(int(instance.x), int(instance.y), instance.width, instance.height)
-            self._mark_cells_dirty(cells)
-            instance.visible = False
-            instance.occupied_cells.clear()
+        dirty_cells = self._apply_hide_sprite(name, instance_id)
+        if dirty_cells is not None:
+            self._mark_cells_dirty(dirty_cells)
             if not self.frame_mode:
                 self._present_sprite_update()
 
@@ -1085,30 +1142,119 @@ class RGB_Api:
               (f" cel {cel_idx}" if cel_idx is not None else " (auto-advance)"), 
             Level.INFO, Component.SPRITE)
         
-        instance = self.sprite_manager.get_instance(name, instance_id)
-        if instance and instance.visible:
-            # Mark old position dirty
-            old_cells = get_grid_cells(int(instance.x), int(instance.y), instance.width, instance.height)
-            self._mark_cells_dirty(old_cells)
-            
-            # Update position
-            instance.x = int(x)
-            instance.y = int(y)
-            
-            # Handle cel animation
-            if cel_idx is not None:
-                # Explicit cel specified - jump to it
-                instance.set_cel(cel_idx)
-            else:
-                # Auto-advance to next cel (with wrap)
-                instance.advance_cel()
-            
-            # Update occupied cells
-            new_cells = set(get_grid_cells(int(x), int(y), instance.width, instance.height))
-            instance.occupied_cells = new_cells
-            
+        dirty_cells = self._apply_move_sprite(name, x, y, instance_id, cel_idx)
+        if dirty_cells is not None:
+            self._mark_cells_dirty(dirty_cells)
             if not self.frame_mode:
-                self._present_sprite_update(instance)
+                self._present_sprite_update(self.sprite_manager.get_instance(name, instance_id))
+
+    def apply_sprite_batch(self, ops: List[Tuple[str, tuple]]) -> int:
+        """
+        Apply a list of (command_name, args) sprite ops as one state transaction.
+
+        Every show/move/hide updates instance position, cel and visibility first;
+        dirty cells are collected into one set and marked once, then (outside frame
+        mode) the display is composited and presented a single time. Unknown ops
+        are logged and skipped. Returns the number of ops applied.
+        """
+        dirty: set = set()
+        changed = False
+        count = 0
+        for cmd_name, args in ops:
+            if self.drain_abort_requested():
+                break
+            if cmd_name == 'show_sprite':
+                cells = self._apply_show_sprite(*args)
+            elif cmd_name == 'move_sprite':
+                cells = self._apply_move_sprite(*args)
+            elif cmd_name == 'hide_sprite':
+                cells = self._apply_hide_sprite(*args)
+            else:
+                # Raising here would leave the ops before it applied but never presented
+                debug(f"sprite_batch: skipping unknown command {cmd_name}", Level.ERROR, Component.SPRITE)
+                continue
+            count += 1
+            if cells is not None:
+                changed = True
+                dirty.update(cells)
+
+        if dirty:
+            self._mark_cells_dirty(dirty)
+        if changed and not self.frame_mode:
+            self._present_sprite_update()
+        debug(f"Applied sprite batch of {count} ops ({len(dirty)} dirty cells)",
+              Level.DEBUG, Component.SPRITE)
+        return count
+
+    def _apply_show_sprite(self, name: str, x: float, y: float, instance_id: int = 0,
+                           z_index: int = 0, cel_idx: Optional[int] = None) -> Optional[List[Tuple[int, int]]]:
+        """Update show_sprite state without presenting. Returns dirty cells, or None if nothing changed."""
+        # Get or create the instance
+        instance = self.sprite_manager.get_instance(name, instance_id)
+        
+        if not instance:
+            # Create new instance from template - use cel_idx or default to 0
+            initial_cel = cel_idx if cel_idx is not None else 0
+            instance = self.sprite_manager.create_instance(name, instance_id, x, y, z_index, initial_cel)
+            if not instance:
+                debug(f"Cannot show sprite '{name}' instance {instance_id}: template doesn't exist", 
+                    Level.ERROR, Component.SPRITE)
+                return None
+        
+        # If already visible, mark old position dirty
+        dirty_cells: List[Tuple[int, int]] = []
+        if instance.visible:
+            dirty_cells = get_grid_cells(int(instance.x), int(instance.y), instance.width, instance.height)
+        
+        # Update instance state
+        instance.x = int(x)
+        instance.y = int(y)
+        instance.visible = True
+        
+        # Only change cel if explicitly specified, or if this is a new instance
+        if cel_idx is not None:
+            instance.set_cel(cel_idx)
+        # If not specified and existing instance, preserve current cel (do nothing)
+        
+        new_cells = get_grid_cells(int(x), int(y), instance.width, instance.height)
+        self.sprite_manager.move_sprite(name, instance_id, new_cells)
+        return dirty_cells
+
+    def _apply_hide_sprite(self, name: str, instance_id: int = 0) -> Optional[List[Tuple[int, int]]]:
+        """Update hide_sprite state without presenting. Returns dirty cells, or None if not visible."""
+        instance = self.sprite_manager.get_instance(name, instance_id)
+        if not (instance and instance.visible):
+            return None
+        cells = get_grid_cells(int(instance.x), int(instance.y), instance.width, instance.height)
+        self.sprite_manager.hide_sprite(name, instance_id)
+        return cells
+
+    def _apply_move_sprite(self, name: str, x: float, y: float, instance_id: int = 0,
+                           cel_idx: Optional[int] = None) -> Optional[List[Tuple[int, int]]]:
+        """Update move_sprite state without presenting. Returns dirty cells, or None if not visible."""
+        instance = self.sprite_manager.get_instance(name, instance_id)
+        if not (instance and instance.visible):
+            return None
+
+        # Mark old position dirty
+        old_cells = get_grid_cells(int(instance.x), int(instance.y), instance.width, instance.height)
+        
+        # Update position
+        instance.x = int(x)
+        instance.y = int(y)
+        
+        # Handle cel animation
+        if cel_idx is not None:
+            # Explicit cel specified - jump to it
+            instance.set_cel(cel_idx)
+        else:
+            # Auto-advance to next cel (with wrap)
+            instance.advance_cel()
+        
+        # Update occupied cells (and the manager's spatial index)
+        new_cells = get_grid_cells(int(x), int(y), instance.width, instance.height)
+        self.sprite_manager.move_sprite(name, instance_id, new_cells)
+        return old_cells
 
     def dispose_sprite_instance(self, name: str, instance_id: int):
         """Remove a specific sprite instance."""
@@ -1162,34 +1308,23 @@ class RGB_Api:
         start_y = max(0, y)
         end_x = min(self.matrix.width, x + sprite.width)
         end_y = min(self.matrix.height, y + sprite.height)
-        sprite_start_x = max(0, -x)
-        sprite_start_y = max(0, -y)
-        pixels_copied = 0
-        pixels_skipped = 0
-        for sy in range(sprite_start_y, sprite.height):
-            dy = y + sy
-            if dy >= end_y:
-                break
-            if dy < start_y:
-                continue
-            for sx in range(sprite_start_x, sprite.width):
-                dx = x + sx
-                if dx >= end_x:
-                    break
-                if dx < start_x:
-                    continue
-                r, g, b = sprite.buffer[sy][sx]
-                if (r, g, b) != TRANSPARENT_COLOR:
-                    intensity = sprite.intensity_buffer[sy][sx]
-                    scale = intensity / 100.0
-                    scaled_rgb = (int(r * scale), int(g * scale), int(b * scale))
-                    debug(f"Copying sprite pixel ({dx}, {dy}) with RGB {scaled_rgb} (intensity: {intensity}%)", 
-                        Level.TRACE, Component.SPRITE)
-                    dest_buffer.SetPixel(dx, dy, scaled_rgb[0], scaled_rgb[1], scaled_rgb[2])
-                    pixels_copied += 1
-                else:
-                    pixels_skipped += 1
-        debug(f"Sprite copy complete: {pixels_copied} pixels copied, {pixels_skipped} skipped", 
+        if start_x >= end_x or start_y >= end_y:
+            return
+        sprite_start_x = start_x - x
+        sprite_start_y = start_y - y
+        buf = sprite.buffer[sprite_start_y:sprite_start_y + (end_y - start_y),
+                            sprite_start_x:sprite_start_x + (end_x - start_x)]
+        inten = sprite.intensity_buffer[sprite_start_y:sprite_start_y + (end_y - start_y),
+                                        sprite_start_x:sprite_start_x + (end_x - start_x)]
+        # Scale the visible region through the intensity table in one gather,
+        # then push only the opaque pixels.
+        opaque = np.any(buf != TRANSPARENT_COLOR, axis=2)
+        ys, xs = np.nonzero(opaque)
+        scaled = SCALE_LUT[buf[ys, xs], np.minimum(inten[ys, xs], 100)[:, None]]
+        set_pixel = dest_buffer.SetPixel
+        for dy, dx, (r, g, b) in zip((ys + start_y).tolist(), (xs + start_x).tolist(), scaled.tolist()):
+            set_pixel(dx, dy, r, g, b)
+        debug(f"Sprite copy complete: {len(ys)} pixels copied, {opaque.size - len(ys)} skipped", 
             Level.TRACE, Component.SPRITE)
     
     def clear_sprite_position(self, sprite: Union[SpriteInstance, MatrixSprite], dest_buffer):
@@ -3,7 +3,7 @@
 import numpy as np
 from typing import Optional, Dict
 from .debug import debug, Level, Component
-from .utils import TRANSPARENT_COLOR
+from .utils import TRANSPARENT_COLOR, SCALE_LUT
 
 
 class BackgroundLayerState:
@@ -230,7 +230,7 @@ class BackgroundManager:
         Uses vectorized numpy operations for performance:
         1. Build coordinate index arrays for the tiled+offset lookup
         2. Gather all pixels in one indexing operation
-        3. Apply intensity scaling with vectorized multiply
+        3. Apply intensity scaling with a SCALE_LUT gather
         4. Fix any pixels that accidentally land on the sentinel value
         """
         cel_buf = template.get_cel_buffer(state.cel_index)
@@ -255,14 +255,10 @@ class BackgroundManager:
         needs_scaling = intensity != 100
 
         if np.any(needs_scaling):
-            # Scale only the pixels that need it
-            # Convert to float32 for the multiply, then back to uint8
-            scale = intensity[needs_scaling].astype(np.float32) / 100.0  # shape (N,)
-            pixels = result[needs_scaling].astype(np.float32)            # shape (N, 3)
-            pixels[:, 0] *= scale
-            pixels[:, 1] *= scale
-            pixels[:, 2] *= scale
-            result[needs_scaling] = pixels.astype(np.uint8)
+            # Scale only the pixels that need it, via the shared intensity table
+            # (same rounding as get_color_rgb, no float round trip)
+            scale_idx = np.minimum(intensity[needs_scaling], 100)[:, None]  # shape (N, 1)
+            result[needs_scaling] = SCALE_LUT[result[needs_scaling], scale_idx]
 
         # Guard: if any scaled pixel accidentally landed on the sentinel (0,0,1),
         # nudge it to (0,0,0) so it doesn't get treated as transparent.
@@ -13,6 +13,9 @@ Three workload densities:
 - Sparse: ~200-500 pixels
 - Medium: ~1500-2500 pixels  
 - Dense: ~4000-6000 pixels
+
+Off the Pi, run against the in-memory display backend:
+    PIXIL_DISPLAY_BACKEND=framebuffer PIXIL_SIM_VSYNC_MS=2 python3 -m rgb_matrix_lib.benchmark_drawing
 """
 
 import time
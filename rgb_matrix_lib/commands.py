@@ -8,6 +8,7 @@ from .text_effects import TextEffect, EffectModifier
 from shared.mplot_protocol import decode_buffer, unpack_mplot_batch
 from shared.draw_batch_protocol import decode_buffer as decode_draw_buffer, unpack_draw_batch
 from shared.sprite_batch_protocol import decode_sprite_buffer, unpack_sprite_batch
+from shared import latency_trace
 class CommandExecutor:
     """Handles parsing and execution of drawing commands."""
     
@@ -64,6 +65,7 @@ class CommandExecutor:
 
         debug(f"Processing command: {command}", Level.DEBUG, Component.COMMAND)
 
+        trace_start = latency_trace.now_us() if latency_trace.ENABLED else 0
         try:
             if command == '__test_snapshot__':
                 from pixil_utils.test_hooks import is_test_mode
@@ -94,6 +96,8 @@ class CommandExecutor:
             debug("Command executed successfully", Level.DEBUG, Component.COMMAND)
         finally:
             self.current_command = None
+            if trace_start:
+                latency_trace.span(command.split('(', 1)[0], "consumer", trace_start, latency_trace.now_us())
             
     def _parse_command(self, command: str) -> tuple[str, List[Any]]:
         """Parse a command string into name and parameters."""
@@ -571,6 +575,10 @@ class CommandExecutor:
                     plot_batch.append(args)
                     continue
                 flush_plots()
+                if cmd_name == "raster":
+                    self.api.draw_raster(*args)
+                    count += 1
+                    continue
                 handler = self.command_handlers.get(cmd_name)
                 if handler is None:
                     raise ValueError(f"draw_batch unknown command: {cmd_name}")
@@ -594,16 +602,12 @@ class CommandExecutor:
             Component.COMMAND,
         )
         try:
+            if self.api.drain_abort_requested():
+                return
             binary_data = decode_sprite_buffer(encoded_data)
-            count = 0
-            for cmd_name, args in unpack_sprite_batch(binary_data):
-                if self.api.drain_abort_requested():
-                    break
-                handler = self.command_handlers.get(cmd_name)
-                if handler is None:
-                    raise ValueError(f"sprite_batch unknown command: {cmd_name}")
-                handler(*args)
-                count += 1
+            ops = list(unpack_sprite_batch(binary_data))
+            # One state transaction: all positions/cels/visibility, then one present
+            count = self.api.apply_sprite_batch(ops)
             debug(
                 f"Successfully executed sprite_batch with {count} ops in order",
                 Level.DEBUG,
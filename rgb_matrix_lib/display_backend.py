@@ -0,0 +1,196 @@
+# File: rgb_matrix_lib/display_backend.py
+
+"""
+Display backends for RGB_Api.
+
+RGB_Api only needs a small slice of the rpi-rgb-led-matrix surface:
+matrix.width/height, matrix.CreateFrameCanvas(), matrix.SwapOnVSync(canvas)
+and canvas.SetPixel/SetImage/Fill. This module provides that surface for:
+
+    hardware     - rgbmatrix.RGBMatrix on the Pi (default)
+    framebuffer  - in-memory NumPy canvases with a simulated vsync latency
+    null         - accepts every call and discards it (pure interpreter cost)
+
+Select with PIXIL_DISPLAY_BACKEND=hardware|framebuffer|null. The framebuffer
+backend sleeps PIXIL_SIM_VSYNC_MS milliseconds per swap (default 0), which lets
+benchmarks and the Tier 2 script harness run off the Pi with a realistic present
+cost.
+"""
+
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+from .debug import debug, Level, Component
+
+MATRIX_WIDTH = 64
+MATRIX_HEIGHT = 64
+
+BACKEND_ENV = "PIXIL_DISPLAY_BACKEND"
+VSYNC_ENV = "PIXIL_SIM_VSYNC_MS"
+
+HARDWARE = "hardware"
+FRAMEBUFFER = "framebuffer"
+NULL = "null"
+BACKENDS = (HARDWARE, FRAMEBUFFER, NULL)
+
+
+def selected_backend() -> str:
+    """Backend name from PIXIL_DISPLAY_BACKEND (hardware when unset or unknown)."""
+    name = os.environ.get(BACKEND_ENV, "").strip().lower()
+    if not name:
+        return HARDWARE
+    if name not in BACKENDS:
+        debug(f"Unknown {BACKEND_ENV}={name!r}; using {HARDWARE}", Level.WARNING, Component.MATRIX)
+        return HARDWARE
+    return name
+
+
+def simulated_vsync_latency() -> float:
+    """Seconds the framebuffer backend spends in SwapOnVSync (PIXIL_SIM_VSYNC_MS)."""
+    try:
+        return max(0.0, float(os.environ.get(VSYNC_ENV, "0") or 0) / 1000.0)
+    except ValueError:
+        return 0.0
+
+
+class FramebufferCanvas:
+    """Off-screen canvas backed by a (height, width, 3) uint8 array."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def SetPixel(self, x: int, y: int, r: int, g: int, b: int) -> None:
+        x = int(x)
+        y = int(y)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y, x] = (r, g, b)
+
+    def SetImage(self, image, offset_x: int = 0, offset_y: int = 0, unsafe: bool = True) -> None:
+        src = np.asarray(image.convert("RGB") if image.mode != "RGB" else image, dtype=np.uint8)
+        h, w = src.shape[:2]
+        x0 = max(0, offset_x)
+        y0 = max(0, offset_y)
+        x1 = min(self.width, offset_x + w)
+        y1 = min(self.height, offset_y + h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.pixels[y0:y1, x0:x1] = src[y0 - offset_y:y1 - offset_y, x0 - offset_x:x1 - offset_x]
+
+    def Fill(self, r: int, g: int, b: int) -> None:
+        self.pixels[:] = (r, g, b)
+
+    def Clear(self) -> None:
+        self.pixels[:] = 0
+
+
+class FramebufferMatrix:
+    """Double-buffered in-memory matrix; SwapOnVSync makes the canvas visible."""
+
+    def __init__(self, width: int = MATRIX_WIDTH, height: int = MATRIX_HEIGHT,
+                 vsync_latency: Optional[float] = None):
+        self.width = width
+        self.height = height
+        self.vsync_latency = simulated_vsync_latency() if vsync_latency is None else max(0.0, vsync_latency)
+        self.front = FramebufferCanvas(width, height)
+        self.swap_count = 0
+        self.brightness = 100
+
+    def CreateFrameCanvas(self) -> FramebufferCanvas:
+        return FramebufferCanvas(self.width, self.height)
+
+    def SwapOnVSync(self, canvas: FramebufferCanvas, framerate_fraction: int = 1) -> FramebufferCanvas:
+        """Present canvas and hand back the previously visible one, like the driver."""
+        if self.vsync_latency > 0:
+            time.sleep(self.vsync_latency)
+        previous = self.front
+        self.front = canvas
+        self.swap_count += 1
+        return previous
+
+    def snapshot(self) -> np.ndarray:
+        """Copy of the currently visible pixels."""
+        return self.front.pixels.copy()
+
+    def Clear(self) -> None:
+        self.front.Clear()
+
+
+class NullCanvas:
+    """Canvas that ignores every draw call."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+
+    def SetPixel(self, x, y, r, g, b) -> None:
+        pass
+
+    def SetImage(self, image, offset_x: int = 0, offset_y: int = 0, unsafe: bool = True) -> None:
+        pass
+
+    def Fill(self, r, g, b) -> None:
+        pass
+
+    def Clear(self) -> None:
+        pass
+
+
+class NullMatrix:
+    """Matrix with no output; swaps are counted but cost nothing."""
+
+    def __init__(self, width: int = MATRIX_WIDTH, height: int = MATRIX_HEIGHT):
+        self.width = width
+        self.height = height
+        self.swap_count = 0
+        self.brightness = 100
+
+    def CreateFrameCanvas(self) -> NullCanvas:
+        return NullCanvas(self.width, self.height)
+
+    def SwapOnVSync(self, canvas: NullCanvas, framerate_fraction: int = 1) -> NullCanvas:
+        self.swap_count += 1
+        return canvas
+
+    def Clear(self) -> None:
+        pass
+
+
+def configure_hardware_options():
+    """Build the RGBMatrixOptions used for the Adafruit HAT panel."""
+    from rgbmatrix import RGBMatrixOptions
+
+    debug("Configuring matrix options", Level.DEBUG, Component.MATRIX)
+    options = RGBMatrixOptions()
+    options.rows = MATRIX_HEIGHT
+    options.cols = MATRIX_WIDTH
+    options.hardware_mapping = 'adafruit-hat'
+    options.gpio_slowdown = 3
+    options.scan_mode = 1
+    options.pwm_bits = 11
+    options.brightness = 100
+    options.limit_refresh_rate_hz = 0  # No throttling
+
+    debug(f"Matrix configured: {options.rows}x{options.cols}", Level.DEBUG, Component.MATRIX)
+    return options
+
+
+def create_matrix(backend: Optional[str] = None):
+    """Return (matrix, options) for the requested backend; options is None off-hardware."""
+    name = (backend or selected_backend()).strip().lower()
+    if name == FRAMEBUFFER:
+        debug("Using framebuffer display backend", Level.INFO, Component.MATRIX)
+        return FramebufferMatrix(), None
+    if name == NULL:
+        debug("Using null display backend", Level.INFO, Component.MATRIX)
+        return NullMatrix(), None
+    if name != HARDWARE:
+        raise ValueError(f"Unknown display backend: {backend}")
+    from rgbmatrix import RGBMatrix
+
+    options = configure_hardware_options()
+    return RGBMatrix(options=options), options
@@ -274,6 +274,21 @@ class ThreadedBurnoutManager:
             self.changes_made = False
             return changes
 
+    def has_pending_changes(self) -> bool:
+        """True if burnout writes happened since the last check_and_reset_changes()."""
+        return self.changes_made
+
+    def live_count(self) -> int:
+        """Burnout objects still waiting to expire."""
+        return self.burnout_queue.qsize()
+
+    def next_expiry(self) -> Optional[float]:
+        """Earliest pending removal_time (time.time() clock), or None when nothing is queued."""
+        try:
+            return self.burnout_queue.queue[0].removal_time
+        except IndexError:
+            return None
+
     def has_active_fades(self) -> bool:
         """Check if there are any objects currently fading."""
         with self.index_lock:
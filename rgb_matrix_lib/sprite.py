@@ -1,7 +1,7 @@
 # File: rgb_matrix_lib/sprite.py
 
 import numpy as np
-from typing import List, Tuple, Dict, Optional, Union
+from typing import List, Tuple, Dict, Optional, Union, Set, Iterable
 from .debug import debug, Level, Component
 from .utils import TRANSPARENT_COLOR, polygon_vertices, is_transparent
 
@@ -707,6 +707,16 @@ class SpriteManager:
         
         # Z-order tracking: list of (name, instance_id) tuples
         self.z_order: List[Tuple[str, int]] = []
+
+        # Spatial index: { (grid_x, grid_y): {(name, instance_id), ...} }
+        # Kept in sync with each instance's occupied_cells so overlap queries
+        # only touch the buckets they ask about instead of every instance.
+        self._cell_index: Dict[Tuple[int, int], Set[Tuple[str, int]]] = {}
+
+        # Creation sequence per instance key; sorting by it reproduces z_order
+        # without scanning the list.
+        self._z_rank: Dict[Tuple[str, int], int] = {}
+        self._next_z_rank = 0
         
         # Sprite definition state (for building sprites)
         self._defining_sprite: Optional[MatrixSprite] = None
@@ -873,26 +883,104 @@ class SpriteManager:
         instance = SpriteInstance(template, x, y, z_index, cel_index)
         self.instances[name][instance_id] = instance
         self.z_order.append((name, instance_id))
+        self._z_rank[(name, instance_id)] = self._next_z_rank
+        self._next_z_rank += 1
+        if instance.occupied_cells:
+            self._index_cells((name, instance_id), instance.occupied_cells)
         
         debug(f"Created instance {instance_id} of sprite '{name}' at cel {cel_index}", 
               Level.DEBUG, Component.SPRITE)
         return instance
 
-    def get_overlapping_sprites(self, cells: List[Tuple[int, int]]) -> List[SpriteInstance]:
+    # ========== Spatial Index ==========
+
+    def _index_cells(self, key: Tuple[str, int], cells: Iterable[Tuple[int, int]]):
+        """Add an instance key to the bucket of every cell it covers."""
+        for cell in cells:
+            bucket = self._cell_index.get(cell)
+            if bucket is None:
+                self._cell_index[cell] = {key}
+            else:
+                bucket.add(key)
+
+    def _unindex_cells(self, key: Tuple[str, int], cells: Iterable[Tuple[int, int]]):
+        """Remove an instance key from the buckets of the given cells."""
+        for cell in cells:
+            bucket = self._cell_index.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cell_index[cell]
+
+    def move_sprite(self, name: str, instance_id: int, cells: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Replace an instance's occupied cells and update the spatial index.
+        Returns the previously occupied cells (now dirty).
+        """
+        instance = self.instances.get(name, {}).get(instance_id)
+        if instance is None:
+            return []
+        key = (name, instance_id)
+        old_cells = instance.occupied_cells
+        new_cells = set(cells)
+        self._unindex_cells(key, old_cells - new_cells)
+        self._index_cells(key, new_cells - old_cells)
+        instance.occupied_cells = new_cells
+        return list(old_cells)
+
+    def hide_sprite(self, name: str, instance_id: int) -> List[Tuple[int, int]]:
+        """
+        Mark an instance hidden and drop it from the spatial index.
+        Returns the previously occupied cells (now dirty).
+        """
+        instance = self.instances.get(name, {}).get(instance_id)
+        if instance is None:
+            return []
+        dirty_cells = list(instance.occupied_cells)
+        self._unindex_cells((name, instance_id), instance.occupied_cells)
+        instance.visible = False
+        instance.occupied_cells = set()
+        return dirty_cells
+
+    def get_overlapping_sprites(self, cells: Iterable[Tuple[int, int]]) -> List[SpriteInstance]:
         """Get all visible sprite instances that overlap given grid cells in z-order."""
+        keys: Set[Tuple[str, int]] = set()
+        for cell in cells:
+            bucket = self._cell_index.get(cell)
+            if bucket:
+                keys.update(bucket)
+        if not keys:
+            return []
+
         overlapping = []
-        cells_set = set(cells)
-        
-        for name, instance_id in self.z_order:
-            if name in self.instances and instance_id in self.instances[name]:
-                instance = self.instances[name][instance_id]
-                if instance.visible and instance.occupied_cells.intersection(cells_set):
-                    overlapping.append(instance)
-                    debug(f"Found overlapping sprite: {name} instance {instance_id}", 
-                          Level.DEBUG, Component.SPRITE)
+        for key in sorted(keys, key=self._z_rank.__getitem__):
+            instance = self.instances[key[0]][key[1]]
+            if instance.visible:
+                overlapping.append(instance)
+                debug(f"Found overlapping sprite: {key[0]} instance {key[1]}", 
+                      Level.DEBUG, Component.SPRITE)
         
         return overlapping
 
+    def get_colliding_instances(self, name: str, instance_id: int) -> List[Tuple[str, int]]:
+        """
+        Broad-phase collision query: other visible instances sharing a grid cell
+        with the given instance, as (name, instance_id) pairs in z-order.
+        Cell granularity is GRID_SIZE, so callers needing pixel accuracy should
+        refine the result with a bounding-box or mask test.
+        """
+        instance = self.instances.get(name, {}).get(instance_id)
+        if instance is None or not instance.visible:
+            return []
+        me = (name, instance_id)
+        keys: Set[Tuple[str, int]] = set()
+        for cell in instance.occupied_cells:
+            bucket = self._cell_index.get(cell)
+            if bucket:
+                keys.update(bucket)
+        keys.discard(me)
+        return sorted(keys, key=self._z_rank.__getitem__)
+
     def dispose_sprite_instance(self, name: str, instance_id: int) -> List[Tuple[int, int]]:
         """
         Dispose of a specific sprite instance.
@@ -910,13 +998,15 @@ class SpriteManager:
         
         # If visible, mark cells as dirty
         if instance.visible:
-            dirty_cells = list(instance.occupied_cells)
-            instance.visible = False
-            instance.occupied_cells.clear()
+            dirty_cells = self.hide_sprite(name, instance_id)
+        elif instance.occupied_cells:
+            self._unindex_cells((name, instance_id), instance.occupied_cells)
+            instance.occupied_cells = set()
         
         # Remove from z-order and instances dictionary
         if (name, instance_id) in self.z_order:
             self.z_order.remove((name, instance_id))
+        self._z_rank.pop((name, instance_id), None)
         
         del self.instances[name][instance_id]
         
@@ -949,6 +1039,8 @@ class SpriteManager:
         self.instances.clear()
         self.templates.clear()
         self.z_order.clear()
+        self._cell_index.clear()
+        self._z_rank.clear()
         
         debug(f"Disposed of all sprites, {len(dirty_cells)} cells marked dirty", 
             Level.DEBUG, Component.SPRITE)
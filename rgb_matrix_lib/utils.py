@@ -4,6 +4,7 @@ from typing import Dict, Tuple, Optional, List, Union
 from .debug import debug, Level, Component
 import numpy as np
 import math
+from shared.mplot_protocol import NAMED_COLOR_TO_ID
 
 # System Colors - Do Not Modify
 TRANSPARENT_COLOR = (0, 0, 1)  # RGB value for transparent pixels
@@ -118,6 +119,55 @@ def generate_spectral_colors() -> Dict[int, Tuple[int, int, int]]:
 # Spectral System (0-99 mapped to 8-bit RGB)
 SPECTRAL_COLORS = generate_spectral_colors()
 
+# Precomputed color tables
+# SCALE_LUT[v, i] == int(v * (i / 100.0)) - the exact intensity scaling used by
+# get_color_rgb, so vectorized paths (sprites, backgrounds) match scalar ones.
+INTENSITY_LEVELS = 101
+SCALE_LUT = (np.arange(256, dtype=np.float64)[:, None]
+             * (np.arange(INTENSITY_LEVELS) / 100.0)[None, :]).astype(np.uint8)
+
+# COLOR_LUT[color_id + COLOR_ID_OFFSET, intensity] -> (r, g, b) uint8, for every
+# wire color id in shared.mplot_protocol (named colors negative, spectral 0-99).
+COLOR_ID_OFFSET = -min(NAMED_COLOR_TO_ID.values())
+COLOR_LUT = np.zeros((COLOR_ID_OFFSET + len(SPECTRAL_COLORS), INTENSITY_LEVELS, 3), dtype=np.uint8)
+for _name, _cid in NAMED_COLOR_TO_ID.items():
+    COLOR_LUT[_cid + COLOR_ID_OFFSET] = SCALE_LUT[list(NAMED_COLORS[_name])].T
+for _num, _rgb in SPECTRAL_COLORS.items():
+    COLOR_LUT[_num + COLOR_ID_OFFSET] = SCALE_LUT[list(_rgb)].T
+
+# Scalar lookups go through per-color rows of plain int tuples: one dict probe
+# and one list index per pixel instead of lower()/clamp/float math.
+_ID_ROWS: List[List[Tuple[int, int, int]]] = [
+    [tuple(rgb) for rgb in row] for row in COLOR_LUT.tolist()
+]
+_COLOR_ROWS: Dict[Union[str, int, Tuple[int, int, int]], List[Tuple[int, int, int]]] = {}
+for _name, _cid in NAMED_COLOR_TO_ID.items():
+    _COLOR_ROWS[_name] = _ID_ROWS[_cid + COLOR_ID_OFFSET]
+for _name, _rgb in NAMED_COLORS.items():
+    if _name not in _COLOR_ROWS:
+        _COLOR_ROWS[_name] = [tuple(v) for v in SCALE_LUT[list(_rgb)].T.tolist()]
+for _num in SPECTRAL_COLORS:
+    _COLOR_ROWS[_num] = _ID_ROWS[_num + COLOR_ID_OFFSET]
+del _name, _cid, _num, _rgb
+
+# User RGB tuples get rows on first use; capped so arbitrary colors can't grow it forever.
+_MAX_USER_RGB_ROWS = 1024
+_user_rgb_rows = 0
+
+
+def register_rgb_color(rgb: Tuple[int, int, int]) -> List[Tuple[int, int, int]]:
+    """Return the 101-entry intensity row for an int RGB tuple (each 0-255), caching it when there is room."""
+    global _user_rgb_rows
+    row = _COLOR_ROWS.get(rgb)
+    if row is not None:
+        return row
+    row = [tuple(v) for v in SCALE_LUT[list(rgb)].T.tolist()]
+    if _user_rgb_rows < _MAX_USER_RGB_ROWS:
+        _COLOR_ROWS[rgb] = row
+        _user_rgb_rows += 1
+    return row
+
+
 def get_color_rgb(color: Union[str, int, Tuple[int, int, int]], intensity: int = 100) -> Tuple[int, int, int]:
     """
     Get RGB values for a color and optional intensity.
@@ -129,12 +179,23 @@ def get_color_rgb(color: Union[str, int, Tuple[int, int, int]], intensity: int =
     Returns:
         Tuple[int, int, int]: RGB values scaled by intensity
     """
+    row = _COLOR_ROWS.get(color)
+    if row is not None and intensity.__class__ is int and 0 <= intensity <= 100:
+        return row[intensity]
+    return _get_color_rgb_slow(color, intensity)
+
+
+def _get_color_rgb_slow(color: Union[str, int, Tuple[int, int, int]], intensity: int) -> Tuple[int, int, int]:
+    """get_color_rgb for inputs without a table row (mixed case, out of range, float intensity)."""
     # Clamp intensity to valid range
     intensity = max(0, min(100, intensity))
     scale = intensity / 100.0
 
     # Handle RGB tuple input
     if isinstance(color, tuple) and len(color) == 3:
+        # Only 8-bit int channels have a table row; anything else keeps the plain math
+        if intensity.__class__ is int and all(c.__class__ is int and 0 <= c <= 255 for c in color):
+            return register_rgb_color(color)[intensity]
         base_rgb = color
     # Handle spectral colors (numeric input)
     elif isinstance(color, int):
@@ -0,0 +1,310 @@
+"""
+Opt-in allocation and GC instrumentation for the producer and consumer loops.
+
+PIXIL_ALLOC_STATS=1 (Pixil.py --alloc-stats) installs a gc.callbacks hook in
+both processes that times every collection by generation, and samples
+sys.getallocatedblocks() at each end_frame so net block growth and GC pauses
+are known per frame. PIXIL_ALLOC_STATS=trace (--alloc-stats trace) also runs
+tracemalloc: each frame records its transient peak (traced bytes above the
+level the frame started at, via reset_peak) and at script end the sites whose
+retained memory grew most since the first frame are listed. tracemalloc slows
+allocation-heavy code several times over, so use it to find sites, not to time.
+
+Collectors do not survive a fork: the consumer is forked from the producer at
+start-up and again on every restart, and each child removes the inherited
+gc.callbacks hook and stops inherited tracing before it starts its own.
+
+The consumer's AllocStats delta rides on the ConsumerStats message under
+"alloc" and is folded with merge(); the producer prints both with the run
+metrics.
+
+PIXIL_GC_FREEZE=1 (--gc-freeze) is a separate mode: at the first begin_frame of
+a script (procedures, grid programs and sprites are loaded by then) the
+producer collects, gc.freeze()s everything alive and raises the collection
+thresholds to ANIMATION_THRESHOLDS (PIXIL_GC_THRESHOLD="g0,g1,g2"); the
+consumer does the same after start-up and each script reset. Thresholds are
+restored and the permanent generation unfrozen when the script ends.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+ALLOC_ENV = "PIXIL_ALLOC_STATS"
+GC_FREEZE_ENV = "PIXIL_GC_FREEZE"
+GC_THRESHOLD_ENV = "PIXIL_GC_THRESHOLD"
+
+# Fewer, larger young collections while frames are being produced; with the
+# loaded script frozen, full collections only walk objects made since
+ANIMATION_THRESHOLDS = (10000, 20, 50)
+TRACE_FRAMES = 1  # traceback depth kept by tracemalloc
+TOP_SITES = 10
+
+GENERATIONS = 3
+
+
+def alloc_mode() -> str:
+    """'' (off), 'stats' or 'trace' from PIXIL_ALLOC_STATS."""
+    value = os.environ.get(ALLOC_ENV, "").strip().lower()
+    if value in ("", "0"):
+        return ""
+    return "trace" if value == "trace" else "stats"
+
+
+def gc_freeze_enabled() -> bool:
+    return os.environ.get(GC_FREEZE_ENV, "").strip() not in ("", "0")
+
+
+def animation_thresholds() -> Tuple[int, ...]:
+    """ANIMATION_THRESHOLDS, or PIXIL_GC_THRESHOLD when it parses."""
+    value = os.environ.get(GC_THRESHOLD_ENV, "").strip()
+    if value:
+        try:
+            parsed = tuple(int(part) for part in value.split(","))
+            if 1 <= len(parsed) <= GENERATIONS and all(p >= 0 for p in parsed):
+                return parsed
+        except ValueError:
+            pass
+    return ANIMATION_THRESHOLDS
+
+
+def empty_totals() -> Dict:
+    return {
+        "frames": 0,
+        "blocks_growth": 0,
+        "blocks_growth_max": 0,
+        "collections": [0] * GENERATIONS,
+        "collected": 0,
+        "gc_pause": 0.0,
+        "gc_pause_max": 0.0,
+        "gc_frames": 0,
+        "frame_gc_pause_max": 0.0,
+        "transient_bytes": 0,
+        "transient_bytes_max": 0,
+        "top_sites": [],
+    }
+
+
+def merge(totals: Dict, delta: Dict) -> Dict:
+    """Fold one AllocStats delta into running totals (in place; returned for chaining)."""
+    for key in ("frames", "blocks_growth", "collected", "gc_pause", "gc_frames", "transient_bytes"):
+        totals[key] += delta.get(key, 0)
+    for key in ("blocks_growth_max", "gc_pause_max", "frame_gc_pause_max", "transient_bytes_max"):
+        totals[key] = max(totals[key], delta.get(key, 0))
+    for gen, count in enumerate(delta.get("collections", ())):
+        totals["collections"][gen] += count
+    if delta.get("top_sites"):
+        totals["top_sites"] = delta["top_sites"]
+    return totals
+
+
+def format_report(role: str, totals: Dict) -> List[str]:
+    """Lines printed with the run metrics."""
+    frames = totals["frames"]
+    lines = [f"Allocation / GC ({role}):"]
+    per_frame = totals["blocks_growth"] / frames if frames else 0.0
+    lines.append(f"  Frames: {frames:,}  net blocks/frame avg {per_frame:+.1f}, max {totals['blocks_growth_max']:+,}")
+    gens = ", ".join(f"gen{gen} {count:,}" for gen, count in enumerate(totals["collections"]))
+    lines.append(f"  GC collections: {gens} ({totals['collected']:,} objects freed)")
+    lines.append(f"  GC pause: total {totals['gc_pause'] * 1000.0:.1f} ms, max {totals['gc_pause_max'] * 1000.0:.2f} ms; "
+                 f"{totals['gc_frames']:,} frames paused (worst {totals['frame_gc_pause_max'] * 1000.0:.2f} ms/frame)")
+    if totals["transient_bytes_max"]:
+        avg_kb = totals["transient_bytes"] / frames / 1024.0 if frames else 0.0
+        lines.append(f"  Transient per frame: avg {avg_kb:.1f} KiB, max {totals['transient_bytes_max'] / 1024.0:.1f} KiB")
+    if totals["top_sites"]:
+        lines.append("  Retained growth since first frame:")
+        for where, size, count in totals["top_sites"]:
+            lines.append(f"    {size / 1024.0:+9.1f} KiB {count:+8,} blocks  {where}")
+    return lines
+
+
+class AllocStats:
+    """Per-process collector; frame() at each end_frame, take() for the delta."""
+
+    def __init__(self, trace: bool = False, top: int = TOP_SITES):
+        self.trace = trace
+        self.top = top
+        self._installed = False
+        self._gc_start = 0.0
+        self._baseline = None
+        # Frame in progress (kept across take())
+        self._frame_gc_pause = 0.0
+        self._frame_blocks = sys.getallocatedblocks()
+        self._frame_traced = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self.frames = 0
+        self.blocks_growth = 0
+        self.blocks_growth_max = 0
+        self.collections = [0] * GENERATIONS
+        self.collected = 0
+        self.gc_pause = 0.0
+        self.gc_pause_max = 0.0
+        self.gc_frames = 0
+        self.frame_gc_pause_max = 0.0
+        self.transient_bytes = 0
+        self.transient_bytes_max = 0
+
+    def start(self) -> None:
+        if self._installed:
+            return
+        gc.callbacks.append(self._on_gc)
+        self._installed = True
+        _INSTALLED.append(self)
+        if self.trace:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+            self._frame_traced = tracemalloc.get_traced_memory()[0]
+        self._frame_blocks = sys.getallocatedblocks()
+
+    def stop(self) -> None:
+        if not self._installed:
+            return
+        gc.callbacks.remove(self._on_gc)
+        self._installed = False
+        _INSTALLED.remove(self)
+        if self.trace:
+            import tracemalloc
+
+            tracemalloc.stop()
+        self._baseline = None
+
+    def _on_gc(self, phase: str, info: Dict) -> None:
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+            return
+        pause = time.perf_counter() - self._gc_start
+        self.collections[info.get("generation", 0)] += 1
+        self.collected += info.get("collected", 0)
+        self.gc_pause += pause
+        if pause > self.gc_pause_max:
+            self.gc_pause_max = pause
+        self._frame_gc_pause += pause
+
+    def frame(self) -> None:
+        """Close a frame: net block growth, GC pause inside it, transient traced peak."""
+        blocks = sys.getallocatedblocks()
+        growth = blocks - self._frame_blocks
+        self._frame_blocks = blocks
+        self.frames += 1
+        self.blocks_growth += growth
+        if growth > self.blocks_growth_max:
+            self.blocks_growth_max = growth
+        if self._frame_gc_pause:
+            self.gc_frames += 1
+            if self._frame_gc_pause > self.frame_gc_pause_max:
+                self.frame_gc_pause_max = self._frame_gc_pause
+            self._frame_gc_pause = 0.0
+        if self.trace:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            transient = max(0, peak - self._frame_traced)
+            self.transient_bytes += transient
+            if transient > self.transient_bytes_max:
+                self.transient_bytes_max = transient
+            tracemalloc.reset_peak()
+            self._frame_traced = current
+            if self._baseline is None:
+                self._baseline = tracemalloc.take_snapshot()
+
+    def top_sites(self) -> List[Tuple[str, int, int]]:
+        """(file:line, size_diff, count_diff) for the sites that grew most since the first frame."""
+        if not self.trace or self._baseline is None:
+            return []
+        import tracemalloc
+
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+                  tracemalloc.Filter(False, __file__))
+        snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+        stats = snapshot.compare_to(self._baseline.filter_traces(ignore), "lineno")
+        sites = []
+        for stat in stats:
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            sites.append((f"{frame.filename}:{frame.lineno}", stat.size_diff, stat.count_diff))
+            if len(sites) == self.top:
+                break
+        return sites
+
+    def take(self, final: bool = False) -> Dict:
+        """Delta since the previous take(); final=True (script end) adds top_sites and
+        makes the next frame take a new baseline."""
+        delta = {
+            "frames": self.frames,
+            "blocks_growth": self.blocks_growth,
+            "blocks_growth_max": self.blocks_growth_max,
+            "collections": self.collections,
+            "collected": self.collected,
+            "gc_pause": self.gc_pause,
+            "gc_pause_max": self.gc_pause_max,
+            "gc_frames": self.gc_frames,
+            "frame_gc_pause_max": self.frame_gc_pause_max,
+            "transient_bytes": self.transient_bytes,
+            "transient_bytes_max": self.transient_bytes_max,
+            "top_sites": self.top_sites() if final else [],
+        }
+        self._clear()
+        if final:
+            self._baseline = None
+        return delta
+
+
+# Started collectors in this process, dropped in forked children
+_INSTALLED: List[AllocStats] = []
+
+
+def _drop_inherited() -> None:
+    for stats in list(_INSTALLED):
+        stats.stop()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_drop_inherited)
+
+
+def from_env() -> Optional[AllocStats]:
+    """Started AllocStats when PIXIL_ALLOC_STATS asks for one, else None."""
+    mode = alloc_mode()
+    if not mode:
+        return None
+    stats = AllocStats(trace=mode == "trace")
+    stats.start()
+    return stats
+
+
+class GcTuning:
+    """gc.freeze() + raised thresholds while a script animates (PIXIL_GC_FREEZE)."""
+
+    def __init__(self, thresholds: Optional[Tuple[int, ...]] = None):
+        self.thresholds = thresholds or animation_thresholds()
+        self._saved: Optional[Tuple[int, ...]] = None
+
+    @property
+    def active(self) -> bool:
+        return self._saved is not None
+
+    def enter(self) -> None:
+        """Collect, freeze what is alive now and raise thresholds (idempotent)."""
+        if self._saved is not None:
+            return
+        gc.collect()
+        gc.freeze()
+        self._saved = gc.get_threshold()
+        gc.set_threshold(*self.thresholds)
+
+    def leave(self) -> None:
+        """Restore thresholds and return frozen objects to the oldest generation."""
+        if self._saved is None:
+            return
+        gc.set_threshold(*self._saved)
+        self._saved = None
+        gc.unfreeze()
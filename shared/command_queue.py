@@ -4,6 +4,17 @@ from typing import Optional
 import threading
 from queue import Empty, Full
 
+from . import latency_trace
+from . import consumer_stats
+from . import alloc_stats
+
+# Unsent consumer stats deltas the producer may fall behind by before the consumer
+# starts folding them together locally
+CONSUMER_STATS_BACKLOG = 16
+
+# Producer side: the telemetry thread collects consumer stats alongside the interpreter
+_CONSUMER_STATS_LOCK = threading.RLock()
+
 class MatrixCommandQueue:
     """Manages command queue between Pixil and RGB Matrix Library"""
     
@@ -13,6 +24,13 @@ class MatrixCommandQueue:
         self.command_queue = Queue(maxsize=queue_size)
         # Consumer -> main: buffer fingerprint after __test_snapshot__
         self._test_snapshot_reply: Queue = Queue(maxsize=1)
+        # Consumer -> main: periodic display stats deltas (shared.consumer_stats)
+        self._consumer_stats_reply: Queue = Queue(maxsize=CONSUMER_STATS_BACKLOG)
+        self._consumer_stats_totals = consumer_stats.empty_totals()
+        self._unsent_consumer_stats = None
+        self._log_frame_budget = False  # Consumer: print overrun lines (PIXIL_FRAME_BUDGET_LOG)
+        self._alloc_stats = None  # Consumer: shared.alloc_stats collector (PIXIL_ALLOC_STATS)
+        self._gc_tuning = None  # Consumer: gc.freeze() mode (PIXIL_GC_FREEZE)
         self._consumer_process: Optional[Process] = None
         self._running = False
         self.last_command_time = time.time() * 1000  # Convert to milliseconds
@@ -91,6 +109,10 @@ class MatrixCommandQueue:
         """
         self.command_queue = Queue(maxsize=self._queue_size)
         self._test_snapshot_reply = Queue(maxsize=1)
+        # Keep stats the old consumer already posted
+        with _CONSUMER_STATS_LOCK:
+            self.collect_consumer_stats()
+            self._consumer_stats_reply = Queue(maxsize=CONSUMER_STATS_BACKLOG)
 
     def _kill_consumer_process(self, timeout: float = 1.0, graceful: bool = False) -> None:
         """Stop the consumer subprocess."""
@@ -203,7 +225,7 @@ class MatrixCommandQueue:
 
         while swallowed < self._queue_size:
             try:
-                command, _delay = self.command_queue.get_nowait()
+                command, _delay, *_trace = self.command_queue.get_nowait()
             except Empty:
                 break
             if command == '__SHUTDOWN__':
@@ -321,11 +343,22 @@ class MatrixCommandQueue:
         delay = (current_time - self.last_command_time) * 0.7 * self.throttle_factor
         return max(0, delay)  # Ensure non-negative delay
         
-    def put_command(self, command: str, force_instant: bool = False):
-        """Add a command to the queue with timing information"""
+    def put_command(self, command: str, force_instant: bool = False, frame_stamp=None):
+        """Add a command to the queue with timing information
+
+        frame_stamp (consumer_stats.frame_stamp) rides on end_frame for frame budget accounting.
+        """
         BACKOFF_SLEEP = 1  # seconds
         delay = 0 if force_instant else self._calculate_delay()
-        command_tuple = (command, delay)
+        if latency_trace.ENABLED:
+            trace_start = latency_trace.now_us()
+            command_tuple = (command, delay, latency_trace.stamp())
+        else:
+            trace_start = 0
+            command_tuple = (command, delay)
+        if frame_stamp is not None:
+            # (command, delay, trace stamp or None, frame stamp)
+            command_tuple = (command, delay, command_tuple[2] if trace_start else None, frame_stamp)
         
         # Try immediately first
         try:
@@ -333,6 +366,8 @@ class MatrixCommandQueue:
             #print(f"[QUEUE] Adding command: {command} (delay: {delay}ms)")
             self.command_queue.put_nowait(command_tuple)
             self.last_command_time = time.time() * 1000
+            if trace_start:
+                latency_trace.span("enqueue", "queue", trace_start, latency_trace.now_us())
             return
         except Full:
             # Queue is full, notify metrics
@@ -349,6 +384,8 @@ class MatrixCommandQueue:
                 time.sleep(BACKOFF_SLEEP)
                 self.command_queue.put_nowait(command_tuple)
                 self.last_command_time = time.time() * 1000
+                if trace_start:
+                    latency_trace.span("enqueue", "queue", trace_start, latency_trace.now_us())
 
                 # Successfully added, notify metrics
                 if hasattr(self, 'on_queue_resume') and callable(self.on_queue_resume):
@@ -366,6 +403,15 @@ class MatrixCommandQueue:
             api_instance = get_api_instance()
             api_instance.set_drain_checker(self._drain_requested.is_set)
             api_instance.set_shutdown_checker(self._force_shutdown.is_set)
+            from pixil_utils.test_hooks import is_bench_mode, BenchSampler
+
+            # Benchmark mode: time every executed command; emitted with __test_snapshot__
+            bench = BenchSampler("consumer") if is_bench_mode() else None
+            self._log_frame_budget = consumer_stats.frame_budget_log_enabled()
+            self._alloc_stats = alloc_stats.from_env()
+            if alloc_stats.gc_freeze_enabled():
+                self._gc_tuning = alloc_stats.GcTuning()
+                self._gc_tuning.enter()
 
             while True:
                 if self._force_shutdown.is_set():
@@ -373,8 +419,21 @@ class MatrixCommandQueue:
                     break
 
                 try:
-                    # Get command tuple with timeout
-                    command, delay = self.command_queue.get(timeout=0.01)
+                    # Block until a command arrives or the next burnout/fade present is due
+                    wait = api_instance.presentation_wait()
+                    idle_start = time.perf_counter()
+                    try:
+                        if wait > 0:
+                            command, delay, *trace = self.command_queue.get(timeout=wait)
+                        else:
+                            command, delay, *trace = self.command_queue.get_nowait()
+                    finally:
+                        api_instance.consumer_stats.record_idle(time.perf_counter() - idle_start)
+                    if trace:
+                        if trace[0] is not None:
+                            latency_trace.dequeued(trace)
+                        if len(trace) > 1:
+                            api_instance.consumer_stats.record_frame_stamp(trace[1])
 
                     if self._force_shutdown.is_set():
                         self._consumer_blackout_and_exit(api_instance)
@@ -386,8 +445,22 @@ class MatrixCommandQueue:
                         break
 
                     if command == "__SCRIPT_RESET__":
+                        # Flush the finished script's display stats before the reset clears burnouts
+                        self._send_consumer_stats(api_instance, final=True)
                         self._apply_script_reset(api_instance)
+                        api_instance.consumer_stats.reset_frame()
+                        if self._gc_tuning is not None:
+                            # Refreeze without the finished script's objects
+                            self._gc_tuning.leave()
+                            self._gc_tuning.enter()
                         self._reset_complete.set()
+                        if bench is not None:
+                            bench.reset()
+                        continue
+
+                    if command == "__DRAIN__" and not self._drain_requested.is_set():
+                        # Marker arrived after the flag-triggered drain finished; draining
+                        # again would swallow the __SCRIPT_RESET__ queued behind it
                         continue
 
                     if command == "__DRAIN__" or self._drain_requested.is_set():
@@ -403,6 +476,9 @@ class MatrixCommandQueue:
                             from rgb_matrix_lib.test_inspect import emit_test_snapshot
 
                             fp = emit_test_snapshot(api_instance)
+                            if bench is not None:
+                                bench.emit()
+                                bench.reset()
                             try:
                                 self._test_snapshot_reply.put_nowait(fp)
                             except Full:
@@ -438,7 +514,24 @@ class MatrixCommandQueue:
                             break
                         continue
 
+                    t0 = time.perf_counter()
                     api_instance.execute_command(command)
+                    elapsed = time.perf_counter() - t0
+                    is_end_frame = command.startswith("end_frame")
+                    if not is_end_frame:
+                        # end_frame times its own present (and includes the pacing sleep)
+                        api_instance.consumer_stats.record_execute(elapsed)
+                    if is_end_frame and self._alloc_stats is not None:
+                        self._alloc_stats.frame()
+                    if bench is not None:
+                        bench.add_command(elapsed)
+                        if is_end_frame:
+                            bench.end_frame(elapsed, self._consumer_queue_depth())
+                    # Interleave scheduled presents with command processing under load
+                    if not api_instance.drain_abort_requested():
+                        api_instance.pump_presentation()
+                    if api_instance.consumer_stats.due():
+                        self._send_consumer_stats(api_instance)
 
                 except Empty:
                     if self._force_shutdown.is_set():
@@ -450,18 +543,69 @@ class MatrixCommandQueue:
                         continue
                     try:
                         if not api_instance.drain_abort_requested():
-                            api_instance.pump_fade_display()
+                            api_instance.pump_presentation()
                     except AttributeError:
                         pass
+                    if api_instance.consumer_stats.due():
+                        self._send_consumer_stats(api_instance)
                     continue
                 except Exception:
                     continue
 
         finally:
             if api_instance is not None:
+                try:
+                    self._send_consumer_stats(api_instance)
+                except Exception:
+                    pass
                 api_instance.set_drain_checker(None)
                 api_instance.set_shutdown_checker(None)
                 api_instance.cleanup()
+            latency_trace.write_part("consumer")
+
+    def _send_consumer_stats(self, api_instance, final: bool = False) -> None:
+        """Consumer side: post the stats delta; fold it locally if the producer is behind.
+
+        final marks the flush before a script reset.
+        """
+        delta = api_instance.consumer_stats.take(api_instance.burnout_manager.live_count())
+        if self._alloc_stats is not None:
+            delta["alloc"] = self._alloc_stats.take(final=final)
+        if self._log_frame_budget:
+            line = consumer_stats.format_overruns(delta)
+            if line:
+                print(line, flush=True)
+        if self._unsent_consumer_stats is not None:
+            delta = consumer_stats.merge(self._unsent_consumer_stats, delta)
+        try:
+            self._consumer_stats_reply.put_nowait(delta)
+            self._unsent_consumer_stats = None
+        except Full:
+            self._unsent_consumer_stats = delta
+
+    def collect_consumer_stats(self) -> dict:
+        """Producer side: fold pending consumer deltas into the running totals."""
+        with _CONSUMER_STATS_LOCK:
+            while True:
+                try:
+                    delta = self._consumer_stats_reply.get_nowait()
+                except (Empty, OSError, ValueError):
+                    break
+                consumer_stats.merge(self._consumer_stats_totals, delta)
+            return self._consumer_stats_totals
+
+    def reset_consumer_stats(self) -> None:
+        """Producer side: start a new script's totals, dropping anything still queued."""
+        self.collect_consumer_stats()
+        with _CONSUMER_STATS_LOCK:
+            self._consumer_stats_totals = consumer_stats.empty_totals()
+
+    def _consumer_queue_depth(self) -> Optional[int]:
+        """Commands still waiting behind the current one (None where qsize is unsupported)."""
+        try:
+            return self.command_queue.qsize()
+        except (NotImplementedError, OSError):
+            return None
 
     def is_empty(self) -> bool:
         """Check if queue is empty"""
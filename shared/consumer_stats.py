@@ -0,0 +1,313 @@
+"""
+Consumer-side display statistics sent back to the Pixil producer.
+
+The rgb_matrix_lib consumer owns presenting, burnouts, fades and text effects,
+none of which the producer's counters can see. RGB_Api accumulates a
+ConsumerStats; every STATS_INTERVAL seconds (and before each __SCRIPT_RESET__)
+the consumer loop hands the delta to MatrixCommandQueue, which carries it to the
+producer over a dedicated multiprocessing queue. The producer folds deltas with
+merge() and PixilMetricsDB stores the result in consumer_metrics.
+
+Frame budget: every end_frame closes a frame timed by stage (BUDGET_STAGES).
+The producer stamps the end_frame queue item with its interpreter time since
+the previous end_frame (queue stalls excluded) and the enqueue time; the
+consumer adds queue wait, command execute time since the previous present and
+the present itself. While fps() sets a target, a frame is an overrun when the
+time from the previous paced present to this present exceeds the interval by
+more than OVERRUN_SLACK (the pacer had nothing left to sleep). That time is
+consumer idle + execute + present, so the overrun is blamed on whichever is
+largest: idle time means the consumer was starved by the interpreter. Queue
+wait is backlog behind slower frames rather than work, so it is reported but
+never blamed.
+
+Deltas are plain dicts so they pickle cheaply across the process boundary.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+STATS_INTERVAL = 1.0  # seconds between consumer -> producer messages
+
+# Present-time histogram upper bounds (ms); the final bucket is "slower than 66 ms"
+PRESENT_BUCKETS_MS = (1, 2, 4, 8, 16, 33, 66)
+HISTOGRAM_LABELS = tuple(f"le_{b}ms" for b in PRESENT_BUCKETS_MS) + (f"gt_{PRESENT_BUCKETS_MS[-1]}ms",)
+
+# Per-frame stages timed against the fps() interval
+BUDGET_STAGES = ("interpret", "queue_wait", "execute", "present")
+BLAMED_STAGES = ("interpret", "execute", "present")
+OVERRUN_SLACK = 0.05  # fraction of the interval allowed for sleep/scheduler jitter
+
+# Consumer prints a line per stats interval that had overruns (Pixil.py --frame-budget-log)
+FRAME_BUDGET_LOG_ENV = "PIXIL_FRAME_BUDGET_LOG"
+
+# Counters summed by merge(); burnout samples are handled separately
+_SUMMED = (
+    "presents", "end_frames", "present_time", "pixels_written",
+    "fade_pumps", "text_effects", "text_stall_time", "messages",
+    "frames_paced", "frame_overruns",
+)
+
+
+def frame_budget_log_enabled() -> bool:
+    return os.environ.get(FRAME_BUDGET_LOG_ENV, "").strip() not in ("", "0")
+
+
+def frame_stamp(interpret: float) -> Tuple[float, float]:
+    """Producer side: payload for the end_frame queue item (interpreter seconds, enqueue time)."""
+    return (interpret, time.perf_counter())
+
+
+def empty_totals() -> Dict:
+    """Producer-side running totals (same shape as a delta)."""
+    totals = {key: 0 for key in _SUMMED}
+    totals["present_time"] = 0.0
+    totals["text_stall_time"] = 0.0
+    totals["present_max"] = 0.0
+    totals["pixels_max"] = 0
+    totals["burnouts_live"] = 0
+    totals["burnouts_peak"] = 0
+    totals["histogram"] = [0] * len(HISTOGRAM_LABELS)
+    totals["frame_target_fps"] = 0.0
+    totals["frame_time_max"] = 0.0
+    totals["frame_stage_time"] = [0.0] * len(BUDGET_STAGES)
+    totals["frame_stage_max"] = [0.0] * len(BUDGET_STAGES)
+    totals["overrun_stage"] = [0] * len(BLAMED_STAGES)
+    return totals
+
+
+def merge(totals: Dict, delta: Dict) -> Dict:
+    """Fold one consumer delta into running totals (in place; returned for chaining)."""
+    for key in _SUMMED:
+        totals[key] += delta.get(key, 0)
+    totals["present_max"] = max(totals["present_max"], delta.get("present_max", 0.0))
+    totals["pixels_max"] = max(totals["pixels_max"], delta.get("pixels_max", 0))
+    totals["burnouts_live"] = delta.get("burnouts_live", totals["burnouts_live"])
+    totals["burnouts_peak"] = max(totals["burnouts_peak"], delta.get("burnouts_peak", 0))
+    for i, count in enumerate(delta.get("histogram", ())):
+        totals["histogram"][i] += count
+    if delta.get("frame_target_fps"):
+        totals["frame_target_fps"] = delta["frame_target_fps"]
+    totals["frame_time_max"] = max(totals["frame_time_max"], delta.get("frame_time_max", 0.0))
+    for i, seconds in enumerate(delta.get("frame_stage_time", ())):
+        totals["frame_stage_time"][i] += seconds
+    for i, seconds in enumerate(delta.get("frame_stage_max", ())):
+        totals["frame_stage_max"][i] = max(totals["frame_stage_max"][i], seconds)
+    for i, count in enumerate(delta.get("overrun_stage", ())):
+        totals["overrun_stage"][i] += count
+    if "alloc" in delta:
+        # Present only while PIXIL_ALLOC_STATS is on (shared.alloc_stats)
+        from . import alloc_stats
+
+        alloc_stats.merge(totals.setdefault("alloc", alloc_stats.empty_totals()), delta["alloc"])
+    return totals
+
+
+def slowest_stage(totals: Dict) -> Optional[str]:
+    """Stage blamed for the most overruns, else the blamed stage with the most time (None before any frame)."""
+    if totals["frame_overruns"]:
+        counts = totals["overrun_stage"]
+        return BLAMED_STAGES[counts.index(max(counts))]
+    times = [totals["frame_stage_time"][BUDGET_STAGES.index(stage)] for stage in BLAMED_STAGES]
+    if not any(times):
+        return None
+    return BLAMED_STAGES[times.index(max(times))]
+
+
+def format_overruns(delta: Dict) -> Optional[str]:
+    """Consumer log line for a delta with overruns, naming the slowest stage."""
+    overruns = delta.get("frame_overruns", 0)
+    if not overruns:
+        return None
+    frames = delta["end_frames"] or 1
+    stage = slowest_stage(delta)
+    avg_ms = delta["frame_stage_time"][BUDGET_STAGES.index(stage)] / frames * 1000.0
+    return (f"[FRAME] {overruns}/{delta['frames_paced']} frames over "
+            f"{1000.0 / delta['frame_target_fps']:.1f} ms budget "
+            f"(worst {delta['frame_time_max'] * 1000.0:.1f} ms); "
+            f"slowest stage {stage} avg {avg_ms:.1f} ms")
+
+
+def summarize(totals: Dict) -> Dict:
+    """Flatten totals into consumer_metrics columns."""
+    presents = totals["presents"]
+    row = {
+        "frames_presented": presents,
+        "end_frames": totals["end_frames"],
+        "present_time_total": totals["present_time"],
+        "present_time_avg_ms": (totals["present_time"] / presents * 1000.0) if presents else 0.0,
+        "present_time_max_ms": totals["present_max"] * 1000.0,
+        "pixels_written_total": totals["pixels_written"],
+        "pixels_per_frame_avg": (totals["pixels_written"] / presents) if presents else 0.0,
+        "pixels_per_frame_max": totals["pixels_max"],
+        "burnouts_live_end": totals["burnouts_live"],
+        "burnouts_live_peak": totals["burnouts_peak"],
+        "fade_pumps": totals["fade_pumps"],
+        "text_effects": totals["text_effects"],
+        "text_effect_stall_time": totals["text_stall_time"],
+        "stats_messages": totals["messages"],
+    }
+    for label, count in zip(HISTOGRAM_LABELS, totals["histogram"]):
+        row[f"present_{label}"] = count
+    frames = totals["end_frames"]
+    paced = totals["frames_paced"]
+    row["frame_target_fps"] = totals["frame_target_fps"]
+    row["frames_paced"] = paced
+    row["frame_overruns"] = totals["frame_overruns"]
+    row["frame_overrun_pct"] = (totals["frame_overruns"] / paced * 100.0) if paced else 0.0
+    row["frame_time_max_ms"] = totals["frame_time_max"] * 1000.0
+    for i, stage in enumerate(BUDGET_STAGES):
+        row[f"frame_{stage}_avg_ms"] = (totals["frame_stage_time"][i] / frames * 1000.0) if frames else 0.0
+        row[f"frame_{stage}_max_ms"] = totals["frame_stage_max"][i] * 1000.0
+    for stage, count in zip(BLAMED_STAGES, totals["overrun_stage"]):
+        row[f"overruns_{stage}"] = count
+    row["frame_slowest_stage"] = slowest_stage(totals)
+    return row
+
+
+def _bucket(seconds: float) -> int:
+    ms = seconds * 1000.0
+    for i, bound in enumerate(PRESENT_BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(PRESENT_BUCKETS_MS)
+
+
+class ConsumerStats:
+    """Consumer-process accumulator; take() returns the delta since the last take()."""
+
+    def __init__(self, interval: float = STATS_INTERVAL):
+        self.interval = interval
+        self._next_send = time.monotonic() + interval
+        self._clear()
+        self.reset_frame()
+
+    def _clear(self) -> None:
+        self.presents = 0
+        self.end_frames = 0
+        self.present_time = 0.0
+        self.present_max = 0.0
+        self.pixels_written = 0
+        self.pixels_max = 0
+        self.fade_pumps = 0
+        self.text_effects = 0
+        self.text_stall_time = 0.0
+        self.burnouts_peak = 0
+        self.histogram = [0] * len(HISTOGRAM_LABELS)
+        self.frames_paced = 0
+        self.frame_overruns = 0
+        self.frame_target_fps = 0.0
+        self.frame_time_max = 0.0
+        self.frame_stage_time = [0.0] * len(BUDGET_STAGES)
+        self.frame_stage_max = [0.0] * len(BUDGET_STAGES)
+        self.overrun_stage = [0] * len(BLAMED_STAGES)
+
+    def reset_frame(self) -> None:
+        """Forget the frame in progress (script reset)."""
+        self._frame_execute = 0.0
+        self._frame_idle = 0.0
+        self._frame_stamp: Optional[Tuple[float, float]] = None
+
+    def record_present(self, seconds: float, pixels: int, end_frame: bool = False) -> None:
+        """One SwapOnVSync: composite + swap time and pixels written since the last present."""
+        self.presents += 1
+        if end_frame:
+            self.end_frames += 1
+        self.present_time += seconds
+        if seconds > self.present_max:
+            self.present_max = seconds
+        self.histogram[_bucket(seconds)] += 1
+        self.pixels_written += pixels
+        if pixels > self.pixels_max:
+            self.pixels_max = pixels
+
+    def record_execute(self, seconds: float) -> None:
+        """Command execute time, charged to the frame that presents next."""
+        self._frame_execute += seconds
+
+    def record_idle(self, seconds: float) -> None:
+        """Consumer blocked on an empty command queue (waiting for the interpreter)."""
+        self._frame_idle += seconds
+
+    def record_frame_stamp(self, stamp: Tuple[float, float], now: Optional[float] = None) -> None:
+        """end_frame dequeued: keep its interpreter time and queue wait for record_frame()."""
+        interpret, enqueued = stamp
+        now = time.perf_counter() if now is None else now
+        self._frame_stamp = (interpret, max(0.0, now - enqueued))
+
+    def record_frame(self, present: float, interval: float, elapsed: float) -> Optional[str]:
+        """
+        Close a frame at end_frame.
+
+        interval is the fps() target (0 = none); elapsed is the time since the
+        previous paced present (0 when unknown). Returns the blamed stage when
+        the frame overran, else None.
+        """
+        interpret, queue_wait = self._frame_stamp or (0.0, 0.0)
+        execute, idle = self._frame_execute, self._frame_idle
+        stages = (interpret, queue_wait, execute, present)
+        for i, seconds in enumerate(stages):
+            self.frame_stage_time[i] += seconds
+            if seconds > self.frame_stage_max[i]:
+                self.frame_stage_max[i] = seconds
+        self.reset_frame()
+        if interval <= 0 or elapsed <= 0:
+            return None
+        self.frames_paced += 1
+        self.frame_target_fps = 1.0 / interval
+        if elapsed > self.frame_time_max:
+            self.frame_time_max = elapsed
+        if elapsed <= interval * (1.0 + OVERRUN_SLACK):
+            return None
+        self.frame_overruns += 1
+        blamed = [idle, execute, present]  # BLAMED_STAGES order
+        worst = blamed.index(max(blamed))
+        self.overrun_stage[worst] += 1
+        return BLAMED_STAGES[worst]
+
+    def record_fade_pump(self, burnouts_live: int) -> None:
+        self.fade_pumps += 1
+        self.sample_burnouts(burnouts_live)
+
+    def record_text_stall(self, seconds: float) -> None:
+        """Time the consumer spent blocked inside an animated text effect."""
+        self.text_effects += 1
+        self.text_stall_time += seconds
+
+    def sample_burnouts(self, live: int) -> None:
+        if live > self.burnouts_peak:
+            self.burnouts_peak = live
+
+    def due(self, now: Optional[float] = None) -> bool:
+        return (time.monotonic() if now is None else now) >= self._next_send
+
+    def take(self, burnouts_live: int) -> Dict:
+        """Delta since the previous take(); resets counters and the send timer."""
+        self.sample_burnouts(burnouts_live)
+        delta = {
+            "presents": self.presents,
+            "end_frames": self.end_frames,
+            "present_time": self.present_time,
+            "present_max": self.present_max,
+            "pixels_written": self.pixels_written,
+            "pixels_max": self.pixels_max,
+            "fade_pumps": self.fade_pumps,
+            "text_effects": self.text_effects,
+            "text_stall_time": self.text_stall_time,
+            "burnouts_live": burnouts_live,
+            "burnouts_peak": self.burnouts_peak,
+            "histogram": self.histogram,
+            "messages": 1,
+            "frames_paced": self.frames_paced,
+            "frame_overruns": self.frame_overruns,
+            "frame_target_fps": self.frame_target_fps,
+            "frame_time_max": self.frame_time_max,
+            "frame_stage_time": self.frame_stage_time,
+            "frame_stage_max": self.frame_stage_max,
+            "overrun_stage": self.overrun_stage,
+        }
+        self._clear()
+        self._next_send = time.monotonic() + self.interval
+        return delta
@@ -6,6 +6,12 @@ Flush as draw_batch(encoded) at end_frame or mflush.
 
 Record layout: uint8 op_code + fixed-size payload per op.
 PLOT payload matches mplot_protocol (20 bytes).
+
+RASTER is the one variable-size record: a header (x, y, width, height,
+format) followed by a dense pixel plane, so a whole grid/field program frame
+is one record instead of one PLOT per cell. RASTER_INDEXED planes are int16
+wire color ids then uint8 intensities (cells with id RASTER_SKIP are left
+untouched); RASTER_RGB planes are uint8 r, g, b per pixel.
 """
 
 from __future__ import annotations
@@ -35,6 +41,12 @@ OP_CIRCLE = 4
 OP_POLYGON = 5
 OP_ELLIPSE = 6
 OP_ARC = 7
+OP_RASTER = 8
+
+# RASTER plane formats
+RASTER_INDEXED = 1
+RASTER_RGB = 2
+RASTER_SKIP = -32768  # indexed color id for "leave this pixel alone"
 
 def _payload_size(fmt: str) -> int:
     return struct.calcsize(fmt)
@@ -46,6 +58,8 @@ _CIRCLE_FMT = "<3HhBIBB3x"
 _POLYGON_FMT = "<4HfhBIBB3x"
 _ELLIPSE_FMT = "<4HfhBIBB3x"
 _ARC_FMT = "<4HfhBIBB3x"
+_RASTER_HEADER_FMT = "<4HB"
+_RASTER_HEADER_SIZE = struct.calcsize(_RASTER_HEADER_FMT)
 
 OP_RECORD_SIZES = {
     OP_PLOT: 1 + MPLOT_RECORD_SIZE,
@@ -274,6 +288,65 @@ def pack_plot_record(
     return bytes([OP_PLOT]) + pack_mplot(x, y, color, intensity, burnout, burnout_mode)
 
 
+def pack_raster_record(x: int, y: int, pixels, intensities=None) -> bytes:
+    """
+    Pack a dense pixel plane with its top-left corner at (x, y).
+
+    pixels is an (h, w) array of wire color ids (RASTER_SKIP = untouched) with
+    intensities (h, w) 0-100, or an (h, w, 3) RGB array with intensities None.
+    The plane is clipped to the panel like draw_rectangle.
+    """
+    import numpy as np
+
+    pixels = np.asarray(pixels)
+    height, width = pixels.shape[:2]
+    clipped = clip_rectangle(x, y, width, height)
+    if clipped is None:
+        return b""
+    cx, cy, cw, ch = clipped
+    left = cx - int(float(x))
+    top = cy - int(float(y))
+    pixels = pixels[top:top + ch, left:left + cw]
+    header = struct.pack(
+        _RASTER_HEADER_FMT, cx, cy, cw, ch,
+        RASTER_RGB if intensities is None else RASTER_INDEXED,
+    )
+    if intensities is None:
+        return bytes([OP_RASTER]) + header + np.ascontiguousarray(pixels, dtype=np.uint8).tobytes()
+    intensities = np.asarray(intensities)[top:top + ch, left:left + cw]
+    return (
+        bytes([OP_RASTER]) + header
+        + np.ascontiguousarray(pixels, dtype="<i2").tobytes()
+        + np.ascontiguousarray(intensities, dtype=np.uint8).tobytes()
+    )
+
+
+def _unpack_raster(binary_data: bytes, offset: int) -> Tuple[tuple, int]:
+    """(x, y, pixels, intensities) for the RASTER record at offset, and its size."""
+    import numpy as np
+
+    end = offset + 1 + _RASTER_HEADER_SIZE
+    if end > len(binary_data):
+        raise ValueError(f"Truncated draw_batch record op={OP_RASTER} at offset {offset}")
+    x, y, width, height, fmt = struct.unpack_from(_RASTER_HEADER_FMT, binary_data, offset + 1)
+    cells = width * height
+    if fmt == RASTER_INDEXED:
+        ids_end = end + 2 * cells
+        size = ids_end + cells - offset
+    elif fmt == RASTER_RGB:
+        size = end + 3 * cells - offset
+    else:
+        raise ValueError(f"Unknown raster format: {fmt}")
+    if offset + size > len(binary_data):
+        raise ValueError(f"Truncated draw_batch record op={OP_RASTER} at offset {offset}")
+    if fmt == RASTER_RGB:
+        pixels = np.frombuffer(binary_data, dtype=np.uint8, count=3 * cells, offset=end)
+        return (x, y, pixels.reshape(height, width, 3), None), size
+    pixels = np.frombuffer(binary_data, dtype="<i2", count=cells, offset=end)
+    intensities = np.frombuffer(binary_data, dtype=np.uint8, count=cells, offset=ids_end)
+    return (x, y, pixels.reshape(height, width), intensities.reshape(height, width)), size
+
+
 def pack_draw_op(cmd_name: str, args: List[Any]) -> bytes:
     """
   Pack one frame draw command from already-parsed Pixil arguments.
@@ -412,6 +485,11 @@ def pack_draw_op(cmd_name: str, args: List[Any]) -> bytes:
         )
         return bytes([OP_ARC]) + payload
 
+    if cmd_name == "raster":
+        x, y, pixels = args[0], args[1], args[2]
+        intensities = args[3] if len(args) > 3 else None
+        return pack_raster_record(x, y, pixels, intensities)
+
     raise ValueError(f"draw_batch does not support command: {cmd_name}")
 
 
@@ -434,6 +512,11 @@ def unpack_draw_batch(binary_data: bytes) -> Iterator[Tuple[str, tuple]]:
         if offset >= n:
             break
         op = binary_data[offset]
+        if op == OP_RASTER:
+            args, size = _unpack_raster(binary_data, offset)
+            offset += size
+            yield ("raster", args)
+            continue
         size = OP_RECORD_SIZES.get(op)
         if size is None:
             raise ValueError(f"Unknown draw_batch op code: {op}")
@@ -539,6 +622,10 @@ __all__ = [
     "OP_POLYGON",
     "OP_ELLIPSE",
     "OP_ARC",
+    "OP_RASTER",
+    "RASTER_INDEXED",
+    "RASTER_RGB",
+    "RASTER_SKIP",
     "center_radius_visible_on_panel",
     "circle_visible_on_panel",
     "ellipse_visible_on_panel",
@@ -546,6 +633,7 @@ __all__ = [
     "clip_line_segment",
     "pack_draw_op",
     "pack_plot_record",
+    "pack_raster_record",
     "unpack_draw_batch",
     "encode_buffer",
     "decode_buffer",
@@ -0,0 +1,200 @@
+"""
+Per-stage latency tracing for Pixil (producer) → queue → rgb_matrix_lib (consumer).
+
+Enabled only when PIXIL_TRACE names an output file; otherwise every hook is a
+single module-level flag check. Spans land in a per-process ring buffer
+(PIXIL_TRACE_EVENTS, default 200000) and are written as Chrome trace JSON
+(chrome://tracing or https://ui.perfetto.dev).
+
+Stages, all tagged with the producer frame id stamped at begin_frame:
+  producer  interpret   begin_frame → end_frame enqueued (interpreter time)
+  queue     enqueue     put_command (includes back-off while the queue is full)
+  queue     queue_wait  enqueue → dequeue in the consumer
+  consumer  <command>   CommandExecutor decode + execute
+  present   present     RGB_Api.end_frame composite + swap
+
+Each process writes <PIXIL_TRACE>.<role>.json on exit; the producer merges the
+parts into PIXIL_TRACE after the consumer has stopped.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+TRACE_ENV = "PIXIL_TRACE"
+TRACE_EVENTS_ENV = "PIXIL_TRACE_EVENTS"
+DEFAULT_CAPACITY = 200000
+
+ENABLED = bool(os.environ.get(TRACE_ENV, "").strip())
+
+# (name, cat, ts_us, dur_us, frame) — Chrome fields are built at export time
+_ring: deque = deque(maxlen=int(os.environ.get(TRACE_EVENTS_ENV, DEFAULT_CAPACITY) or DEFAULT_CAPACITY))
+_frame_id = 0
+_current_frame = 0
+_frame_start_us = 0
+
+
+def now_us() -> int:
+    """Monotonic microseconds (CLOCK_MONOTONIC is shared by both processes on Linux)."""
+    return time.perf_counter_ns() // 1000
+
+
+def enable(capacity: Optional[int] = None) -> None:
+    """Turn tracing on in this process (tests / interactive use)."""
+    global ENABLED, _ring
+    ENABLED = True
+    if capacity is not None:
+        _ring = deque(maxlen=capacity)
+
+
+def reset() -> None:
+    global _frame_id, _current_frame, _frame_start_us
+    _ring.clear()
+    _frame_id = 0
+    _current_frame = 0
+    _frame_start_us = 0
+
+
+def span(name: str, cat: str, start_us: int, end_us: int, frame: Optional[int] = None) -> None:
+    """Record one completed span (no-op when tracing is off)."""
+    if ENABLED:
+        _ring.append((name, cat, start_us, max(0, end_us - start_us),
+                      _current_frame if frame is None else frame))
+
+
+def set_frame(frame: int) -> None:
+    """Consumer side: frame id of the command being executed."""
+    global _current_frame
+    _current_frame = frame
+
+
+def current_frame() -> int:
+    return _current_frame
+
+
+def begin_frame() -> int:
+    """Producer side: stamp a new frame id at begin_frame."""
+    global _frame_id, _current_frame, _frame_start_us
+    _frame_id += 1
+    _current_frame = _frame_id
+    _frame_start_us = now_us() if ENABLED else 0
+    return _frame_id
+
+
+def end_frame() -> None:
+    """Producer side: close the interpreter span once end_frame is enqueued."""
+    global _current_frame
+    if ENABLED and _frame_start_us:
+        span("interpret", "producer", _frame_start_us, now_us(), _current_frame)
+    _current_frame = 0
+
+
+def stamp() -> tuple:
+    """Queue payload (frame id, enqueue time) appended to the command tuple."""
+    return (_current_frame, now_us())
+
+
+def dequeued(trace_stamp) -> None:
+    """Consumer side: record queue wait for a stamped command and adopt its frame.
+
+    trace_stamp is the list of extra tuple items after (command, delay).
+    """
+    if not trace_stamp:
+        return
+    frame, enqueued_us = trace_stamp[0]
+    set_frame(frame)
+    span("queue_wait", "queue", enqueued_us, now_us(), frame)
+
+
+def events() -> List[tuple]:
+    return list(_ring)
+
+
+def chrome_events(role: str, pid: Optional[int] = None) -> List[Dict]:
+    """Ring contents as Chrome trace 'X' events plus process metadata."""
+    pid = os.getpid() if pid is None else pid
+    out: List[Dict] = [
+        {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": role}},
+    ]
+    for name, cat, ts, dur, frame in _ring:
+        out.append({
+            "name": name, "cat": cat, "ph": "X", "ts": ts, "dur": dur,
+            "pid": pid, "tid": 0, "args": {"frame": frame},
+        })
+    return out
+
+
+def part_path(role: str, base: Optional[str] = None) -> Path:
+    base = base or os.environ.get(TRACE_ENV, "").strip()
+    return Path(f"{base}.{role}.json")
+
+
+def write_part(role: str, base: Optional[str] = None) -> Optional[Path]:
+    """Dump this process's ring as <PIXIL_TRACE>.<role>.json."""
+    if not ENABLED:
+        return None
+    path = part_path(role, base)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": chrome_events(role)}), encoding="utf-8")
+    except OSError:
+        return None
+    return path
+
+
+def merge(parts: Iterable[Path], output: Path) -> int:
+    """Concatenate Chrome trace parts into one file; returns event count."""
+    merged: List[Dict] = []
+    for part in parts:
+        try:
+            merged.extend(json.loads(Path(part).read_text(encoding="utf-8")).get("traceEvents", []))
+        except (OSError, ValueError):
+            continue
+    Path(output).write_text(json.dumps({"traceEvents": merged, "displayTimeUnit": "ms"}), encoding="utf-8")
+    return len(merged)
+
+
+def finish_producer() -> Optional[Path]:
+    """Write the producer part and merge every part present into PIXIL_TRACE."""
+    if not ENABLED:
+        return None
+    base = os.environ.get(TRACE_ENV, "").strip()
+    write_part("producer", base)
+    parts = [p for p in (part_path("producer", base), part_path("consumer", base)) if p.is_file()]
+    output = Path(base)
+    count = merge(parts, output)
+    for p in parts:
+        try:
+            p.unlink()
+        except OSError:
+            pass
+    print(f"Latency trace: {count} events written to {output}")
+    return output
+
+
+def frame_breakdown(trace_events: Iterable[Dict]) -> Dict[int, Dict[str, float]]:
+    """Per-frame milliseconds by stage: interpret / enqueue / queue_wait (max) / execute / present."""
+    frames: Dict[int, Dict[str, float]] = {}
+    for ev in trace_events:
+        if ev.get("ph") != "X":
+            continue
+        frame = ev.get("args", {}).get("frame", 0)
+        if not frame:
+            continue
+        row = frames.setdefault(frame, {"interpret": 0.0, "enqueue": 0.0, "queue_wait": 0.0,
+                                        "execute": 0.0, "present": 0.0})
+        ms = ev.get("dur", 0) / 1000.0
+        name, cat = ev.get("name"), ev.get("cat")
+        if name == "queue_wait":
+            row["queue_wait"] = max(row["queue_wait"], ms)
+        elif name in ("interpret", "enqueue", "present"):
+            row[name] += ms
+        elif cat == "consumer" and name != "end_frame":
+            # end_frame's own span wraps present; count it once, as present
+            row["execute"] += ms
+    return frames
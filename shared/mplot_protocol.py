@@ -55,6 +55,7 @@ from typing import Union, Optional, Iterator, Tuple, Any
 # Binary format constants
 MPLOT_RECORD_SIZE = 20
 STRUCT_FORMAT = '<HHhBIB8x'  # little-endian: ushort, ushort, short, uchar, uint, uchar, 8 padding
+_RECORD_STRUCT = struct.Struct(STRUCT_FORMAT)
 
 # Special values for optional parameters
 INTENSITY_DEFAULT = 255      # Indicates "use default intensity (100)"
@@ -123,6 +124,8 @@ NAMED_COLOR_TO_ID = {
     'magenta': -42,
     'lavender': -43,
     'transparent': -44,
+    'dark_green': -45,
+    'dark_purple': -46,
 }
 
 # Reverse mapping: ID to named color (for unpacking)
@@ -159,7 +162,10 @@ def get_color_id(color: Union[str, int]) -> int:
             raise ValueError(f"Spectral color must be 0-99, got {color}")
     
     elif isinstance(color, str):
-        # Named color: lookup in mapping
+        # Named color: exact-case hit first (scripts almost always use lowercase)
+        result = NAMED_COLOR_TO_ID.get(color)
+        if result is not None:
+            return result
         color_lower = color.lower()
         
         if color_lower in NAMED_COLOR_TO_ID:
@@ -300,12 +306,7 @@ def unpack_mplot_batch(binary_data: bytes) -> Iterator[Tuple[int, int, Union[str
         raise ValueError(f"Binary data size {len(binary_data)} is not multiple of record size {MPLOT_RECORD_SIZE}")
     
     # Process each 20-byte record
-    for offset in range(0, len(binary_data), MPLOT_RECORD_SIZE):
-        record = binary_data[offset:offset + MPLOT_RECORD_SIZE]
-        
-        # Unpack binary record
-        x, y, color_id, intensity_value, burnout_value, burnout_mode_value = struct.unpack(STRUCT_FORMAT, record)
-        
+    for x, y, color_id, intensity_value, burnout_value, burnout_mode_value in _RECORD_STRUCT.iter_unpack(binary_data):
         # Convert color ID back to color
         color = get_color_from_id(color_id)
         
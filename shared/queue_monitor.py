@@ -1,56 +1,69 @@
 from threading import Thread
 import sys
-import os
+import shutil
 import time
 import atexit
 
 class QueueMonitor:
-    def __init__(self, queue_instance):
+    """Bottom-right terminal overlay for -q; headless runs use --telemetry instead."""
+
+    def __init__(self, queue_instance, telemetry=None):
         self.queue_instance = queue_instance
+        # Optional shared.telemetry.TelemetryPublisher: show its rates too
+        self.telemetry = telemetry
         self.running = False
         self.thread = None
         atexit.register(self.cleanup)
-        
+
     def start(self):
         """Start queue monitoring thread"""
+        if not sys.stdout.isatty():
+            return  # Nothing to draw on (systemd/journal, pipes)
         self.running = True
         self.thread = Thread(target=self._monitor_loop, daemon=True)
         sys.stdout.write('\n\033[s\033[?25l')  # Save cursor position and hide it
         self.thread.start()
-        
+
     def stop(self):
         """Stop monitoring and restore cursor"""
         self.running = False
         if self.thread:
             self.thread.join(timeout=1.0)
         self.cleanup()
-            
+
     def cleanup(self):
         """Restore cursor and position"""
+        if self.thread is None:
+            return
+        self.thread = None
         sys.stdout.write('\033[?25h\033[u\n')  # Show cursor, restore position, and add newline
         sys.stdout.flush()
-        
+
+    def _display_text(self):
+        latest = self.telemetry.latest if self.telemetry is not None else None
+        if latest:
+            depth = latest.get('queue_depth') or 0
+            return (f"Queue: {depth:5d}  fps {latest.get('frames_per_s', 0.0):5.1f}"
+                    f"/{latest.get('consumer_frames_per_s', 0.0):5.1f}")
+        return f"Queue: {self.queue_instance.command_queue.qsize():5d}"
+
     def _monitor_loop(self):
         """Update queue depth display"""
         while self.running:
             try:
-                # Get terminal size
-                rows, columns = os.popen('stty size', 'r').read().split()
-                rows, columns = int(rows), int(columns)
-                
-                # Get queue size
-                queue_size = self.queue_instance.command_queue.qsize()
-                display_text = f"Queue: {queue_size:5d}"
-                
+                # ioctl on the tty; no subprocess per update
+                columns, rows = shutil.get_terminal_size()
+                display_text = self._display_text()
+
                 # Position at bottom right
                 x = max(0, columns - len(display_text))
-                
-                # Save current cursor position, move to bottom, write queue size, 
+
+                # Save current cursor position, move to bottom, write queue size,
                 # and restore cursor position
                 sys.stdout.write(f'\033[s\033[{rows};{x}H{display_text}\033[u')
                 sys.stdout.flush()
-                
-            except:
+
+            except Exception:
                 pass  # Ignore any errors during display
-                
-            time.sleep(0.1)  # Update 10 times/second
\ No newline at end of file
+
+            time.sleep(0.1)  # Update 10 times/second
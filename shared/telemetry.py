@@ -0,0 +1,188 @@
+"""
+Live telemetry for a running Pixil instance over a local Unix socket.
+
+The producer builds a snapshot (queue depth, producer/consumer frame rates,
+queue stall time, frame budget overruns, cache hit rates) every INTERVAL seconds and writes it as one
+JSON line to every connected client. Counters listed in RATE_COUNTERS are
+published as-is plus a "<name>_per_s" rate over the last RATE_WINDOW seconds
+(consumer stats only arrive once a second, so a per-tick rate would flicker);
+counters that go backwards (per-script resets) restart the rate from zero.
+
+Enabled with `Pixil.py --telemetry [PATH]` or PIXIL_TELEMETRY=<path|1>; read
+with tools/pixil_top.py. Slow or vanished clients are dropped rather than
+allowed to back-pressure the interpreter.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+TELEMETRY_ENV = "PIXIL_TELEMETRY"
+SOCKET_NAME = "pixil-telemetry.sock"
+DEFAULT_INTERVAL = 0.25  # seconds between snapshots
+RATE_WINDOW = 2.0  # seconds of history behind each *_per_s rate
+MAX_CLIENTS = 8
+
+# Cumulative counters that also get a per-second rate
+RATE_COUNTERS = ("commands", "lines", "frames", "consumer_frames", "queue_stall_time",
+                 "consumer_frame_overruns")
+
+
+def default_socket_path() -> Path:
+    """$XDG_RUNTIME_DIR/pixil-telemetry.sock, else the system temp dir."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(base) / SOCKET_NAME
+
+
+def socket_path_from_env() -> Optional[Path]:
+    """Socket path requested through PIXIL_TELEMETRY (None when unset)."""
+    value = os.environ.get(TELEMETRY_ENV, "").strip()
+    if not value or value == "0":
+        return None
+    return default_socket_path() if value == "1" else Path(value)
+
+
+def add_rates(snapshot: Dict, previous: Optional[Dict]) -> Dict:
+    """Add <counter>_per_s fields computed against an earlier snapshot."""
+    elapsed = snapshot["ts"] - previous["ts"] if previous else 0.0
+    for key in RATE_COUNTERS:
+        if key not in snapshot:
+            continue
+        rate = 0.0
+        if elapsed > 0:
+            before = previous.get(key, 0)
+            delta = snapshot[key] - before if snapshot[key] >= before else snapshot[key]
+            rate = delta / elapsed
+        snapshot[f"{key}_per_s"] = rate
+    return snapshot
+
+
+class TelemetryPublisher:
+    """Background thread serving snapshot() to Unix-socket clients."""
+
+    def __init__(self, snapshot: Callable[[], Dict], path=None, interval: float = DEFAULT_INTERVAL):
+        self._snapshot = snapshot
+        self.path = Path(path) if path else default_socket_path()
+        self.interval = max(0.02, interval)
+        self.latest: Optional[Dict] = None
+        self._history: deque = deque()
+        self._server: Optional[socket.socket] = None
+        self._clients: List[socket.socket] = []
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() or self.path.is_symlink():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.path))
+            except OSError:
+                # Stale socket from a previous run
+                self.path.unlink()
+            else:
+                raise OSError(f"telemetry socket {self.path} is in use by another Pixil instance")
+            finally:
+                probe.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(self.path))
+        server.listen(MAX_CLIENTS)
+        server.setblocking(False)
+        self._server = server
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="pixil-telemetry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._running.clear()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        for client in self._clients:
+            client.close()
+        self._clients.clear()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def _accept(self) -> None:
+        while len(self._clients) < MAX_CLIENTS:
+            try:
+                client, _addr = self._server.accept()
+            except (BlockingIOError, OSError):
+                return
+            client.setblocking(False)
+            self._clients.append(client)
+
+    def _broadcast(self, payload: bytes) -> None:
+        for client in list(self._clients):
+            try:
+                sent = client.send(payload)
+            except OSError:
+                sent = -1
+            if sent != len(payload):
+                # Gone, or its receive buffer is full: a partial line would corrupt the stream
+                client.close()
+                self._clients.remove(client)
+
+    def publish_once(self) -> Dict:
+        """Take one snapshot and send it (the thread's loop body)."""
+        snapshot = dict(self._snapshot())
+        snapshot["ts"] = time.time()
+        history = self._history
+        while len(history) > 1 and history[1]["ts"] <= snapshot["ts"] - RATE_WINDOW:
+            history.popleft()
+        self.latest = add_rates(snapshot, history[0] if history else None)
+        history.append(snapshot)
+        if self._server is not None:
+            self._accept()
+            if self._clients:
+                self._broadcast((json.dumps(snapshot, separators=(",", ":")) + "\n").encode())
+        return snapshot
+
+    def _run(self) -> None:
+        while self._running.is_set():
+            try:
+                self.publish_once()
+            except Exception:
+                pass  # Telemetry must never take the interpreter down
+            time.sleep(self.interval)
+
+
+def read_snapshots(path=None, timeout: float = 5.0) -> Iterator[Dict]:
+    """Client side: yield snapshots from a running publisher until it goes away."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    client.connect(str(Path(path) if path else default_socket_path()))
+    buffered = b""
+    try:
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                return
+            buffered += chunk
+            *lines, buffered = buffered.split(b"\n")
+            for line in lines:
+                if line:
+                    yield json.loads(line)
+    finally:
+        client.close()
@@ -44,3 +44,55 @@ FAST_MATH_CASES = [
     ("5 + v_x", 15),
     ("2 * v_x", 20),
 ]
+
+# One expression per try_fast_* pattern; uses variables_with_array (adds v_values=[10..50], v_i=2)
+FAST_PATH_CASES = [
+    ("int(v_x / 4)", 2),
+    ("int(v_values[v_i])", 30),
+    ("v_values[v_i]", 30),
+    ("v_values[v_i + 1]", 40),
+    ("v_values[v_i - v_a]", 20),
+    ("v_values[v_i] + v_values[v_a]", 50),
+    ("v_values[v_i] - v_values[v_a]", 10),
+    ("v_values[v_i] + 5", 35),
+    ("v_values[v_i] - 5", 25),
+    ("v_values[v_i] * 2", 60),
+    ("v_values[v_i] / 10", 3.0),
+    ("v_values[v_i] * 2 / v_x", 6.0),
+    ("100 - v_values[v_i] * 2 / v_x", 94.0),
+    ("v_x + v_y", 15),
+    ("v_x * v_y", 50),
+    ("v_x - v_y", 5),
+    ("v_x / v_y", 2.0),
+    ("10 - v_x", 0),
+    ("100 / v_x", 10.0),
+    ("v_y * 8 + v_x", 50),
+    ("sqrt(v_x * v_x + v_y * v_y)", math.hypot(10, 5)),
+    ("abs(v_x)", 10),
+    ("sin(v_b)", 0.0),
+    ("cos(v_b)", 1.0),
+    ("radians(v_x)", math.radians(10)),
+    ("sqrt(v_x)", math.sqrt(10)),
+]
+
+# random(min, max, decimals): (expression, (low, high))
+RANDOM_CASES = [
+    ("random(0, v_x, 0)", (0, 10)),
+    ("random(v_b, v_a, 2)", (0, 1)),
+]
+
+# Pixil.parse_value parameters: (value, command, position, formatted) — same variables
+PARAM_VALUE_CASES = [
+    ("100", "plot", 0, "100"),
+    ("red", "plot", 2, "red"),
+    ("fade", "plot", 5, "fade"),
+    ('"Hello"', "draw_text", 2, '"Hello"'),
+    ("v_values[v_i]", "plot", 0, "30"),
+    ("v_x + 5", "plot", 0, "15"),
+    ("v_x * 2", "plot", 1, "20"),
+    ("v_x - 3", "plot", 0, "7"),
+    ("v_x / 2", "plot", 0, "5"),
+    ("v_x % 3", "plot", 0, "1"),
+    ("v_x + v_y", "plot", 0, "15"),
+    ("v_x * v_y", "plot", 3, "50"),
+]
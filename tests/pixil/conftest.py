@@ -1,5 +1,6 @@
 """Shared fixtures for pixil_utils unit tests."""
 
+import numpy as np
 import pytest
 
 from pixil_utils.array_manager import PixilArray
@@ -43,6 +44,25 @@ def variables_with_array(variables):
     return variables
 
 
+@pytest.fixture
+def make_vars():
+    """Factory for a registry from keywords: sequences become numeric arrays, anything else a scalar."""
+
+    def make(**values):
+        reg = VariableRegistry()
+        for name, value in values.items():
+            reg.register(name)
+            if isinstance(value, (list, tuple, np.ndarray)):
+                arr = PixilArray(len(value))
+                arr.data[:] = [float(v) for v in value]
+                reg.set(name, arr)
+            else:
+                reg.set(name, value)
+        return reg
+
+    return make
+
+
 @pytest.fixture(autouse=True)
 def reset_caches():
     """Isolate tests from global math/JIT/condition caches."""
@@ -0,0 +1,97 @@
+"""Allocation/GC instrumentation and the gc.freeze() animation mode."""
+
+import gc
+
+import pytest
+
+from shared import alloc_stats, consumer_stats
+from shared.alloc_stats import AllocStats, GcTuning
+
+
+@pytest.fixture
+def stats():
+    collector = AllocStats()
+    collector.start()
+    yield collector
+    collector.stop()
+
+
+def test_gc_callback_times_collections_per_frame(stats):
+    stats.frame()
+    gc.collect()
+    kept = [[i] for i in range(2000)]
+    stats.frame()
+    delta = stats.take()
+    assert delta["frames"] == 2
+    assert delta["collections"][2] >= 1
+    assert delta["gc_pause"] > 0 and delta["gc_pause_max"] <= delta["gc_pause"]
+    assert delta["gc_frames"] == 1
+    assert delta["blocks_growth_max"] >= len(kept)
+    assert delta["top_sites"] == []
+    # take() resets the counters
+    assert stats.take()["frames"] == 0
+
+
+def test_merge_through_consumer_stats_and_report():
+    first = AllocStats().take()
+    first.update(frames=10, blocks_growth=50, blocks_growth_max=20, collections=[3, 1, 0], gc_pause=0.002)
+    second = dict(first, collections=[1, 0, 1], blocks_growth_max=40, gc_pause_max=0.004)
+    totals = consumer_stats.merge(consumer_stats.empty_totals(), {"alloc": first})
+    consumer_stats.merge(totals, {"alloc": second})
+    alloc = totals["alloc"]
+    assert alloc["frames"] == 20 and alloc["collections"] == [4, 1, 1]
+    assert alloc["blocks_growth_max"] == 40 and alloc["gc_pause_max"] == 0.004
+    lines = alloc_stats.format_report("consumer", alloc)
+    assert lines[0] == "Allocation / GC (consumer):"
+    assert "gen0 4, gen1 1, gen2 1" in lines[2]
+    # Without --alloc-stats the consumer totals carry no alloc section
+    assert "alloc" not in consumer_stats.merge(consumer_stats.empty_totals(), {"presents": 1})
+
+
+def test_trace_mode_reports_transient_peak_and_growth_sites():
+    collector = AllocStats(trace=True, top=3)
+    collector.start()
+    try:
+        collector.frame()  # baseline snapshot
+        scratch = bytearray(256 * 1024)
+        del scratch
+        retained = [str(i) * 20 for i in range(3000)]
+        collector.frame()
+        delta = collector.take(final=True)
+    finally:
+        collector.stop()
+    assert delta["transient_bytes_max"] >= 256 * 1024
+    assert delta["top_sites"] and len(delta["top_sites"]) <= 3
+    where, size, count = delta["top_sites"][0]
+    assert "test_alloc_stats.py:" in where
+    assert size > 0 and count > 0 and retained
+
+
+def test_gc_tuning_freezes_and_restores_thresholds():
+    before = gc.get_threshold()
+    tuning = GcTuning((5000, 15, 30))
+    tuning.enter()
+    try:
+        assert tuning.active
+        assert gc.get_threshold() == (5000, 15, 30)
+        assert gc.get_freeze_count() > 0
+        tuning.enter()  # idempotent: keeps the original thresholds to restore
+    finally:
+        tuning.leave()
+    assert not tuning.active
+    assert gc.get_threshold() == before
+    assert gc.get_freeze_count() == 0
+
+
+def test_env_parsing(monkeypatch):
+    monkeypatch.delenv(alloc_stats.ALLOC_ENV, raising=False)
+    assert alloc_stats.alloc_mode() == "" and alloc_stats.from_env() is None
+    for value, mode in (("1", "stats"), ("stats", "stats"), ("trace", "trace"), ("0", "")):
+        monkeypatch.setenv(alloc_stats.ALLOC_ENV, value)
+        assert alloc_stats.alloc_mode() == mode
+    monkeypatch.setenv(alloc_stats.GC_THRESHOLD_ENV, "2000,5")
+    assert alloc_stats.animation_thresholds() == (2000, 5)
+    monkeypatch.setenv(alloc_stats.GC_THRESHOLD_ENV, "fast")
+    assert alloc_stats.animation_thresholds() == alloc_stats.ANIMATION_THRESHOLDS
+    monkeypatch.setenv(alloc_stats.GC_FREEZE_ENV, "1")
+    assert alloc_stats.gc_freeze_enabled()
@@ -0,0 +1,36 @@
+"""Benchmark harness output parsing and baseline comparison (no sudo / LED required)."""
+
+from tests.scripts.run_bench import compare_results, parse_bench_output
+
+
+def _run(lines_per_s, frame_p90):
+    return {
+        "scripts": {
+            "main/a.pix": {
+                "producer": {"lines_per_s": lines_per_s, "commands_per_s": 100.0},
+                "consumer": {"frame_ms": {"p50": 1.0, "p90": frame_p90}},
+            }
+        }
+    }
+
+
+def test_parse_bench_output_reads_both_roles():
+    out = (
+        "noise\n"
+        'PIXIL_BENCH_CONSUMER {"frames": 3}\n'
+        "PIXIL_TEST_BUFFER_HASH=empty\n"
+        'PIXIL_BENCH_PRODUCER {"lines": 10}\n'
+    )
+    assert parse_bench_output(out) == {"consumer": {"frames": 3}, "producer": {"lines": 10}}
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    rows = compare_results(_run(1000.0, 5.0), _run(800.0, 4.0), tolerance=10.0)
+    by_metric = {r["metric"]: r for r in rows}
+    assert by_metric["producer.lines_per_s"]["regressed"] is True
+    assert by_metric["consumer.frame_ms.p90"]["regressed"] is False
+    assert by_metric["producer.commands_per_s"]["change_pct"] == 0.0
+
+
+def test_compare_skips_scripts_missing_from_baseline():
+    assert compare_results({"scripts": {}}, _run(1.0, 1.0)) == []
@@ -0,0 +1,108 @@
+"""Tests for grid_program rule kernels (ca_kernel)."""
+
+import numpy as np
+import pytest
+
+from pixil_utils.ca_kernel import NEIGHBORHOODS, CAKernel, parse_ca_rule
+from pixil_utils.grid_engine import reset_grid_runtime, run_grid_step
+from pixil_utils.grid_field_compiler import compile_grid_program
+
+
+def test_parse_rules():
+    life = parse_ca_rule("B3/S23")
+    assert (life.kind, life.states, life.birth, life.survive) == ("life", 2, {3}, {2, 3})
+    brain = parse_ca_rule("b2/s/c3")
+    assert (brain.kind, brain.states, brain.birth, brain.survive) == ("generations", 3, {2}, set())
+    cyclic = parse_ca_rule("cyclic C16 T2", "von_neumann")
+    assert (cyclic.kind, cyclic.states, cyclic.threshold, cyclic.neighbors) == ("cyclic", 16, 2, 4)
+
+
+@pytest.mark.parametrize(
+    "text, neighborhood, message",
+    [
+        ("B3", "moore", "needs B"),
+        ("B9/S23", "moore", "go up to 8"),
+        ("B5/S23", "von_neumann", "go up to 4"),
+        ("B3/S23/C1", "moore", "states must be"),
+        ("B3/X2", "moore", "bad rule part"),
+        ("cyclic T1", "moore", "needs C"),
+        ("cyclic C8 T9", "moore", "threshold"),
+        ("B3/S23", "hex", "unknown neighborhood"),
+    ],
+)
+def test_parse_rule_errors(text, neighborhood, message):
+    with pytest.raises(ValueError, match=message):
+        parse_ca_rule(text, neighborhood)
+
+
+def _reference_step(grid, rule, boundary):
+    padded = np.pad(grid, 1, mode="wrap" if boundary == "wrap" else "edge")
+    size = grid.shape[0]
+    shifted = [padded[1 + dy:1 + dy + size, 1 + dx:1 + dx + size] for dy, dx in NEIGHBORHOODS[rule.neighborhood]]
+    state = grid.astype(int)
+    if rule.kind == "cyclic":
+        successor = (state + 1) % rule.states
+        hits = sum((cells == successor).astype(int) for cells in shifted)
+        return np.where(hits >= rule.threshold, successor, state)
+    live = sum((cells == 1).astype(int) for cells in shifted)
+    born = np.isin(live, list(rule.birth)).astype(int)
+    kept = np.where(np.isin(live, list(rule.survive)), 1, 2 % rule.states)
+    return np.where(state == 0, born, np.where(state == 1, kept, (state + 1) % rule.states))
+
+
+@pytest.mark.parametrize("text", ["B3/S23", "B34/S023", "B2/S/C3", "B3/S234/C6", "cyclic C5 T1", "cyclic C3 T3"])
+@pytest.mark.parametrize("neighborhood", ["moore", "von_neumann"])
+@pytest.mark.parametrize("boundary", ["wrap", "clamp"])
+def test_kernel_matches_reference(text, neighborhood, boundary):
+    rule = parse_ca_rule(text, neighborhood)
+    kernel = CAKernel(rule, 9, boundary)
+    grid = np.random.default_rng(len(text)).integers(0, rule.states, (9, 9)).astype(np.uint8)
+    out = np.empty_like(grid)
+    for _ in range(4):
+        expected = _reference_step(grid, rule, boundary)
+        kernel.step(grid, out)
+        assert np.array_equal(out, expected)
+        grid = out.copy()
+
+
+def test_run_clips_field_values_to_states():
+    kernel = CAKernel(parse_ca_rule("B2/S/C3"), 2, "clamp")
+    out = np.empty(4)
+    kernel.run(np.array([-1.0, np.nan, 2.7, 9.0]), out, 1)
+    # Inputs load as 0, 0, 2, 2: the refractory cells decay, nothing is born
+    assert out.tolist() == [0.0, 0.0, 0.0, 0.0]
+
+
+LIFE_STEP = [
+    "step v_grid {",
+    "v_n = neighbors(v_grid)",
+    "v_alive = at(v_grid) == 1",
+    "v_grid_next = where(v_alive and (v_n == 2 or v_n == 3), 1, where(v_n == 3, 1, 0))",
+    "}",
+]
+
+
+@pytest.mark.parametrize("boundary", ["wrap", "clamp"])
+def test_rule_program_matches_step_expressions(boundary, make_vars):
+    head = ["size 12", "fields v_grid", "steps 3", f"boundary {boundary}"]
+    draw = ["draw {", "fill_field v_grid", "}"]
+    seed = (np.random.default_rng(4).uniform(size=144) < 0.35).astype(float)
+    results = []
+    for name, body in (("expr_life", LIFE_STEP), ("rule_life", ["rule B3/S23"])):
+        reset_grid_runtime()
+        prog = compile_grid_program(name, head + body + draw)
+        reg = make_vars(v_grid=seed)
+        draws = []
+        for _ in range(3):
+            run_grid_step(prog, reg, lambda cmd, args: draws.append(args))
+        results.append((list(reg.get("v_grid").data), draws[-1][2].tolist()))
+    assert results[0] == results[1]
+
+
+def test_rule_program_errors():
+    with pytest.raises(ValueError, match="no step blocks"):
+        compile_grid_program("bad", ["size 4", "fields v_grid", "rule B3/S23"] + LIFE_STEP)
+    with pytest.raises(ValueError, match="one field"):
+        compile_grid_program("bad", ["size 4", "fields v_a, v_b", "rule B3/S23"])
+    with pytest.raises(ValueError, match="needs a rule"):
+        compile_grid_program("bad", ["size 4", "fields v_grid", "neighborhood moore"] + LIFE_STEP)
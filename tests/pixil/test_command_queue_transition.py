@@ -190,3 +190,52 @@ def test_shutdown_display_runs_emergency_blackout_when_consumer_times_out(monkey
     assert "kill" in calls
     assert emergency_calls == [0.01]
 
+
+def test_late_drain_marker_does_not_swallow_script_reset(monkeypatch):
+    """__DRAIN__ can arrive after the flag-triggered drain already finished."""
+    from rgb_matrix_lib import api as api_module
+
+    api = api_module.RGB_Api(backend="framebuffer")
+    monkeypatch.setattr(api_module, "get_api_instance", lambda: api)
+    q = MatrixCommandQueue(queue_size=8)
+    for command in ("__DRAIN__", "__SCRIPT_RESET__", "__SHUTDOWN__"):
+        q.command_queue.put((command, 0))
+    q._consumer_loop()
+    assert q._reset_complete.is_set()
+    assert q._shutdown_complete.is_set()
+
+
+def test_restarted_consumer_drops_inherited_alloc_stats(monkeypatch):
+    """Each consumer fork starts clean even though the producer's collector is running."""
+    import gc
+    import multiprocessing
+    import tracemalloc
+
+    from shared import alloc_stats
+
+    monkeypatch.setenv(alloc_stats.ALLOC_ENV, "trace")
+    reports = multiprocessing.Queue()
+
+    def consumer_loop(self):
+        inherited = [cb for cb in gc.callbacks if isinstance(getattr(cb, "__self__", None), alloc_stats.AllocStats)]
+        traced = tracemalloc.is_tracing()
+        own = alloc_stats.from_env()
+        gc.collect()
+        reports.put((len(inherited), traced, producer.take()["collections"], own.take()["collections"]))
+
+    monkeypatch.setattr(MatrixCommandQueue, "_consumer_loop", consumer_loop)
+    producer = alloc_stats.from_env()
+    try:
+        q = MatrixCommandQueue(queue_size=4)
+        monkeypatch.setattr(q, "_wait_for_script_reset", lambda timeout=3.0: True)
+        q.start_consumer()
+        first = reports.get(timeout=10)
+        q.reset_for_next_script()
+        second = reports.get(timeout=10)
+        q._kill_consumer_process()
+    finally:
+        producer.stop()
+    for inherited, traced, producer_samples, own_samples in (first, second):
+        assert inherited == 0 and not traced
+        # The collection is the child's own, not counted on the producer's copy
+        assert producer_samples == [0, 0, 0] and own_samples[2] >= 1
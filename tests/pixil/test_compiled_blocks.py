@@ -213,8 +213,11 @@ def test_boids_key_procedures_compile():
     """Smoke-compile real Boids procedures (no hardware)."""
     flags.ENABLE_COMPILED_PROCEDURES = True
     reset_loop_compiler_stats()
-    assert try_compile_procedure_block(_boids_procedure_body("calculate_distance")) is not None
-    assert try_compile_procedure_block(_boids_procedure_body("apply_flocking_rules")) is not None
+    flocking = try_compile_procedure_block(_boids_procedure_body("apply_flocking_rules"))
+    assert flocking is not None
+    assert [s.command_name for s in flocking.statements if isinstance(s, CommandStmt)][:2] == [
+        "neighbor_grid", "neighbor_away",
+    ]
     assert try_compile_procedure_block(_boids_procedure_body("update_boids")) is not None
     draw = try_compile_procedure_block(_boids_procedure_body("draw_boids"))
     assert draw is not None
@@ -0,0 +1,197 @@
+"""Consumer display stats: accumulation, queue channel to the producer, DB persistence."""
+
+import datetime
+import time
+from queue import Full
+
+import pytest
+
+from database.base import DatabaseConfig
+from database.pixil_metrics import PixilMetricsDB
+from shared import consumer_stats
+from shared.command_queue import MatrixCommandQueue
+from shared.consumer_stats import ConsumerStats
+
+
+class _FullQueue:
+    """Stats channel whose producer end has fallen behind."""
+
+    def put_nowait(self, item):
+        raise Full
+
+
+@pytest.fixture
+def api():
+    from rgb_matrix_lib.api import RGB_Api
+
+    api = RGB_Api(backend="framebuffer")
+    yield api
+    api.burnout_manager.stop()
+
+
+def test_take_returns_delta_and_resets():
+    stats = ConsumerStats()
+    stats.record_present(0.0005, 10, end_frame=True)
+    stats.record_present(0.020, 30)
+    stats.record_present(0.100, 0)
+    stats.record_fade_pump(burnouts_live=7)
+    stats.record_text_stall(0.25)
+    delta = stats.take(burnouts_live=3)
+    assert delta["presents"] == 3 and delta["end_frames"] == 1
+    assert delta["histogram"] == [1, 0, 0, 0, 0, 1, 0, 1]
+    assert delta["pixels_max"] == 30
+    assert (delta["burnouts_live"], delta["burnouts_peak"]) == (3, 7)
+    assert stats.take(burnouts_live=0)["presents"] == 0
+
+
+def test_merge_and_summarize():
+    totals = consumer_stats.empty_totals()
+    for _ in range(2):
+        stats = ConsumerStats()
+        stats.record_present(0.004, 100)
+        consumer_stats.merge(totals, stats.take(burnouts_live=2))
+    row = consumer_stats.summarize(totals)
+    assert row["frames_presented"] == 2
+    assert row["present_le_4ms"] == 2
+    assert row["pixels_per_frame_avg"] == 100
+    assert row["present_time_avg_ms"] == pytest.approx(4.0)
+    assert row["stats_messages"] == 2
+
+
+def test_end_frame_records_present_and_pixels(api):
+    api.consumer_stats.take(0)
+    api.begin_frame()
+    api.draw_rectangle(0, 0, 4, 4, "red", 100, True)
+    api.end_frame()
+    delta = api.consumer_stats.take(api.burnout_manager.live_count())
+    assert delta["end_frames"] == 1
+    assert delta["pixels_written"] == 16
+
+
+def test_stats_travel_to_producer(api):
+    q = MatrixCommandQueue(queue_size=4)
+    api.plot(1, 1, "red", 100)
+    q._send_consumer_stats(api)
+    deadline = time.time() + 2
+    while not q.collect_consumer_stats()["messages"] and time.time() < deadline:
+        time.sleep(0.01)
+    totals = q.collect_consumer_stats()
+    assert totals["presents"] >= 1
+    q.reset_consumer_stats()
+    assert q.collect_consumer_stats()["messages"] == 0
+
+
+def test_full_channel_folds_unsent_deltas(api, monkeypatch):
+    q = MatrixCommandQueue(queue_size=4)
+    monkeypatch.setattr(q, "_consumer_stats_reply", _FullQueue())
+    api.plot(1, 1, "red", 100)
+    q._send_consumer_stats(api)
+    api.plot(2, 2, "red", 100)
+    q._send_consumer_stats(api)
+    assert q._unsent_consumer_stats["messages"] == 2
+    assert q._unsent_consumer_stats["presents"] >= 2
+
+
+def test_consumer_metrics_saved_and_joined(tmp_path, monkeypatch):
+    monkeypatch.setattr(DatabaseConfig, "get_db_directory", staticmethod(lambda: tmp_path))
+    db = PixilMetricsDB()
+    now = datetime.datetime.now()
+    script_id = db.save_metrics("demo.pix", now, now, {"active_execution_time": 2.0})
+    totals = consumer_stats.empty_totals()
+    stats = ConsumerStats()
+    stats.record_present(0.010, 64)
+    stats.record_text_stall(0.5)
+    consumer_stats.merge(totals, stats.take(burnouts_live=4))
+    db.save_consumer_metrics(script_id, totals)
+
+    rows = db.get_consumer_metrics(limit=5, script_name="demo.pix")
+    assert len(rows) == 1
+    assert rows[0]["script_name"] == "demo.pix"
+    assert rows[0]["present_le_16ms"] == 1
+    assert rows[0]["burnouts_live_end"] == 4
+    assert rows[0]["text_effect_stall_time"] == pytest.approx(0.5)
+    assert db.get_consumer_metrics(script_name="other.pix") == []
+
+
+def _frame(stats, elapsed, interpret=0.002, idle=0.0, execute=0.003, present=0.004):
+    stats.record_frame_stamp((interpret, 10.0), now=10.001)
+    stats.record_idle(idle)
+    stats.record_execute(execute)
+    return stats.record_frame(present, 1 / 50, elapsed)
+
+
+def test_frame_budget_counts_overruns_and_blames_slowest_stage():
+    stats = ConsumerStats()
+    assert _frame(stats, 0.0) is None  # first paced frame has no reference yet
+    assert _frame(stats, 0.020) is None  # on budget
+    assert _frame(stats, 0.0205) is None  # within OVERRUN_SLACK
+    assert _frame(stats, 0.050, execute=0.045) == "execute"
+    # The display sat idle waiting for the interpreter
+    assert _frame(stats, 0.100, interpret=0.090, idle=0.085) == "interpret"
+    delta = stats.take(burnouts_live=0)
+    assert (delta["frames_paced"], delta["frame_overruns"]) == (4, 2)
+    assert delta["overrun_stage"] == [1, 1, 0]
+    assert delta["frame_target_fps"] == pytest.approx(50.0)
+    assert delta["frame_time_max"] == pytest.approx(0.100)
+    assert delta["frame_stage_max"][1] == pytest.approx(0.001)
+
+    # Without an fps() target frames are timed but never paced
+    stats.record_frame(0.004, 0.0, 0.5)
+    assert stats.take(0)["frames_paced"] == 0
+
+
+def test_frame_budget_summary_and_log_line():
+    stats = ConsumerStats()
+    for _ in range(3):
+        stats.record_present(0.030, 10, end_frame=True)
+        _frame(stats, 0.040, present=0.030)
+    delta = stats.take(burnouts_live=0)
+    line = consumer_stats.format_overruns(delta)
+    assert line.startswith("[FRAME] 3/3 frames over 20.0 ms budget (worst 40.0 ms)")
+    assert "slowest stage present avg 30.0 ms" in line
+
+    totals = consumer_stats.merge(consumer_stats.empty_totals(), delta)
+    row = consumer_stats.summarize(totals)
+    assert row["frame_overrun_pct"] == pytest.approx(100.0)
+    assert row["frame_execute_avg_ms"] == pytest.approx(3.0)
+    assert row["overruns_present"] == 3
+    assert row["frame_slowest_stage"] == "present"
+    assert consumer_stats.format_overruns(ConsumerStats().take(0)) is None
+
+
+def test_frame_stamp_rides_on_end_frame(api):
+    q = MatrixCommandQueue(queue_size=4)
+    q.put_command("end_frame", force_instant=True, frame_stamp=consumer_stats.frame_stamp(0.012))
+    command, delay, *extra = q.command_queue.get(timeout=1)
+    assert (command, delay, extra[0]) == ("end_frame", 0, None)
+
+    api.set_fps(1000)
+    api.consumer_stats.take(0)
+    for _ in range(2):
+        api.consumer_stats.record_frame_stamp(extra[1])
+        api.begin_frame()
+        api.end_frame()
+    delta = api.consumer_stats.take(0)
+    assert delta["frames_paced"] == 1
+    assert delta["frame_stage_time"][0] == pytest.approx(0.024)
+
+
+def test_frame_budget_query_groups_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(DatabaseConfig, "get_db_directory", staticmethod(lambda: tmp_path))
+    db = PixilMetricsDB()
+    now = datetime.datetime.now()
+    for script, execute in (("slow.pix", 0.030), ("slow.pix", 0.030), ("fast.pix", 0.001)):
+        stats = ConsumerStats()
+        for _ in range(2):
+            stats.record_present(0.002, 10, end_frame=True)
+            _frame(stats, execute + 0.010, execute=execute, present=0.002)
+        totals = consumer_stats.merge(consumer_stats.empty_totals(), stats.take(0))
+        db.save_consumer_metrics(db.save_metrics(script, now, now, {}), totals)
+
+    rows = db.get_frame_budget(days=1)
+    assert [r["script_name"] for r in rows] == ["slow.pix", "fast.pix"]
+    assert (rows[0]["runs"], rows[0]["frames_paced"], rows[0]["frame_overruns"]) == (2, 4, 4)
+    assert rows[0]["overruns_execute"] == 4
+    assert rows[0]["execute_avg_ms"] == pytest.approx(30.0)
+    assert rows[1]["overrun_pct"] == 0.0
+    assert db.get_frame_budget(script_name="fast.pix")[0]["target_fps"] == pytest.approx(50.0)
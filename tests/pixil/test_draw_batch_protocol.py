@@ -225,3 +225,65 @@ def test_expanding_circles_style_polygon():
     cmds = list(unpack_draw_batch(rec))
     assert cmds[0][0] == "draw_polygon"
     assert cmds[0][1][3] == 5
+
+
+def test_raster_indexed_roundtrip_clips_to_panel():
+    import numpy as np
+
+    from shared.draw_batch_protocol import RASTER_SKIP
+
+    ids = np.arange(-4, 6, dtype=np.int16).reshape(2, 5)
+    ids[0, 0] = RASTER_SKIP
+    ints = np.full((2, 5), 70, dtype=np.uint8)
+    rec = pack_draw_op("raster", [62, 10, ids, ints]) + pack_draw_op("plot", [1, 1, "red"])
+    cmds = list(unpack_draw_batch(rec))
+    assert [name for name, _ in cmds] == ["raster", "plot"]
+    x, y, pixels, intensities = cmds[0][1]
+    assert (x, y) == (62, 10)
+    assert pixels.tolist() == [[RASTER_SKIP, -3], [1, 2]]
+    assert intensities.shape == (2, 2)
+    assert pack_draw_op("raster", [64, 0, ids, ints]) == b""
+
+
+def test_raster_rgb_roundtrip():
+    import numpy as np
+
+    rgb = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    [(name, (x, y, pixels, intensities))] = list(unpack_draw_batch(pack_draw_op("raster", [0, 5, rgb])))
+    assert name == "raster" and (x, y) == (0, 5)
+    assert intensities is None
+    assert np.array_equal(pixels, rgb)
+
+
+def test_raster_blit_matches_plot_batch():
+    import numpy as np
+
+    from rgb_matrix_lib.api import RGB_Api
+    from shared.draw_batch_protocol import RASTER_SKIP
+    from shared.mplot_protocol import get_color_from_id, get_color_id
+
+    def frame_api():
+        api = RGB_Api.__new__(RGB_Api)
+        api.matrix = type("M", (), {"width": 64, "height": 64})()
+        api.drawing_buffer = np.zeros((64, 64, 3), dtype=np.uint8)
+        api.frame_mode = True
+        api.preserve_frame_changes = False
+        return api
+
+    rng = np.random.default_rng(3)
+    ids = rng.integers(0, 100, size=(8, 8)).astype(np.int16)
+    ids[0, :4] = get_color_id("cyan")
+    ids[2, 2] = RASTER_SKIP
+    ints = rng.integers(0, 101, size=(8, 8)).astype(np.uint8)
+
+    raster = frame_api()
+    [(_, args)] = list(unpack_draw_batch(pack_draw_op("raster", [60, 3, ids, ints])))
+    raster.draw_raster(*args)
+
+    plots = frame_api()
+    plots.plot_batch([
+        (60 + x, 3 + y, get_color_from_id(int(ids[y, x])), int(ints[y, x]), None, "instant")
+        for y in range(8) for x in range(4) if ids[y, x] != RASTER_SKIP
+    ])
+    assert np.array_equal(raster.drawing_buffer, plots.drawing_buffer)
+    assert not raster.drawing_buffer[5, 62].any()
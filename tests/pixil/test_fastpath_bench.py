@@ -0,0 +1,77 @@
+"""Fast-path microbenchmark harness and the parse_value fast paths it times."""
+
+import pytest
+
+from pixil_utils import math_functions as mf
+from pixil_utils import optimization_flags as opt
+from pixil_utils.math_functions import evaluate_condition
+from pixil_utils.param_fast_paths import try_fast_path, try_ultra_fast_path
+from tests.pixil._math_cases import PARAM_VALUE_CASES
+from tests.scripts import run_fastpath_bench as bench
+
+
+@pytest.mark.parametrize("value,command,position,formatted", PARAM_VALUE_CASES)
+def test_param_fast_paths_match_general_path(value, command, position, formatted, variables_with_array):
+    fast = try_ultra_fast_path(value, command, position)
+    if fast is None:
+        fast = try_fast_path(value, command, position, variables_with_array)
+    assert fast == formatted
+    assert bench.general_param_value(value, command, position, variables_with_array) == formatted
+
+
+def test_profile_flags_apply_to_math_functions_and_restore():
+    before = (opt.ENABLE_FAST_MATH, mf.ENABLE_FAST_MATH, mf.ENABLE_EXPRESSION_CACHE)
+    with bench.profile_flags("all_off") as flags:
+        assert flags["ENABLE_FAST_MATH"] is False
+        assert mf.ENABLE_FAST_MATH is False and mf.ENABLE_CONDITION_TEMPLATES is False
+    with bench.profile_flags("math_heavy"):
+        assert mf.ENABLE_EXPRESSION_CACHE is True
+    assert (opt.ENABLE_FAST_MATH, mf.ENABLE_FAST_MATH, mf.ENABLE_EXPRESSION_CACHE) == before
+
+
+def test_hits_are_attributed_to_the_innermost_path():
+    variables = bench.bench_variables()
+    assert bench.math_path_taken("sqrt(v_x * v_x + v_y * v_y)", variables) == "try_fast_hypot"
+    assert bench.math_path_taken("sin(v_b)", variables) == "try_fast_trig"
+    assert bench.math_path_taken("v_values[v_i] * 2", variables) == "try_fast_array_arithmetic"
+    assert bench.math_path_taken("pow(2, 3)", variables) == bench.MISS
+
+
+def test_profile_run_covers_every_fast_path():
+    result = bench.run_profile("boids", number=2, repeat=1)
+    expected = set(bench.MATH_FAST_PATHS) | {"condition_template", "try_ultra_fast_path", "try_fast_path"}
+    assert expected <= set(result["paths"])
+    assert all(row["match"] for row in result["cases"])
+    # Paren groups with a trailing "not (...)" only evaluate through the template
+    fast_only = [row["case"] for row in result["cases"] if row["fallback_ns"] is None]
+    assert fast_only == ["(v_x > 5) and not (v_y > 100 or v_z == 0)"]
+    assert bench.run_profile("all_off", number=2, repeat=1)["paths"] == {}
+
+
+def test_slower_paths_mismatches_and_regressions_fail():
+    rows = [
+        {"path": "try_fast_trig", "fast_ns": 120.0, "fallback_ns": 100.0, "match": True},
+        {"path": "try_fast_number", "fast_ns": 50.0, "fallback_ns": 100.0, "match": False},
+        {"path": bench.MISS, "fast_ns": 150.0, "fallback_ns": 100.0, "match": True},
+    ]
+    paths = bench.summarize_paths(rows, tolerance=10.0)
+    assert paths["try_fast_trig"]["slower"] is True
+    assert paths["try_fast_number"]["speedup"] == 2.0
+    assert paths[bench.MISS]["slower"] is False
+
+    failures = bench.find_failures({"profiles": {"boids": {"paths": paths}}})
+    assert failures == [
+        "boids: try_fast_number disagrees with fallback on 1 case(s)",
+        "boids: try_fast_trig slower than fallback (0.83x)",
+    ]
+
+    baseline = {"profiles": {"boids": {"paths": {"try_fast_number": {"speedup": 3.0}}}}}
+    compared = bench.compare_results(baseline, {"profiles": {"boids": {"paths": paths}}})
+    assert [(r["path"], r["regressed"]) for r in compared] == [("try_fast_number", True)]
+
+
+def test_bare_flag_condition_skips_templates(variables):
+    attempts = mf._CONDITION_TEMPLATE_HITS + mf._CONDITION_TEMPLATE_MISSES
+    assert evaluate_condition("v_a", variables) is True
+    assert evaluate_condition("v_b", variables) is False
+    assert mf._CONDITION_TEMPLATE_HITS + mf._CONDITION_TEMPLATE_MISSES == attempts
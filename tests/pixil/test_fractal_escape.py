@@ -109,3 +109,169 @@ def test_escape_zoom_uses_direct_when_dc_large():
     direct = escape_iter(ar + dc_re, ai + dc_im, 120)
     zoomed = escape_zoom(ar, ai, dc_re, dc_im, 120)
     assert np.mean(np.abs(direct - zoomed)) < 0.01
+
+
+def _reference_escape(cr, ci, max_iter, burning_ship=False):
+    """Whole-grid masked iteration (no compaction, no bands)."""
+    zr = np.zeros_like(cr)
+    zi = np.zeros_like(ci)
+    esc = np.zeros(cr.shape)
+    mask = np.ones(cr.shape, dtype=bool)
+    with np.errstate(over="ignore", invalid="ignore"):
+        for n in range(max_iter):
+            ar, ai = (np.abs(zr), np.abs(zi)) if burning_ship else (zr, zi)
+            zr_new = ar * ar - ai * ai + cr
+            zi_new = 2.0 * ar * ai + ci
+            zr = np.where(mask, zr_new, zr)
+            zi = np.where(mask, zi_new, zi)
+            mag2 = zr * zr + zi * zi
+            escaped = mask & ((mag2 > 4.0) | ~np.isfinite(mag2))
+            esc[escaped] = n + 1
+            mask &= ~escaped
+    esc[mask] = max_iter
+    return esc
+
+
+@pytest.fixture
+def banded(monkeypatch):
+    """Three workers and small bands, so a 48x48 grid runs as six bands."""
+    from pixil_utils import fractal_escape
+
+    monkeypatch.setenv(fractal_escape.WORKERS_ENV, "3")
+    monkeypatch.setattr(fractal_escape, "MIN_BAND_PIXELS", 256)
+    yield fractal_escape
+    fractal_escape.shutdown_pool()
+
+
+@pytest.mark.parametrize("burning_ship", [False, True])
+def test_compacted_kernels_match_reference(burning_ship):
+    from pixil_utils.fractal_escape import burning_ship_iter
+
+    ys, xs = np.mgrid[0:40, 0:40].astype(np.float64)
+    cr, ci = xs / 40 * 3.2 - 2.2, ys / 40 * 3.0 - 1.5
+    fn = burning_ship_iter if burning_ship else escape_iter
+    assert np.array_equal(fn(cr, ci, 90), _reference_escape(cr, ci, 90, burning_ship))
+
+
+def test_banded_execution_matches_single_band(banded, monkeypatch):
+    ys, xs = np.mgrid[0:48, 0:48].astype(np.float64)
+    dc_re, dc_im = (xs - 24) / 2.0e6, (ys - 24) / 2.0e6
+    runs = {}
+    for workers in ("3", "1"):
+        monkeypatch.setenv(banded.WORKERS_ENV, workers)
+        runs[workers] = (
+            escape_iter(xs.ravel() / 16 - 2, ys.ravel() / 16 - 1.5, 120),
+            escape_iter(np.array(-0.8), np.array(0.156), 120, z0_re=xs / 16 - 1.5, z0_im=ys / 16 - 1.5),
+            banded.burning_ship_iter(xs / 14 - 2.5, ys / 16 - 2, 120),
+            escape_perturb(-0.743643887, 0.131825904, dc_re, dc_im, 300),
+        )
+    assert banded._pool is not None and banded._pool_workers == 3
+    for tiled, single in zip(runs["3"], runs["1"]):
+        assert tiled.shape == single.shape
+        assert np.array_equal(tiled, single)
+    assert runs["1"][0].shape == (48 * 48,)
+
+
+def _zoom_frames(count, zoom=1.03):
+    ys, xs = np.mgrid[0:48, 0:48].astype(np.float64)
+    scale = 60.0
+    for frame in range(count):
+        scale *= zoom
+        # Drift the anchor by a fraction of a pixel so grids never line up exactly
+        ar = -0.743643887 + 0.3 * frame / scale
+        ai = 0.131825904 - 0.2 * frame / scale
+        yield ar, ai, (xs - 24) / scale, (ys - 24) / scale
+
+
+def test_coherent_zoom_reuses_pixels_and_stays_close():
+    from pixil_utils.fractal_escape import REFRESH_FRAMES, _COHERENT, escape_zoom_coherent, reset_coherent
+
+    reset_coherent()
+    mismatch = []
+    for frame, (ar, ai, dr, di) in enumerate(_zoom_frames(REFRESH_FRAMES + 1)):
+        full = escape_zoom(ar, ai, dr, di, 100)
+        reused = escape_zoom_coherent("zoom", ar, ai, dr, di, 100, quality=0.25)
+        if frame in (0, REFRESH_FRAMES):
+            # First frame and each periodic refresh are computed in full
+            assert np.array_equal(reused, full)
+        mismatch.append(np.mean(reused != full))
+    cache = _COHERENT["zoom"]
+    assert cache.reused > 0.2 * (cache.reused + cache.computed)
+    assert max(mismatch) < 0.02
+    reset_coherent()
+    assert not _COHERENT
+
+
+def test_coherent_zoom_quality_one_and_max_iter_change_recompute():
+    from pixil_utils.fractal_escape import _COHERENT, escape_zoom_coherent, reset_coherent
+
+    reset_coherent()
+    for frame, (ar, ai, dr, di) in enumerate(_zoom_frames(4)):
+        assert np.array_equal(escape_zoom_coherent("exact", ar, ai, dr, di, 80, quality=1), escape_zoom(ar, ai, dr, di, 80))
+        max_iter = 60 + frame
+        assert np.array_equal(
+            escape_zoom_coherent("depth", ar, ai, dr, di, max_iter, quality=0), escape_zoom(ar, ai, dr, di, max_iter)
+        )
+    assert _COHERENT["exact"].reused == 0 and _COHERENT["depth"].reused == 0
+    reset_coherent()
+
+
+def test_escape_zoom_quality_argument_via_expr_parser():
+    from pixil_utils.fractal_escape import _COHERENT, reset_coherent
+
+    reset_coherent()
+    size = 16
+    ys, xs = np.mgrid[0:size, 0:size].astype(np.float64)
+    node = parse_expr("escape_zoom(v_ar, v_ai, (grid_x - 8) / v_eff, (grid_y - 8) / v_eff, 64, 0.25)")
+    for eff in (40.0, 41.0):
+        ctx = FieldEvalContext(
+            scalars={"v_ar": -0.75, "v_ai": 0.1, "v_eff": eff},
+            temps={},
+            site_vars={},
+            grid_vars={"grid_x": xs, "grid_y": ys},
+            sum_sites_fn=lambda _e: np.zeros((size, size)),
+        )
+        result = eval_expr(node, ctx)
+        assert result.shape == (size, size)
+    assert _COHERENT[id(node)].reused > 0
+    reset_coherent()
+
+
+ZOOM_BODY = [
+    "size 16",
+    "sites v_dummy_x, v_dummy_y",
+    "mode formula",
+    "value {",
+    "v_iter = escape_zoom(v_ar, v_ai, (grid_x - 8) / v_eff, (grid_y - 8) / v_eff, 64, 0.25)",
+    "}",
+    "plot_if v_iter < 63",
+    "color 50",
+]
+
+
+def test_coherent_zoom_cache_is_per_program_and_cleared_between_scripts(make_vars):
+    from pixil_utils.fractal_escape import _COHERENT
+
+    zoom_vars = dict(v_dummy_x=[0.0], v_dummy_y=[0.0], v_ar=-0.75, v_ai=0.1, v_eff=40.0)
+    reset_grid_runtime()
+    reg = make_vars(**zoom_vars)
+    prog = compile_field_program("zoom", ZOOM_BODY)
+    for eff in (40.0, 41.0):
+        reg.set("v_eff", eff)
+        run_field_render(prog, reg, lambda cmd, args: None)
+    (key,) = _COHERENT
+    assert key[0] == "zoom" and _COHERENT[key].reused > 0
+    # Recompiling the same program keeps its call-site key
+    assert compile_field_program("zoom", ZOOM_BODY).value_assignments[0][1].cache_key == key
+
+    # Next script: everything from the last one is gone, and a new program
+    # with the same expressions does not pick up its frames
+    reset_grid_runtime()
+    assert not _COHERENT
+    reg = make_vars(**zoom_vars)
+    run_field_render(compile_field_program("other", ZOOM_BODY), reg, lambda cmd, args: None)
+    (key,) = _COHERENT
+    assert key[0] == "other" and _COHERENT[key].reused == 0
+
+    reset_grid_runtime("other")
+    assert not _COHERENT
@@ -61,6 +61,58 @@ def test_life_blinker_step():
     assert len(draws) > 0
 
 
+def test_field_arrays_are_views_of_the_live_buffer():
+    from pixil_utils import grid_engine
+
+    reset_grid_runtime()
+    prog = compile_grid_program("life", LIFE_BODY)
+    variables = _make_vars()
+    grid = variables.get("v_grid")
+    run_grid_step(prog, variables, lambda _c, _a: None)
+    rt = grid_engine._RUNTIME["life"]
+    assert grid.data is rt.buffers["v_grid"][rt.active_idx["v_grid"]]
+
+    # A script write lands in the live field: the next step sees it without grid_reset
+    for i in (5, 6, 7):
+        grid[i] = 1
+    run_grid_step(prog, variables, lambda _c, _a: None)
+    assert [grid[i] for i in (2, 6, 10)] == [1, 1, 1] and grid[5] == 0
+    assert grid.data is rt.buffers["v_grid"][rt.active_idx["v_grid"]]
+
+
+def test_runtime_buffers_reused_across_runs():
+    from pixil_utils import grid_engine
+
+    reset_grid_runtime()
+    prog = compile_grid_program("life", LIFE_BODY)
+    variables = _make_vars()
+    run_grid_step(prog, variables, lambda _c, _a: None)
+    buffers = list(grid_engine._RUNTIME["life"].buffers["v_grid"])
+
+    # Reset: the old array keeps its own copy of the field
+    old = variables.get("v_grid")
+    old[5] = 1
+    reset_grid_runtime("life")
+    assert isinstance(old.data, list) and old.data[5] == 1
+
+    # A restarted script creates a fresh array; its data is adopted into the pooled buffers
+    variables = _make_vars()
+    fresh = variables.get("v_grid")
+    for i in (5, 6, 7):
+        fresh[i] = 1
+    run_grid_step(prog, variables, lambda _c, _a: None)
+    reused = grid_engine._RUNTIME["life"].buffers["v_grid"]
+    assert {id(buf) for buf in reused} == {id(buf) for buf in buffers}
+    assert [fresh[i] for i in (2, 6, 10)] == [1, 1, 1]
+    assert old.data[5] == 1
+
+    # Same program name without a reset (create_array again): the new array is bound instead
+    newer = PixilArray(16)
+    variables.set("v_grid", newer)
+    run_grid_step(prog, variables, lambda _c, _a: None)
+    assert max(newer.data) == 0 and isinstance(fresh.data, list)
+
+
 BRAIN_BODY = [
     "size 4",
     "cell 1",
@@ -325,3 +377,248 @@ def test_wireworld_electron_advances_on_wire():
     run_grid_step(prog, reg, lambda _c, _a: None)
     assert grid[4 * 8 + 3] == 0.35
     assert grid[4 * 8 + 4] == 1
+
+
+def test_grid_draw_emits_one_scaled_raster():
+    from shared.draw_batch_protocol import RASTER_SKIP
+    from shared.mplot_protocol import get_color_id
+
+    reset_grid_runtime()
+    body = [line if line != "cell 1" else "cell 2" for line in LIFE_BODY]
+    prog = compile_grid_program("life_cell2", body)
+    variables = _make_vars()
+    grid = variables.get("v_grid")
+    for i in (5, 6, 7):
+        grid[i] = 1
+
+    draws = []
+    run_grid_step(prog, variables, lambda cmd, args: draws.append((cmd, args)))
+    [(cmd, (x, y, ids, intensities))] = draws
+    assert cmd == "raster" and (x, y) == (0, 0)
+    assert ids.shape == intensities.shape == (8, 8)
+    # Vertical blinker in column 2 -> pixel columns 4-5, rows 0-5
+    lit = ids != RASTER_SKIP
+    assert lit.sum() == 3 * 4
+    assert lit[0:6, 4:6].all()
+    assert (ids[lit] == get_color_id("cyan")).all()
+    assert (intensities[lit] == 90).all()
+
+
+def _reference_laplacian(grid, boundary):
+    import numpy as np
+
+    if boundary == "wrap":
+        return (np.roll(grid, 1, 1) + np.roll(grid, -1, 1) + np.roll(grid, 1, 0) + np.roll(grid, -1, 0)) - 4.0 * grid
+    p = np.pad(grid, 1, mode="edge")
+    return p[1:-1, :-2] + p[1:-1, 2:] + p[:-2, 1:-1] + p[2:, 1:-1] - 4.0 * grid
+
+
+def _reference_below_avg(grid):
+    size = grid.shape[0]
+    out = grid.copy()
+    for y in range(size - 1):
+        for x in range(size):
+            cells = [grid[y + 1, xx] for xx in (x, x - 1, x + 1) if 0 <= xx < size]
+            out[y, x] = sum(cells) / len(cells)
+    return out
+
+
+@pytest.mark.parametrize("size", [1, 2, 5])
+@pytest.mark.parametrize("boundary", ["wrap", "clamp"])
+def test_slice_stencils_match_reference(size, boundary):
+    import numpy as np
+    from pixil_utils.grid_engine import _below_avg, _laplacian_4, _neighbor_count
+
+    rng = np.random.default_rng(size)
+    grid = rng.uniform(0, 1, (size, size))
+    flat = grid.ravel()
+    assert np.array_equal(_laplacian_4(flat, size, boundary), _reference_laplacian(grid, boundary).ravel())
+    assert np.array_equal(_below_avg(flat, size), _reference_below_avg(grid).ravel())
+    alive = (grid > 0.5).astype(float)
+    mode = "wrap" if boundary == "wrap" else "edge"
+    p = np.pad(alive, 1, mode=mode)
+    ortho = p[1:-1, :-2] + p[1:-1, 2:] + p[:-2, 1:-1] + p[2:, 1:-1]
+    full = ortho + p[:-2, :-2] + p[:-2, 2:] + p[2:, :-2] + p[2:, 2:]
+    assert np.array_equal(_neighbor_count(flat, size, boundary, True), ortho.ravel())
+    assert np.array_equal(_neighbor_count(flat, size, boundary, False), full.ravel())
+
+
+MIXED_BODY = [
+    "size 6",
+    "cell 1",
+    "fields v_a, v_b",
+    "steps 3",
+    "boundary clamp",
+    "step v_a {",
+    "v_k = v_rate * 2 + 1",
+    "v_r = at(v_a) / (at(v_b) - 0.5)",
+    "v_m = not (at(v_a) > 0.5) or at(v_b) <= v_k / 4",
+    "v_c = clamp(sqrt(abs(v_r)) + floor(at(v_b) * 3), 0, v_rate * 4)",
+    "v_a_next = where(v_m, min(v_c, 1), max(pow(at(v_a), 2), sin(grid_x) * cos(grid_y))) + lap(v_b) / v_zero",
+    "}",
+    "step v_b {",
+    "v_half = 0.5",
+    "v_b_next = where(neighbors4(v_a) >= 2 and v_rate > 0, v_half, below_avg(v_b)) - -at(v_b) * v_rate",
+    "}",
+    "draw {",
+    "palette_field v_a",
+    "}",
+]
+
+
+def _mixed_vars():
+    import numpy as np
+
+    reg = VariableRegistry()
+    rng = np.random.default_rng(7)
+    for name in ("v_a", "v_b"):
+        reg.register(name)
+        arr = PixilArray(36)
+        arr.data[:] = [float(v) for v in rng.choice([0.0, 0.5, 1.0, 0.25, 2.0], 36)]
+        reg.set(name, arr)
+    for name, value in (("v_rate", 0.75), ("v_zero", 0)):
+        reg.register(name)
+        reg.set(name, value)
+    return reg
+
+
+def test_step_plan_matches_eval_expr(monkeypatch):
+    from pixil_utils import grid_engine
+
+    results = []
+    for planned in (True, False):
+        reset_grid_runtime()
+        if not planned:
+            monkeypatch.setattr(grid_engine, "compile_step_plan", lambda *args: None)
+        prog = compile_grid_program("mixed", MIXED_BODY)
+        reg = _mixed_vars()
+        run_grid_step(prog, reg, lambda _c, _a: None)
+        run_grid_step(prog, reg, lambda _c, _a: None)
+        plans = [plan for _block, plan in grid_engine._RUNTIME["mixed"].plans.values()]
+        assert all((plan is not None) == planned for plan in plans) and len(plans) == 2
+        results.append([list(reg.get(name).data) for name in ("v_a", "v_b")])
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("expr", ["pow(at(v_a), 2)", "pow(at(v_a), v_k)", "pow(v_k, at(v_b))"])
+def test_step_plan_pow_matches_eval_expr(monkeypatch, expr):
+    import numpy as np
+
+    from pixil_utils import grid_engine
+
+    body = ["size 16", "fields v_a, v_b", "step v_a {", "v_k = v_rate * 2.3", f"v_a_next = {expr}", "}"]
+    values = np.random.default_rng(3).uniform(0.0, 3.0, (2, 256))
+    results = []
+    for planned in (True, False):
+        reset_grid_runtime()
+        if not planned:
+            monkeypatch.setattr(grid_engine, "compile_step_plan", lambda *args: None)
+        reg = _mixed_vars()
+        for name, data in zip(("v_a", "v_b"), values):
+            arr = PixilArray(256)
+            arr.data[:] = data
+            reg.set(name, arr)
+        run_grid_step(compile_grid_program("pow", body), reg, lambda _c, _a: None)
+        results.append(list(reg.get("v_a").data))
+    assert results[0] == results[1]
+
+
+def test_unlowered_block_falls_back_to_eval_expr():
+    from pixil_utils import grid_engine
+
+    reset_grid_runtime()
+    body = [
+        "size 4",
+        "cell 1",
+        "fields v_grid",
+        "step v_grid {",
+        "v_grid_next = escape_iter(grid_x / 4 - 1, grid_y / 4 - 0.5, 8) + at(v_grid)",
+        "}",
+        "draw {",
+        "palette_field v_grid",
+        "}",
+    ]
+    prog = compile_grid_program("escape", body)
+    reg = _make_vars()
+    run_grid_step(prog, reg, lambda _c, _a: None)
+    [(_block, plan)] = grid_engine._RUNTIME["escape"].plans.values()
+    assert plan is None
+    assert max(reg.get("v_grid").data) > 0
+
+
+def test_vectorized_sum_sites_matches_per_site_loop(make_vars):
+    import numpy as np
+    from pixil_utils.grid_engine import _eval_value_formula
+
+    reset_grid_runtime()
+    body = [
+        "size 16",
+        "sites v_x, v_y",
+        "weights v_w",
+        "phases v_ph",
+        "active v_act",
+        "mode formula",
+        "value {",
+        "v_h = sum_sites(sin(sqrt(dist2) / 3 - phase) * weight + where(dx > 0, dy, -dx) * active)",
+        "}",
+    ]
+    prog = compile_field_program("sites", body)
+    rng = np.random.default_rng(3)
+    count = 300  # several site chunks at size 16
+    px, py = rng.uniform(0, 16, count), rng.uniform(0, 16, count)
+    w, ph = rng.uniform(0.5, 2, count), rng.uniform(0, 6, count)
+    act = (rng.uniform(0, 1, count) > 0.3).astype(float)
+    reg = make_vars(v_x=px, v_y=py, v_w=w, v_ph=ph, v_act=act)
+
+    ys, xs = np.mgrid[0:16, 0:16].astype(np.float64)
+    expected = np.zeros((16, 16))
+    for i in np.flatnonzero(act > 0):
+        dx, dy = xs - px[i], ys - py[i]
+        dist2 = dx * dx + dy * dy
+        expected += np.sin(np.sqrt(dist2) / 3 - ph[i]) * w[i] + np.where(dx > 0, dy, -dx) * act[i]
+    np.testing.assert_allclose(_eval_value_formula(prog, reg, 16), expected, rtol=1e-12, atol=1e-9)
+
+
+def test_voronoi_labels_match_brute_force():
+    import numpy as np
+    from pixil_utils.grid_engine import _nearest_sites
+
+    reset_grid_runtime()
+    rng = np.random.default_rng(11)
+    ys, xs = np.mgrid[0:12, 0:12].astype(np.float64)
+    for count in (1, 2, 7, 40):
+        px = rng.integers(0, 12, count).astype(np.float64)
+        py = rng.integers(0, 12, count).astype(np.float64)
+        px[-1], py[-1] = px[0], py[0]  # a coincident pair: ties go to the lower index
+        dist2 = (xs[None] - px[:, None, None]) ** 2 + (ys[None] - py[:, None, None]) ** 2
+        label, best, second = _nearest_sites(f"vor{count}", 12, px, py)
+        assert np.array_equal(label, np.argmin(dist2, axis=0))
+        ordered = np.sort(dist2, axis=0)
+        assert np.array_equal(best, ordered[0])
+        assert np.array_equal(second, ordered[1] if count > 1 else np.full((12, 12), np.inf))
+
+
+def test_voronoi_single_site_renders(make_vars):
+    prog = compile_field_program("one_cell", ["size 4", "sites v_x, v_y", "mode voronoi", "edges true"])
+    reg = make_vars(v_x=[1], v_y=[2])
+    draws = []
+    run_field_render(prog, reg, lambda cmd, args: draws.append((cmd, args)))
+    [(cmd, (_x0, _y0, ids, _ints))] = draws
+    assert cmd == "raster" and len(set(ids.ravel().tolist())) == 1
+
+
+def test_site_tables_reused_until_sites_move(make_vars):
+    from pixil_utils import grid_engine
+
+    reset_grid_runtime()
+    prog = compile_field_program("cells", ["size 8", "sites v_x, v_y", "mode voronoi"])
+    reg = make_vars(v_x=[1, 6], v_y=[1, 6])
+    run_field_render(prog, reg, lambda _c, _a: None)
+    tables = grid_engine._SITE_TABLES["cells"]
+    run_field_render(prog, reg, lambda _c, _a: None)
+    assert grid_engine._SITE_TABLES["cells"] is tables
+    reg.get("v_x")[0] = 2
+    run_field_render(prog, reg, lambda _c, _a: None)
+    assert grid_engine._SITE_TABLES["cells"] is not tables
+    reset_grid_runtime("cells")
+    assert "cells" not in grid_engine._SITE_TABLES
@@ -3,7 +3,7 @@
 import pytest
 
 from pixil_utils.grid_field_compiler import compile_field_program, compile_grid_program
-from pixil_utils.grid_expr import parse_expr, eval_expr, GridEvalContext
+from pixil_utils.grid_expr import compile_expr, parse_expr, eval_expr, GridEvalContext
 import numpy as np
 
 
@@ -101,3 +101,70 @@ def test_compile_voronoi_field_program():
     prog = compile_field_program("voronoi_anim", body)
     assert prog.mode == "voronoi"
     assert prog.edges is True
+
+
+def _grid_ctx(temps=None):
+    n = 16
+    field = np.array([0, 1, 2, 0.5] * 4, dtype=np.float64)
+    return GridEvalContext(
+        scalars={"v_a": 1.5, "v_zero": 0.0},
+        fields={"v_f": field},
+        temps=temps if temps is not None else {},
+        grid_vars={"grid_x": np.arange(n) % 4.0, "grid_y": np.arange(n) // 4.0},
+        size=4,
+        boundary="wrap",
+        laplacian_fn=lambda _name: field * 2,
+        neighbors_fn=lambda _name, orth: field + (1 if orth else 2),
+        below_avg_fn=lambda _name: field < 1,
+        random_field_fn=lambda lo, hi: np.full(n, lo),
+    )
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "at(v_f) * 2 + v_a",
+        "v_a / v_zero + at(v_f) / (grid_x - 1)",
+        "where(at(v_f) > 0.5, v_a, 3)",
+        "min(at(v_f), 1) - max(v_a, 2) * -grid_y",
+        "(at(v_f) > 0 and grid_x < 2) or not (grid_y == 1)",
+        "clamp(lap(v_f) + neighbors4(v_f), 0, v_a) + pow(v_a, grid_x)",
+        "v_a * 2 > 1",
+        "v_a / 2",
+        "v_tmp + floor(v_a) + random_field(2, 3)",
+    ],
+)
+def test_compiled_expression_matches_interpreter(text):
+    temps = {"v_tmp": np.linspace(0, 1, 16)}
+    expected = eval_expr(parse_expr(text), _grid_ctx(dict(temps)))
+    got = compile_expr(parse_expr(text), "grid", ["v_f"], ["v_tmp"])(_grid_ctx(dict(temps)))
+    assert type(got) is type(expected)
+    assert np.asarray(got).dtype == np.asarray(expected).dtype
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_compile_expr_folds_constants_and_defers_errors():
+    assert compile_expr(parse_expr("2 * 3 + max(1, 4) / 2 - -1"), "grid")(None) == 9.0
+    # Errors stay at evaluation time, as with eval_expr
+    bad = compile_expr(parse_expr("min(1, 2, 3)"), "grid")
+    with pytest.raises(ValueError, match="Unknown or invalid call"):
+        bad(None)
+    with pytest.raises(KeyError, match="v_missing"):
+        compile_expr(parse_expr("v_missing + 1"), "grid")(_grid_ctx())
+
+
+def test_program_expressions_compiled_at_definition():
+    prog = compile_grid_program("gray_scott", GRAY_SCOTT_BODY)
+    assert all(expr.compiled is not None for block in prog.step_blocks for _, expr in block.assignments)
+    field_prog = compile_field_program("blobs", [
+        "sites v_px, v_py",
+        "value {",
+        "v_sum = sum_sites(weight / max(dist2, 1))",
+        "}",
+        "plot_if v_sum > 1",
+    ])
+    value_expr = field_prog.value_assignments[0][1]
+    assert value_expr.compiled is not None and value_expr.children[0].compiled is not None
+    assert field_prog.plot_if.compiled is not None
+    # Lowering does not change the parsed tree
+    assert value_expr == parse_expr("sum_sites(weight / max(dist2, 1))")
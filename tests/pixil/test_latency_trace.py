@@ -0,0 +1,90 @@
+"""shared.latency_trace: frame-stamped spans, ring bound, Chrome trace export."""
+
+import json
+
+import pytest
+
+from shared import latency_trace
+from shared.command_queue import MatrixCommandQueue
+
+
+@pytest.fixture
+def tracing(monkeypatch):
+    monkeypatch.setattr(latency_trace, "ENABLED", False)
+    monkeypatch.setattr(latency_trace, "_ring", latency_trace._ring)
+    latency_trace.enable(capacity=64)
+    latency_trace.reset()
+    yield latency_trace
+    latency_trace.reset()
+
+
+def test_disabled_records_nothing(monkeypatch):
+    monkeypatch.setattr(latency_trace, "ENABLED", False)
+    latency_trace.reset()
+    latency_trace.span("x", "consumer", 0, 10)
+    latency_trace.begin_frame()
+    latency_trace.end_frame()
+    assert latency_trace.events() == []
+
+
+def test_ring_keeps_most_recent_spans(tracing):
+    for i in range(100):
+        tracing.span(f"s{i}", "consumer", i, i + 1)
+    names = [e[0] for e in tracing.events()]
+    assert len(names) == 64
+    assert names[-1] == "s99"
+
+
+def test_queue_stamp_carries_frame_to_consumer(tracing):
+    q = MatrixCommandQueue(queue_size=4)
+    frame = tracing.begin_frame()
+    q.put_command("plot(1, 1, red, 100)", force_instant=True)
+    tracing.end_frame()
+    command, delay, *trace = q.command_queue.get(timeout=1)
+    tracing.set_frame(0)
+    tracing.dequeued(trace)
+    assert command.startswith("plot")
+    assert tracing.current_frame() == frame
+    by_name = {e[0]: e for e in tracing.events()}
+    assert set(by_name) == {"enqueue", "interpret", "queue_wait"}
+    assert by_name["queue_wait"][4] == frame
+
+
+def test_chrome_export_merge_and_breakdown(tracing, tmp_path):
+    tracing.span("interpret", "producer", 100, 4100, frame=1)
+    tracing.span("draw_batch", "consumer", 5000, 6000, frame=1)
+    tracing.span("present", "present", 6000, 8000, frame=1)
+    part = tracing.write_part("consumer", base=str(tmp_path / "t.json"))
+    out = tmp_path / "merged.json"
+    assert tracing.merge([part], out) == 4
+    events = json.loads(out.read_text())["traceEvents"]
+    assert events[0]["ph"] == "M"
+    assert {e["name"] for e in events if e["ph"] == "X"} == {"interpret", "draw_batch", "present"}
+    row = tracing.frame_breakdown(events)[1]
+    assert row["interpret"] == 4.0
+    assert row["execute"] == 1.0
+    assert row["present"] == 2.0
+
+
+def test_ctrl_c_exit_writes_merged_trace(tracing, tmp_path, monkeypatch):
+    from pixil_utils import shutdown
+
+    base = tmp_path / "run.json"
+    monkeypatch.setenv(tracing.TRACE_ENV, str(base))
+    tracing.span("draw_batch", "consumer", 5000, 6000, frame=1)
+    tracing.write_part("consumer")
+    tracing.reset()
+    tracing.span("interpret", "producer", 100, 4100, frame=1)
+
+    class _Exit(Exception):
+        pass
+
+    def fake_exit(code):
+        raise _Exit(code)
+
+    monkeypatch.setattr(shutdown.os, "_exit", fake_exit)
+    with pytest.raises(_Exit):
+        shutdown.exit_pixil()
+    names = {e["name"] for e in json.loads(base.read_text())["traceEvents"] if e["ph"] == "X"}
+    assert names == {"interpret", "draw_batch"}
+    assert not tracing.part_path("consumer").exists()
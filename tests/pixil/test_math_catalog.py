@@ -16,7 +16,7 @@ from pixil_utils.math_functions import (
 )
 from pixil_utils.variable_registry import VariableRegistry
 
-from tests.pixil._math_cases import FAST_MATH_CASES, MATH_EXPR_CASES
+from tests.pixil._math_cases import FAST_MATH_CASES, FAST_PATH_CASES, MATH_EXPR_CASES, RANDOM_CASES
 
 
 @pytest.mark.parametrize("expr,expected", MATH_EXPR_CASES)
@@ -45,6 +45,17 @@ def test_fast_math_paths(expr, expected, variables):
     assert evaluate_math_expression(expr, variables) == expected
 
 
+@pytest.mark.parametrize("expr,expected", FAST_PATH_CASES)
+def test_every_fast_path_pattern(expr, expected, variables_with_array):
+    assert evaluate_math_expression(expr, variables_with_array) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("expr,bounds", RANDOM_CASES)
+def test_fast_random_stays_in_bounds(expr, bounds, variables_with_array):
+    low, high = bounds
+    assert low <= evaluate_math_expression(expr, variables_with_array) <= high
+
+
 def test_try_fast_number_and_trig():
     assert try_fast_number("99") == 99
     assert try_fast_trig("sin(0)", None) == pytest.approx(0.0)
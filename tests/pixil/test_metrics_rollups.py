@@ -0,0 +1,79 @@
+"""Daily rollups, rollup-backed queries and chunked retention."""
+
+import datetime
+
+import pytest
+
+from database.base import DatabaseConfig
+from database.pixil_metrics import PixilMetricsDB
+from database.queries.pixil_queries import PixilQueries
+from shared import consumer_stats
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(DatabaseConfig, "get_db_directory", staticmethod(lambda: tmp_path))
+    return PixilMetricsDB()
+
+
+def _save(db, name, days_ago=0, reason="complete", **metrics):
+    start = datetime.datetime.now() - datetime.timedelta(days=days_ago)
+    return db.save_metrics(name, start, start, metrics, reason)
+
+
+def test_insert_trigger_maintains_rollups(db):
+    _save(db, "a.pix", commands_per_second=100, total_execution_time=2.0, active_execution_time=2.0)
+    _save(db, "a.pix", commands_per_second=300, total_execution_time=4.0, active_execution_time=1.0,
+          jit_attempts=5, jit_hit_rate=80)
+    _save(db, "a.pix", reason="interrupted", commands_per_second=50)
+    _save(db, "b.pix", days_ago=3, commands_per_second=10)
+
+    summary = PixilQueries().get_performance_summary(days=7)
+    assert summary["total_runs"] == 4
+    assert summary["unique_scripts"] == 2
+    assert summary["completed_count"] == 3 and summary["interrupted_count"] == 1
+    assert summary["avg_commands_per_sec"] == pytest.approx(115.0)
+
+    queries = PixilQueries()
+    script = queries.get_script_summary("a.pix")
+    assert script["total_runs"] == 3 and script["executed_runs"] == 3
+    assert script["avg_commands_per_sec"] == pytest.approx(150.0)
+    assert queries.get_jit_effectiveness()["avg_jit_hit_rate"] == pytest.approx(80.0)
+
+    counts = queries.get_run_counts(days=1, script_name="a.pix")
+    assert counts == {"total_runs": 3, "resource_constrained_runs": 2}
+    daily = queries.get_daily_rollups(days=7)
+    assert [row["runs"] for row in daily] == [3, 1]
+    assert queries.get_active_scripts(days=1) == ["a.pix"]
+
+
+def test_backfill_matches_raw_rows(db):
+    for i in range(4):
+        _save(db, "c.pix", commands_per_second=i * 10)
+    with db.get_connection() as conn:
+        conn.execute("DELETE FROM script_daily_rollup")
+        sql = (DatabaseConfig.get_migrations_directory() / "008_add_daily_rollups.sql").read_text()
+        backfill = sql[sql.index("INSERT OR REPLACE"):sql.index("CREATE TRIGGER")]
+        conn.execute(backfill)
+        row = conn.execute("SELECT runs, commands_per_second FROM script_daily_rollup").fetchone()
+    assert tuple(row) == (4, 60.0)
+
+
+def test_metrics_by_script_limit_is_newest_first(db):
+    for days_ago in (3, 1, 2):
+        _save(db, "d.pix", days_ago=days_ago, commands_executed=days_ago)
+    rows = db.get_metrics_by_script("d.pix", limit=2)
+    assert [r["commands_executed"] for r in rows] == [1, 2]
+    assert len(db.get_metrics_by_script("d.pix")) == 3
+
+
+def test_delete_old_records_in_chunks_keeps_rollups(db):
+    old_ids = [_save(db, "e.pix", days_ago=40) for _ in range(7)]
+    _save(db, "e.pix")
+    db.save_consumer_metrics(old_ids[0], consumer_stats.empty_totals())
+
+    assert db.delete_old_records(30, chunk_size=3) == 7
+    assert db.get_script_count() == 1
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM consumer_metrics").fetchone()[0] == 0
+        assert conn.execute("SELECT SUM(runs) FROM script_daily_rollup").fetchone()[0] == 8
@@ -0,0 +1,87 @@
+"""Background metrics writer, tracked migrations and WAL setup."""
+
+import datetime
+import sqlite3
+
+import pytest
+
+from database import metrics_writer, migrate
+from database.base import DatabaseConfig
+from database.metrics_writer import MetricsWriter
+from database.pixil_metrics import PixilMetricsDB
+
+
+@pytest.fixture
+def db_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(DatabaseConfig, "get_db_directory", staticmethod(lambda: tmp_path))
+    return tmp_path
+
+
+def _versions(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+
+def test_new_database_gets_every_migration_and_wal(db_dir):
+    db = PixilMetricsDB()
+    assert _versions(db.db_path) == {n for n, _path in migrate.available_migrations()}
+    with db.get_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_hand_migrated_database_is_adopted(db_dir):
+    migrations = dict(migrate.available_migrations())
+    with sqlite3.connect(db_dir / "pixil_metrics.db") as conn:
+        conn.executescript(migrations[1].read_text())
+        conn.executescript(migrations[2].read_text())
+
+    db = PixilMetricsDB()
+    assert _versions(db.db_path) == set(migrations)
+    now = datetime.datetime.now()
+    assert db.save_metrics("legacy.pix", now, now, {"parse_value_total_time": 0.5}) > 0
+
+
+def test_writer_batches_runs_with_child_rows(db_dir):
+    writer = MetricsWriter(PixilMetricsDB())
+    now = datetime.datetime.now()
+    profile = [{"line_numbers": "3", "procedure_stack": "<main>", "source_text": "plot(1, 1, red, 100)",
+                "samples": 4, "wall_time": 0.4, "cpu_time": 0.3, "wall_percent": 100.0}]
+    for i in range(5):
+        assert writer.submit(f"run{i}.pix", now, now, {"commands_executed": i}, "complete",
+                             consumer_row={"frames_presented": 10 + i}, profile_rows=profile)
+    assert writer.flush(timeout=5.0)
+    assert writer.close()
+
+    assert writer.written == 5 and writer.last_error is None
+    assert writer.batches <= 5
+    db = writer.db
+    assert db.get_script_count() == 5
+    assert [r["frames_presented"] for r in db.get_consumer_metrics(script_name="run4.pix")] == [14]
+    assert [r["line_numbers"] for r in db.get_line_profile("run2.pix")] == ["3"]
+
+
+def test_full_queue_drops_instead_of_blocking(db_dir):
+    writer = MetricsWriter(PixilMetricsDB(), max_pending=1)
+    writer.start = lambda: None  # keep the thread from draining
+    now = datetime.datetime.now()
+    assert writer.submit("a.pix", now, now, {})
+    assert not writer.submit("b.pix", now, now, {})
+    assert writer.dropped == 1 and writer.pending == 1
+
+
+def test_ctrl_c_exit_flushes_pending_runs(db_dir, monkeypatch):
+    from pixil_utils import shutdown
+
+    writer = MetricsWriter(PixilMetricsDB())
+    monkeypatch.setattr(metrics_writer, "_writer", writer)
+
+    def fake_exit(code):
+        raise SystemExit(code)
+
+    monkeypatch.setattr(shutdown.os, "_exit", fake_exit)
+    now = datetime.datetime.now()
+    assert writer.submit("interrupted.pix", now, now, {"commands_executed": 3}, "interrupted")
+    with pytest.raises(SystemExit):
+        shutdown.exit_pixil()
+    assert writer.written == 1 and writer.pending == 0
+    assert writer.db.get_script_count() == 1
@@ -0,0 +1,164 @@
+"""Tests for particle_program compilation and NumPy execution."""
+
+import numpy as np
+import pytest
+
+from pixil_utils.chladni_engine import _move_particles
+from pixil_utils.grid_field_compiler import compile_particle_program
+from pixil_utils.particle_engine import run_particle_step
+from shared.draw_batch_protocol import RASTER_SKIP
+
+
+FOUNTAIN_BODY = [
+    "position v_px, v_py",
+    "velocity v_vx, v_vy",
+    "life v_life",
+    "decay v_decay",
+    "live_count v_live",
+    "gravity 0, 0.5",
+    "bounds bounce",
+    "area 0, 0, 9, 9",
+    "update {",
+    "v_vx = v_vx + 1",
+    "}",
+    "draw {",
+    "color 10 + index",
+    "opacity v_life * 10",
+    "}",
+]
+
+
+def _capture():
+    draws = []
+    return draws, lambda cmd, args: draws.append((cmd, args))
+
+
+def test_compile_particle_program():
+    prog = compile_particle_program("fountain", FOUNTAIN_BODY)
+    assert prog.position == ("v_px", "v_py")
+    assert prog.velocity == ("v_vx", "v_vy")
+    assert prog.bounds == "bounce"
+    assert prog.area == ("0", "0", "9", "9")
+    assert [target for target, _ in prog.update] == ["v_vx"]
+    assert prog.draw.color_expr is not None
+    assert prog.state_arrays() == ["v_px", "v_py", "v_vx", "v_vy", "v_life"]
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        (["velocity v_vx, v_vy"], "position required"),
+        (["position v_px"], "two arrays"),
+        (["position v_px, v_py", "bounds sticky"], "unknown bounds"),
+        (["position v_px, v_py", "draw {", "fire_field v_heat", "}"], "draw supports"),
+        (["position v_px, v_py", "spin 3"], "Unknown particle_program directive"),
+    ],
+)
+def test_compile_particle_program_errors(body, message):
+    with pytest.raises(ValueError, match=message):
+        compile_particle_program("bad", body)
+
+
+def test_particle_step_integrates_bounces_and_expires(make_vars):
+    prog = compile_particle_program("fountain", FOUNTAIN_BODY)
+    variables = make_vars(
+        v_px=[2.0, 8.5, 5.0],
+        v_py=[2.0, 5.0, 5.0],
+        v_vx=[0.0, 1.0, 0.0],
+        v_vy=[0.0, 0.0, 0.0],
+        v_life=[5.0, 5.0, 0.0],
+        v_decay=1,
+        v_live=0,
+    )
+    draws, capture = _capture()
+    run_particle_step(prog, variables, capture)
+
+    # Particle 0: update (+1), gravity, integrate
+    assert variables.get("v_px")[0] == 3.0
+    assert variables.get("v_py")[0] == 2.5
+    # Particle 1 runs past x1 = 9 and reflects with its velocity reversed
+    assert variables.get("v_px")[1] == 7.5
+    assert variables.get("v_vx")[1] == -2.0
+    # Particle 2 is dead: untouched and not drawn
+    assert variables.get("v_px")[2] == 5.0 and variables.get("v_vx")[2] == 0.0
+    assert variables.get("v_life").data == [4.0, 4.0, 0.0]
+    assert variables.get("v_live") == 2
+
+    assert len(draws) == 1 and draws[0][0] == "raster"
+    x0, y0, ids, ints = draws[0][1]
+    assert (x0, y0) == (3, 2) and ids.shape == (4, 5)
+    assert ids[0, 0] == 10 and ints[0, 0] == 40
+    assert ids[3, 4] == 11
+    assert (ids != RASTER_SKIP).sum() == 2
+
+
+def test_particle_kill_bounds_and_alive_flag(make_vars):
+    prog = compile_particle_program("rain", [
+        "position v_px, v_py",
+        "velocity v_vx, v_vy",
+        "alive v_alive",
+        "bounds kill",
+        "draw {",
+        "fill_color v_drop_color",
+        "fill_intensity 70",
+        "}",
+    ])
+    variables = make_vars(
+        v_px=[10.0, 20.0],
+        v_py=[62.0, 10.0],
+        v_vx=[0.0, 0.0],
+        v_vy=[3.0, 3.0],
+        v_alive=[1.0, 1.0],
+        v_drop_color="blue",
+    )
+    draws, capture = _capture()
+    run_particle_step(prog, variables, capture)
+    assert variables.get("v_alive").data == [0.0, 1.0]
+    x0, y0, ids, ints = draws[0][1]
+    assert (x0, y0) == (20, 13) and ids.shape == (1, 1) and ints[0, 0] == 70
+
+
+def test_update_neighbor_functions_skip_dead_particles(make_vars):
+    prog = compile_particle_program("flock", [
+        "position v_px, v_py",
+        "arrays v_n, v_cx",
+        "alive v_alive",
+        "update {",
+        "v_n = near_count(2)",
+        "v_cx = near_avg(v_px, 2)",
+        "}",
+    ])
+    variables = make_vars(
+        v_px=[10.0, 11.0, 10.5, 40.0],
+        v_py=[10.0, 10.0, 10.0, 40.0],
+        v_n=[0.0] * 4,
+        v_cx=[0.0] * 4,
+        v_alive=[1.0, 1.0, 0.0, 1.0],
+    )
+    run_particle_step(prog, variables, lambda _c, _a: None)
+    assert variables.get("v_n").data == [1.0, 1.0, 0.0, 0.0]
+    assert variables.get("v_cx").data == [11.0, 10.0, 0.0, 0.0]
+
+
+def test_plot_points_last_point_wins_on_shared_pixel():
+    from pixil_utils.particle_engine import plot_points
+
+    draws, capture = _capture()
+    xs = np.array([3.2, 5.0, 3.9, 3.5, 5.5])
+    ys = np.array([4.0, 4.0, 4.7, 4.1, 4.9])
+    plot_points(capture, xs, ys, np.array([10, 20, 30, 40, 50]), np.array([11, 22, 33, 44, 55]))
+    [(cmd, (x0, y0, ids, ints))] = draws
+    assert cmd == "raster" and (x0, y0) == (3, 4)
+    assert ids.tolist() == [[40, RASTER_SKIP, 50]]
+    assert ints.tolist() == [[44, 0, 55]]
+
+
+def test_vectorized_chladni_move_stays_on_plate():
+    rng = np.random.default_rng(7)
+    xs = rng.integers(2, 62, 500).astype(np.float64)
+    ys = rng.integers(2, 62, 500).astype(np.float64)
+    for _ in range(20):
+        xs, ys, vals = _move_particles(xs, ys, 3 * 0.09817477, 7 * 0.09817477, rng)
+    assert xs.min() >= 2 and xs.max() <= 61 and ys.min() >= 2 and ys.max() <= 61
+    # Settling pulls most of the sand onto low plate values
+    assert np.median(vals) < 0.4
@@ -0,0 +1,88 @@
+"""--profile: per-line / per-procedure sampling attribution and DB persistence."""
+
+import datetime
+import sys
+import time
+
+import pytest
+
+from database.base import DatabaseConfig
+from database.pixil_metrics import PixilMetricsDB
+from pixil_utils import math_functions
+from pixil_utils.cli import parse_args
+from pixil_utils.script_profiler import ScriptProfiler, map_source_lines
+
+SCRIPT = """\
+# header comment
+v_x = 1
+def wiggle {
+    plot(v_x, 1, red, 100)   # hot
+}
+plot(v_x, 1, red, 100)
+call wiggle
+"""
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "demo.pix"
+    path.write_text(SCRIPT)
+    return path
+
+
+def _busy(line, seconds):
+    math_functions.set_current_script_line(line)
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_source_map_separates_procedure_lines(script):
+    lines = map_source_lines(script)
+    assert lines[("plot(v_x, 1, red, 100)", "wiggle")] == (4,)
+    assert lines[("plot(v_x, 1, red, 100)", None)] == (6,)
+    assert lines[("call wiggle", None)] == (7,)
+
+
+def test_samples_attributed_to_lines_and_procedures(script):
+    profiler = ScriptProfiler(script, interval=0.001)
+    profiler.start()
+    _busy("v_x = 1", 0.02)
+    profiler.enter("wiggle")
+    _busy("plot(v_x, 1, red, 100)", 0.15)
+    profiler.exit()
+    profiler.stop()
+    math_functions.set_current_script_line(None)
+
+    hottest = profiler.rows()[0]
+    assert hottest["line_numbers"] == "4"
+    assert hottest["procedure_stack"] == "<main>;wiggle"
+    assert hottest["wall_percent"] > 50
+    totals = {name: (inclusive, own) for name, inclusive, own in profiler.procedure_totals()}
+    assert totals["<main>"][0] >= totals["wiggle"][0] > totals["<main>"][1]
+    table = profiler.format_table(top=5)
+    assert "wiggle" in table and "Script Profile" in table
+
+
+def test_profile_db_flag_implies_profile(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["Pixil.py", "demo", "--profile-db", "--profile-interval", "5"])
+    args = parse_args()
+    assert args.profile and args.profile_db
+    assert args.profile_interval == pytest.approx(0.005)
+
+
+def test_line_profile_saved_with_run(script, tmp_path, monkeypatch):
+    monkeypatch.setattr(DatabaseConfig, "get_db_directory", staticmethod(lambda: tmp_path))
+    db = PixilMetricsDB()
+    now = datetime.datetime.now()
+    script_id = db.save_metrics("demo.pix", now, now, {})
+    rows = [
+        {"line_numbers": "4", "procedure_stack": "<main>;wiggle", "source_text": "plot(...)",
+         "samples": 9, "wall_time": 0.9, "cpu_time": 0.8, "wall_percent": 90.0},
+        {"line_numbers": "2", "procedure_stack": "<main>", "source_text": "v_x = 1",
+         "samples": 1, "wall_time": 0.1, "cpu_time": 0.1, "wall_percent": 10.0},
+    ]
+    assert db.save_line_profile(script_id, rows) == 2
+    saved = db.get_line_profile("demo.pix")
+    assert [r["line_numbers"] for r in saved] == ["4", "2"]
+    assert db.get_line_profile("other.pix") == []
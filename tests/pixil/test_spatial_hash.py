@@ -0,0 +1,101 @@
+"""Spatial hash neighbor queries and the neighbor_* script commands."""
+
+import numpy as np
+import pytest
+
+from pixil_utils.spatial_hash import SpatialHash, reset_hashes, run_neighbor_command
+
+
+def _brute_force(xs, ys, radius, wrap=0.0):
+    dx = xs[None, :] - xs[:, None]
+    dy = ys[None, :] - ys[:, None]
+    if wrap:
+        dx -= wrap * np.round(dx / wrap)
+        dy -= wrap * np.round(dy / wrap)
+    within = dx * dx + dy * dy < radius * radius
+    np.fill_diagonal(within, False)
+    return within, dx, dy
+
+
+@pytest.mark.parametrize("cell, radius, wrap", [(4.0, 4.0, 0.0), (2.5, 6.0, 0.0), (10.0, 3.0, 0.0),
+                                                (5.0, 5.0, 64.0), (10.0, 10.0, 64.0), (30.0, 12.0, 64.0)])
+def test_queries_match_brute_force(cell, radius, wrap):
+    rng = np.random.default_rng(11)
+    xs = rng.uniform(-2, 66, 300) if not wrap else rng.uniform(0, 64, 300)
+    ys = rng.uniform(-2, 66, 300) if not wrap else rng.uniform(0, 64, 300)
+    values = rng.uniform(-1, 1, 300)
+    spatial = SpatialHash(xs, ys, cell, wrap)
+    within, dx, dy = _brute_force(xs, ys, radius, wrap)
+    counts = within.sum(axis=1)
+
+    first, second = spatial.pairs(radius)[:2]
+    assert len(set(zip(first.tolist(), second.tolist()))) == first.size == int(counts.sum())
+    np.testing.assert_array_equal(spatial.count(radius), counts)
+    np.testing.assert_allclose(spatial.sum(radius, values), within @ values, atol=1e-12)
+    expected_avg = np.divide(within @ values, counts, out=np.zeros(300), where=counts > 0)
+    np.testing.assert_allclose(spatial.avg(radius, values), expected_avg, atol=1e-12)
+
+    off_x, off_y = spatial.offset(radius)
+    np.testing.assert_allclose(off_x, np.divide((within * dx).sum(1), counts, out=np.zeros(300), where=counts > 0), atol=1e-9)
+    np.testing.assert_allclose(off_y, np.divide((within * dy).sum(1), counts, out=np.zeros(300), where=counts > 0), atol=1e-9)
+    dist = np.sqrt(dx * dx + dy * dy)
+    unit = np.divide(1.0, dist, out=np.zeros_like(dist), where=dist > 0)
+    away_x, away_y = spatial.away(radius)
+    np.testing.assert_allclose(away_x, -(within * dx * unit).sum(1), atol=1e-9)
+    np.testing.assert_allclose(away_y, -(within * dy * unit).sum(1), atol=1e-9)
+
+
+def test_radius_is_strict():
+    # Neighbors exactly radius away are left out, as with v_dist < radius in scripts
+    spatial = SpatialHash(np.array([0.0, 3.0, 0.0, 10.0]), np.array([0.0, 0.0, 4.0, 10.0]), 3.0)
+    assert spatial.count(3.0).tolist() == [0.0, 0.0, 0.0, 0.0]
+    assert spatial.count(4.0).tolist() == [1.0, 1.0, 0.0, 0.0]
+    assert spatial.count(5.0).tolist() == [2.0, 1.0, 1.0, 0.0]
+
+
+def test_empty_and_single_point_hash():
+    assert SpatialHash(np.zeros(0), np.zeros(0), 4.0).count(4.0).size == 0
+    assert SpatialHash(np.array([3.0]), np.array([3.0]), 4.0, wrap=64).count(10.0).tolist() == [0.0]
+    with pytest.raises(ValueError, match="cell size"):
+        SpatialHash(np.zeros(2), np.zeros(2), 0.0)
+
+
+def test_neighbor_commands_write_result_arrays(make_vars):
+    reset_hashes()
+    variables = make_vars(
+        v_x=[1.0, 2.0, 62.0, 30.0],
+        v_y=[5.0, 5.0, 5.0, 30.0],
+        v_vx=[1.0, 2.0, 4.0, 8.0],
+        v_n=[0.0] * 4,
+        v_s=[0.0] * 4,
+        v_ox=[0.0] * 4,
+        v_oy=[0.0] * 4,
+    )
+
+    def run(op, *args):
+        run_neighbor_command(op, list(args), variables, float)
+
+    # Without neighbor_grid a query builds a one-off hash (no wrap)
+    run("count", "v_x", "v_y", "3", "v_n")
+    assert variables.get("v_n").data == [1.0, 1.0, 0.0, 0.0]
+
+    # Wrapping at 64 makes x = 62 a neighbor of x = 1 and x = 2
+    run("grid", "v_x", "v_y", "4", "64")
+    run("count", "v_x", "v_y", "4.5", "v_n")
+    run("sum", "v_x", "v_y", "4.5", "v_vx", "v_s")
+    run("offset", "v_x", "v_y", "4.5", "v_ox", "v_oy")
+    assert variables.get("v_n").data == [2.0, 2.0, 2.0, 0.0]
+    assert variables.get("v_s").data == [6.0, 5.0, 3.0, 0.0]
+    assert variables.get("v_ox").data == [-1.0, -2.5, 3.5, 0.0]
+
+    # The grid is a snapshot: moving a point does not change queries until the next neighbor_grid
+    variables.get("v_x")[3] = 3.0
+    variables.get("v_y")[3] = 5.0
+    run("count", "v_x", "v_y", "4.5", "v_n")
+    assert variables.get("v_n")[3] == 0.0
+    run("grid", "v_x", "v_y", "4", "64")
+    run("count", "v_x", "v_y", "4.5", "v_n")
+    assert variables.get("v_n")[3] == 2.0
+
+    with pytest.raises(ValueError, match="expects 5 arguments"):
+        run("avg", "v_x", "v_y", "4", "v_n")
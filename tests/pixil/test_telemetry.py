@@ -0,0 +1,88 @@
+"""Live telemetry socket: snapshots, windowed rates and the pixil_top formatter."""
+
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+from pixil_utils.math_functions import get_cache_hit_rates
+from shared import telemetry
+from shared.telemetry import TelemetryPublisher, add_rates, read_snapshots
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+import pixil_top  # noqa: E402
+
+
+@pytest.fixture
+def sock_path(tmp_path):
+    # AF_UNIX paths are limited to ~108 bytes; tmp_path can be longer
+    path = Path("/tmp") / f"pixil-test-{tmp_path.name}.sock"
+    yield path
+    if path.exists():
+        path.unlink()
+
+
+def test_rates_from_counters_and_resets():
+    before = {"ts": 10.0, "frames": 100, "commands": 50}
+    after = add_rates({"ts": 12.0, "frames": 160, "commands": 8}, before)
+    assert after["frames_per_s"] == pytest.approx(30.0)
+    # Counter went backwards (new script): rate restarts from the new value
+    assert after["commands_per_s"] == pytest.approx(4.0)
+    assert add_rates({"ts": 1.0, "frames": 5}, None)["frames_per_s"] == 0.0
+
+
+def test_publisher_streams_json_lines(sock_path):
+    counter = {"frames": 0}
+
+    def snapshot():
+        counter["frames"] += 30
+        return {"script": "demo.pix", "queue_depth": 7, "frames": counter["frames"],
+                "cache_hit_rates": get_cache_hit_rates()}
+
+    publisher = TelemetryPublisher(snapshot, sock_path, interval=0.02)
+    publisher.start()
+    try:
+        stream = read_snapshots(sock_path, timeout=2.0)
+        first = next(stream)
+        second = next(stream)
+        assert first["script"] == "demo.pix" and first["queue_depth"] == 7
+        assert second["frames"] > first["frames"]
+        assert second["frames_per_s"] > 0
+        assert set(second["cache_hit_rates"]) == {"fast_math", "expression_cache", "jit", "condition_template"}
+        stream.close()
+    finally:
+        publisher.stop()
+    assert not sock_path.exists()
+
+
+def test_second_publisher_refuses_live_socket_but_replaces_stale(sock_path):
+    live = TelemetryPublisher(dict, sock_path)
+    live.start()
+    try:
+        with pytest.raises(OSError, match="in use"):
+            TelemetryPublisher(dict, sock_path).start()
+    finally:
+        live.stop()
+
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(sock_path))
+    stale.close()
+    replacement = TelemetryPublisher(dict, sock_path)
+    replacement.start()
+    replacement.stop()
+
+
+def test_env_and_viewer_formatting(monkeypatch):
+    monkeypatch.setenv(telemetry.TELEMETRY_ENV, "1")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert telemetry.socket_path_from_env() == Path("/run/user/1000/pixil-telemetry.sock")
+    monkeypatch.setenv(telemetry.TELEMETRY_ENV, "0")
+    assert telemetry.socket_path_from_env() is None
+
+    snap = {"ts": 0.0, "script": "demo.pix", "queue_depth": 12, "queue_capacity": 5000,
+            "frames_per_s": 60.0, "consumer_frames_per_s": 59.5, "queue_stall_time_per_s": 0.25,
+            "cache_hit_rates": {"jit": 90.0, "expression_cache": None}}
+    line = pixil_top.format_line(snap)
+    assert "demo.pix" in line and "60.0/ 59.5" in line and "25%" in line
+    assert any("Consumer fps" in row for row in pixil_top.format_screen(snap))
@@ -40,3 +40,45 @@ def test_summary_line_format(monkeypatch):
     assert "buffer=abc123" in line
     assert "failures=0" in line
     assert "exit=0" in line
+
+
+def test_bench_mode_requires_test_mode(monkeypatch):
+    monkeypatch.setenv("PIXIL_BENCH", "1")
+    monkeypatch.delenv("PIXIL_TEST_MODE", raising=False)
+    assert test_hooks.is_bench_mode() is False
+    monkeypatch.setenv("PIXIL_TEST_MODE", "1")
+    assert test_hooks.is_bench_mode() is True
+
+
+def test_seed_makes_random_reproducible(monkeypatch):
+    import random
+
+    monkeypatch.setenv("PIXIL_RANDOM_SEED", "42")
+    test_hooks.seed_script_randomness()
+    first = [random.random() for _ in range(3)]
+    test_hooks.seed_script_randomness()
+    assert [random.random() for _ in range(3)] == first
+
+
+def test_bench_sampler_frames_and_limit(monkeypatch):
+    monkeypatch.setenv("PIXIL_BENCH_FRAMES", "2")
+    sampler = test_hooks.BenchSampler("consumer")
+    sampler.add_command(0.002)
+    sampler.add_command(0.003)
+    sampler.end_frame(0.003, depth=4)
+    assert not sampler.frame_limit_reached()
+    sampler.add_command(0.001)
+    sampler.end_frame(0.001, depth=0)
+    assert sampler.frame_limit_reached()
+    data = sampler.summary()
+    assert data["frames"] == 2 and data["commands"] == 3
+    assert data["frame_ms"]["max"] == 5.0
+    assert data["queue_depth"]["max"] == 4.0
+
+
+def test_distribution_percentiles():
+    dist = test_hooks.distribution(list(range(1, 101)))
+    assert dist["n"] == 100
+    assert dist["p50"] == 51.0
+    assert dist["p99"] == 99.0
+    assert test_hooks.distribution([])["p90"] == 0.0
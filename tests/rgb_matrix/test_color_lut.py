@@ -0,0 +1,78 @@
+"""Palette tables: LUT lookups match the float formula; sprite copy uses them."""
+
+import sys
+from unittest.mock import MagicMock
+
+import numpy as np
+
+if "rgbmatrix" not in sys.modules:
+    _rgb_stub = MagicMock()
+    _rgb_stub.RGBMatrix = MagicMock
+    _rgb_stub.RGBMatrixOptions = MagicMock
+    sys.modules["rgbmatrix"] = _rgb_stub
+
+from rgb_matrix_lib.api import RGB_Api
+from rgb_matrix_lib.sprite import MatrixSprite, SpriteInstance
+from rgb_matrix_lib.utils import (
+    COLOR_ID_OFFSET,
+    COLOR_LUT,
+    NAMED_COLORS,
+    SPECTRAL_COLORS,
+    get_color_rgb,
+)
+from shared.mplot_protocol import NAMED_COLOR_TO_ID
+
+
+def _reference(rgb, intensity):
+    scale = intensity / 100.0
+    return tuple(int(c * scale) for c in rgb)
+
+
+def test_named_and_spectral_match_reference_at_every_intensity():
+    for name, rgb in NAMED_COLORS.items():
+        for i in range(101):
+            assert get_color_rgb(name, i) == _reference(rgb, i)
+    for num, rgb in SPECTRAL_COLORS.items():
+        for i in range(101):
+            assert get_color_rgb(num, i) == _reference(rgb, i)
+
+
+def test_lut_covers_every_wire_color_id():
+    assert COLOR_LUT.shape == (COLOR_ID_OFFSET + 100, 101, 3)
+    for name, cid in NAMED_COLOR_TO_ID.items():
+        assert tuple(COLOR_LUT[cid + COLOR_ID_OFFSET, 40]) == _reference(NAMED_COLORS[name], 40)
+    assert tuple(COLOR_LUT[17 + COLOR_ID_OFFSET, 100]) == SPECTRAL_COLORS[17]
+
+
+def test_slow_path_inputs_still_resolve():
+    assert get_color_rgb("RED", 50) == _reference(NAMED_COLORS["red"], 50)
+    assert get_color_rgb("nope", 100) == NAMED_COLORS["white"]
+    assert get_color_rgb(150, 100) == SPECTRAL_COLORS[99]
+    assert get_color_rgb((10, 200, 30), 77) == _reference((10, 200, 30), 77)
+    assert get_color_rgb("red", 120) == NAMED_COLORS["red"]
+    # Tuples outside 8-bit ints are not clamped, exactly as before the tables
+    for rgb in ((300, -5, 12), (12.5, 99.9, 0)):
+        # Twice, so a row cached by the first call would be caught
+        for _ in range(2):
+            assert get_color_rgb(rgb, 50) == _reference(rgb, 50)
+
+
+def test_copy_sprite_to_buffer_scales_and_skips_transparent():
+    api = RGB_Api.__new__(RGB_Api)
+    api.matrix = MagicMock()
+    api.matrix.width = 64
+    api.matrix.height = 64
+    template = MatrixSprite(3, 2, "s")
+    template.plot(0, 0, "red", 50)
+    template.plot(2, 1, (10, 20, 30), 100)
+    instance = SpriteInstance(template, x=-1, y=5)
+    canvas = MagicMock()
+    api.copy_sprite_to_buffer(instance, canvas)
+    canvas.SetPixel.assert_called_once_with(1, 6, 10, 20, 30)
+
+    canvas = MagicMock()
+    instance.x = 4
+    api.copy_sprite_to_buffer(instance, canvas)
+    calls = {c.args for c in canvas.SetPixel.call_args_list}
+    assert calls == {(4, 5, 127, 0, 0), (6, 6, 10, 20, 30)}
+    assert np.all(template.buffer[0, 1] == (0, 0, 1))
@@ -0,0 +1,71 @@
+"""Display backends: RGB_Api drives in-memory canvases without rgbmatrix hardware."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from rgb_matrix_lib import display_backend
+from rgb_matrix_lib.api import RGB_Api
+from rgb_matrix_lib.display_backend import FramebufferMatrix, NullMatrix, create_matrix
+from rgb_matrix_lib.utils import get_color_rgb
+
+
+@pytest.fixture
+def api():
+    api = RGB_Api(backend="framebuffer")
+    yield api
+    api.burnout_manager.stop()
+
+
+def test_selection_from_environment(monkeypatch):
+    monkeypatch.setenv("PIXIL_DISPLAY_BACKEND", "framebuffer")
+    monkeypatch.setenv("PIXIL_SIM_VSYNC_MS", "3")
+    matrix, options = create_matrix()
+    assert isinstance(matrix, FramebufferMatrix)
+    assert options is None
+    assert matrix.vsync_latency == pytest.approx(0.003)
+    monkeypatch.setenv("PIXIL_DISPLAY_BACKEND", "null")
+    assert isinstance(create_matrix()[0], NullMatrix)
+    monkeypatch.setenv("PIXIL_DISPLAY_BACKEND", "bogus")
+    assert display_backend.selected_backend() == "hardware"
+
+
+def test_swap_hands_back_previous_front():
+    matrix = FramebufferMatrix(vsync_latency=0)
+    canvas = matrix.CreateFrameCanvas()
+    canvas.SetPixel(1, 2, 10, 20, 30)
+    canvas.SetPixel(99, 2, 1, 1, 1)  # off-panel writes are dropped
+    back = matrix.SwapOnVSync(canvas)
+    assert back is not canvas
+    assert tuple(matrix.snapshot()[2, 1]) == (10, 20, 30)
+    assert matrix.swap_count == 1
+
+
+def test_set_image_honours_offset_and_clips():
+    matrix = FramebufferMatrix(width=4, height=4, vsync_latency=0)
+    canvas = matrix.CreateFrameCanvas()
+    img = Image.fromarray(np.full((2, 2, 3), 200, dtype=np.uint8), mode="RGB")
+    canvas.SetImage(img, 3, -1)
+    assert tuple(canvas.pixels[0, 3]) == (200, 200, 200)
+    assert canvas.pixels.sum() == 600
+
+
+def test_immediate_plot_is_presented(api):
+    api.plot(5, 6, "red", 100)
+    assert tuple(api.matrix.snapshot()[6, 5]) == get_color_rgb("red", 100)
+    assert api.matrix.swap_count >= 1
+
+
+def test_frame_mode_presents_once_at_end_frame(api):
+    api.clear()
+    swaps = api.matrix.swap_count
+    api.begin_frame()
+    api.plot(1, 1, "blue", 100)
+    api.draw_rectangle(10, 10, 3, 3, "green", 100, True)
+    assert api.matrix.swap_count == swaps
+    api.end_frame()
+    assert api.matrix.swap_count == swaps + 1
+    front = api.matrix.snapshot()
+    assert tuple(front[1, 1]) == get_color_rgb("blue", 100)
+    assert tuple(front[11, 11]) == get_color_rgb("green", 100)
+    assert tuple(front[40, 40]) == (0, 0, 0)
@@ -0,0 +1,73 @@
+"""Consumer presentation scheduler: presents planned from burnout expiries, fades and fps()."""
+
+import sys
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+if "rgbmatrix" not in sys.modules:
+    _rgb_stub = MagicMock()
+    _rgb_stub.RGBMatrix = MagicMock
+    _rgb_stub.RGBMatrixOptions = MagicMock
+    sys.modules["rgbmatrix"] = _rgb_stub
+
+from rgb_matrix_lib.api import FADE_PUMP_INTERVAL, IDLE_WAIT_INTERVAL, RGB_Api
+from rgb_matrix_lib.drawing_objects import BurnoutMode, ShapeType, ThreadedBurnoutManager
+
+
+@pytest.fixture
+def api():
+    api = RGB_Api.__new__(RGB_Api)
+    api.frame_mode = False
+    api._target_fps = 0.0
+    api._frame_interval = 0.0
+    api._last_present_time = 0.0
+    api._last_fade_pump_time = 0.0
+    api.drawing_buffer = MagicMock()
+    # Thread is never started: tests drive burnout state directly
+    api.burnout_manager = ThreadedBurnoutManager(api)
+    api.refresh_display = MagicMock()
+    return api
+
+
+def test_idle_consumer_blocks_for_full_idle_wait(api):
+    assert api.next_present_time() is None
+    assert api.presentation_wait() == IDLE_WAIT_INTERVAL
+    assert api.pump_presentation() is False
+    api.refresh_display.assert_not_called()
+
+
+def test_pending_expiry_schedules_present_after_expiry(api):
+    api._last_fade_pump_time = time.time()
+    api.burnout_manager.add_object(ShapeType.POINT, (1, 1), [(1, 1)], 500)
+    due = api.next_present_time()
+    expiry = api.burnout_manager.next_expiry()
+    assert due == pytest.approx(expiry + api.burnout_manager.BURNOUT_WAKE_INTERVAL)
+    assert 0.0 < api.presentation_wait() <= IDLE_WAIT_INTERVAL
+
+
+def test_active_fade_ticks_at_fps_interval(api):
+    api.burnout_manager.add_object(
+        ShapeType.POINT, (1, 1), [(1, 1)], 1000, BurnoutMode.FADE, [(255, 0, 0)]
+    )
+    api._last_fade_pump_time = 100.0
+    assert api.next_present_time() == pytest.approx(100.0 + FADE_PUMP_INTERVAL)
+    api.set_fps(10)
+    assert api.next_present_time() == pytest.approx(100.1)
+
+
+def test_pump_presents_applied_burnout_changes_once(api):
+    api.burnout_manager.changes_made = True
+    assert api.pump_presentation() is True
+    api.refresh_display.assert_called_once()
+    assert api.burnout_manager.has_pending_changes() is False
+    assert api.pump_presentation() is False
+
+
+def test_frame_mode_defers_to_end_frame(api):
+    api.frame_mode = True
+    api.burnout_manager.changes_made = True
+    assert api.next_present_time() is None
+    assert api.pump_presentation(force=True) is False
+    api.refresh_display.assert_not_called()
@@ -0,0 +1,73 @@
+"""SpriteManager per-cell index: overlap queries stay in z-order and track moves/hides."""
+
+import sys
+from unittest.mock import MagicMock
+
+if "rgbmatrix" not in sys.modules:
+    _rgb_stub = MagicMock()
+    _rgb_stub.RGBMatrix = MagicMock
+    _rgb_stub.RGBMatrixOptions = MagicMock
+    sys.modules["rgbmatrix"] = _rgb_stub
+
+from rgb_matrix_lib.sprite import SpriteManager
+
+
+def _manager_with(*names):
+    mgr = SpriteManager()
+    for name in names:
+        mgr.begin_sprite_definition(name, 4, 4)
+        mgr.end_sprite_definition()
+    return mgr
+
+
+def _show(mgr, name, instance_id, cells):
+    instance = mgr.get_instance(name, instance_id) or mgr.create_instance(name, instance_id)
+    instance.visible = True
+    mgr.move_sprite(name, instance_id, cells)
+    return instance
+
+
+def test_overlap_returns_instances_in_z_order():
+    mgr = _manager_with("a", "b")
+    b = _show(mgr, "b", 0, [(0, 0)])
+    a = _show(mgr, "a", 0, [(0, 0), (1, 0)])
+    assert mgr.get_overlapping_sprites([(0, 0)]) == [b, a]
+    assert mgr.get_overlapping_sprites([(1, 0)]) == [a]
+    assert mgr.get_overlapping_sprites([(3, 3)]) == []
+
+
+def test_move_updates_buckets():
+    mgr = _manager_with("a")
+    a = _show(mgr, "a", 0, [(0, 0)])
+    old = mgr.move_sprite("a", 0, [(2, 2)])
+    assert old == [(0, 0)]
+    assert mgr.get_overlapping_sprites([(0, 0)]) == []
+    assert mgr.get_overlapping_sprites([(2, 2)]) == [a]
+
+
+def test_hide_and_dispose_remove_from_index():
+    mgr = _manager_with("a")
+    _show(mgr, "a", 0, [(0, 0)])
+    _show(mgr, "a", 1, [(0, 0)])
+    assert mgr.hide_sprite("a", 0) == [(0, 0)]
+    assert [i for i in mgr.get_overlapping_sprites([(0, 0)])] == [mgr.get_instance("a", 1)]
+    assert mgr.dispose_sprite_instance("a", 1) == [(0, 0)]
+    assert mgr.get_overlapping_sprites([(0, 0)]) == []
+    assert mgr._cell_index == {}
+
+
+def test_colliding_instances_excludes_self():
+    mgr = _manager_with("ship", "rock")
+    _show(mgr, "ship", 0, [(1, 1)])
+    _show(mgr, "rock", 0, [(1, 1), (2, 1)])
+    _show(mgr, "rock", 1, [(3, 3)])
+    assert mgr.get_colliding_instances("ship", 0) == [("rock", 0)]
+    assert mgr.get_colliding_instances("rock", 1) == []
+
+
+def test_dispose_all_clears_index():
+    mgr = _manager_with("a")
+    _show(mgr, "a", 0, [(0, 0)])
+    mgr.dispose_all_sprites()
+    assert mgr._cell_index == {}
+    assert mgr.get_overlapping_sprites([(0, 0)]) == []
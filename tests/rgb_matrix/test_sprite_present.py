@@ -29,6 +29,8 @@ def api_with_visible_ball():
     api.background_manager = MagicMock()
     api.background_manager.has_background.return_value = False
     api.current_command_pixels = []
+    api._drain_checker = None
+    api._shutdown_checker = None
     api.sprite_manager = MagicMock(spec=SpriteManager)
     api.sprite_manager.z_order = []
 
@@ -73,3 +75,31 @@ def test_move_sprite_skips_present_in_frame_mode(api_with_visible_ball):
     api.frame_mode = True
     api.move_sprite("ball_sprite", 12, 22)
     api.refresh_display.assert_not_called()
+
+
+def test_sprite_batch_presents_once_for_many_ops(api_with_visible_ball):
+    api, _instance = api_with_visible_ball
+    ops = [("move_sprite", ("ball_sprite", 10 + i, 20, 0)) for i in range(30)]
+    ops.append(("hide_sprite", ("ball_sprite", 0)))
+    assert api.apply_sprite_batch(ops) == 31
+    api.refresh_display.assert_called_once()
+    api._mark_cells_dirty.assert_called_once()
+
+
+def test_sprite_batch_skips_unknown_ops_and_still_presents(api_with_visible_ball):
+    api, instance = api_with_visible_ball
+    ops = [
+        ("move_sprite", ("ball_sprite", 12, 22, 0)),
+        ("spin_sprite", ("ball_sprite", 90)),
+        ("move_sprite", ("ball_sprite", 14, 24, 0)),
+    ]
+    assert api.apply_sprite_batch(ops) == 2
+    assert (instance.x, instance.y) == (14, 24)
+    api.refresh_display.assert_called_once()
+
+
+def test_sprite_batch_skips_present_in_frame_mode(api_with_visible_ball):
+    api, _instance = api_with_visible_ball
+    api.frame_mode = True
+    api.apply_sprite_batch([("move_sprite", ("ball_sprite", 12, 22, 0))])
+    api.refresh_display.assert_not_called()
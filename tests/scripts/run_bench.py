@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Pixil end-to-end benchmark: run manifest .pix scripts and record throughput.
+
+Uses the Tier 2 manifests (tests/scripts/manifest/*.txt) and the same launch
+path as run_script_tests.py, with benchmark settings:
+
+  PIXIL_BENCH=1           producer/consumer print PIXIL_BENCH_PRODUCER / _CONSUMER JSON
+  PIXIL_TEST_REST_CAP=0   rest() never sleeps (test_hooks.effective_rest_duration)
+  PIXIL_RANDOM_SEED=N     random() / NumPy seeded per script
+  PIXIL_BENCH_FRAMES=N    stop each script after N end_frame (optional)
+
+Results are written as sorted, indented JSON so two runs diff cleanly:
+
+  ./run bench                                   # core manifest, 5s per script
+  ./run bench -- --frames 300 --save-baseline   # write tests/scripts/bench/baseline.json
+  ./run bench -- --frames 300                   # compare against the saved baseline
+
+Off the Pi: PIXIL_DISPLAY_BACKEND=framebuffer ./run bench (no sudo needed).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+try:
+    from tests.scripts import run_script_tests as tier2
+except ImportError:  # run as a script: tests/scripts is sys.path[0]
+    import run_script_tests as tier2
+
+BENCH_DIR = Path(__file__).parent / "bench"
+DEFAULT_OUTPUT = BENCH_DIR / "latest.json"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_SECONDS = 5
+DEFAULT_SEED = 1234
+DEFAULT_TOLERANCE = 10.0  # percent
+
+BENCH_LINE_RE = re.compile(r"^PIXIL_BENCH_(PRODUCER|CONSUMER) (\{.*\})\s*$", re.MULTILINE)
+
+# (section, dotted metric path, True when higher is better)
+COMPARED_METRICS = (
+    ("producer", "lines_per_s", True),
+    ("producer", "commands_per_s", True),
+    ("consumer", "frame_ms.p50", False),
+    ("consumer", "frame_ms.p90", False),
+    ("consumer", "present_ms.p90", False),
+)
+
+
+def parse_bench_output(combined: str) -> dict:
+    """Collect PIXIL_BENCH_* JSON lines; the last line per role wins."""
+    found = {}
+    for role, payload in BENCH_LINE_RE.findall(combined):
+        try:
+            found[role.lower()] = json.loads(payload)
+        except json.JSONDecodeError:
+            continue
+    return found
+
+
+def _metric(entry: dict, section: str, path: str):
+    value = entry.get(section) or {}
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value if isinstance(value, (int, float)) else None
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """Per-metric deltas for scripts present in both runs; 'regressed' beyond tolerance %."""
+    rows = []
+    base_scripts = baseline.get("scripts", {})
+    for script, entry in sorted(current.get("scripts", {}).items()):
+        base_entry = base_scripts.get(script)
+        if not base_entry:
+            continue
+        for section, path, higher_is_better in COMPARED_METRICS:
+            old = _metric(base_entry, section, path)
+            new = _metric(entry, section, path)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / abs(old) * 100.0
+            worse = -change if higher_is_better else change
+            rows.append({
+                "script": script,
+                "metric": f"{section}.{path}",
+                "baseline": old,
+                "current": new,
+                "change_pct": round(change, 1),
+                "regressed": worse > tolerance,
+            })
+    return rows
+
+
+def _bench_env(seed: int, frames: int | None) -> dict:
+    env = {
+        "PIXIL_TEST_MODE": "1",
+        "PIXIL_BENCH": "1",
+        "PIXIL_TEST_REST_CAP": "0",
+        "PIXIL_RANDOM_SEED": str(seed),
+        "PIXIL_TEST_STATE_DIR": str(tier2.TEST_STATE_DIR),
+        "PIXIL_DISPLAY_BACKEND": tier2.DISPLAY_BACKEND,
+        "PIXIL_SIM_VSYNC_MS": os.environ.get("PIXIL_SIM_VSYNC_MS", "0"),
+    }
+    if frames:
+        env["PIXIL_BENCH_FRAMES"] = str(frames)
+    return env
+
+
+def run_one(script_rel: str, *, seconds: int, seed: int, frames: int | None) -> dict:
+    """Run one script under bench settings and return its result entry."""
+    script_path = tier2.REPO_ROOT / "scripts" / script_rel
+    if not script_path.is_file():
+        return {"ok": False, "error": f"missing file: {script_path}"}
+
+    env = _bench_env(seed, frames)
+    cmd = ["env", *[f"{k}={v}" for k, v in env.items()]]
+    cmd += [
+        "python3" if tier2.NEEDS_SUDO else sys.executable,
+        str(tier2.PIXIL),
+        str(Path(script_rel).with_suffix("")),
+        "-t",
+        tier2._seconds_to_pixil_limit(seconds),
+        "-d",
+        "DEBUG_OFF",
+    ]
+    if tier2.NEEDS_SUDO:
+        cmd[:0] = ["sudo", "-n"]
+
+    tier2.TEST_STATE_DIR.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            cmd,
+            cwd=tier2.REPO_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=seconds + 60,
+        )
+    except subprocess.TimeoutExpired:
+        return {"ok": False, "error": "timeout", "wall_s": round(time.perf_counter() - t0, 2)}
+    wall = round(time.perf_counter() - t0, 2)
+    combined = (proc.stdout or "") + (proc.stderr or "")
+    found = parse_bench_output(combined)
+    entry = {"ok": proc.returncode == 0 and "producer" in found, "wall_s": wall}
+    entry.update(found)
+    if proc.returncode != 0:
+        entry["error"] = f"exit {proc.returncode}"
+    elif "producer" not in found:
+        entry["error"] = "missing PIXIL_BENCH_PRODUCER line"
+    return entry
+
+
+def _format_row(script: str, entry: dict) -> str:
+    if not entry.get("ok"):
+        return f"  [FAIL] {script}: {entry.get('error', 'unknown error')}"
+    prod = entry.get("producer", {})
+    cons = entry.get("consumer", {})
+    frame = cons.get("frame_ms", {})
+    depth = cons.get("queue_depth", {})
+    return (
+        f"  {script:<40} lines/s={prod.get('lines_per_s', 0):>10,.0f} "
+        f"cmds/s={prod.get('commands_per_s', 0):>9,.0f} "
+        f"frames={cons.get('frames', 0):>5} "
+        f"frame p50/p90={frame.get('p50', 0):.2f}/{frame.get('p90', 0):.2f}ms "
+        f"depth p90={depth.get('p90', 0):.0f}"
+    )
+
+
+def _parse_cli(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pixil end-to-end benchmark")
+    parser.add_argument("--manifest", action="append", metavar="PATH",
+                        help="Manifest file (repeatable). Default: tests/scripts/manifest/core.txt")
+    parser.add_argument("--seconds", type=int, default=DEFAULT_SECONDS,
+                        help=f"Time limit per script (default {DEFAULT_SECONDS})")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="Stop each script after N frames (time limit still applies)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help=f"PIXIL_RANDOM_SEED for every script (default {DEFAULT_SEED})")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT),
+                        help="Results JSON path (default tests/scripts/bench/latest.json)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help="Baseline JSON to compare against when it exists")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Also write results to the baseline path")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Regression threshold in percent (default {DEFAULT_TOLERANCE})")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    cli = _parse_cli(argv)
+    ok, reason = tier2._can_run()
+    if not ok:
+        print(f"SKIP benchmark: {reason}")
+        return 0
+
+    try:
+        scripts = tier2._load_manifests(tier2._resolve_manifest_paths(cli.manifest))
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    results = {
+        "meta": {
+            "backend": tier2.DISPLAY_BACKEND,
+            "frames": cli.frames,
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "seconds": cli.seconds,
+            "seed": cli.seed,
+            "vsync_ms": os.environ.get("PIXIL_SIM_VSYNC_MS", "0"),
+        },
+        "scripts": {},
+    }
+    print(f"Benchmark: {len(scripts)} scripts, {cli.seconds}s each"
+          + (f", {cli.frames} frames max" if cli.frames else "")
+          + f", seed {cli.seed}, backend {tier2.DISPLAY_BACKEND}")
+    for rel, _volatile, _limit in scripts:
+        entry = run_one(rel, seconds=cli.seconds, seed=cli.seed, frames=cli.frames)
+        results["scripts"][rel] = entry
+        print(_format_row(rel, entry))
+
+    text = json.dumps(results, indent=2, sort_keys=True) + "\n"
+    output = Path(cli.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(text, encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+    baseline_path = Path(cli.baseline)
+    if cli.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(text, encoding="utf-8")
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+    if not baseline_path.is_file():
+        return 0
+
+    rows = compare_results(json.loads(baseline_path.read_text(encoding="utf-8")), results, cli.tolerance)
+    regressions = [r for r in rows if r["regressed"]]
+    print(f"\nCompared with {baseline_path} (tolerance {cli.tolerance:.0f}%):")
+    for row in rows:
+        flag = "REGRESSION" if row["regressed"] else ""
+        print(f"  {row['script']:<40} {row['metric']:<24} "
+              f"{row['baseline']:>12,.2f} -> {row['current']:>12,.2f} "
+              f"({row['change_pct']:+.1f}%) {flag}")
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed beyond {cli.tolerance:.0f}%", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
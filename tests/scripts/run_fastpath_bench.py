@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Pixil fast-path microbenchmark: is each fast path still faster than the code it skips?
+
+Times every fast path against the general evaluator it short-circuits, under
+each optimization_flags profile, over the Tier 1 corpora:
+
+  math       math_functions.try_fast_* via evaluate_math_expression, against the
+             same call with ENABLE_FAST_MATH off (tests/pixil/_math_cases.py)
+  condition  condition templates via evaluate_condition, against the same call
+             with ENABLE_CONDITION_TEMPLATES off (tests/pixil/_condition_cases.py)
+  param      param_fast_paths.try_ultra_fast_path / try_fast_path, against the
+             parse_value normal path (format_parameter)
+
+Each hit is attributed to the innermost try_fast_* that returned a value, so
+the report is per path (and per case underneath). Misses are timed too: the
+"miss" row is what the fast-math dispatch costs an expression no path handles.
+
+  ./run bench-fastpath                        # all profiles, compare to baseline
+  ./run bench-fastpath -- --save-baseline     # write tests/scripts/bench/fastpath_baseline.json
+  ./run bench-fastpath -- --profiles boids,math_heavy --number 500
+
+Exits 1 when a path is slower than its fallback by more than --tolerance
+percent, when a fast path returns a different value than the fallback, or when
+a path's speedup dropped more than --tolerance percent below the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from pixil_utils import math_functions as mf  # noqa: E402
+from pixil_utils import optimization_flags as opt  # noqa: E402
+from pixil_utils import param_fast_paths  # noqa: E402
+from pixil_utils.array_manager import PixilArray  # noqa: E402
+from pixil_utils.condition_templates import clear_condition_cache  # noqa: E402
+from pixil_utils.debug import DEBUG_OFF, set_debug_level  # noqa: E402
+from pixil_utils.expression_parser import format_parameter  # noqa: E402
+from pixil_utils.variable_registry import VariableRegistry  # noqa: E402
+from tests.pixil._condition_cases import CONDITION_WITH_SETUP, LEGACY_CONDITION_CASES  # noqa: E402
+from tests.pixil._math_cases import (  # noqa: E402
+    FAST_MATH_CASES, FAST_PATH_CASES, MATH_EXPR_CASES, PARAM_VALUE_CASES, RANDOM_CASES,
+)
+
+BENCH_DIR = Path(__file__).parent / "bench"
+DEFAULT_OUTPUT = BENCH_DIR / "fastpath_latest.json"
+DEFAULT_BASELINE = BENCH_DIR / "fastpath_baseline.json"
+DEFAULT_NUMBER = 500
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 10.0  # percent
+
+# Flags a profile can change; math_functions copies its four at import time
+PROFILE_FLAGS = (
+    "ENABLE_ULTRA_FAST_PATH", "ENABLE_FAST_PATH", "ENABLE_PARSE_VALUE_CACHE",
+    "ENABLE_PHASE1_FAST_PATH", "ENABLE_FAST_MATH", "ENABLE_EXPRESSION_CACHE",
+    "ENABLE_JIT", "ENABLE_CONDITION_TEMPLATES", "ENABLE_COMPILED_LOOPS",
+    "ENABLE_COMPILED_LOOP_EXPR", "ENABLE_COMPILED_PROCEDURES",
+)
+MATH_MODULE_FLAGS = ("ENABLE_FAST_MATH", "ENABLE_EXPRESSION_CACHE", "ENABLE_JIT", "ENABLE_CONDITION_TEMPLATES")
+
+# Every fast path evaluate_math_expression can take (try_fast_hypot/abs run inside try_fast_trig)
+MATH_FAST_PATHS = tuple(sorted(name for name in dir(mf) if name.startswith("try_fast_")))
+PARAM_FAST_PATHS = ("try_ultra_fast_path", "try_fast_path")
+MISS = "miss"
+
+
+def bench_variables() -> VariableRegistry:
+    """Same registry as the variables_with_array fixture (tests/pixil/conftest.py)."""
+    reg = VariableRegistry()
+    for name, value in (("v_x", 10), ("v_y", 5), ("v_z", 15), ("v_a", 1), ("v_b", 0), ("v_i", 2)):
+        reg.register(name)
+        reg.set(name, value)
+    arr = PixilArray(5)
+    for i, val in enumerate([10, 20, 30, 40, 50]):
+        arr[i] = val
+    reg.register("v_values")
+    reg.set("v_values", arr)
+    return reg
+
+
+@contextlib.contextmanager
+def profile_flags(name: str):
+    """Apply an optimization profile (quietly) and restore every flag afterwards."""
+    saved_opt = {flag: getattr(opt, flag) for flag in PROFILE_FLAGS}
+    saved_mf = {flag: getattr(mf, flag) for flag in MATH_MODULE_FLAGS}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            opt.PROFILES[name]()
+        for flag in MATH_MODULE_FLAGS:
+            setattr(mf, flag, getattr(opt, flag))
+        _clear_caches()
+        yield {flag: getattr(opt, flag) for flag in PROFILE_FLAGS}
+    finally:
+        for flag, value in saved_opt.items():
+            setattr(opt, flag, value)
+        for flag, value in saved_mf.items():
+            setattr(mf, flag, value)
+        _clear_caches()
+
+
+@contextlib.contextmanager
+def _math_flag(flag: str, value: bool):
+    saved = getattr(mf, flag)
+    setattr(mf, flag, value)
+    try:
+        yield
+    finally:
+        setattr(mf, flag, saved)
+
+
+def _clear_caches() -> None:
+    mf.clear_all_math_caches()
+    clear_condition_cache()
+
+
+def _time_ns(fn, number: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter_ns() - start) / number
+
+
+def time_pair(fast, fallback, *, number: int, repeat: int) -> tuple[float, float]:
+    """Best-of-repeat ns/call for both callables, interleaved so drift hits both."""
+    fast()
+    fallback()  # warm caches / JIT exactly like a script's second loop iteration
+    best_fast = best_fallback = float("inf")
+    for _ in range(repeat):
+        best_fast = min(best_fast, _time_ns(fast, number))
+        best_fallback = min(best_fallback, _time_ns(fallback, number))
+    return best_fast, best_fallback
+
+
+def measure(kind: str, path: str, case: str, fast, fallback, *, deterministic: bool = True,
+            number: int, repeat: int) -> dict:
+    """One result row; a fallback that raises marks the fast path as load-bearing."""
+    row = {"kind": kind, "path": path, "case": case}
+    try:
+        expected = fallback()
+    except Exception as e:
+        row.update(fast_ns=round(_time_ns(fast, number), 1), fallback_ns=None,
+                   fallback_error=str(e).splitlines()[0], match=True)
+        return row
+    fast_ns, fallback_ns = time_pair(fast, fallback, number=number, repeat=repeat)
+    row.update(fast_ns=round(fast_ns, 1), fallback_ns=round(fallback_ns, 1),
+               match=not deterministic or _same(fast(), expected))
+    return row
+
+
+def math_path_taken(expr: str, variables) -> str:
+    """Name of the innermost try_fast_* that handled expr (MISS when none did)."""
+    hits = []
+    originals = {name: getattr(mf, name) for name in MATH_FAST_PATHS}
+
+    def recording(name, fn):
+        def wrapper(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            if result is not None:
+                hits.append(name)
+            return result
+        return wrapper
+
+    try:
+        for name, fn in originals.items():
+            setattr(mf, name, recording(name, fn))
+        with _math_flag("ENABLE_FAST_MATH", True):
+            mf.evaluate_math_expression(expr, variables)
+    finally:
+        for name, fn in originals.items():
+            setattr(mf, name, fn)
+    return hits[0] if hits else MISS
+
+
+def general_param_value(value: str, command: str, position: int, variables) -> str:
+    """Pixil.parse_value normal path (no fast paths, no variable format cache)."""
+    if value.startswith("v_") and not mf.has_math_expression(value):
+        val = variables.get(value)
+        return format_parameter(0 if val is None else val, command, position, variables)
+    return format_parameter(value, command, position, variables)
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) <= 1e-9 * max(1.0, abs(a), abs(b))
+    return a == b
+
+
+def _math_cases():
+    for expr, _expected in MATH_EXPR_CASES + FAST_MATH_CASES + FAST_PATH_CASES:
+        yield expr, True
+    for expr, _bounds in RANDOM_CASES:
+        yield expr, False  # values differ per call; timing only
+
+
+def _condition_cases():
+    for condition, _expected in LEGACY_CONDITION_CASES:
+        yield condition, {}
+    for condition, _expected, setup in CONDITION_WITH_SETUP:
+        yield condition, setup
+
+
+def bench_math(variables, *, number: int, repeat: int) -> list[dict]:
+    if not mf.ENABLE_FAST_MATH:
+        return []
+    rows = []
+    for expr, deterministic in _math_cases():
+        path = math_path_taken(expr, variables)
+        evaluate = mf.evaluate_math_expression
+
+        # Both sides pay the flag toggle so only the dispatch differs
+        def fast(expr=expr):
+            with _math_flag("ENABLE_FAST_MATH", True):
+                return evaluate(expr, variables)
+
+        def fallback(expr=expr):
+            with _math_flag("ENABLE_FAST_MATH", False):
+                return evaluate(expr, variables)
+
+        rows.append(measure("math", path, expr, fast, fallback, deterministic=deterministic,
+                            number=number, repeat=repeat))
+    return rows
+
+
+def bench_conditions(variables, *, number: int, repeat: int) -> list[dict]:
+    if not mf.ENABLE_CONDITION_TEMPLATES:
+        return []
+    rows = []
+    for condition, setup in _condition_cases():
+        for name, value in setup.items():
+            variables.register(name)
+            variables.set(name, value)
+        hit = mf.evaluate_condition_fast(condition, variables) is not None
+        evaluate = mf.evaluate_condition
+
+        def fast(condition=condition):
+            with _math_flag("ENABLE_CONDITION_TEMPLATES", True):
+                return evaluate(condition, variables)
+
+        def fallback(condition=condition):
+            with _math_flag("ENABLE_CONDITION_TEMPLATES", False):
+                return evaluate(condition, variables)
+
+        rows.append(measure("condition", "condition_template" if hit else MISS, condition, fast, fallback,
+                            number=number, repeat=repeat))
+    return rows
+
+
+def bench_params(variables, *, number: int, repeat: int) -> list[dict]:
+    enabled = {
+        "try_ultra_fast_path": opt.ENABLE_ULTRA_FAST_PATH,
+        "try_fast_path": opt.ENABLE_FAST_PATH,
+    }
+    rows = []
+    for value, command, position, _formatted in PARAM_VALUE_CASES:
+        if param_fast_paths.try_ultra_fast_path(value, command, position) is not None:
+            path = "try_ultra_fast_path"
+
+            def fast(value=value, command=command, position=position):
+                return param_fast_paths.try_ultra_fast_path(value, command, position)
+        elif param_fast_paths.try_fast_path(value, command, position, variables) is not None:
+            path = "try_fast_path"
+
+            def fast(value=value, command=command, position=position):
+                return param_fast_paths.try_fast_path(value, command, position, variables)
+        else:
+            continue
+        if not enabled[path]:
+            continue
+
+        def fallback(value=value, command=command, position=position):
+            return general_param_value(value, command, position, variables)
+
+        rows.append(measure("param", path, f"{command}[{position}] {value}", fast, fallback,
+                            number=number, repeat=repeat))
+    return rows
+
+
+def summarize_paths(rows: list[dict], tolerance: float = DEFAULT_TOLERANCE) -> dict:
+    """Per-path totals; 'slower' when the fast side costs more than fallback + tolerance %."""
+    paths = {}
+    for row in rows:
+        entry = paths.setdefault(row["path"], {"cases": 0, "fast_ns": 0.0, "fallback_ns": 0.0,
+                                               "mismatches": 0, "fast_only": 0})
+        entry["cases"] += 1
+        entry["mismatches"] += 0 if row["match"] else 1
+        if row["fallback_ns"] is None:
+            # The general evaluator cannot handle this case at all: not a timing comparison
+            entry["fast_only"] += 1
+            continue
+        entry["fast_ns"] += row["fast_ns"]
+        entry["fallback_ns"] += row["fallback_ns"]
+    for name, entry in paths.items():
+        entry["fast_ns"] = round(entry["fast_ns"], 1)
+        entry["fallback_ns"] = round(entry["fallback_ns"], 1)
+        entry["speedup"] = round(entry["fallback_ns"] / entry["fast_ns"], 3) if entry["fast_ns"] else 0.0
+        # A miss is pure overhead by definition; report it, never fail on it
+        entry["slower"] = name != MISS and entry["fast_ns"] > entry["fallback_ns"] * (1 + tolerance / 100.0)
+    return paths
+
+
+def run_profile(name: str, *, number: int, repeat: int, tolerance: float = DEFAULT_TOLERANCE) -> dict:
+    """Benchmark every path under one optimization profile."""
+    with profile_flags(name) as flags:
+        variables = bench_variables()
+        rows = bench_math(variables, number=number, repeat=repeat)
+        rows += bench_conditions(variables, number=number, repeat=repeat)
+        rows += bench_params(variables, number=number, repeat=repeat)
+    return {"flags": flags, "paths": summarize_paths(rows, tolerance), "cases": rows}
+
+
+def run_all(profiles, *, number: int = DEFAULT_NUMBER, repeat: int = DEFAULT_REPEAT,
+            tolerance: float = DEFAULT_TOLERANCE) -> dict:
+    set_debug_level(DEBUG_OFF)  # as in Pixil.py; debug output would dominate the timings
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "number": number,
+            "repeat": repeat,
+        },
+        "profiles": {name: run_profile(name, number=number, repeat=repeat, tolerance=tolerance)
+                     for name in profiles},
+    }
+
+
+def find_failures(results: dict) -> list[str]:
+    """Paths slower than their fallback, and fast paths that disagree with it."""
+    failures = []
+    for profile, entry in sorted(results.get("profiles", {}).items()):
+        for path, stats in sorted(entry["paths"].items()):
+            if stats["slower"]:
+                failures.append(f"{profile}: {path} slower than fallback ({stats['speedup']:.2f}x)")
+            if stats["mismatches"]:
+                failures.append(f"{profile}: {path} disagrees with fallback on {stats['mismatches']} case(s)")
+    return failures
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """Per (profile, path) speedup change; 'regressed' when it fell more than tolerance %."""
+    rows = []
+    base_profiles = baseline.get("profiles", {})
+    for profile, entry in sorted(current.get("profiles", {}).items()):
+        base_paths = (base_profiles.get(profile) or {}).get("paths", {})
+        for path, stats in sorted(entry["paths"].items()):
+            old = (base_paths.get(path) or {}).get("speedup")
+            if not old or path == MISS:
+                continue
+            change = (stats["speedup"] - old) / old * 100.0
+            rows.append({
+                "profile": profile,
+                "path": path,
+                "baseline": old,
+                "current": stats["speedup"],
+                "change_pct": round(change, 1),
+                "regressed": -change > tolerance,
+            })
+    return rows
+
+
+def _print_report(results: dict) -> None:
+    for profile, entry in results["profiles"].items():
+        print(f"\n[{profile}]")
+        if not entry["paths"]:
+            print("  (no fast paths enabled)")
+        for path, stats in sorted(entry["paths"].items(), key=lambda kv: kv[1]["speedup"]):
+            flag = "  SLOWER" if stats["slower"] else ""
+            print(f"  {path:<28} {stats['cases']:>3} cases  fast {stats['fast_ns']:>10.0f} ns  "
+                  f"fallback {stats['fallback_ns']:>10.0f} ns  {stats['speedup']:5.2f}x{flag}")
+
+
+def _write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time Pixil fast paths against the general evaluator")
+    parser.add_argument("--profiles", default=",".join(opt.PROFILES),
+                        help="Comma-separated optimization profiles (default: all)")
+    parser.add_argument("--number", type=int, default=DEFAULT_NUMBER, help="Calls per timing sample")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Samples per case (best is kept)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Percent slack before a path counts as slower / regressed")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Also write results to --baseline")
+    args = parser.parse_args(argv)
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    unknown = [p for p in profiles if p not in opt.PROFILES]
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(unknown)} (available: {', '.join(opt.PROFILES)})")
+
+    results = run_all(profiles, number=args.number, repeat=args.repeat, tolerance=args.tolerance)
+    _print_report(results)
+    _write_json(args.output, results)
+    print(f"\nResults: {args.output}")
+
+    failed = False
+    if args.save_baseline:
+        _write_json(args.baseline, results)
+        print(f"Baseline saved: {args.baseline}")
+    elif args.baseline.is_file():
+        rows = compare_results(json.loads(args.baseline.read_text()), results, args.tolerance)
+        regressed = [r for r in rows if r["regressed"]]
+        print(f"Compared {len(rows)} path speedups against {args.baseline}: {len(regressed)} regressed")
+        for r in regressed:
+            print(f"  REGRESSED {r['profile']}: {r['path']} {r['baseline']:.2f}x -> {r['current']:.2f}x")
+        failed = bool(regressed)
+
+    failures = find_failures(results)
+    for line in failures:
+        print(f"  FAIL {line}")
+    return 1 if failures or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
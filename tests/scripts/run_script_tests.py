@@ -2,6 +2,10 @@
 """
 Tier 2: Run curated .pix scripts through Pixil.py (requires sudo + LED stack on Pi).
 
+Off the Pi, set PIXIL_DISPLAY_BACKEND=framebuffer (or null) to run the same
+scripts against an in-memory display without sudo; PIXIL_SIM_VSYNC_MS adds a
+simulated per-swap latency.
+
 With PIXIL_TEST_MODE=1 (set automatically), Pixil emits:
   PIXIL_TEST_SUMMARY script=... commands=N rest=R fail=F buffer=HASH exit=0
   PIXIL_TEST_BUFFER_HASH=HASH  (from consumer process)
@@ -41,6 +45,9 @@ PIXIL = REPO_ROOT / "Pixil.py"
 
 # Default smoke duration (was 1:00 — too slow for infinite-loop main shows).
 DEFAULT_TIME_LIMIT = os.environ.get("PIXIL_SCRIPT_TIME_LIMIT", "0:10")
+# hardware (default) needs sudo for GPIO; framebuffer/null run as the current user.
+DISPLAY_BACKEND = os.environ.get("PIXIL_DISPLAY_BACKEND", "").strip().lower() or "hardware"
+NEEDS_SUDO = DISPLAY_BACKEND == "hardware"
 # Wall-clock cap per script: limit + margin (see run_one). PIXIL_SCRIPT_TIMEOUT_MAX
 # is an optional ceiling (default 120s) for very heavy smokes.
 _TIMEOUT_MARGIN = int(os.environ.get("PIXIL_SCRIPT_TIMEOUT_MARGIN", "40"))
@@ -204,6 +211,8 @@ def _can_run() -> tuple[bool, str]:
         return False, "PIXIL_SKIP_SCRIPT_TESTS is set"
     if not PIXIL.is_file():
         return False, f"Pixil.py not found at {PIXIL}"
+    if not NEEDS_SUDO:
+        return True, ""
     try:
         subprocess.run(
             ["sudo", "-n", "true"],
@@ -286,13 +295,13 @@ def run_one(
             pass
 
     cmd = [
-        "sudo",
-        "-n",
         "env",
         "PIXIL_TEST_MODE=1",
         f"PIXIL_TEST_REST_CAP={os.environ.get('PIXIL_TEST_REST_CAP', '0.01')}",
         f"PIXIL_TEST_STATE_DIR={TEST_STATE_DIR}",
-        "python3",
+        f"PIXIL_DISPLAY_BACKEND={DISPLAY_BACKEND}",
+        f"PIXIL_SIM_VSYNC_MS={os.environ.get('PIXIL_SIM_VSYNC_MS', '0')}",
+        "python3" if NEEDS_SUDO else sys.executable,
         str(PIXIL),
         pixil_arg,
         "-t",
@@ -300,6 +309,8 @@ def run_one(
         "-d",
         "DEBUG_OFF",
     ]
+    if NEEDS_SUDO:
+        cmd[:0] = ["sudo", "-n"]
     t0 = time.perf_counter()
     try:
         proc = subprocess.run(
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Live view of a running Pixil instance's telemetry socket.
+Usage: python pixil_top.py [--socket PATH] [--plain | --once]
+
+Start Pixil with --telemetry (or PIXIL_TELEMETRY=1 in the systemd unit) first.
+The curses view redraws on every snapshot; --plain prints one line per
+snapshot for ssh sessions and logs, --once prints a single snapshot as JSON.
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# Add project root to path so we can import from shared package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.telemetry import default_socket_path, read_snapshots
+
+CACHE_LABELS = (
+    ('fast_math', 'Fast math'),
+    ('expression_cache', 'Expr cache'),
+    ('jit', 'JIT'),
+    ('condition_template', 'Cond template'),
+)
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(description='Live Pixil queue / frame / cache telemetry')
+    parser.add_argument('--socket', type=str, default=None,
+                        help=f'Telemetry socket (default: {default_socket_path()})')
+    parser.add_argument('--plain', action='store_true',
+                        help='Print one line per snapshot instead of the curses view')
+    parser.add_argument('--once', action='store_true',
+                        help='Print a single snapshot as JSON and exit')
+    return parser
+
+
+def _pct(value):
+    return "   -" if value is None else f"{value:3.0f}%"
+
+
+def format_line(snap):
+    """One-line summary used by --plain."""
+    rates = snap.get('cache_hit_rates') or {}
+    depth = snap.get('queue_depth')
+    return (f"{time.strftime('%H:%M:%S', time.localtime(snap['ts']))} "
+            f"{(snap.get('script') or '-')[:24]:24} "
+            f"q {'-' if depth is None else depth:>5}/{snap.get('queue_capacity', 0):<5} "
+            f"fps {snap.get('frames_per_s', 0.0):5.1f}/{snap.get('consumer_frames_per_s', 0.0):5.1f} "
+            f"cmd/s {snap.get('commands_per_s', 0.0):7.0f} "
+            f"stall {snap.get('queue_stall_time_per_s', 0.0) * 100:3.0f}% "
+            f"jit {_pct(rates.get('jit'))} expr {_pct(rates.get('expression_cache'))}")
+
+
+def format_screen(snap):
+    """Lines drawn by the curses view."""
+    rates = snap.get('cache_hit_rates') or {}
+    depth = snap.get('queue_depth')
+    capacity = snap.get('queue_capacity') or 0
+    fill = (depth or 0) / capacity if capacity else 0.0
+    bar = '#' * int(fill * 30)
+    lines = [
+        f"Pixil telemetry   {time.strftime('%H:%M:%S', time.localtime(snap['ts']))}",
+        "",
+        f"Script        {snap.get('script') or '-'}  ({snap.get('uptime', 0.0):.0f}s)",
+        f"Queue         {'-' if depth is None else depth:>6} / {capacity:<6} [{bar:<30}]"
+        + ("  STALLED" if snap.get('queue_stalled') else ""),
+        f"Queue stall   {snap.get('queue_stall_time', 0.0):8.2f}s total  "
+        f"{snap.get('queue_stall_time_per_s', 0.0) * 100:5.1f}% of last interval",
+        "",
+        f"Producer fps  {snap.get('frames_per_s', 0.0):8.1f}   ({snap.get('frames', 0):,} frames)",
+        f"Consumer fps  {snap.get('consumer_frames_per_s', 0.0):8.1f}   ({snap.get('consumer_frames', 0):,} presents, "
+        f"max {snap.get('consumer_present_max_ms', 0.0):.1f} ms)",
+        f"Overruns/s    {snap.get('consumer_frame_overruns_per_s', 0.0):8.1f}   "
+        f"({snap.get('consumer_frame_overruns', 0):,} frames over the "
+        f"{snap.get('consumer_frame_target_fps', 0.0):.0f} fps budget)",
+        f"Commands/s    {snap.get('commands_per_s', 0.0):8.0f}",
+        f"Lines/s       {snap.get('lines_per_s', 0.0):8.0f}",
+        f"Text stall    {snap.get('consumer_text_stall_time', 0.0):8.2f}s   burnouts live {snap.get('consumer_burnouts', 0)}",
+        "",
+        "Cache hit rates",
+    ]
+    for key, label in CACHE_LABELS:
+        lines.append(f"  {label:<14} {_pct(rates.get(key))}")
+    lines += ["", "q to quit"]
+    return lines
+
+
+def run_curses(path):
+    import curses
+
+    def _main(screen):
+        curses.curs_set(0)
+        screen.nodelay(True)
+        for snap in read_snapshots(path):
+            if screen.getch() in (ord('q'), ord('Q')):
+                return
+            screen.erase()
+            height, width = screen.getmaxyx()
+            for row, text in enumerate(format_screen(snap)[:height - 1]):
+                screen.addnstr(row, 0, text, width - 1)
+            screen.refresh()
+
+    curses.wrapper(_main)
+
+
+def main():
+    args = create_parser().parse_args()
+    path = args.socket or default_socket_path()
+
+    try:
+        if args.once:
+            print(json.dumps(next(read_snapshots(path)), indent=2))
+        elif args.plain or not sys.stdout.isatty():
+            for snap in read_snapshots(path):
+                print(format_line(snap), flush=True)
+        else:
+            run_curses(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No Pixil telemetry at {path} (start Pixil.py with --telemetry)")
+        sys.exit(1)
+    except (StopIteration, TimeoutError):
+        print("Telemetry stream closed")
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,7 @@ Usage: python view_pixil_metrics.py <command> [options]
 import sys
 import argparse
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Add project root to path so we can import from database package
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -33,6 +33,9 @@ Examples:
   %(prog)s summary
   %(prog)s runs --count 40 --verbose
   %(prog)s runs --script "Boids_Flocking_Simulation.pix" --days 7 --verbose
+  %(prog)s consumer --count 10 --verbose
+  %(prog)s budget --days 7
+  %(prog)s profile --script "Blob.pix"
 
 Column Definitions:
   Performance Metrics:
@@ -58,6 +61,23 @@ Column Definitions:
     JIT-Hit      - JIT cache utilization percentage
     JIT-Comp     - JIT compilation time in seconds
     Failed       - Number of unique script lines that failed JIT compilation
+
+  Consumer (display process) Metrics:
+    Frames       - Display presents (end_frame plus immediate-mode swaps)
+    FPS          - Frames presented per second of active execution time
+    Pres-ms      - Average / maximum composite + swap time per present
+    Px/Frame     - Average pixels written per present
+    Burnouts     - Burnout objects live at script end (peak)
+    Fades        - Burnout/fade presents pumped by the consumer
+    TextStall    - Seconds the consumer was blocked in animated text effects
+
+  Frame Budget (frames with an fps() target):
+    Over%%        - Frames that took longer than 1/fps (nothing left for the pacer to sleep)
+    Interp       - Average interpreter ms per frame (queue stalls excluded)
+    QWait        - Average ms end_frame waited in the queue (backlog, never blamed)
+    Exec / Pres  - Average consumer command-execute / present ms per frame
+    Worst        - Longest frame in ms
+    Slowest      - Stage blamed for the most overruns (interpret = display idle waiting for it)
         """
     )
     
@@ -78,6 +98,8 @@ Column Definitions:
                               help='Number of executions to analyze (default: 20)')
     trends_parser.add_argument('--verbose', '-v', action='store_true',
                               help='Show detailed metrics')
+    trends_parser.add_argument('--daily', action='store_true',
+                              help='Show per-day averages; --count is then the number of days')
     
     # Summary command
     summary_parser = subparsers.add_parser('summary', help='Show performance summary')
@@ -97,6 +119,31 @@ Column Definitions:
     runs_parser.add_argument('--days', type=int, default=5,
                             help='Number of days to look back (default: 5)')
     
+    # Consumer command
+    consumer_parser = subparsers.add_parser('consumer', help='Show display-process (consumer) metrics per run')
+    consumer_parser.add_argument('--count', type=int, default=10,
+                                 help='Number of recent runs to show (default: 10)')
+    consumer_parser.add_argument('--script', type=str,
+                                 help='Show runs for specific script only')
+    consumer_parser.add_argument('--verbose', '-v', action='store_true',
+                                 help='Show the present-time histogram')
+
+    # Frame budget command
+    budget_parser = subparsers.add_parser('budget', help='Show per-script frame budget overruns against fps()')
+    budget_parser.add_argument('--count', type=int, default=20,
+                               help='Number of scripts to show (default: 20)')
+    budget_parser.add_argument('--script', type=str,
+                               help='Show a specific script only')
+    budget_parser.add_argument('--days', type=int,
+                               help='Only include runs from the last N days')
+
+    # Profile command
+    profile_parser = subparsers.add_parser('profile', help='Show the latest --profile-db line profile for a script')
+    profile_parser.add_argument('--script', type=str, required=True,
+                                help='Script name (e.g. "Blob.pix")')
+    profile_parser.add_argument('--count', type=int, default=25,
+                                help='Number of lines to show (default: 25)')
+
     # JIT summary command
     jit_parser = subparsers.add_parser('jit-summary', help='Show JIT compilation performance')
     
@@ -108,36 +155,40 @@ Column Definitions:
 def show_script_runs(count, script_filter=None, verbose=False, resource_constrained=False, days=5):
     """Show script execution runs with optional filters."""
     db = PixilMetricsDB()
+    queries = PixilQueries()
+    cutoff = datetime.now() - timedelta(days=days)
     
-    with db.get_connection() as conn:
-        base_query = '''
-            SELECT script_name, start_time, total_execution_time, active_execution_time, 
-                   commands_executed, commands_per_second, lines_per_second,
-                   parse_value_attempts, parse_value_total_time,  -- ADD THESE LINES
-                   fast_path_hit_rate, fast_math_hit_rate, cache_hit_rate,
-                   parse_value_hit_rate, jit_hit_rate, jit_skip_efficiency'''
+    columns = '''
+        SELECT script_name, start_time, total_execution_time, active_execution_time, 
+               commands_executed, commands_per_second, lines_per_second,
+               parse_value_attempts, parse_value_total_time,
+               fast_path_hit_rate, fast_math_hit_rate, cache_hit_rate,
+               parse_value_hit_rate, jit_hit_rate, jit_skip_efficiency'''
 
-        if verbose:
-                    base_query += ''', jit_cache_size, jit_cache_utilization, jit_compilation_time, failed_lines_cached,
-                                    ultra_fast_hit_rate, fast_path_parse_hit_rate, var_cache_hit_rate,
-                                    condition_template_hit_rate, condition_template_cache_size'''
-        
-        where_conditions = [
-            "execution_reason IN ('complete', 'interrupted')",
-            f"start_time >= datetime('now', '-{days} days')"
-        ]
-        
-        if resource_constrained:
-            where_conditions.append("active_execution_time >= (total_execution_time * 0.99)")
-        
-        if script_filter:
-            where_conditions.append(f"script_name = '{script_filter}'")
-        
-        where_clause = " FROM script_metrics WHERE " + " AND ".join(where_conditions)
-        order_clause = " ORDER BY script_name ASC, start_time DESC"  # DESC to get most recent first
-        
-        cursor = conn.execute(base_query + where_clause + order_clause)
-        all_runs = cursor.fetchall()
+    if verbose:
+        columns += ''', jit_cache_size, jit_cache_utilization, jit_compilation_time, failed_lines_cached,
+                        ultra_fast_hit_rate, fast_path_parse_hit_rate, var_cache_hit_rate,
+                        condition_template_hit_rate, condition_template_cache_size'''
+    
+    where_conditions = [
+        "script_name = ?",
+        "start_time >= ?",
+        "execution_reason IN ('complete', 'interrupted')",
+    ]
+    
+    if resource_constrained:
+        where_conditions.append("active_execution_time >= (total_execution_time * 0.99)")
+    
+    # One index seek per script (idx_script_runs_covering) bounded by count, instead
+    # of reading every run in the window and trimming in Python
+    run_query = (columns + " FROM script_metrics WHERE " + " AND ".join(where_conditions)
+                 + " ORDER BY start_time DESC LIMIT ?")
+    script_names = [script_filter] if script_filter else queries.get_active_scripts(days)
+    
+    all_runs = []
+    with db.get_connection() as conn:
+        for name in script_names:
+            all_runs.extend(conn.execute(run_query, (name, cutoff, count)).fetchall())
     
     if not all_runs:
         filter_desc = []
@@ -152,19 +203,10 @@ def show_script_runs(count, script_filter=None, verbose=False, resource_constrai
         return
     
     # Group runs by script
-    if script_filter:
-        runs_data = {script_filter: all_runs[:count]}
-        title_parts = [f"Script Runs for {script_filter}"]
-    else:
-        scripts_data = {}
-        for row in all_runs:
-            script_name = row['script_name']
-            if script_name not in scripts_data:
-                scripts_data[script_name] = []
-            if len(scripts_data[script_name]) < count:
-                scripts_data[script_name].append(row)
-        runs_data = scripts_data
-        title_parts = ["Script Execution Runs"]
+    runs_data = {}
+    for row in all_runs:
+        runs_data.setdefault(row['script_name'], []).append(row)
+    title_parts = [f"Script Runs for {script_filter}" if script_filter else "Script Execution Runs"]
     
     # Build title with filters
     if resource_constrained:
@@ -287,31 +329,14 @@ def show_script_runs(count, script_filter=None, verbose=False, resource_constrai
         
         # Show resource efficiency if not already filtered
         if not resource_constrained:
-            with db.get_connection() as conn:
-                # Get total runs in the time window (not filtered by count limit)
-                cursor = conn.execute(f'''
-                    SELECT COUNT(*) as total_runs_in_window
-                    FROM script_metrics 
-                    WHERE execution_reason IN ('complete', 'interrupted')
-                    AND start_time >= datetime('now', '-{days} days')
-                    {f"AND script_name = '{script_filter}'" if script_filter else ""}
-                ''')
-                total_runs_in_window = cursor.fetchone()['total_runs_in_window']
-                
-                # Get resource-constrained runs in the same time window
-                cursor = conn.execute(f'''
-                    SELECT COUNT(*) as resource_constrained_runs
-                    FROM script_metrics 
-                    WHERE execution_reason IN ('complete', 'interrupted')
-                    AND start_time >= datetime('now', '-{days} days')
-                    AND active_execution_time >= (total_execution_time * 0.99)
-                    {f"AND script_name = '{script_filter}'" if script_filter else ""}
-                ''')
-                resource_runs = cursor.fetchone()['resource_constrained_runs']
-                
-                if total_runs_in_window > 0:
-                    efficiency_rate = (resource_runs / total_runs_in_window) * 100
-                    print(f"Resource-constrained runs: {resource_runs} of {total_runs_in_window} total ({efficiency_rate:.1f}%)")
+            # Window totals (whole days) from the daily rollups
+            counts = queries.get_run_counts(days, script_filter)
+            total_runs_in_window = counts['total_runs']
+            resource_runs = counts['resource_constrained_runs']
+            
+            if total_runs_in_window > 0:
+                efficiency_rate = (resource_runs / total_runs_in_window) * 100
+                print(f"Resource-constrained runs: {resource_runs} of {total_runs_in_window} total ({efficiency_rate:.1f}%)")
 
 
 def main():
@@ -327,7 +352,9 @@ def main():
         if args.command == 'recent':
             show_recent(args.count, args.script)
         elif args.command == 'trends':
-            if args.script:
+            if args.daily:
+                show_daily_trends(args.count, args.script)
+            elif args.script:
                 show_script_trends(args.script, args.count, args.verbose)
             else:
                 show_system_trends(args.count, args.verbose)
@@ -338,6 +365,12 @@ def main():
                 show_system_summary()
         elif args.command == 'runs':
             show_script_runs(args.count, args.script, args.verbose, args.resource_constrained, args.days)
+        elif args.command == 'consumer':
+            show_consumer_metrics(args.count, args.script, args.verbose)
+        elif args.command == 'budget':
+            show_frame_budget(args.count, args.script, args.days)
+        elif args.command == 'profile':
+            show_line_profile(args.script, args.count)
         elif args.command == 'jit-summary':
             show_jit_summary()
         elif args.command == 'list':
@@ -352,8 +385,7 @@ def show_recent(limit, script_filter=None):
     
     if script_filter:
         # Get recent executions for specific script
-        history = db.get_metrics_by_script(script_filter)
-        recent = history[:limit] if history else []
+        recent = db.get_metrics_by_script(script_filter, limit)
         title = f"{len(recent)} Most Recent Executions for {script_filter}"
     else:
         # Get recent executions for all scripts
@@ -393,15 +425,12 @@ def show_recent(limit, script_filter=None):
 def show_script_trends(script_name, count, verbose=False):
     """Show performance trends for a specific script."""
     db = PixilMetricsDB()
-    history = db.get_metrics_by_script(script_name)
+    recent_history = db.get_metrics_by_script(script_name, count)
     
-    if not history:
+    if not recent_history:
         print(f"No data found for script: {script_name}")
         return
     
-    # Take only the requested number of most recent executions
-    recent_history = history[:count]
-    
     print(f"\n=== Performance Trends: {script_name} (Last {len(recent_history)} executions) ===")
     
     if verbose:
@@ -561,40 +590,60 @@ def show_system_trends(count, verbose=False):
         print("No executions found.")
         return
     
+def show_daily_trends(days, script_name=None):
+    """Show per-day averages from the daily rollups."""
+    daily = PixilQueries().get_daily_rollups(days, script_name)
+    scope = script_name or "All Scripts"
+    
+    if not daily:
+        print(f"No executions found for {scope} in the last {days} days.")
+        return
+    
+    print(f"\n=== Daily Performance Trends: {scope} (Last {days} days) ===")
+    print("Date         Runs Scripts  ExecTime  Cmds/s  Lines/s  FastPath%  FastMath%  Cache%  ParseVal%  JIT%  Skip%  RC-Runs")
+    print("-" * 116)
+    
+    for row in reversed(daily):
+        exec_time = f"{row['avg_execution_time']:.1f}s"
+        cmds_per_sec = f"{row['avg_commands_per_sec']:.0f}"
+        lines_per_sec = f"{row['avg_lines_per_sec']:.0f}"
+        fast_path = f"{row['avg_fast_path_rate']:.0f}%"
+        fast_math = f"{row['avg_fast_math_rate']:.0f}%"
+        cache = f"{row['avg_cache_rate']:.0f}%"
+        parse_val = f"{row['avg_parse_value_rate']:.0f}%"
+        jit_rate = f"{safe_get_column(row, 'avg_jit_hit_rate', 0):.0f}%"
+        skip_rate = f"{safe_get_column(row, 'avg_skip_efficiency', 0):.0f}%"
+        
+        print(f"{row['date']:12} {row['runs']:>4} {row['scripts']:>7} {exec_time:>9} {cmds_per_sec:>7} {lines_per_sec:>8} {fast_path:>10} {fast_math:>10} {cache:>7} {parse_val:>10} {jit_rate:>5} {skip_rate:>6} {row['resource_constrained_runs']:>8}")
+
 def show_script_summary(script_name):
     """Show performance summary for specific script."""
     db = PixilMetricsDB()
-    history = db.get_metrics_by_script(script_name)
+    summary = PixilQueries().get_script_summary(script_name)
     
-    if not history:
+    if not summary['total_runs']:
         print(f"No data found for script: {script_name}")
         return
     
     print(f"\n=== Performance Summary for {script_name} ===")
-    print(f"Total executions: {len(history)}")
-    
-    # Calculate averages including JIT metrics
-    executed = [row for row in history if row['execution_reason'] in ('complete', 'interrupted')]
-    if executed:
-        avg_duration = sum(row['total_execution_time'] for row in executed) / len(executed)
-        avg_commands_per_sec = sum(row['commands_per_second'] for row in executed) / len(executed)
-        avg_fast_path = sum(row['fast_path_hit_rate'] for row in executed) / len(executed)
-        
-        # JIT averages
-        avg_jit_hit = sum(safe_get_column(row, 'jit_hit_rate', 0) for row in executed) / len(executed)
-        avg_jit_skip = sum(safe_get_column(row, 'jit_skip_efficiency', 0) for row in executed) / len(executed)
+    print(f"Total executions: {summary['total_runs']}")
+    
+    # Averages over complete and interrupted runs, from the daily rollups
+    if summary['executed_runs']:
+        avg_jit_hit = summary['avg_jit_hit_rate'] or 0
+        avg_jit_skip = summary['avg_skip_efficiency'] or 0
         
-        print(f"Executed runs: {len(executed)}")
-        print(f"Average duration: {avg_duration:.3f}s")
-        print(f"Average performance: {avg_commands_per_sec:.1f} commands/sec")
-        print(f"Average fast path hit rate: {avg_fast_path:.1f}%")
+        print(f"Executed runs: {summary['executed_runs']}")
+        print(f"Average duration: {summary['avg_duration']:.3f}s")
+        print(f"Average performance: {summary['avg_commands_per_sec']:.1f} commands/sec")
+        print(f"Average fast path hit rate: {summary['avg_fast_path_rate']:.1f}%")
         
         if avg_jit_hit > 0 or avg_jit_skip > 0:
             print(f"Average JIT hit rate: {avg_jit_hit:.1f}%")
             print(f"Average JIT skip efficiency: {avg_jit_skip:.1f}%")
     
     print("\nRecent executions:")
-    for row in history[:5]:  # Show last 5
+    for row in db.get_metrics_by_script(script_name, 5):
         status = row['execution_reason']
         jit_info = ""
         jit_rate = safe_get_column(row, 'jit_hit_rate', 0)
@@ -634,28 +683,12 @@ def show_system_summary():
     print(f"Total optimization time savings: {total_optimization_savings:.3f} seconds")
     
     # JIT summary if available
-    db = PixilMetricsDB()
-    with db.get_connection() as conn:
-        try:
-            cursor = conn.execute('''
-                SELECT 
-                    AVG(jit_hit_rate) as avg_jit_hit_rate,
-                    AVG(jit_skip_efficiency) as avg_skip_efficiency,
-                    SUM(jit_time_saved + jit_skip_time_saved) as total_jit_time_saved
-                FROM script_metrics
-                WHERE execution_reason IN ('complete', 'interrupted')
-                AND created_at >= datetime('now', '-7 days')
-                AND jit_attempts > 0
-            ''')
-            
-            jit_row = cursor.fetchone()
-            if jit_row and safe_get_column(jit_row, 'avg_jit_hit_rate', 0) > 0:
-                print(f"\n=== JIT Line Caching Effectiveness ===")
-                print(f"JIT hit rate: {safe_get_column(jit_row, 'avg_jit_hit_rate', 0):.1f}%")
-                print(f"JIT skip efficiency: {safe_get_column(jit_row, 'avg_skip_efficiency', 0):.1f}%")
-                print(f"Total JIT time savings: {safe_get_column(jit_row, 'total_jit_time_saved', 0):.3f} seconds")
-        except Exception:
-            pass  # JIT columns might not exist in older databases
+    jit_row = queries.get_jit_effectiveness()
+    if safe_get_column(jit_row, 'avg_jit_hit_rate', 0):
+        print(f"\n=== JIT Line Caching Effectiveness ===")
+        print(f"JIT hit rate: {safe_get_column(jit_row, 'avg_jit_hit_rate', 0):.1f}%")
+        print(f"JIT skip efficiency: {safe_get_column(jit_row, 'avg_skip_efficiency', 0):.1f}%")
+        print(f"Total JIT time savings: {safe_get_column(jit_row, 'total_jit_time_saved', 0):.3f} seconds")
 
 def show_resource_constrained_runs(count, script_filter=None, verbose=False):
     """Show scripts that ran without significant resource constraints."""
@@ -840,6 +873,72 @@ def show_jit_summary():
         else:
             print("No JIT metrics data found.")
 
+def show_consumer_metrics(count, script_filter=None, verbose=False):
+    """Show consumer-side display metrics joined to their script runs."""
+    from shared.consumer_stats import HISTOGRAM_LABELS
+
+    db = PixilMetricsDB()
+    rows = db.get_consumer_metrics(count, script_filter)
+    if not rows:
+        if script_filter:
+            print(f"No consumer metrics found for script: {script_filter}")
+        else:
+            print("No consumer metrics found in database.")
+        return
+
+    print(f"\n=== Consumer Metrics ({len(rows)} most recent runs) ===")
+    print(f"{'Script':<36} {'Started':<19} {'Frames':>7} {'FPS':>6} {'Pres-ms':>11} "
+          f"{'Px/Frame':>8} {'Burnouts':>11} {'Fades':>6} {'TextStall':>9}")
+    for row in rows:
+        active = safe_get_column(row, 'active_execution_time', 0)
+        fps = row['frames_presented'] / active if active > 0 else 0.0
+        present = f"{row['present_time_avg_ms']:.1f}/{row['present_time_max_ms']:.1f}"
+        burnouts = f"{row['burnouts_live_end']} ({row['burnouts_live_peak']})"
+        print(f"{row['script_name'][:36]:<36} {str(row['start_time'])[:19]:<19} "
+              f"{row['frames_presented']:>7} {fps:>6.1f} {present:>11} "
+              f"{row['pixels_per_frame_avg']:>8.0f} {burnouts:>11} {row['fade_pumps']:>6} "
+              f"{row['text_effect_stall_time']:>8.2f}s")
+        if verbose:
+            buckets = "  ".join(f"{label}:{safe_get_column(row, f'present_{label}', 0)}"
+                                for label in HISTOGRAM_LABELS)
+            print(f"    present histogram  {buckets}")
+
+def show_frame_budget(count, script_filter=None, days=None):
+    """Show which scripts overrun their fps() frame budget, and in which stage."""
+    from shared.consumer_stats import BLAMED_STAGES
+
+    db = PixilMetricsDB()
+    rows = db.get_frame_budget(count, script_filter, days)
+    if not rows:
+        print("No frame budget data found (scripts need fps() and frame mode).")
+        return
+
+    print(f"\n=== Frame Budget ({len(rows)} scripts) ===")
+    print(f"{'Script':<36} {'Runs':>4} {'FPS':>5} {'Frames':>8} {'Over%':>6} {'Interp':>7} "
+          f"{'QWait':>7} {'Exec':>7} {'Pres':>7} {'Worst':>7}  Slowest")
+    for row in rows:
+        blamed = {stage: row[f'overruns_{stage}'] for stage in BLAMED_STAGES}
+        slowest = max(blamed, key=blamed.get) if row['frame_overruns'] else '-'
+        print(f"{row['script_name'][:36]:<36} {row['runs']:>4} {row['target_fps']:>5.0f} "
+              f"{row['frames_paced']:>8} {row['overrun_pct']:>5.1f}% {row['interpret_avg_ms']:>7.1f} "
+              f"{row['queue_wait_avg_ms']:>7.1f} {row['execute_avg_ms']:>7.1f} {row['present_avg_ms']:>7.1f} "
+              f"{row['worst_frame_ms']:>7.1f}  {slowest}")
+
+def show_line_profile(script_name, count):
+    """Show the hottest script lines from the latest profiled run."""
+    db = PixilMetricsDB()
+    rows = db.get_line_profile(script_name, count)
+    if not rows:
+        print(f"No line profile found for script: {script_name} (run Pixil.py with --profile-db)")
+        return
+
+    print(f"\n=== Line Profile: {script_name} ({rows[0]['start_time']}) ===")
+    print(f"{'Wall s':>8} {'Wall%':>6} {'CPU s':>8} {'Samples':>8}  {'Line':<10} {'Stack':<28} Source")
+    for row in rows:
+        print(f"{row['wall_time']:>8.3f} {row['wall_percent']:>5.1f}% {row['cpu_time']:>8.3f} "
+              f"{row['samples']:>8}  {row['line_numbers'][:10]:<10} {row['procedure_stack'][-28:]:<28} "
+              f"{(row['source_text'] or '')[:60]}")
+
 def calculate_trends(history, script_name):
     """Calculate and display trend indicators including JIT metrics."""
     # Compare first vs last few executions